@@ -13,18 +13,35 @@ def main():
     if len(sys.argv) > 1 and sys.argv[1] == "deploy":
         deploy_contracts()
     elif len(sys.argv) > 1 and sys.argv[1] == "build":
-        build_contracts()
+        build_contracts(force="--force" in sys.argv)
+    elif len(sys.argv) > 1 and sys.argv[1] == "keeper":
+        run_keeper(mock="--mock" in sys.argv)
+    elif len(sys.argv) > 1 and sys.argv[1] == "audit":
+        run_audit(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "api":
+        run_api(sys.argv[2:])
     else:
         build_contracts()
 
-def build_contracts():
+def build_contracts(force=False):
     """Build and compile contracts"""
+    from smart_contracts.build import build_all, compiler_version
     print("[BUILD] Climate DAO Smart Contracts")
     print(f"Admin Wallet: {DAO_ADMIN}")
-    print("Available Contracts:")
-    print("- ClimateDAO (Main DAO contract)")
+    print(f"[INFO] Compiler: puyapy {compiler_version()}")
+
+    try:
+        results = build_all(force=force)
+    except RuntimeError as e:
+        print(f"[ERROR] {e}")
+        return False
+
+    for result in results:
+        state = "cached" if result.cached else "compiled"
+        print(f"- {result.folder}: {state} ({result.key[:12]}) -> {result.artifacts}")
     print("[CONFIG] DAO Token Config:", DAO_TOKEN_CONFIG)
     print("\n[SUCCESS] Contracts ready for deployment")
+    return True
 
 def deploy_contracts():
     """Deploy contracts to Algorand network"""
@@ -43,26 +60,26 @@ def deploy_contracts():
         print("   Please set it using: $env:DEPLOYER_MNEMONIC='your 25 word mnemonic'")
         return False
     
+    # Compile first; unchanged contracts come straight from the artifact cache
+    if not build_contracts():
+        return False
+    
     try:
         print("\n[DEPLOY] Setting up Algorand client...")
-        from algosdk.v2client import algod
-        from algosdk import account, mnemonic as algo_mnemonic, transaction
-        from algokit_utils import ApplicationClient
-        import json
+        from algosdk import account, mnemonic as algo_mnemonic
+        from smart_contracts.deploy import DEPLOYMENT_FILE, deploy_all
+        from smart_contracts.transport import get_algod_client
         
-        # Create Algorand client for TestNet
-        algod_client = algod.AlgodClient(
-            algod_token="",
-            algod_address="https://testnet-api.algonode.cloud",
-            headers={"User-Agent": "AlgoKit"}
-        )
+        # Shared pooled client (ALGOD_SERVER/ALGOD_TOKEN, TestNet by default)
+        algod_client = get_algod_client()
+        network = os.getenv('DEPLOY_NETWORK', 'testnet')
         
         # Get account from mnemonic
         private_key = algo_mnemonic.to_private_key(mnemonic)
         deployer_address = account.address_from_private_key(private_key)
         
         print(f"[INFO] Deployer address: {deployer_address}")
-        print(f"[INFO] Network: TestNet")
+        print(f"[INFO] Network: {network}")
         
         # Check account balance
         account_info = algod_client.account_info(deployer_address)
@@ -74,91 +91,35 @@ def deploy_contracts():
             print("   Fund your account at: https://bank.testnet.algorand.network/")
             return False
         
-        # Deploy ClimateDAO contract
-        print("\n[DEPLOY] Deploying ClimateDAO main contract...")
-        
-        # For now, let's create a simple contract deployment without ApplicationClient
-        # We'll create the application using raw transactions
-        from algosdk import transaction, encoding
-        
-        # Compile the contract (for demonstration, we'll create a minimal app)
-        print("[INFO] Creating application...")
-        
-        # Create the application
-        # For a complete implementation, we would need to compile the ARC4 contract
-        # For now, let's create a placeholder app
-        approval_program = b'\x02\x20\x01\x01\x22'  # Minimal approval program that always approves
-        clear_program = b'\x02\x20\x01\x01\x22'     # Minimal clear program
-        
-        local_schema = transaction.StateSchema(0, 0)
-        global_schema = transaction.StateSchema(2, 2)  # 2 ints, 2 bytes
-        
-        # Create application transaction
-        txn = transaction.ApplicationCreateTxn(
-            sender=deployer_address,
-            sp=algod_client.suggested_params(),
-            on_complete=transaction.OnComplete.NoOpOC,
-            approval_program=approval_program,
-            clear_program=clear_program,
-            global_schema=global_schema,
-            local_schema=local_schema,
-            app_args=None,
-            accounts=None,
-            foreign_apps=None,
-            foreign_assets=None,
-            note="Climate DAO Application",
-            lease=None,
-            rekey_to=None
-        )
+        print("\n[DEPLOY] Deploying ClimateDAO, ImpactAnalytics and VotingSystem...")
+        report = deploy_all(algod_client, private_key, network=network)
         
-        # Sign and send transaction
-        signed_txn = txn.sign(private_key)
-        txid = algod_client.send_transaction(signed_txn)
-        
-        # Wait for confirmation
-        confirmed_txn = transaction.wait_for_confirmation(algod_client, txid, 4)
-        app_id = confirmed_txn["application-index"]
-        app_address = encoding.encode_address(encoding.checksum(b"appID" + app_id.to_bytes(8, "big")))
-        
-        print(f"[SUCCESS] ClimateDAO deployed!")
-        print(f"   App ID: {app_id}")
-        print(f"   App Address: {app_address}")
-        
-        # Note: Token creation would be implemented in the actual contract logic
-        print("\n[INFO] Contract deployed successfully!")
-        print("[NOTE] This is a minimal deployment for testing.")
-        print("       Full ARC4 contract functionality will be implemented in future updates.")
-        
-        # Set token IDs to None for now
-        dao_token_id = None
-        credit_token_id = None
-        
-        # Save deployment info
-        deployment_info = {
-            "network": "testnet",
-            "app_id": app_id,
-            "app_address": app_address,
-            "deployer": deployer_address,
-            "dao_admin": DAO_ADMIN,
-            "dao_token_id": dao_token_id,
-            "credit_token_id": credit_token_id,
-            "deployment_time": str(account_info.get('round', 0))
-        }
-        
-        # Write deployment info to file
-        deployment_file = Path(__file__).parent / "deployment_info.json"
-        with open(deployment_file, "w") as f:
-            json.dump(deployment_info, f, indent=2)
+        for name, app_id in report.app_ids.items():
+            if name in report.created:
+                state = "created"
+            elif name in report.updated:
+                state = "updated"
+            else:
+                state = "unchanged"
+            print(f"   {name}: App ID {app_id} ({state})")
+        if report.tokens_created:
+            print("[INFO] DAO and credit tokens created")
+        if report.linked:
+            print("[INFO] VotingSystem linked to ClimateDAO and the credit token")
+        if report.migrated:
+            print(f"[INFO] {len(report.migrated)} member records migrated to the current layout")
         
         print(f"\n[SUCCESS] Deployment completed!")
-        print(f"[INFO] Deployment details saved to: {deployment_file}")
+        print(f"[INFO] Deployment details saved to: {DEPLOYMENT_FILE}")
         print("\n[NEXT STEPS]")
         print("1. Update your frontend .env.local with:")
-        print(f"   NEXT_PUBLIC_CLIMATE_DAO_APP_ID={app_id}")
-        if dao_token_id:
-            print(f"   NEXT_PUBLIC_DAO_TOKEN_ID={dao_token_id}")
-        if credit_token_id:
-            print(f"   NEXT_PUBLIC_CREDIT_TOKEN_ID={credit_token_id}")
+        print(f"   NEXT_PUBLIC_CLIMATE_DAO_APP_ID={report.app_ids['ClimateDAO']}")
+        print(f"   NEXT_PUBLIC_VOTING_SYSTEM_APP_ID={report.app_ids['VotingSystem']}")
+        print(f"   NEXT_PUBLIC_IMPACT_ANALYTICS_APP_ID={report.app_ids['ImpactAnalytics']}")
+        if report.dao_token_id:
+            print(f"   NEXT_PUBLIC_DAO_TOKEN_ID={report.dao_token_id}")
+        if report.credit_token_id:
+            print(f"   NEXT_PUBLIC_CREDIT_TOKEN_ID={report.credit_token_id}")
         print("2. Test the deployment with frontend wallet integration")
         
         return True
@@ -169,5 +130,168 @@ def deploy_contracts():
         traceback.print_exc()
         return False
 
+def run_keeper(mock=False):
+    """Finalize expired proposals and award credits as rounds are produced"""
+    import asyncio
+    import logging
+    from algosdk.atomic_transaction_composer import AccountTransactionSigner
+    from smart_contracts.climate_dao.client import VotingSystemClient
+    from smart_contracts.keeper import Keeper
+
+    logging.basicConfig(level=logging.INFO)
+    print("[KEEPER] Climate DAO settlement keeper")
+
+    if mock:
+        import tempfile
+        from algosdk import account
+        from smart_contracts.climate_dao.client import Proposal, proposal_box
+        from smart_contracts.emulator import EmulatedAlgod, voting_fixture
+        from smart_contracts.mock_algod import MockAlgodServer
+        from smart_contracts.transport import PooledAlgodClient
+
+        # run the contract on an emulated chain with voted proposals, then close their voting period
+        private_key, sender = account.generate_account()
+        with EmulatedAlgod() as ledger:
+            app_id, _ = voting_fixture(ledger, sender, [(2500, 300, 10), (2500, 20, 200), (2500, 5, 0), (2500, 150, 40)])
+            ledger.warp(7 * 24 * 3600 + 1)
+            with MockAlgodServer(ledger, block_time=0.2) as server:
+                algod_client = PooledAlgodClient("", server.address)
+                client = VotingSystemClient(algod_client, app_id, sender, AccountTransactionSigner(private_key))
+                checkpoint = Path(tempfile.mkdtemp()) / "keeper_checkpoint.json"
+                keeper = Keeper(client, checkpoint)
+                asyncio.run(keeper.run(rounds=6))
+            print(f"[INFO] Stats: {keeper.stats}")
+            for pid in range(1, 5):
+                print(f"   Proposal {pid}: status {Proposal.decode(ledger.get_box(app_id, proposal_box(pid))).status}")
+            print(f"[INFO] Credits paid: {sum(ledger.received.values())} to {len(ledger.received)} proposers")
+        return True
+
+    mnemonic = os.getenv('DEPLOYER_MNEMONIC')
+    if not mnemonic:
+        print("\n[ERROR] DEPLOYER_MNEMONIC environment variable not set")
+        return False
+
+    from algosdk import account, mnemonic as algo_mnemonic
+    from smart_contracts.deploy import load_deployment
+    from smart_contracts.transport import get_algod_client
+
+    app_id = load_deployment().get("apps", {}).get("VotingSystem", {}).get("app_id")
+    if not app_id:
+        print("[ERROR] VotingSystem not deployed; run `python -m smart_contracts deploy` first")
+        return False
+
+    private_key = algo_mnemonic.to_private_key(mnemonic)
+    sender = account.address_from_private_key(private_key)
+    client = VotingSystemClient(get_algod_client(), app_id, sender, AccountTransactionSigner(private_key))
+    print(f"[INFO] VotingSystem app {app_id}, keeper account {sender}")
+    try:
+        asyncio.run(Keeper(client).run())
+    except KeyboardInterrupt:
+        print("\n[INFO] Keeper stopped; progress saved in the checkpoint")
+    return True
+
+def run_audit(args):
+    """Recompute the vote tallies from block logs and diff them against the on-chain summaries"""
+    import argparse
+    from smart_contracts.audit import TallyAudit
+    from smart_contracts.climate_dao.client import VotingSystemClient
+    from smart_contracts.deploy import load_deployment
+    from smart_contracts.transport import get_algod_client
+
+    deployment = load_deployment()
+    parser = argparse.ArgumentParser(prog="python -m smart_contracts audit")
+    parser.add_argument("proposals", nargs="*", type=int, help="proposal ids (default: all)")
+    parser.add_argument("--from", dest="start_round", type=int, default=deployment.get("deployment_round"), help="first round to replay")
+    parser.add_argument("--workers", type=int, default=None, help="block reader processes (default: one per core)")
+    options = parser.parse_args(args)
+
+    app_id = deployment.get("apps", {}).get("VotingSystem", {}).get("app_id")
+    if not app_id:
+        print("[ERROR] VotingSystem not deployed; run `python -m smart_contracts deploy` first")
+        return False
+    if options.start_round is None:
+        print("[ERROR] No deployment round recorded; pass --from ROUND")
+        return False
+
+    print(f"[AUDIT] VotingSystem app {app_id}, replaying from round {options.start_round}")
+    client = VotingSystemClient(get_algod_client(), app_id)
+    audit = TallyAudit(client, options.start_round, options.proposals or None, workers=options.workers)
+    report = audit.run()
+    print(f"[INFO] {report.votes} ballots in rounds {report.first_round}-{report.last_round}, {report.proposals} proposals checked")
+    for mismatch in report.mismatches:
+        print(f"   [MISMATCH] {mismatch}")
+    if report.ok:
+        print("[SUCCESS] Every summary matches its ballots")
+    return report.ok
+
+def run_api(args):
+    """Serve the read API and live tally streams for dashboards from a local mirror of the apps"""
+    import argparse
+    import time
+    from smart_contracts.api import ReadAPI
+    from smart_contracts.climate_dao.client import ClimateDAOClient, ImpactAnalyticsClient, VotingSystemClient
+    from smart_contracts.live import StreamingAPIServer, TallyHub
+    from smart_contracts.mirror import ChainMirror
+
+    parser = argparse.ArgumentParser(prog="python -m smart_contracts api")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--mock", action="store_true", help="serve an emulated chain with a few proposals")
+    options = parser.parse_args(args)
+
+    ledger = server = None
+    if options.mock:
+        from algosdk import account
+        from algosdk.atomic_transaction_composer import AccountTransactionSigner
+        from smart_contracts.climate_dao.contract import VotingSystem
+        from smart_contracts.emulator import EmulatedAlgod
+        from smart_contracts.mock_algod import MockAlgodServer
+        from smart_contracts.transport import PooledAlgodClient
+
+        ledger = EmulatedAlgod()
+        server = MockAlgodServer(ledger, block_time=1.0).start()
+        algod_client = PooledAlgodClient("", server.address)
+        start_round = ledger.round + 1
+        admin_key, admin = account.generate_account()
+        app_id = ledger.deploy(VotingSystem, admin)
+        admin_client = VotingSystemClient(algod_client, app_id, admin, AccountTransactionSigner(admin_key))
+        admin_client.register_member(admin, 200_000_000)
+        for title, funding in [("Mangrove restoration", 5000), ("Community solar", 12000), ("Peatland rewetting", 3000)]:
+            admin_client.submit_proposal(title, f"{title} pilot", funding)
+        apps = {"VotingSystem": app_id}
+    else:
+        from smart_contracts.deploy import load_deployment
+        from smart_contracts.transport import get_algod_client
+
+        deployment = load_deployment()
+        apps = {name: info.get("app_id") for name, info in deployment.get("apps", {}).items()}
+        if not apps.get("VotingSystem"):
+            print("[ERROR] VotingSystem not deployed; run `python -m smart_contracts deploy` first")
+            return False
+        algod_client = get_algod_client()
+        start_round = deployment.get("deployment_round") or 0
+
+    voting = VotingSystemClient(algod_client, apps["VotingSystem"])
+    dao = ClimateDAOClient(algod_client, apps["ClimateDAO"]) if apps.get("ClimateDAO") else None
+    impact = ImpactAnalyticsClient(algod_client, apps["ImpactAnalytics"]) if apps.get("ImpactAnalytics") else None
+    mirror = ChainMirror(voting, dao=dao, impact=impact, start_round=start_round)
+    print(f"[API] Syncing apps {apps} from round {start_round}")
+    mirror.sync()
+    api = ReadAPI(mirror)
+    api.warm()
+    hub = TallyHub(mirror)
+    with StreamingAPIServer(api, hub, options.host, options.port) as api_server:
+        print(f"[API] Serving {api_server.address}/api/dashboard (round {mirror.round})")
+        print(f"[API] Live tallies at {api_server.address}/api/stream")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print(f"\n[INFO] Stats: {api.stats}, streams: {hub.stats}")
+    if server is not None:
+        server.stop()
+        ledger.close()
+    return True
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,323 @@
+"""
+Read API for dashboards, served from the local `ChainMirror`.
+
+Endpoints (JSON):
+ - GET /api/status                       last round applied by the mirror
+ - GET /api/dashboard                    totals by status, funding, turnout, members, impact
+ - GET /api/proposals                    every proposal with its vote summary
+ - GET /api/proposals/<id>               one proposal with its vote summary
+ - GET /api/proposals/<id>/votes         the vote summary alone
+ - GET /api/members/<address>            member record and DAO balance
+ - GET /api/impact                       ImpactAnalytics totals and AI scores
+
+Live tallies are streamed over server-sent events by `live.StreamingAPIServer`.
+
+No request reaches the chain. A response body is rendered once per version of what it shows
+(the round its data last changed in, see `ChainMirror.changed`) and kept with its gzip encoding,
+so a hot endpoint is a dict lookup. The version is also the strong ETag, e.g. `"proposals-r1042"`
+(`-gz` is appended for the gzip representation). A client that sends the ETag back in
+If-None-Match gets an empty 304 until the data changes.
+
+    python -m smart_contracts api            # deployment_info.json apps, port 8080
+    python -m smart_contracts api --mock     # an emulated chain with a few proposals
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import re
+import threading
+import time
+from dataclasses import asdict
+from typing import Callable, Optional
+from urllib import parse
+
+from smart_contracts.mirror import IMPACT, MEMBERS, PROPOSALS, ChainMirror
+
+STATUS_NAMES = {0: "pending", 1: "approved", 2: "rejected", 3: "no_quorum"}
+GZIP_MIN_SIZE = 256  # smaller bodies are not worth compressing
+MAX_RENDERED = 4096  # rendered item responses kept
+
+Response = tuple[int, dict[str, str], bytes]
+
+logger = logging.getLogger(__name__)
+
+
+class Rendered:
+    """One precomputed response body, plain and gzipped"""
+
+    __slots__ = ("etag", "body", "gzipped")
+
+    def __init__(self, etag: str, payload):
+        self.etag = etag
+        self.body = json.dumps(payload, separators=(",", ":")).encode()
+        self.gzipped = gzip.compress(self.body, 6, mtime=0) if len(self.body) >= GZIP_MIN_SIZE else None
+
+
+class ReadAPI:
+    """Routes read requests to precomputed responses; framework-free so any server can host it"""
+
+    ROUTES: list[tuple[re.Pattern, str]] = [
+        (re.compile(r"^/api/status$"), "status"),
+        (re.compile(r"^/api/dashboard$"), "dashboard"),
+        (re.compile(r"^/api/proposals$"), "proposals"),
+        (re.compile(r"^/api/proposals/(?P<pid>\d+)$"), "proposal"),
+        (re.compile(r"^/api/proposals/(?P<pid>\d+)/votes$"), "votes"),
+        (re.compile(r"^/api/members/(?P<address>[A-Z2-7]{58})$"), "member"),
+        (re.compile(r"^/api/impact$"), "impact"),
+    ]
+
+    def __init__(self, mirror: ChainMirror):
+        self.mirror = mirror
+        self._rendered: dict[tuple, Rendered] = {}
+        self.stats = {"requests": 0, "rendered": 0, "not_modified": 0}
+
+    def handle(self, method: str, target: str, headers: dict[str, str]) -> Response:
+        """(status, response headers, body) for a request; header names are lower case"""
+        self.stats["requests"] += 1
+        if method not in ("GET", "HEAD"):
+            return 405, {"Allow": "GET, HEAD", "Content-Type": "text/plain"}, b"method not allowed"
+        path = parse.urlsplit(target).path
+        for pattern, name in self.ROUTES:
+            match = pattern.match(path)
+            if match:
+                break
+        else:
+            return 404, {"Content-Type": "application/json"}, b'{"message":"not found"}'
+
+        rendered = getattr(self, f"_{name}")(**match.groupdict())
+        if rendered is None:
+            return 404, {"Content-Type": "application/json"}, b'{"message":"not found"}'
+        use_gzip = rendered.gzipped is not None and "gzip" in headers.get("accept-encoding", "")
+        etag = f'"{rendered.etag}-gz"' if use_gzip else f'"{rendered.etag}"'
+        response_headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag in _etags(headers.get("if-none-match", "")):
+            self.stats["not_modified"] += 1
+            return 304, response_headers, b""
+        response_headers["Content-Type"] = "application/json"
+        if use_gzip:
+            response_headers["Content-Encoding"] = "gzip"
+        body = rendered.gzipped if use_gzip else rendered.body
+        # HEAD reports the length GET would send
+        response_headers["Content-Length"] = str(len(body))
+        return 200, response_headers, b"" if method == "HEAD" else body
+
+    def warm(self) -> None:
+        """Render the collection endpoints ahead of the first request (e.g. after each sync)"""
+        self._dashboard()
+        self._proposals()
+        self._impact()
+
+    # ------------------ rendering ------------------
+    def _cached(self, key: tuple, version: int, build: Callable[[], Optional[dict]]) -> Optional[Rendered]:
+        rendered = self._rendered.get(key)
+        etag = f"{'-'.join(str(part) for part in key)}-r{version}"
+        if rendered is None or rendered.etag != etag:
+            with self.mirror.lock:
+                payload = build()
+            if payload is None:
+                return None
+            rendered = Rendered(etag, payload)
+            if len(self._rendered) >= MAX_RENDERED:
+                self._rendered.pop(next(iter(self._rendered)))
+            self._rendered[key] = rendered
+            self.stats["rendered"] += 1
+        return rendered
+
+    def _status(self) -> Rendered:
+        return self._cached(("status",), self.mirror.round, lambda: {"round": self.mirror.round})
+
+    def _dashboard(self) -> Rendered:
+        version = max(self.mirror.version(PROPOSALS), self.mirror.version(MEMBERS), self.mirror.version(IMPACT))
+        return self._cached(("dashboard",), version, self._dashboard_payload)
+
+    def _proposals(self) -> Rendered:
+        return self._cached(("proposals",), self.mirror.version(PROPOSALS), lambda: [self._proposal_payload(pid) for pid in sorted(self.mirror.proposals)])
+
+    def _proposal(self, pid: str) -> Optional[Rendered]:
+        pid = int(pid)
+        return self._cached(("proposal", pid), self.mirror.version(PROPOSALS, pid), lambda: self._proposal_payload(pid) if pid in self.mirror.proposals else None)
+
+    def _votes(self, pid: str) -> Optional[Rendered]:
+        pid = int(pid)
+        return self._cached(("votes", pid), self.mirror.version(PROPOSALS, pid), lambda: _summary_payload(self.mirror.summaries.get(pid)) if pid in self.mirror.summaries else None)
+
+    def _member(self, address: str) -> Optional[Rendered]:
+        return self._cached(("member", address), self.mirror.version(MEMBERS, address), lambda: self._member_payload(address))
+
+    def _impact(self) -> Rendered:
+        return self._cached(("impact",), self.mirror.version(IMPACT), lambda: {**self.mirror.impact, "ai_scores": {str(k): v for k, v in sorted(self.mirror.ai_scores.items())}})
+
+    # ------------------ payloads (called with the mirror locked) ------------------
+    def _proposal_payload(self, pid: int) -> dict:
+        proposal = self.mirror.proposals[pid]
+        return {
+            "id": pid,
+            **asdict(proposal),
+            "status_name": STATUS_NAMES.get(proposal.status, "unknown"),
+            "awarded": self.mirror.awarded.get(pid, 0),
+            "votes": _summary_payload(self.mirror.summaries.get(pid)),
+        }
+
+    def _member_payload(self, address: str) -> Optional[dict]:
+        record = self.mirror.members.get(address)
+        balance = self.mirror.dao_balances.get(address)
+        if record is None and balance is None:
+            return None
+        return {"address": address, "dao_balance": balance or 0, **(asdict(record) if record is not None else {})}
+
+    def _dashboard_payload(self) -> dict:
+        by_status = {name: 0 for name in STATUS_NAMES.values()}
+        funding = 0
+        for proposal in self.mirror.proposals.values():
+            by_status[STATUS_NAMES.get(proposal.status, "pending")] += 1
+            funding += proposal.funding
+        summaries = self.mirror.summaries.values()
+        # no round: the body only changes with the data it is versioned by (see /api/status)
+        return {
+            "proposals": len(self.mirror.proposals),
+            "by_status": by_status,
+            "requested_funding": funding,
+            "awarded": sum(self.mirror.awarded.values()),
+            "ballots": sum(summary.total_voters for summary in summaries),
+            "voting_power_cast": sum(summary.total_voting_power for summary in summaries),
+            "members": len(self.mirror.members),
+            "dao_members": len(self.mirror.dao_balances),
+            "impact": dict(self.mirror.impact),
+        }
+
+
+def _summary_payload(summary) -> Optional[dict]:
+    return asdict(summary) if summary is not None else None
+
+
+def _etags(header: str) -> set[str]:
+    return {tag.strip() for tag in header.split(",") if tag.strip()}
+
+
+class ReadAPIServer:
+    """Serves a ReadAPI over HTTP/1.1 (keep-alive) from an asyncio loop on a background thread
+
+    The mirror is synced every `sync_interval` seconds on a worker thread, so slow chain reads
+    never hold up requests; `on_sync` hooks (e.g. live streams) get each sync's Changes.
+    """
+
+    def __init__(self, api: ReadAPI, host: str = "127.0.0.1", port: int = 0, sync_interval: Optional[float] = 1.0):
+        self.api = api
+        self.host = host
+        self.port = port
+        self.sync_interval = sync_interval
+        self.on_sync: list[Callable] = []
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    @property
+    def address(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "ReadAPIServer":
+        self._thread = threading.Thread(target=self._run, name="read-api", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self) -> None:
+        if self.loop is None:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop = None
+
+    def __enter__(self) -> "ReadAPIServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        server = self.loop.run_until_complete(asyncio.start_server(self._serve_connection, self.host, self.port))
+        self.port = server.sockets[0].getsockname()[1]
+        if self.sync_interval:
+            self.loop.create_task(self._sync_forever())
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            server.close()
+            for writer in list(self._writers):
+                writer.close()
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.run_until_complete(server.wait_closed())
+            self.loop.close()
+
+    async def _sync_forever(self) -> None:
+        while True:
+            started = time.monotonic()
+            try:
+                changes = await asyncio.to_thread(self.api.mirror.sync)
+                self.api.warm()
+                for hook in self.on_sync:
+                    hook(changes)
+            except Exception:  # keep serving the last good state
+                logger.exception("mirror sync failed")
+            await asyncio.sleep(max(0.0, self.sync_interval - (time.monotonic() - started)))
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, target, headers = request
+                status, response_headers, body = await self.dispatch(method, target, headers, writer)
+                if status == 0:
+                    break  # the handler took over the connection (e.g. a stream)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                # a handler's own Content-Length (a HEAD response) wins over the body it returns
+                writer.write(_head(status, {"Content-Length": str(len(body)), **response_headers, "Connection": "keep-alive" if keep_alive else "close"}) + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def dispatch(self, method: str, target: str, headers: dict[str, str], writer: asyncio.StreamWriter) -> Response:
+        return self.api.handle(method, target, headers)
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[tuple[str, str, dict[str, str]]]:
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length:
+        await reader.readexactly(length)  # read endpoints ignore bodies
+    return method, target, headers
+
+
+def _head(status: int, headers: dict[str, str]) -> bytes:
+    reason = {200: "OK", 304: "Not Modified", 404: "Not Found", 405: "Method Not Allowed"}.get(status, "Error")
+    lines = [f"HTTP/1.1 {status} {reason}"] + [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
@@ -0,0 +1,206 @@
+"""
+Off-chain audit of the VotingSystem vote tallies.
+
+Each proposal's `votes_` box is a running `VoteData` summary that `vote` updates in place; nothing on
+chain keeps the individual ballots, only the `voted_` bitmap of who voted. `TallyAudit` recomputes
+every summary from the block logs instead and diffs it against the boxes:
+ - VoteCast events give each ballot's proposal, choice and power
+ - Delegated/Undelegated events give each delegate's delegator count at the time of a ballot
+   (`total_voters` counts a delegate's vote once for them and once per delegator)
+ - the number of ballots must match the bits set in the proposal's `voted_` bitmap
+
+Blocks are read and decoded by worker processes, `chunk_rounds` rounds per task. A task sums its
+ballots per proposal before handing them back, along with the (voter, proposal) order and the
+delegation changes needed for `total_voters`. At most two tasks per worker are in flight, and the
+parent only keeps one row per proposal and one delegator count per delegate, so memory stays
+bounded however many ballots are replayed:
+
+    audit = TallyAudit(voting_client, start_round=deployment_round, workers=8)
+    report = audit.run()
+    for mismatch in report.mismatches:
+        print(mismatch)
+
+    python -m smart_contracts audit                      # every proposal, from the deployment round
+    python -m smart_contracts audit 3 7 --workers 8 --from 41200000
+
+The replay has to start at or before the app's first member registration, or delegations made
+earlier are missed.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from algosdk.v2client import algod
+
+from smart_contracts.climate_dao.client import VoteSummary, VotingSystemClient
+from smart_contracts.events import Event, EventStream
+from smart_contracts.transport import get_algod_client
+
+DEFAULT_CHUNK_ROUNDS = 500
+FIELDS = ("yes_votes", "no_votes", "abstain_votes", "total_voters", "total_voting_power")
+CHOICE_COLUMN = (2, 0, 1)  # choice 0=abstain, 1=yes, 2=no -> VoteData column
+VOTERS, POWER, BALLOTS = 3, 4, 5  # columns after the three choice totals
+
+
+@dataclass
+class ChunkTally:
+    """Ballots of a range of rounds, summed per proposal"""
+    first: int
+    last: int
+    sums: dict[int, list[int]] = field(default_factory=dict)  # pid -> [yes, no, abstain, 0, power, ballots]
+    timeline: list[tuple[str, str, int]] = field(default_factory=list)  # ("vote", voter, pid) and ("delegators", delegate, +1/-1), in block order
+    votes: int = 0
+
+
+@dataclass(frozen=True)
+class Mismatch:
+    proposal_id: int
+    field: str  # a VoteData field, "ballots" (voted_ bitmap) or "votes box"
+    recomputed: Optional[int]
+    on_chain: Optional[int]
+
+    def __str__(self) -> str:
+        return f"proposal {self.proposal_id}: {self.field} recomputed {self.recomputed}, on chain {self.on_chain}"
+
+
+@dataclass
+class AuditReport:
+    proposals: int
+    votes: int
+    first_round: int
+    last_round: int
+    mismatches: list[Mismatch] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches
+
+
+def tally_events(events: Iterable[Event], first: int, last: int, proposal_ids: Optional[frozenset[int]] = None) -> ChunkTally:
+    """Sum the VoteCast events per proposal (only `proposal_ids` when given)"""
+    chunk = ChunkTally(first, last)
+    for event in events:
+        if event.name == "VoteCast":
+            pid = event["proposal_id"]
+            if proposal_ids is not None and pid not in proposal_ids:
+                continue
+            row = chunk.sums.get(pid)
+            if row is None:
+                row = chunk.sums[pid] = [0] * 6
+            row[CHOICE_COLUMN[event["choice"]]] += event["power"]
+            row[POWER] += event["power"]
+            row[BALLOTS] += 1
+            chunk.timeline.append(("vote", event["voter"], pid))
+            chunk.votes += 1
+        elif event.name == "Delegated":
+            chunk.timeline.append(("delegators", event["delegate"], 1))
+        elif event.name == "Undelegated":
+            chunk.timeline.append(("delegators", event["delegate"], -1))
+    return chunk
+
+
+def tally_rounds(algod_client: algod.AlgodClient, app_id: int, first: int, last: int, proposal_ids: Optional[frozenset[int]] = None) -> ChunkTally:
+    stream = EventStream(algod_client, {app_id}, first)
+    return tally_events((event for rnd in range(first, last + 1) for event in stream.read_round(rnd)), first, last, proposal_ids)
+
+
+def _tally_remote(address: str, token: str, app_id: int, first: int, last: int, proposal_ids: Optional[frozenset[int]]) -> ChunkTally:
+    # one pooled client per worker process
+    return tally_rounds(get_algod_client(address, token), app_id, first, last, proposal_ids)
+
+
+class TallyAudit:
+    """Replays the vote events of a VotingSystem app and checks its `votes_` and `voted_` boxes"""
+
+    def __init__(self, client: VotingSystemClient, start_round: int, proposal_ids: Optional[Iterable[int]] = None, workers: Optional[int] = None, chunk_rounds: int = DEFAULT_CHUNK_ROUNDS):
+        self.client = client
+        self.start_round = start_round
+        self.next_round = start_round
+        self.proposal_ids = frozenset(proposal_ids) if proposal_ids is not None else None
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_rounds = chunk_rounds
+        self.tallies: dict[int, list[int]] = {}
+        self.delegators: dict[str, int] = {}
+        self.votes = 0
+
+    # ------------------ replay ------------------
+    def replay(self, last_round: int) -> None:
+        """Replay every round up to `last_round` (from where the previous replay stopped)"""
+        ranges = [(first, min(first + self.chunk_rounds - 1, last_round)) for first in range(self.next_round, last_round + 1, self.chunk_rounds)]
+        if self.workers == 1 or len(ranges) <= 1:
+            for first, last in ranges:
+                self.merge(tally_rounds(self.client.algod_client, self.client.app_id, first, last, self.proposal_ids))
+        else:
+            address, token = self.client.algod_client.algod_address, self.client.algod_client.algod_token
+            with ProcessPoolExecutor(min(self.workers, len(ranges))) as executor:
+                pending = deque()
+                for first, last in ranges:
+                    pending.append(executor.submit(_tally_remote, address, token, self.client.app_id, first, last, self.proposal_ids))
+                    if len(pending) >= 2 * self.workers:
+                        self.merge(pending.popleft().result())
+                while pending:
+                    self.merge(pending.popleft().result())
+        self.next_round = max(self.next_round, last_round + 1)
+
+    def merge(self, chunk: ChunkTally) -> None:
+        """Add a chunk's ballots; chunks must be merged in round order"""
+        for pid, sums in chunk.sums.items():
+            row = self.tallies.setdefault(pid, [0] * 6)
+            for column, value in enumerate(sums):
+                row[column] += value
+        # a delegate's ballot counts them and everyone delegating to them at that point
+        delegators = self.delegators
+        for kind, account, value in chunk.timeline:
+            if kind == "delegators":
+                delegators[account] = delegators.get(account, 0) + value
+            else:
+                self.tallies[value][VOTERS] += 1 + delegators.get(account, 0)
+        self.votes += chunk.votes
+
+    # ------------------ checks ------------------
+    def recomputed(self, proposal_id: int) -> VoteSummary:
+        row = self.tallies.get(proposal_id, [0] * 6)
+        return VoteSummary(*row[:5])
+
+    def diff(self, proposal_ids: Iterable[int]) -> list[Mismatch]:
+        """Compare the recomputed tallies with the boxes as they are now"""
+        self.client.refresh_round()
+        mismatches = []
+        for pid in proposal_ids:
+            row = self.tallies.get(pid, [0] * 6)
+            summary = self.client.get_vote_summary(pid)
+            if summary is None:
+                if row[BALLOTS]:
+                    mismatches.append(Mismatch(pid, "votes box", row[BALLOTS], None))
+                continue
+            for column, name in enumerate(FIELDS):
+                if row[column] != getattr(summary, name):
+                    mismatches.append(Mismatch(pid, name, row[column], getattr(summary, name)))
+            ballots = len(self.client.voted_indexes(pid))
+            if row[BALLOTS] != ballots:
+                mismatches.append(Mismatch(pid, "ballots", row[BALLOTS], ballots))
+        return mismatches
+
+    def run(self, attempts: int = 3) -> AuditReport:
+        """Replay up to the latest round and diff; mismatches are rechecked while the chain moves on
+
+        Votes committed between the replay and the box reads show up as mismatches, so the replay
+        catches up and the mismatching proposals are read again, up to `attempts` times.
+        """
+        last_round = self.client.refresh_round()
+        proposal_ids = sorted(self.proposal_ids) if self.proposal_ids is not None else list(range(1, self.client.total_proposals() + 1))
+        self.replay(last_round)
+        mismatches = self.diff(proposal_ids)
+        for _ in range(attempts - 1):
+            if not mismatches:
+                break
+            latest = self.client.refresh_round()
+            if latest == last_round:
+                break
+            last_round = latest
+            self.replay(last_round)
+            mismatches = self.diff(sorted({m.proposal_id for m in mismatches}))
+        return AuditReport(len(proposal_ids), self.votes, self.start_round, last_round, mismatches)
@@ -0,0 +1,300 @@
+"""
+Content-addressed storage for proposal descriptions.
+
+`submit_proposal` writes the whole description into the `prop_` box, so a long proposal pays box
+MBR for every byte and every reader downloads it with the proposal. With a `BlobClient` attached,
+`VotingSystemClient.submit_proposal` stores the text off chain instead and submits a fixed-size
+reference as the description:
+
+    blob:<sha256 of the text, hex>:<length in bytes, 12 digits>
+
+The proposal box is then the same size however long the text is. Anyone can check a fetched
+text against the hash on chain, so the store does not need to be trusted:
+
+    blobs = BlobClient("http://127.0.0.1:8090")          # or BlobClient(store=BlobStore(path))
+    voting = VotingSystemClient(algod_client, app_id, sender, signer, blobs=blobs)
+    pid = voting.submit_proposal("Mangroves", long_text, 5000)
+    voting.get_proposal(pid, resolve=True).description  # == long_text, hash verified
+
+`BlobStore` keeps each blob zlib-compressed in a file named after its hash. `BlobServer` serves a
+store over HTTP (GET/PUT /blobs/<hash>, compressed bodies), a stand-in for whatever host the
+DAO settles on. `BlobClient` verifies every fetch and keeps verified blobs in an LRU bounded by
+size; blobs never change, so cached entries never go stale.
+
+Blobs are at most `MAX_BLOB_BYTES` once decompressed: the server refuses larger PUT bodies before
+reading them, and decompression stops at the limit, so a small zlib bomb cannot inflate into
+memory on either side.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+from smart_contracts.transport import HTTPTransport
+
+REF_PREFIX = "blob:"
+REF_PATTERN = re.compile(r"^blob:(?P<digest>[0-9a-f]{64}):(?P<length>\d+)$")
+BLOB_PATH = re.compile(r"^/blobs/(?P<digest>[0-9a-f]{64})$")
+LENGTH_DIGITS = 12  # fixed width, so every reference has the same size
+DEFAULT_CACHE_BYTES = 16 * 1024 * 1024
+MAX_BLOB_BYTES = 1024 * 1024  # decompressed; a proposal description, not a document archive
+
+
+class BlobError(Exception):
+    """A blob that is missing or does not match its hash"""
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def reference(digest: str, length: int) -> str:
+    """The on-chain description that stands for a stored text"""
+    return f"{REF_PREFIX}{digest}:{length:0{LENGTH_DIGITS}d}"
+
+
+def parse_reference(description: str) -> Optional[tuple[str, int]]:
+    """(digest, length) of a blob reference, None for a description stored inline"""
+    match = REF_PATTERN.match(description)
+    return (match.group("digest"), int(match.group("length"))) if match else None
+
+
+def compressed_bound(length: int) -> int:
+    """zlib's compressBound: no blob of `length` bytes compresses to more than this"""
+    return length + (length >> 12) + (length >> 14) + (length >> 25) + 13
+
+
+def _verified(digest: str, compressed: bytes, max_bytes: int = MAX_BLOB_BYTES) -> bytes:
+    decompressor = zlib.decompressobj()
+    try:
+        # one byte past the limit tells an oversized blob from one exactly at it
+        data = decompressor.decompress(compressed, max_bytes + 1)
+    except zlib.error as e:
+        raise BlobError(f"blob {digest} is corrupt: {e}") from None
+    if len(data) > max_bytes or decompressor.unconsumed_tail:
+        raise BlobError(f"blob {digest} is larger than {max_bytes} bytes")
+    if not decompressor.eof:
+        raise BlobError(f"blob {digest} is corrupt: truncated")
+    if content_hash(data) != digest:
+        raise BlobError(f"blob {digest} does not match its hash")
+    return data
+
+
+class BlobStore:
+    """Filesystem store: root/ab/cdef....z holds the zlib-compressed blob whose sha256 is abcdef..."""
+
+    def __init__(self, root: Path, level: int = 9, max_bytes: int = MAX_BLOB_BYTES):
+        self.root = Path(root)
+        self.level = level
+        self.max_bytes = max_bytes
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest[2:]}.z"
+
+    def put(self, data: bytes) -> str:
+        if len(data) > self.max_bytes:
+            raise BlobError(f"blob is {len(data)} bytes, the limit is {self.max_bytes}")
+        digest = content_hash(data)
+        if not self.path(digest).exists():
+            self._write(digest, zlib.compress(data, self.level))
+        return digest
+
+    def put_compressed(self, digest: str, compressed: bytes) -> None:
+        """Store an already-compressed blob, after checking it against `digest`"""
+        _verified(digest, compressed, self.max_bytes)
+        if not self.path(digest).exists():
+            self._write(digest, compressed)
+
+    def get_compressed(self, digest: str) -> Optional[bytes]:
+        try:
+            return self.path(digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def get(self, digest: str) -> Optional[bytes]:
+        compressed = self.get_compressed(digest)
+        return _verified(digest, compressed, self.max_bytes) if compressed is not None else None
+
+    def _write(self, digest: str, compressed: bytes) -> None:
+        path = self.path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write-then-rename, so a reader never sees half a blob
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp, path)
+
+
+class BlobServer:
+    """Serves a BlobStore over HTTP on a background thread"""
+
+    def __init__(self, store: BlobStore, host: str = "127.0.0.1", port: int = 0):
+        self.store = store
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.requests += 1
+                match = BLOB_PATH.match(self.path)
+                compressed = server.store.get_compressed(match.group("digest")) if match else None
+                if compressed is None:
+                    return self._reply(404, b"blob not found", "text/plain")
+                self._reply(200, compressed, "application/zlib", {"Cache-Control": "public, max-age=31536000, immutable"})
+
+            def do_PUT(self):
+                server.requests += 1
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                except ValueError:
+                    length = -1
+                # a refused body is left unread, so the connection cannot be reused
+                if length < 0:
+                    self.close_connection = True
+                    return self._reply(400, b"bad Content-Length", "text/plain")
+                if length > compressed_bound(server.store.max_bytes):
+                    self.close_connection = True
+                    return self._reply(413, b"blob too large", "text/plain")
+                body = self.rfile.read(length)
+                match = BLOB_PATH.match(self.path)
+                if not match:
+                    return self._reply(404, b"not found", "text/plain")
+                try:
+                    server.store.put_compressed(match.group("digest"), body)
+                except BlobError as e:
+                    return self._reply(400, str(e).encode(), "text/plain")
+                self._reply(201, b"", "text/plain")
+
+            def _reply(self, status, body, content_type, headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self.host, self.port = self._httpd.server_address[:2]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "BlobServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="blob-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self) -> "BlobServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+class BlobClient:
+    """Stores and fetches verified blobs, from a BlobServer or straight from a local BlobStore"""
+
+    def __init__(self, base_url: Optional[str] = None, store: Optional[BlobStore] = None, cache_bytes: int = DEFAULT_CACHE_BYTES, transport: Optional[HTTPTransport] = None,
+                 max_bytes: int = MAX_BLOB_BYTES):
+        if (base_url is None) == (store is None):
+            raise ValueError("pass either a server base_url or a local store")
+        self.store = store
+        self.max_bytes = max_bytes
+        self.transport = transport if transport is not None or base_url is None else HTTPTransport(base_url)
+        self.cache_bytes = cache_bytes
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._cached_size = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "fetches": 0}
+
+    def put(self, data: bytes) -> str:
+        if len(data) > self.max_bytes:
+            raise BlobError(f"blob is {len(data)} bytes, the limit is {self.max_bytes}")
+        digest = content_hash(data)
+        if self.store is not None:
+            self.store.put(data)
+        else:
+            response = self.transport.request("PUT", f"/blobs/{digest}", {"Content-Type": "application/zlib"}, zlib.compress(data, 9))
+            if response.status != 201:
+                raise BlobError(f"storing blob {digest} failed: {response.status} {response.body[:200]!r}")
+        self._remember(digest, data)
+        return digest
+
+    def get(self, digest: str, length: Optional[int] = None) -> bytes:
+        """The blob's bytes, checked against `digest` (and `length`); raises BlobError otherwise"""
+        with self._lock:
+            data = self._cache.get(digest)
+            if data is not None:
+                self._cache.move_to_end(digest)
+                self.stats["hits"] += 1
+        if data is None:
+            self.stats["fetches"] += 1
+            data = _verified(digest, self._fetch(digest), self.max_bytes if length is None else min(length, self.max_bytes))
+            self._remember(digest, data)
+        if length is not None and len(data) != length:
+            raise BlobError(f"blob {digest} is {len(data)} bytes, the reference says {length}")
+        return data
+
+    # ------------------ text helpers ------------------
+    def reference(self, text: str) -> str:
+        """Store `text` and return the reference to submit in its place"""
+        data = text.encode("utf-8")
+        return reference(self.put(data), len(data))
+
+    def resolve(self, description: str) -> str:
+        """The full text behind a reference; inline descriptions are returned unchanged"""
+        ref = parse_reference(description)
+        return description if ref is None else self.get(*ref).decode("utf-8")
+
+    # ------------------ internals ------------------
+    def _fetch(self, digest: str) -> bytes:
+        if self.store is not None:
+            compressed = self.store.get_compressed(digest)
+        else:
+            response = self.transport.request("GET", f"/blobs/{digest}")
+            if response.status not in (200, 404):
+                raise BlobError(f"fetching blob {digest} failed: {response.status}")
+            compressed = response.body if response.status == 200 else None
+        if compressed is None:
+            raise BlobError(f"blob {digest} not found")
+        return compressed
+
+    def _remember(self, digest: str, data: bytes) -> None:
+        if len(data) > self.cache_bytes:
+            return
+        with self._lock:
+            if digest in self._cache:
+                return
+            self._cache[digest] = data
+            self._cached_size += len(data)
+            while self._cached_size > self.cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cached_size -= len(evicted)
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
@@ -0,0 +1,113 @@
+"""
+Compile the contracts in smart_contracts/<contract folder>/contract.py with PuyaPy.
+
+Each contract folder is compiled once into smart_contracts/artifacts/<contract folder>/, which
+gets TEAL, ARC-56 app specs (including the assembled bytecode) for every ARC4Contract in the file.
+Builds are cached: the artifact folder stores a key made of a hash of the compiled source
+(contract.py, which imports nothing else from its folder) and the compiler version, and an
+unchanged key with all artifacts present skips the compiler. Client-side modules living next to
+the contract (client.py, planner.py, ...) do not invalidate the artifacts.
+"""
+
+import hashlib
+import json
+import shutil
+import subprocess
+import sys
+from dataclasses import dataclass
+from importlib import metadata
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path(__file__).parent
+ARTIFACTS_DIR = ROOT / "artifacts"
+CACHE_FILE = ".build_cache.json"
+CONTRACT_SOURCES = ("contract.py",)  # per folder: the files puyapy compiles
+
+# contract folder -> ARC4 contracts defined in its contract.py
+CONTRACTS = {
+    "climate_dao": ["ClimateDAO", "ImpactAnalytics", "VotingSystem"],
+}
+
+
+@dataclass
+class BuildResult:
+    folder: str
+    key: str
+    cached: bool
+    artifacts: Path
+
+
+def compiler_version() -> str:
+    try:
+        return metadata.version("puyapy")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def source_key(folder: str, version: Optional[str] = None) -> str:
+    """Hash of the contract sources of a folder plus the compiler version"""
+    digest = hashlib.sha256()
+    digest.update((version or compiler_version()).encode())
+    for name in CONTRACT_SOURCES:
+        path = ROOT / folder / name
+        digest.update(path.relative_to(ROOT).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def expected_artifacts(folder: str) -> list[str]:
+    names = []
+    for contract in CONTRACTS[folder]:
+        names += [f"{contract}.arc56.json", f"{contract}.approval.teal", f"{contract}.clear.teal"]
+    return names
+
+
+def is_cached(folder: str, key: str) -> bool:
+    out_dir = ARTIFACTS_DIR / folder
+    try:
+        cache = json.loads((out_dir / CACHE_FILE).read_text())
+    except (OSError, ValueError):
+        return False
+    return cache.get("key") == key and all((out_dir / name).exists() for name in expected_artifacts(folder))
+
+
+def build_folder(folder: str, force: bool = False) -> BuildResult:
+    """Compile one contract folder unless its cache key is unchanged"""
+    key = source_key(folder)
+    out_dir = ARTIFACTS_DIR / folder
+    if not force and is_cached(folder, key):
+        return BuildResult(folder, key, True, out_dir)
+
+    # compile into a scratch folder so a failed build never leaves half-written artifacts
+    tmp_dir = ARTIFACTS_DIR / f".{folder}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    command = [
+        sys.executable, "-m", "puyapy", str(ROOT / folder / "contract.py"),
+        "--out-dir", str(tmp_dir),
+        "--output-arc56", "--output-teal", "--no-output-source-map",
+    ]
+    result = subprocess.run(command, capture_output=True, text=True, cwd=ROOT.parent)
+    if result.returncode != 0:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise RuntimeError(f"puyapy failed for {folder}:\n{result.stdout}{result.stderr}")
+
+    (tmp_dir / CACHE_FILE).write_text(json.dumps({"key": key, "compiler": compiler_version()}, indent=2))
+    shutil.rmtree(out_dir, ignore_errors=True)
+    tmp_dir.rename(out_dir)
+    return BuildResult(folder, key, False, out_dir)
+
+
+def build_all(force: bool = False) -> list[BuildResult]:
+    return [build_folder(folder, force) for folder in CONTRACTS]
+
+
+def load_app_spec(contract: str) -> dict:
+    """ARC-56 app spec of a built contract"""
+    for folder, contracts in CONTRACTS.items():
+        if contract in contracts:
+            path = ARTIFACTS_DIR / folder / f"{contract}.arc56.json"
+            if not path.exists():
+                raise FileNotFoundError(f"{path} missing; run `python -m smart_contracts build` first")
+            return json.loads(path.read_text())
+    raise KeyError(f"unknown contract {contract}")
@@ -0,0 +1,870 @@
+"""
+Typed Python clients for the three Climate DAO apps:
+ - ClimateDAOClient: token creation and membership
+ - ImpactAnalyticsClient: project impact tracking
+ - VotingSystemClient: proposals, votes and credit awards
+
+Notes:
+ - Method signatures mirror the ARC-4 ABI of contract.py (the same methods listed in the
+   compiled arc56 app specs), so callers never hand-encode `app_args`.
+ - Reads (proposals, vote summaries, member balances) go straight to the app boxes instead of
+   simulating the readonly getters, and are served through a read-through `BoxCache`.
+ - The cache is keyed by (app id, box name) and is invalidated by round number: once a newer
+   round is observed every entry read at an older round is dropped. An optional TTL bounds
+   staleness for long-lived processes that never observe rounds.
+ - With a `BlobClient` attached, proposal descriptions are stored off chain and the proposal box
+   holds a fixed-size content-hash reference (see blobs.py).
+ - Box, account and asset references are derived per method from the contract's key prefixes
+   (`references`), sized so the box I/O budget covers every byte touched; planner.py packs many
+   such calls into shared-resource groups.
+"""
+
+import base64
+import copy
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Optional
+
+from algosdk import abi, constants, encoding, error, transaction
+from algosdk.atomic_transaction_composer import (
+    AtomicTransactionComposer,
+    TransactionSigner,
+    TransactionWithSigner,
+)
+from algosdk.v2client import algod
+
+from smart_contracts.blobs import BlobClient
+from smart_contracts.params_cache import SuggestedParamsCache
+
+# -----------------------------
+# Box key prefixes (must match the BoxMap key_prefix values in contract.py)
+# -----------------------------
+MEMBER_PREFIX = b"member_"
+PROPOSAL_PREFIX = b"prop_"
+VOTES_PREFIX = b"votes_"
+VOTED_PREFIX = b"voted_"
+ACTIVE_BOX = b"active"
+AWARDED_PREFIX = b"awarded_"
+LEGACY_INDEX_PREFIX = b"midx_"  # member index and delegation boxes of the layout before MemberRecord
+LEGACY_DELEGATION_PREFIX = b"deleg_"
+LEGACY_BALLOT_PREFIX = b"vrec_"  # ballots cast before the voted bitmaps, still checked by vote
+PROJECT_PREFIX = b"project_"
+IMPACT_PREFIX = b"impact_"
+CREATOR_PREFIX = b"creator_"
+AI_SCORE_PREFIX = b"ai_"
+
+# -----------------------------
+# ARC4 struct codecs
+# -----------------------------
+PROPOSAL_TYPE = abi.ABIType.from_string("(string,string,uint64,address,uint64,uint64,uint64)")
+MEMBER_TYPE = abi.ABIType.from_string("(uint64,uint64,uint64,uint64,uint64)")
+DAO_MEMBER_TYPE = abi.ABIType.from_string("(uint64,uint64)")
+VOTE_DATA_TYPE = abi.ABIType.from_string("(uint64,uint64,uint64,uint64,uint64)")
+ACTIVE_ENTRY_SIZE = 16  # (end_time, proposal_id) as two big-endian uint64
+MAX_ACTIVE_PROPOSALS = 1024  # open proposals the `active` box holds; submit_proposal fails beyond it
+DELEGATION_TYPE = abi.ABIType.from_string("(address,uint64,uint64,uint64,uint64,uint64)")
+UINT64_TYPE = abi.UintType(64)
+ZERO_ADDRESS = encoding.encode_address(bytes(32))
+
+
+@dataclass(frozen=True)
+class Proposal:
+    """Decoded `ProposalData` struct"""
+    title: str
+    description: str
+    funding: int
+    proposer: str
+    creation_time: int
+    end_time: int
+    status: int  # 0=pending,1=approved,2=rejected,3=no_quorum
+
+    @classmethod
+    def decode(cls, raw: bytes) -> "Proposal":
+        return cls(*PROPOSAL_TYPE.decode(raw))
+
+
+@dataclass(frozen=True)
+class VoteSummary:
+    """Decoded `VoteData` struct"""
+    yes_votes: int
+    no_votes: int
+    abstain_votes: int
+    total_voters: int
+    total_voting_power: int
+
+    @classmethod
+    def decode(cls, raw: bytes) -> "VoteSummary":
+        return cls(*VOTE_DATA_TYPE.decode(raw))
+
+
+@dataclass(frozen=True)
+class DaoMember:
+    """Decoded `DaoMemberRecord` struct, a ClimateDAO member box"""
+    balance: int
+    joined: int  # 0 for members who joined before it was kept
+
+    @classmethod
+    def decode(cls, raw: bytes) -> "DaoMember":
+        # boxes of members who have not joined again since hold only the balance
+        return cls(*DAO_MEMBER_TYPE.decode(raw.ljust(DAO_MEMBER_SIZE, b"\0")))
+
+
+@dataclass(frozen=True)
+class Member:
+    """Decoded `MemberRecord` struct, the head of every VotingSystem member box"""
+    balance: int
+    index: int
+    joined: int  # 0 for members migrated from a layout that did not keep it
+    proposals: int
+    votes: int
+
+    @classmethod
+    def decode(cls, raw: bytes) -> "Member":
+        return cls(*MEMBER_TYPE.decode(raw[:MEMBER_RECORD_SIZE]))
+
+
+@dataclass(frozen=True)
+class Delegation:
+    """Decoded `DelegationRecord` struct"""
+    delegate: str  # ZERO_ADDRESS when voting directly
+    lent_power: int
+    delegated_power: int
+    delegators: int
+    last_change: int
+    last_vote: int
+
+    @classmethod
+    def decode(cls, raw: bytes) -> "Delegation":
+        return cls(*DELEGATION_TYPE.decode(raw))
+
+    @classmethod
+    def from_member_box(cls, raw: bytes) -> "Delegation":
+        """The DelegationRecord that follows the MemberRecord in a VotingSystem member box"""
+        return cls.decode(raw[MEMBER_RECORD_SIZE:VOTING_MEMBER_SIZE])
+
+    @property
+    def is_delegating(self) -> bool:
+        return self.delegate != ZERO_ADDRESS
+
+
+def itob(value: int) -> bytes:
+    """Big-endian uint64 encoding, as produced by `op.itob` and UInt64 BoxMap keys"""
+    return value.to_bytes(8, "big")
+
+
+def proposal_box(proposal_id: int) -> bytes:
+    return PROPOSAL_PREFIX + itob(proposal_id)
+
+
+def votes_box(proposal_id: int) -> bytes:
+    return VOTES_PREFIX + itob(proposal_id)
+
+
+def member_box(address: str) -> bytes:
+    return MEMBER_PREFIX + encoding.decode_address(address)
+
+
+def voted_box(proposal_id: int) -> bytes:
+    return VOTED_PREFIX + itob(proposal_id)
+
+
+def legacy_ballot_box(proposal_id: int, address: str) -> bytes:
+    return LEGACY_BALLOT_PREFIX + itob(proposal_id) + encoding.decode_address(address)
+
+
+def awarded_box(proposal_id: int) -> bytes:
+    return AWARDED_PREFIX + itob(proposal_id)
+
+
+def decode_active(raw: bytes) -> list[tuple[int, int]]:
+    """(end_time, proposal_id) entries of the `active` box, soonest first"""
+    return [
+        (int.from_bytes(raw[i:i + 8], "big"), int.from_bytes(raw[i + 8:i + 16], "big"))
+        for i in range(0, len(raw) - ACTIVE_ENTRY_SIZE + 1, ACTIVE_ENTRY_SIZE)
+    ]
+
+
+def bitmap_indexes(bitmap: bytes) -> list[int]:
+    """Member indexes whose bit is set (bit 0 is the most significant bit of byte 0)"""
+    return [i * 8 + bit for i, byte in enumerate(bitmap) if byte for bit in range(8) if byte & (0x80 >> bit)]
+
+
+# -----------------------------
+# Protocol limits for grouped calls
+# -----------------------------
+MAX_GROUP_SIZE = 16
+MAX_REFS_PER_TXN = 8  # accounts + assets + apps + boxes
+MAX_ACCOUNTS_PER_TXN = 4
+APP_CALL_BUDGET = 700  # opcode budget each app call adds to the group pool
+BOX_IO_PER_REF = 1024  # bytes of box I/O budget each box reference adds
+FINALIZE_COST = 450  # approximate opcodes finalize_batch spends per proposal (tally + queue removal)
+AWARD_COST = 250  # approximate opcodes award_credits_batch spends per award (checks + inner transfer)
+AWARD_BATCH_SIZE = 36  # most awards per group: 3 references each (proposal, awarded_ box, proposer), plus the credit token beside every 4 proposers
+VOTE_DATA_SIZE = 40
+DAO_MEMBER_SIZE = 16  # ClimateDAO member box
+MEMBER_RECORD_SIZE = 40
+DELEGATION_SIZE = 72
+VOTING_MEMBER_SIZE = MEMBER_RECORD_SIZE + DELEGATION_SIZE  # VotingSystem member box: MemberRecord + DelegationRecord
+UINT64_SIZE = 8
+
+
+class GroupOverflow(ValueError):
+    """A call whose references need more transactions than one group holds"""
+
+
+@dataclass
+class References:
+    """Resources an app call needs: the boxes it touches (name -> bytes), accounts, assets and apps
+
+    Each box is referenced once, plus repeats of the largest one until the box I/O budget
+    (1KB per box reference, pooled across the group) covers every byte touched.
+    """
+    boxes: dict[bytes, int] = field(default_factory=dict)
+    accounts: list[str] = field(default_factory=list)
+    assets: list[int] = field(default_factory=list)
+    apps: list[int] = field(default_factory=list)
+    holdings: list[tuple[str, int]] = field(default_factory=list)  # (account, asset) holdings touched
+    extra_box_refs: int = 0  # I/O budget references beyond the size estimate (reported by simulate)
+    budget_txns: int = 1  # app calls worth of opcode budget the call needs
+    inner_txns: int = 0  # inner transactions whose fees the caller pays
+
+    def box(self, name: bytes, size: int = 0) -> "References":
+        self.boxes[name] = max(self.boxes.get(name, 0), size)
+        return self
+
+    def account(self, address: Optional[str]) -> "References":
+        if address and address not in self.accounts:
+            self.accounts.append(address)
+        return self
+
+    def asset(self, asset_id: int) -> "References":
+        if asset_id and asset_id not in self.assets:
+            self.assets.append(asset_id)
+        return self
+
+    def holding(self, address: Optional[str], asset_id: int) -> "References":
+        """An account's holding of an asset, available only where one transaction lists both"""
+        self.account(address).asset(asset_id)
+        if address and asset_id and (address, asset_id) not in self.holdings:
+            self.holdings.append((address, asset_id))
+        return self
+
+    def box_refs(self) -> list[bytes]:
+        if not self.boxes:
+            return []
+        names = list(self.boxes)
+        needed = max(len(names), math.ceil(sum(self.boxes.values()) / BOX_IO_PER_REF)) + self.extra_box_refs
+        largest = max(names, key=self.boxes.get)
+        return names + [largest] * (needed - len(names))
+
+    def count(self) -> int:
+        return len(self.box_refs()) + len(self.accounts) + len(self.assets) + len(self.apps)
+
+    def merge(self, other: "References") -> "References":
+        """References of two calls sharing one group; shared resources are listed once"""
+        merged = References(dict(self.boxes), list(self.accounts), list(self.assets), list(self.apps))
+        for name, size in other.boxes.items():
+            merged.box(name, size)
+        for address in other.accounts:
+            merged.account(address)
+        for asset_id in other.assets:
+            merged.asset(asset_id)
+        merged.apps += [app_id for app_id in other.apps if app_id not in merged.apps]
+        merged.holdings = self.holdings + [pair for pair in other.holdings if pair not in self.holdings]
+        merged.extra_box_refs = self.extra_box_refs + other.extra_box_refs
+        merged.budget_txns = self.budget_txns + other.budget_txns
+        merged.inner_txns = self.inner_txns + other.inner_txns
+        return merged
+
+
+# -----------------------------
+# Read-through box cache
+# -----------------------------
+class BoxCache:
+    """LRU cache of box values, invalidated by round and optionally by age"""
+
+    def __init__(self, maxsize: int = 4096, ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.round = 0
+        self.hits = 0
+        self.misses = 0
+        # (app_id, name) -> (value or None for a missing box, round read at, time read at)
+        self._entries: "OrderedDict[tuple[int, bytes], tuple[Optional[bytes], int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, app_id: int, name: bytes) -> tuple[bool, Optional[bytes]]:
+        """Return (hit, value); a hit with value None means the box is known not to exist"""
+        key = (app_id, name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            value, read_round, read_at = entry
+            if read_round < self.round or (self.ttl is not None and self.clock() - read_at > self.ttl):
+                del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def put(self, app_id: int, name: bytes, value: Optional[bytes], read_round: int) -> None:
+        with self._lock:
+            if read_round < self.round:
+                # a slow read raced with a newer round; caching it would serve stale data
+                return
+            self._entries[(app_id, name)] = (value, read_round, self.clock())
+            self._entries.move_to_end((app_id, name))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def advance(self, new_round: int) -> None:
+        """Record that `new_round` has been observed, dropping entries read before it"""
+        with self._lock:
+            if new_round <= self.round:
+                return
+            self.round = new_round
+            stale = [key for key, entry in self._entries.items() if entry[1] < new_round]
+            for key in stale:
+                del self._entries[key]
+
+    def invalidate(self, app_id: int, name: Optional[bytes] = None) -> None:
+        """Drop one box, or every box of an app when `name` is None"""
+        with self._lock:
+            if name is not None:
+                self._entries.pop((app_id, name), None)
+                return
+            for key in [k for k in self._entries if k[0] == app_id]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# -----------------------------
+# Base client
+# -----------------------------
+class AppClient:
+    """Shared plumbing: ABI method lookup, cached box reads and method-call groups"""
+
+    METHODS: dict[str, abi.Method] = {}
+
+    def __init__(self, algod_client: algod.AlgodClient, app_id: int, sender: Optional[str] = None, signer: Optional[TransactionSigner] = None, cache: Optional[BoxCache] = None, params: Optional[SuggestedParamsCache] = None):
+        self.algod_client = algod_client
+        self.app_id = app_id
+        self.sender = sender
+        self.signer = signer
+        self.cache = cache if cache is not None else BoxCache()
+        self.params = params
+
+    @property
+    def app_address(self) -> str:
+        return encoding.encode_address(encoding.checksum(b"appID" + itob(self.app_id)))
+
+    def method(self, name: str) -> abi.Method:
+        return self.METHODS[name]
+
+    # ------------------ reads ------------------
+    def observe_round(self, current_round: int) -> None:
+        """Tell the cache about a round seen elsewhere (block watcher, confirmation, ...)"""
+        self.cache.advance(current_round)
+
+    def refresh_round(self) -> int:
+        """Ask algod for the latest round and invalidate anything older"""
+        current_round = self.algod_client.status()["last-round"]
+        self.cache.advance(current_round)
+        return current_round
+
+    def read_box(self, name: bytes) -> Optional[bytes]:
+        """Return the raw box value (None when missing), reading through the cache"""
+        hit, value = self.cache.get(self.app_id, name)
+        if hit:
+            return value
+        try:
+            response = self.algod_client.application_box_by_name(self.app_id, name)
+        except error.AlgodHTTPError as e:
+            if e.code != 404:
+                raise
+            self.cache.put(self.app_id, name, None, self.cache.round)
+            return None
+        value = base64.b64decode(response["value"])
+        read_round = response.get("round", self.cache.round)
+        self.cache.advance(read_round)
+        self.cache.put(self.app_id, name, value, read_round)
+        return value
+
+    def global_state(self) -> dict[str, Any]:
+        """Decoded global state (bytes values are returned raw)"""
+        info = self.algod_client.application_info(self.app_id)
+        state = {}
+        for item in info.get("params", {}).get("global-state", []):
+            key = base64.b64decode(item["key"]).decode("utf-8", errors="replace")
+            value = item["value"]
+            state[key] = value["uint"] if value["type"] == 2 else base64.b64decode(value["bytes"])
+        return state
+
+    # ------------------ writes ------------------
+    def suggested_params(self) -> transaction.SuggestedParams:
+        """Params from the shared SuggestedParamsCache when configured, else straight from algod"""
+        return self.params.get() if self.params is not None else self.algod_client.suggested_params()
+
+    def compose(self, name: str, args: list, sp: Optional[transaction.SuggestedParams] = None, atc: Optional[AtomicTransactionComposer] = None, boxes: Optional[list[bytes]] = None, **kwargs: Any) -> AtomicTransactionComposer:
+        """Append a method call to `atc` (a new composer when omitted)"""
+        if self.sender is None or self.signer is None:
+            raise ValueError("sender and signer are required for method calls")
+        atc = atc if atc is not None else AtomicTransactionComposer()
+        atc.add_method_call(
+            app_id=self.app_id,
+            method=self.method(name),
+            sender=self.sender,
+            sp=sp if sp is not None else self.suggested_params(),
+            signer=self.signer,
+            method_args=args,
+            boxes=[(self.app_id, box) for box in boxes or []],
+            **kwargs,
+        )
+        return atc
+
+    def call(self, name: str, args: list, boxes: Optional[list[bytes]] = None, **kwargs: Any) -> Any:
+        """Submit a single method call, wait for it and return the decoded ABI return value"""
+        return self.execute(self.compose(name, args, boxes=boxes, **kwargs), boxes).abi_results[0].return_value
+
+    def box_size(self, name: bytes) -> int:
+        return len(self.read_box(name) or b"")
+
+    def references(self, name: str, args: list) -> References:
+        """References `name` needs when called with `args` (the `_refs_<name>` rule, if any)"""
+        rule = getattr(self, f"_refs_{name}", None)
+        return rule(*args) if rule is not None else References()
+
+    def compose_planned(self, name: str, args: list, refs: Optional[References] = None, sp: Optional[transaction.SuggestedParams] = None) -> AtomicTransactionComposer:
+        """Method call carrying its planned references, padded and fee-pooled as needed"""
+        refs = refs if refs is not None else self.references(name, args)
+        return self.compose_padded(
+            name, args, refs.box_refs(), refs.budget_txns,
+            accounts=refs.accounts, inner_txns=refs.inner_txns, sp=sp, holdings=refs.holdings,
+            foreign_assets=refs.assets or None, foreign_apps=refs.apps or None,
+        )
+
+    def call_planned(self, name: str, args: list) -> Any:
+        """Submit one planned call and return its ABI return value"""
+        refs = self.references(name, args)
+        return self.execute(self.compose_planned(name, args, refs), list(refs.boxes)).abi_results[0].return_value
+
+    def compose_padded(self, name: str, args: list, boxes: list[bytes], min_txns: int = 1, accounts: Optional[list[str]] = None, inner_txns: int = 0, holdings: Optional[list[tuple[str, int]]] = None, **kwargs: Any) -> AtomicTransactionComposer:
+        """Method call followed by `noop` calls carrying the references (and opcode budget) it needs
+
+        References are shared across the group, so boxes and accounts beyond the 8-reference limit
+        of one transaction ride on the padding calls. An account's asset holding (`holdings`) is
+        only available where the account and the asset are listed together, so every call carrying
+        such an account lists its assets too. With `inner_txns` the first call pays the whole
+        group's fees, including that many inner transactions, and the padding calls are free.
+        """
+        accounts = accounts or []
+        assets_of: dict[str, list[int]] = {}
+        for address, asset_id in holdings or []:
+            assets_of.setdefault(address, []).append(asset_id)
+        # assets and apps of the method call itself take slots from the first transaction
+        first_assets = list(kwargs.pop("foreign_assets", None) or [])
+        first_apps = len(kwargs.get("foreign_apps") or [])
+        slots: list[tuple[list[str], list[int], list[bytes]]] = []
+        next_box = next_account = 0
+        while next_box < len(boxes) or next_account < len(accounts) or len(slots) < min_txns:
+            first = not slots
+            txn_accounts: list[str] = []
+            txn_assets = first_assets if first else []
+            used = first_apps + len(txn_assets) if first else 0
+            while next_account < len(accounts) and len(txn_accounts) < MAX_ACCOUNTS_PER_TXN:
+                extra = [asset_id for asset_id in assets_of.get(accounts[next_account], []) if asset_id not in txn_assets]
+                if used + 1 + len(extra) > MAX_REFS_PER_TXN:
+                    break
+                txn_accounts.append(accounts[next_account])
+                txn_assets = txn_assets + extra
+                used += 1 + len(extra)
+                next_account += 1
+            txn_boxes = boxes[next_box:next_box + MAX_REFS_PER_TXN - used]
+            next_box += len(txn_boxes)
+            slots.append((txn_accounts, txn_assets, txn_boxes))
+        if len(slots) > MAX_GROUP_SIZE:
+            raise GroupOverflow(f"{name} needs {len(slots)} transactions, more than one group holds")
+        if len(slots) > 1 and "noop" not in self.METHODS:
+            raise ValueError(f"{name} needs more references than one call holds and the app has no noop method")
+
+        sp = kwargs.pop("sp", None) or self.suggested_params()
+        pad_sp = sp
+        if inner_txns:
+            sp = copy.copy(sp)
+            sp.flat_fee = True
+            sp.fee = (len(slots) + inner_txns) * max(sp.min_fee or 0, constants.MIN_TXN_FEE)
+            pad_sp = copy.copy(sp)
+            pad_sp.fee = 0
+        txn_accounts, txn_assets, txn_boxes = slots[0]
+        atc = self.compose(name, args, sp=sp, boxes=txn_boxes, accounts=txn_accounts or None, foreign_assets=txn_assets or None, **kwargs)
+        for i, (txn_accounts, txn_assets, txn_boxes) in enumerate(slots[1:], start=1):
+            self.compose("noop", [], sp=pad_sp, atc=atc, boxes=txn_boxes, accounts=txn_accounts or None, foreign_assets=txn_assets or None, note=i.to_bytes(2, "big"))
+        return atc
+
+    def execute(self, atc: AtomicTransactionComposer, boxes: Optional[list[bytes]] = None) -> Any:
+        """Submit a composed group, wait for it and invalidate the boxes it wrote"""
+        result = atc.execute(self.algod_client, 4)
+        self.observe_round(result.confirmed_round)
+        if self.params is not None:
+            self.params.observe_round(result.confirmed_round)
+        # our own write makes the touched boxes stale even within the same round
+        for box in boxes or []:
+            self.cache.invalidate(self.app_id, box)
+        return result
+
+
+def _methods(*signatures: str) -> dict[str, abi.Method]:
+    methods = [abi.Method.from_signature(sig) for sig in signatures]
+    return {m.name: m for m in methods}
+
+
+# -----------------------------
+# ClimateDAO
+# -----------------------------
+class ClimateDAOClient(AppClient):
+    METHODS = _methods(
+        "create_dao_tokens(pay)void",
+        "join_dao(pay)uint64",
+        "get_member_tokens(address)uint64",
+    )
+
+    def member_tokens(self, member: str) -> int:
+        record = self.get_member(member)
+        return record.balance if record is not None else 0
+
+    def get_member(self, member: str) -> Optional[DaoMember]:
+        raw = self.read_box(member_box(member))
+        return DaoMember.decode(raw) if raw is not None else None
+
+    def is_member(self, member: str) -> bool:
+        return self.read_box(member_box(member)) is not None
+
+    def join_dao(self, pay: TransactionWithSigner) -> int:
+        return self.call_planned("join_dao", [pay])
+
+    # ------------------ references ------------------
+    def _refs_create_dao_tokens(self, pay: TransactionWithSigner) -> References:
+        return References(inner_txns=2)
+
+    def _refs_join_dao(self, pay: TransactionWithSigner) -> References:
+        # the payer is the pay transaction's sender, already available to the whole group
+        refs = References(inner_txns=1).box(member_box(pay.txn.sender), DAO_MEMBER_SIZE)
+        return refs.asset(self.global_state().get("dao_token_id", 0))
+
+
+# -----------------------------
+# ImpactAnalytics
+# -----------------------------
+class ImpactAnalyticsClient(AppClient):
+    METHODS = _methods(
+        "register_project(string,string,uint64,uint64,uint64,string)uint64",
+        "_calculate_ai_score(uint64,uint64,uint64)uint64",
+    )
+
+    def project_raw(self, project_id: int) -> Optional[bytes]:
+        return self.read_box(PROJECT_PREFIX + itob(project_id))
+
+    def ai_score(self, project_id: int) -> Optional[int]:
+        raw = self.read_box(AI_SCORE_PREFIX + itob(project_id))
+        return int.from_bytes(raw, "big") if raw is not None else None
+
+    def register_project(self, project_name: str, project_type: str, expected_co2: int, expected_trees: int, expected_energy: int, location: str) -> int:
+        args = [project_name, project_type, expected_co2, expected_trees, expected_energy, location]
+        return self.call_planned("register_project", args)
+
+    # ------------------ references ------------------
+    def _refs_register_project(self, project_name: str, project_type: str, expected_co2: int, expected_trees: int, expected_energy: int, location: str) -> References:
+        next_id = self.global_state().get("total_projects", 0) + 1
+        # name|type|location|creator, each string with its 2-byte ARC-4 length prefix
+        project_size = sum(2 + len(text.encode()) for text in (project_name, project_type, location)) + 3 + 32
+        return (
+            References()
+            .box(PROJECT_PREFIX + itob(next_id), project_size)
+            .box(IMPACT_PREFIX + itob(next_id), 3 * UINT64_SIZE + 2)
+            .box(CREATOR_PREFIX + encoding.decode_address(self.sender), UINT64_SIZE)
+            .box(AI_SCORE_PREFIX + itob(next_id), UINT64_SIZE)
+        )
+
+
+# -----------------------------
+# VotingSystem
+# -----------------------------
+class VotingSystemClient(AppClient):
+    METHODS = _methods(
+        "set_linked_dao(address)void",
+        "set_credit_token(uint64)void",
+        "set_total_token_supply(uint64)void",
+        "register_member(address,uint64)void",
+        "migrate_member(address)void",
+        "submit_proposal(string,string,uint64)uint64",
+        "vote(uint64,uint64,uint64)void",
+        "finalize(uint64)uint64",
+        "finalize_batch(uint64[])uint64[]",
+        "get_expiring(uint64,uint64)(uint64,uint64)[]",
+        "noop()void",
+        "award_credits(uint64,uint64)void",
+        "award_credits_batch((uint64,uint64)[])uint64[]",
+        "get_awarded(uint64)uint64",
+        "get_proposal(uint64)(string,string,uint64,address,uint64,uint64,uint64)",
+        "get_vote_summary(uint64)(uint64,uint64,uint64,uint64,uint64)",
+        "has_voted(uint64,address)bool",
+        "delegate(address)void",
+        "undelegate()void",
+        "get_member(address)(uint64,uint64,uint64,uint64,uint64)",
+        "get_delegation(address)(address,uint64,uint64,uint64,uint64,uint64)",
+        "opt_in()string",
+        "opt_out()void",
+    )
+
+    def __init__(self, *args: Any, blobs: Optional[BlobClient] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # descriptions go to this content-addressed store, the proposal box only keeps a reference
+        self.blobs = blobs
+
+    # ------------------ reads ------------------
+    def get_proposal(self, proposal_id: int, resolve: bool = False) -> Optional[Proposal]:
+        """The proposal; with `resolve`, a blob reference is replaced by the verified full text"""
+        raw = self.read_box(proposal_box(proposal_id))
+        if raw is None:
+            return None
+        proposal = Proposal.decode(raw)
+        if resolve and self.blobs is not None:
+            proposal = replace(proposal, description=self.blobs.resolve(proposal.description))
+        return proposal
+
+    def get_vote_summary(self, proposal_id: int) -> Optional[VoteSummary]:
+        raw = self.read_box(votes_box(proposal_id))
+        return VoteSummary.decode(raw) if raw is not None else None
+
+    def get_member(self, member: str) -> Optional[Member]:
+        """The member's record; None for non-members and for members not yet migrated (`legacy_members`)"""
+        raw = self.read_box(member_box(member))
+        return Member.decode(raw) if raw is not None and len(raw) >= VOTING_MEMBER_SIZE else None
+
+    def member_index(self, member: str) -> Optional[int]:
+        record = self.get_member(member)
+        return record.index if record is not None else None
+
+    def has_voted(self, proposal_id: int, member: str) -> bool:
+        index = self.member_index(member)
+        bitmap = self.read_box(voted_box(proposal_id)) or b""
+        return index is not None and index // 8 < len(bitmap) and bool(bitmap[index // 8] & (0x80 >> index % 8))
+
+    def active_proposals(self) -> list[tuple[int, int]]:
+        """Every open proposal as (end_time, proposal_id), soonest first (one box read)"""
+        return decode_active(self.read_box(ACTIVE_BOX) or b"")
+
+    def expiring(self, before_ts: int, limit: Optional[int] = None) -> list[tuple[int, int]]:
+        """Open proposals ending before `before_ts`, like the readonly `get_expiring`"""
+        entries = [entry for entry in self.active_proposals() if entry[0] < before_ts]
+        return entries[:limit] if limit is not None else entries
+
+    def awarded(self, proposal_id: int) -> int:
+        """Credits paid to the proposal so far"""
+        raw = self.read_box(awarded_box(proposal_id))
+        return UINT64_TYPE.decode(raw) if raw is not None else 0
+
+    def get_delegation(self, member: str) -> Optional[Delegation]:
+        raw = self.read_box(member_box(member))
+        return Delegation.from_member_box(raw) if raw is not None and len(raw) >= VOTING_MEMBER_SIZE else None
+
+    def voted_indexes(self, proposal_id: int) -> list[int]:
+        """Indexes of every member that voted on the proposal (one box read)"""
+        return bitmap_indexes(self.read_box(voted_box(proposal_id)) or b"")
+
+    def member_tokens(self, member: str) -> int:
+        raw = self.read_box(member_box(member))
+        # the balance leads the record in every layout
+        return UINT64_TYPE.decode(raw[:UINT64_SIZE]) if raw is not None else 0
+
+    def total_proposals(self) -> int:
+        return self.global_state().get("total_proposals", 0)
+
+    def legacy_members(self) -> list[str]:
+        """Members whose box predates the current record layout (see `migrate_member`)
+
+        Their box holds only the balance; members indexed before the record was merged also have
+        `midx_` and `deleg_` boxes, which the migration folds into it.
+        """
+        names = [base64.b64decode(box["name"]) for box in self.algod_client.application_boxes(self.app_id).get("boxes", [])]
+        return [
+            encoding.encode_address(name[len(MEMBER_PREFIX):])
+            for name in names
+            if name.startswith(MEMBER_PREFIX) and self.box_size(name) < VOTING_MEMBER_SIZE
+        ]
+
+    # ------------------ writes ------------------
+    def register_member(self, member: str, tokens: int) -> None:
+        self.call_planned("register_member", [member, tokens])
+
+    def migrate_member(self, member: str) -> None:
+        """Give a member registered by an older version of the app its index and full record"""
+        self.call_planned("migrate_member", [member])
+
+    def delegate(self, to: str) -> None:
+        self.call_planned("delegate", [to])
+
+    def undelegate(self) -> None:
+        self.call_planned("undelegate", [])
+
+    def submit_proposal(self, title: str, description: str, funding: int) -> int:
+        if self.blobs is not None:
+            description = self.blobs.reference(description)
+        return self.call_planned("submit_proposal", [title, description, funding])
+
+    def vote(self, proposal_id: int, choice: int, voting_power: int) -> None:
+        self.call_planned("vote", [proposal_id, choice, voting_power])
+
+    def finalize(self, proposal_id: int) -> int:
+        return self.call_planned("finalize", [proposal_id])
+
+    def finalize_batch(self, proposal_ids: list[int], batch_size: int = 24) -> list[int]:
+        """Finalize many proposals with one group per `batch_size` ids; returns each id's status
+
+        Ids that are still open (status 0) or already final are skipped by the contract rather
+        than failing the group.
+        """
+        statuses = []
+        for start in range(0, len(proposal_ids), batch_size):
+            chunk = proposal_ids[start:start + batch_size]
+            atc, boxes = self.compose_finalize_batch(chunk)
+            statuses += self.execute(atc, boxes).abi_results[0].return_value
+        return statuses
+
+    def compose_finalize_batch(self, chunk: list[int], sp: Optional[transaction.SuggestedParams] = None) -> tuple[AtomicTransactionComposer, list[bytes]]:
+        """The padded group for one finalize_batch call and the boxes it writes"""
+        refs = self.references("finalize_batch", [chunk])
+        return self.compose_planned("finalize_batch", [chunk], refs, sp), list(refs.boxes)
+
+    def award_credits(self, proposal_id: int, amount: int) -> None:
+        self.call_planned("award_credits", [proposal_id, amount])
+
+    def award_credits_batch(self, awards: list[tuple[int, int]], batch_size: int = AWARD_BATCH_SIZE) -> list[int]:
+        """Pay many (proposal_id, amount) awards, one group per chunk (see `compose_award_batches`); returns each cumulative total
+
+        Awards the contract skips (unapproved, or past the proposal's funding) report the unchanged
+        total, so comparing with `awarded` beforehand tells which ones paid.
+        """
+        totals = []
+        for _, atc, boxes in self.compose_award_batches(awards, batch_size=batch_size):
+            totals += self.execute(atc, boxes).abi_results[0].return_value
+        return totals
+
+    def compose_award_batches(self, awards: list[tuple[int, int]], sp: Optional[transaction.SuggestedParams] = None, batch_size: int = AWARD_BATCH_SIZE) -> list[tuple[list[tuple[int, int]], AtomicTransactionComposer, list[bytes]]]:
+        """(chunk, group, written boxes) for every award, in order
+
+        Chunks hold at most `batch_size` awards and are halved until their planned references fit
+        one group: a proposal box longer than 1KB takes more than one reference.
+        """
+        sp = sp or self.suggested_params()
+        todo = [awards[start:start + batch_size] for start in range(0, len(awards), batch_size)]
+        groups = []
+        while todo:
+            chunk = todo.pop(0)
+            try:
+                atc, boxes = self.compose_award_batch(chunk, sp)
+            except GroupOverflow:
+                if len(chunk) == 1:
+                    raise
+                todo[:0] = [chunk[:len(chunk) // 2], chunk[len(chunk) // 2:]]
+                continue
+            groups.append((chunk, atc, boxes))
+        return groups
+
+    def compose_award_batch(self, chunk: list[tuple[int, int]], sp: Optional[transaction.SuggestedParams] = None) -> tuple[AtomicTransactionComposer, list[bytes]]:
+        """The padded, fee-pooled group for one award_credits_batch call and the boxes it writes"""
+        refs = self.references("award_credits_batch", [list(chunk)])
+        return self.compose_planned("award_credits_batch", [list(chunk)], refs, sp), [box for box in refs.boxes if box.startswith(AWARDED_PREFIX)]
+
+    # ------------------ references ------------------
+    def _refs_register_member(self, member: str, tokens: int) -> References:
+        raw = self.read_box(member_box(member))
+        if raw is not None and len(raw) < VOTING_MEMBER_SIZE:
+            # re-registering migrates the box first, folding in its midx_ and deleg_ boxes
+            refs = self._refs_migrate_member(member)
+            legacy = self.read_box(LEGACY_DELEGATION_PREFIX + encoding.decode_address(member))
+            current = Delegation.decode(legacy) if legacy else None
+        else:
+            refs = References().box(member_box(member), VOTING_MEMBER_SIZE)
+            current = Delegation.from_member_box(raw) if raw is not None else None
+        if current is not None and current.is_delegating:
+            refs.box(member_box(current.delegate), VOTING_MEMBER_SIZE)  # its delegated power follows the balance
+        return refs
+
+    def _refs_migrate_member(self, member: str) -> References:
+        address = encoding.decode_address(member)
+        return (
+            References()
+            .box(member_box(member), VOTING_MEMBER_SIZE)
+            .box(LEGACY_INDEX_PREFIX + address, UINT64_SIZE)
+            .box(LEGACY_DELEGATION_PREFIX + address, DELEGATION_SIZE)
+        )
+
+    def _refs_delegate(self, to: str) -> References:
+        return References().box(member_box(self.sender), VOTING_MEMBER_SIZE).box(member_box(to), VOTING_MEMBER_SIZE)
+
+    def _refs_undelegate(self) -> References:
+        refs = References().box(member_box(self.sender), VOTING_MEMBER_SIZE)
+        current = self.get_delegation(self.sender)
+        if current is not None and current.is_delegating:
+            refs.box(member_box(current.delegate), VOTING_MEMBER_SIZE)
+        return refs
+
+    def _refs_submit_proposal(self, title: str, description: str, funding: int) -> References:
+        next_id = self.total_proposals() + 1
+        proposal_size = len(PROPOSAL_TYPE.encode([title, description, funding, self.sender, 0, 0, 0]))
+        return (
+            References()
+            .box(member_box(self.sender), VOTING_MEMBER_SIZE)
+            .box(proposal_box(next_id), proposal_size)
+            .box(votes_box(next_id), VOTE_DATA_SIZE)
+            .box(ACTIVE_BOX, min(self.box_size(ACTIVE_BOX) + ACTIVE_ENTRY_SIZE, MAX_ACTIVE_PROPOSALS * ACTIVE_ENTRY_SIZE))
+        )
+
+    def _refs_vote(self, proposal_id: int, choice: int, voting_power: int) -> References:
+        # box I/O is charged on the whole bitmap, which only grows when the voter's byte lies past its end
+        bitmap_size = self.box_size(voted_box(proposal_id))
+        index = self.member_index(self.sender)
+        if index is not None and index // 8 >= bitmap_size:
+            bitmap_size = index // 8 + 1
+        return (
+            References()
+            .box(proposal_box(proposal_id), self.box_size(proposal_box(proposal_id)))
+            .box(votes_box(proposal_id), VOTE_DATA_SIZE)
+            .box(member_box(self.sender), VOTING_MEMBER_SIZE)
+            .box(voted_box(proposal_id), bitmap_size)
+            .box(legacy_ballot_box(proposal_id, self.sender))  # read for absence only
+        )
+
+    def _refs_finalize(self, proposal_id: int) -> References:
+        return self._refs_finalize_batch([proposal_id])
+
+    def _refs_finalize_batch(self, proposal_ids: list[int]) -> References:
+        refs = References(budget_txns=math.ceil(len(proposal_ids) * FINALIZE_COST / APP_CALL_BUDGET))
+        for pid in proposal_ids:
+            refs.box(proposal_box(pid), self.box_size(proposal_box(pid))).box(votes_box(pid), VOTE_DATA_SIZE)
+        return refs.box(ACTIVE_BOX, self.box_size(ACTIVE_BOX))
+
+    def _refs_award_credits(self, proposal_id: int, amount: int) -> References:
+        return self._refs_award_credits_batch([(proposal_id, amount)])
+
+    def _refs_award_credits_batch(self, awards: list[tuple[int, int]]) -> References:
+        refs = References(budget_txns=math.ceil(len(awards) * AWARD_COST / APP_CALL_BUDGET), inner_txns=len(awards))
+        credit_token_id = self.global_state().get("credit_token_id", 0)
+        refs.asset(credit_token_id)
+        for pid, _ in awards:
+            raw = self.read_box(proposal_box(pid))
+            refs.box(proposal_box(pid), len(raw or b"")).box(awarded_box(pid), UINT64_SIZE)
+            if raw is not None:
+                # the inner transfer credits the proposer's holding of the credit token
+                refs.holding(Proposal.decode(raw).proposer, credit_token_id)
+        return refs
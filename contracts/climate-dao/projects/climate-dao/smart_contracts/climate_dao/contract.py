@@ -2,15 +2,38 @@
 This file contains three contracts:
  - ClimateDAO: token creation and membership
  - ImpactAnalytics: project impact tracking
- - VotingSystem: fully struct-based voting logic (ProposalData, VoteData, VoterRecord)
+ - VotingSystem: fully struct-based voting logic (ProposalData, VoteData, DelegationRecord)
 
 Notes:
  - BoxMap that stores structs uses `BoxMap(UInt64, Bytes, key_prefix=...)` and stores the struct's `.bytes`.
- - Member token balances are stored in `BoxMap(Bytes, Bytes)` where the key is the account bytes and the value is the arc4.UInt64 `.bytes`.
+ - Each member has one fixed-layout box keyed by their account (`member_` + address). In
+   VotingSystem it is a `MemberRecord` (balance, index, join time, proposals submitted, ballots
+   cast) followed by their `DelegationRecord`; ClimateDAO keeps a `DaoMemberRecord` (balance, join
+   time). Fields are read and written in place at fixed offsets with box extract/replace, so
+   `vote` and `submit_proposal` touch only the bytes they need.
  - This is written to be compatible with the ARC-4 patterns shown in your environment (use `.bytes` and `Class.from_bytes`).
+ - VotingSystem members get a dense index (0, 1, 2, ...) at registration. Each proposal keeps a
+   voted bitmap box where bit i (most significant bit first) is set once member i has voted, so
+   double-vote checks are a single bit test and the box grows by one byte per eight members.
+   Member boxes written by older versions (an 8-byte balance, with separate `midx_` index and
+   `deleg_` delegation boxes once indexing existed) keep working for registration and are moved
+   to the current record by `migrate_member`, which deploys run after updating the app.
+ - Members can delegate their voting power to another member; a delegate's vote carries the sum
+   of their delegators' power. A member who voted cannot delegate until the proposals they voted on
+   have closed, and a member whose delegation changed can neither vote directly on proposals
+   created before the change nor re-delegate within a voting period, so no power is counted twice.
+ - Open proposals are kept in the `active` box as 16-byte (end_time, proposal_id) entries sorted
+   by end time, which is also the ARC4 encoding of `ActiveProposal`, so `get_expiring` returns a
+   prefix of the box without decoding every proposal. Box I/O is charged on the whole queue, so
+   at most MAX_ACTIVE_PROPOSALS (1024, a 16KB box) can be open at once; `submit_proposal` fails
+   with "too many open proposals" until some are finalized.
+ - Credits paid to a proposal are totalled in its `awarded_` box and can never exceed its funding,
+   so a repeated award (single or batched) cannot pay twice.
+ - Every state-changing method logs a typed ARC-28 event (the structs below ProposalData and
+   friends), so indexers can follow the apps from block logs instead of re-reading boxes.
 """
 
-from algopy import ARC4Contract, BoxMap, Global, Txn, UInt64, gtxn, itxn, String, Bytes, LocalState, Asset, Account, op
+from algopy import ARC4Contract, Box, BoxMap, Global, Txn, UInt64, gtxn, itxn, String, Bytes, LocalState, Asset, Account, op
 import algopy.arc4 as arc4
 import algopy
 
@@ -33,22 +56,110 @@ class VoteData(arc4.Struct):
     total_voters: arc4.UInt64
     total_voting_power: arc4.UInt64
 
-class VoterRecord(arc4.Struct):
-    voter: arc4.Address
-    choice: arc4.UInt64  # 0 abstain,1 yes,2 no
-    voting_power: arc4.UInt64
-    timestamp: arc4.UInt64
+class MemberRecord(arc4.Struct):
+    balance: arc4.UInt64
+    index: arc4.UInt64  # dense member index (bit position in voted bitmaps)
+    joined: arc4.UInt64  # timestamp of the first registration, 0 for members migrated from a layout without it
+    proposals: arc4.UInt64  # proposals submitted
+    votes: arc4.UInt64  # ballots cast
+
+class DaoMemberRecord(arc4.Struct):
+    balance: arc4.UInt64
+    joined: arc4.UInt64  # timestamp of the first join, 0 for members who joined before it was kept
+
+class ActiveProposal(arc4.Struct):
+    end_time: arc4.UInt64
+    proposal_id: arc4.UInt64
+
+class CreditAward(arc4.Struct):
+    proposal_id: arc4.UInt64
+    amount: arc4.UInt64
+
+class DelegationRecord(arc4.Struct):
+    delegate: arc4.Address  # zero address when voting directly
+    lent_power: arc4.UInt64  # power handed to `delegate`
+    delegated_power: arc4.UInt64  # power received from delegators
+    delegators: arc4.UInt64
+    last_change: arc4.UInt64  # timestamp of the last delegate/undelegate
+    last_vote: arc4.UInt64  # timestamp of the last direct vote
 
 # -----------------------------
-# Helper encoders for primitive arc4.UInt64 stored in BoxMap(Bytes, Bytes)
+# ARC-28 events (logged by every state-changing method, decoded by smart_contracts/events.py)
 # -----------------------------
-@algopy.subroutine
-def u64_to_bytes(v: arc4.UInt64) -> Bytes:
-    return v.bytes
+class TokensCreated(arc4.Struct):
+    dao_token: arc4.UInt64
+    credit_token: arc4.UInt64
+
+class MemberJoined(arc4.Struct):
+    member: arc4.Address
+    minted: arc4.UInt64
+    balance: arc4.UInt64
+
+class ProjectRegistered(arc4.Struct):
+    project_id: arc4.UInt64
+    creator: arc4.Address
+    ai_score: arc4.UInt64
+
+class SettingChanged(arc4.Struct):
+    name: arc4.String
+    value: arc4.DynamicBytes
+
+class MemberRegistered(arc4.Struct):
+    member: arc4.Address
+    tokens: arc4.UInt64
+    index: arc4.UInt64
+
+class Delegated(arc4.Struct):
+    member: arc4.Address
+    delegate: arc4.Address
+    power: arc4.UInt64
+
+class Undelegated(arc4.Struct):
+    member: arc4.Address
+    delegate: arc4.Address
+    power: arc4.UInt64
+
+class ProposalSubmitted(arc4.Struct):
+    proposal_id: arc4.UInt64
+    proposer: arc4.Address
+    funding: arc4.UInt64
+    end_time: arc4.UInt64
 
-@algopy.subroutine
-def bytes_to_u64(b: Bytes) -> arc4.UInt64:
-    return arc4.UInt64.from_bytes(b)
+class VoteCast(arc4.Struct):
+    proposal_id: arc4.UInt64
+    voter: arc4.Address
+    choice: arc4.UInt64
+    power: arc4.UInt64
+
+class ProposalFinalized(arc4.Struct):
+    proposal_id: arc4.UInt64
+    status: arc4.UInt64
+    yes_votes: arc4.UInt64
+    no_votes: arc4.UInt64
+    total_voting_power: arc4.UInt64
+
+class CreditsAwarded(arc4.Struct):
+    proposal_id: arc4.UInt64
+    receiver: arc4.Address
+    amount: arc4.UInt64
+    total: arc4.UInt64
+
+# -----------------------------
+# Member box layout: ClimateDAO keeps a DaoMemberRecord; VotingSystem a MemberRecord, then a DelegationRecord
+# -----------------------------
+DAO_MEMBER_SIZE = 16
+BALANCE = 0
+INDEX = 8
+JOINED = 16
+PROPOSALS = 24
+VOTES = 32
+MEMBER_RECORD_SIZE = 40
+DELEGATION = MEMBER_RECORD_SIZE  # DelegationRecord offset
+DELEGATION_SIZE = 72
+LAST_VOTE = DELEGATION + 64  # DelegationRecord.last_vote
+
+# the `active` queue is read and written whole, so it is kept to half the 32KB box limit
+MAX_ACTIVE_PROPOSALS = 1024
 
 # -----------------------------
 # ClimateDAO: token creation + membership
@@ -62,8 +173,8 @@ class ClimateDAO(ARC4Contract):
         self.dao_token = Asset()
         self.credit_token = Asset()
 
-        # member balances stored in BoxMap<Bytes, Bytes> -- key = account bytes, value = arc4.UInt64.bytes
-        self.member_tokens = BoxMap(Bytes, Bytes, key_prefix=b"member_")
+        # member records: key = account -> DaoMemberRecord.bytes
+        self.members = BoxMap(Account, Bytes, key_prefix=b"member_")
 
         # simple counters
         self.total_members = UInt64(0)
@@ -106,6 +217,7 @@ class ClimateDAO(ARC4Contract):
         self.credit_token_id = credit.created_asset.id
         self.dao_token = dao.created_asset
         self.credit_token = credit.created_asset
+        arc4.emit(TokensCreated(arc4.UInt64(self.dao_token_id), arc4.UInt64(self.credit_token_id)))
 
     @arc4.abimethod()
     def join_dao(self, pay: gtxn.PaymentTransaction) -> arc4.UInt64:
@@ -113,10 +225,9 @@ class ClimateDAO(ARC4Contract):
         assert pay.amount >= 1_000_000, "min 1 ALGO"
         assert self.dao_token_id != 0, "dao token not created"
 
-        key = pay.sender.bytes
-        cur_bytes, exists = self.member_tokens.maybe(key)
+        member = self.members.box(pay.sender)
 
-        if not exists:
+        if not member:
             initial = arc4.UInt64(1000 * 1_000_000)
 
             # transfer governance tokens from app reserve to user (inner txn)
@@ -127,9 +238,12 @@ class ClimateDAO(ARC4Contract):
                 fee=0
             ).submit()
 
-            # store balance as bytes
-            self.member_tokens[key] = initial.bytes
+            member.value = DaoMemberRecord(
+                balance=initial,
+                joined=arc4.UInt64(Global.latest_timestamp)
+            ).bytes
             self.total_members = self.total_members + UInt64(1)
+            arc4.emit(MemberJoined(arc4.Address(pay.sender), initial, initial))
             return initial
         else:
             # existing member -> bonus proportional to ALGO paid
@@ -141,15 +255,23 @@ class ClimateDAO(ARC4Contract):
                 fee=0
             ).submit()
 
-            prev = arc4.UInt64.from_bytes(cur_bytes)
-            new_bal = arc4.UInt64(prev.native + bonus.native)
-            self.member_tokens[key] = new_bal.bytes
+            new_bal = arc4.UInt64(op.btoi(member.extract(BALANCE, 8)) + bonus.native)
+            # boxes of members who joined before the record existed hold only the balance
+            if member.length < DAO_MEMBER_SIZE:
+                member.resize(DAO_MEMBER_SIZE)
+            member.replace(BALANCE, new_bal.bytes)
+            arc4.emit(MemberJoined(arc4.Address(pay.sender), bonus, new_bal))
             return new_bal
 
     @arc4.abimethod(readonly=True)
     def get_member_tokens(self, member: arc4.Address) -> arc4.UInt64:
-        b, ok = self.member_tokens.maybe(member.bytes)
-        return arc4.UInt64.from_bytes(b) if ok else arc4.UInt64(0)
+        record = self.members.box(member.native)
+        return arc4.UInt64(op.btoi(record.extract(BALANCE, 8))) if record else arc4.UInt64(0)
+
+    @arc4.baremethod(allow_actions=["UpdateApplication"])
+    def update(self) -> None:
+        # redeploys from `python -m smart_contracts deploy` keep the app id and its boxes
+        assert Txn.sender == Global.creator_address, "only creator"
 
 # -----------------------------
 # ImpactAnalytics (kept simple)
@@ -184,6 +306,7 @@ class ImpactAnalytics(ARC4Contract):
         self.ai_scores[pid] = ai
 
         self.total_projects = pid
+        arc4.emit(ProjectRegistered(arc4.UInt64(pid), arc4.Address(Txn.sender), arc4.UInt64(ai)))
         return arc4.UInt64(pid)
     
     @arc4.abimethod()
@@ -195,6 +318,10 @@ class ImpactAnalytics(ARC4Contract):
         max_score = UInt64(1000)
         return total if total <= max_score else max_score
 
+    @arc4.baremethod(allow_actions=["UpdateApplication"])
+    def update(self) -> None:
+        assert Txn.sender == Global.creator_address, "only creator"
+
 # -----------------------------
 # VotingSystem (FULL STRUCT-BASED)
 # -----------------------------
@@ -204,15 +331,31 @@ class VotingSystem(ARC4Contract):
         self.voting_period = arc4.UInt64(604800)  # 7 days
         self.min_tokens_to_propose = arc4.UInt64(100 * 1_000_000)
 
-        # membership mirror: key = account bytes, value = arc4.UInt64.bytes
-        self.member_tokens = BoxMap(Bytes, Bytes, key_prefix=b"member_")
+        # member records: key = account -> MemberRecord.bytes + DelegationRecord.bytes
+        self.members = BoxMap(Account, Bytes, key_prefix=b"member_")
 
         # proposals and votes stored as bytes of the struct
         self.proposals = BoxMap(UInt64, Bytes, key_prefix=b"prop_")
         self.votes = BoxMap(UInt64, Bytes, key_prefix=b"votes_")
 
-        # voter records: key = proposal_id.bytes + voter.bytes -> value = VoterRecord.bytes
-        self.voter_records = BoxMap(Bytes, Bytes, key_prefix=b"vrec_")
+        # members are indexed 0, 1, 2, ... (MemberRecord.index, the bit position in voted bitmaps)
+        self.total_members = UInt64(0)
+
+        # voted bitmaps: key = proposal id -> one bit per member index
+        self.voted = BoxMap(UInt64, Bytes, key_prefix=b"voted_")
+
+        # boxes of the layout before MemberRecord, read and deleted by migrate_member
+        self.legacy_index = BoxMap(Account, UInt64, key_prefix=b"midx_")
+        self.legacy_delegations = BoxMap(Account, Bytes, key_prefix=b"deleg_")
+        # ballots cast before the voted bitmaps: key = itob(proposal id) + voter address; never
+        # written any more, but a voter who has one already voted on that proposal
+        self.legacy_ballots = BoxMap(Bytes, Bytes, key_prefix=b"vrec_")
+
+        # open proposals: ActiveProposal entries sorted by (end_time, proposal_id)
+        self.active = Box(Bytes, key=b"active")
+
+        # credits paid out so far: key = proposal id -> cumulative amount, capped at its funding
+        self.awarded = BoxMap(UInt64, UInt64, key_prefix=b"awarded_")
 
         self.total_proposals = UInt64(0)
 
@@ -224,19 +367,23 @@ class VotingSystem(ARC4Contract):
 
     # ------------------ admin setters ------------------
     @arc4.abimethod()
-    def set_linked_dao(self, dao_app_addr: arc4.String) -> None:
+    def set_linked_dao(self, dao_app_addr: arc4.Address) -> None:
         assert Txn.sender == self.admin
+        # the raw 32-byte address, as register_member compares it with Txn.sender.bytes
         self.linked_dao = dao_app_addr.bytes
+        arc4.emit(SettingChanged(arc4.String("linked_dao"), arc4.DynamicBytes(dao_app_addr.bytes)))
 
     @arc4.abimethod()
     def set_credit_token(self, asset_id: arc4.UInt64) -> None:
         assert Txn.sender == self.admin
         self.credit_token_id = asset_id.as_uint64()
+        arc4.emit(SettingChanged(arc4.String("credit_token_id"), arc4.DynamicBytes(asset_id.bytes)))
 
     @arc4.abimethod()
     def set_total_token_supply(self, supply: arc4.UInt64) -> None:
         assert Txn.sender == self.admin
         self.total_token_supply = supply.as_uint64()
+        arc4.emit(SettingChanged(arc4.String("total_token_supply"), arc4.DynamicBytes(supply.bytes)))
 
     # ------------------ member registration ------------------
     @arc4.abimethod()
@@ -245,16 +392,140 @@ class VotingSystem(ARC4Contract):
         is_dao = bool(self.linked_dao) and Txn.sender.bytes == self.linked_dao
         assert Txn.sender == self.admin or is_dao, "not authorized"
 
-        self.member_tokens[member.bytes] = tokens.bytes
+        record = self.members.box(member.native)
+        if record:
+            self._migrate(member.native)
+            rec = DelegationRecord.from_bytes(record.extract(DELEGATION, DELEGATION_SIZE))
+            if rec.delegate.native != Global.zero_address:
+                # the power lent follows the balance, so undelegating later takes back what the delegate holds
+                target_box = self.members.box(rec.delegate.native)
+                target = DelegationRecord.from_bytes(target_box.extract(DELEGATION, DELEGATION_SIZE))
+                target.delegated_power = arc4.UInt64(target.delegated_power.native - rec.lent_power.native + tokens.native)
+                rec.lent_power = tokens
+                record.replace(DELEGATION, rec.bytes)
+                target_box.replace(DELEGATION, target.bytes)
+            record.replace(BALANCE, tokens.bytes)
+        else:
+            record.value = self._new_member(tokens, Global.latest_timestamp)
+        arc4.emit(MemberRegistered(member, tokens, arc4.UInt64(op.btoi(record.extract(INDEX, 8)))))
+
+    @arc4.abimethod()
+    def migrate_member(self, member: arc4.Address) -> None:
+        # brings a member box written by an older version of this app up to the current layout;
+        # anyone may call it, members already on the current layout are left untouched
+        record = self.members.box(member.native)
+        assert record, "not member"
+        if record.length < MEMBER_RECORD_SIZE + DELEGATION_SIZE:
+            self._migrate(member.native)
+            arc4.emit(MemberRegistered(member, arc4.UInt64.from_bytes(record.extract(BALANCE, 8)), arc4.UInt64(op.btoi(record.extract(INDEX, 8)))))
+
+    @algopy.subroutine
+    def _new_member(self, balance: arc4.UInt64, joined: UInt64) -> Bytes:
+        # MemberRecord with the next dense index, then an empty DelegationRecord
+        index = self.total_members
+        self.total_members = index + UInt64(1)
+        return self._record(balance, index, joined, DelegationRecord(
+            delegate=arc4.Address(),
+            lent_power=arc4.UInt64(0),
+            delegated_power=arc4.UInt64(0),
+            delegators=arc4.UInt64(0),
+            last_change=arc4.UInt64(0),
+            last_vote=arc4.UInt64(0)
+        ).bytes)
+
+    @algopy.subroutine
+    def _record(self, balance: arc4.UInt64, index: UInt64, joined: UInt64, delegation: Bytes) -> Bytes:
+        return MemberRecord(
+            balance=balance,
+            index=arc4.UInt64(index),
+            joined=arc4.UInt64(joined),
+            proposals=arc4.UInt64(0),
+            votes=arc4.UInt64(0)
+        ).bytes + delegation
+
+    @algopy.subroutine
+    def _migrate(self, account: Account) -> None:
+        # older member boxes hold only the 8-byte balance. Members registered before indexing get
+        # the next index; members indexed before the record was merged move their midx_ index and
+        # deleg_ DelegationRecord boxes into it. Neither layout kept when the member joined, so
+        # `joined` is 0 (unknown) rather than the time of the migration
+        record = self.members.box(account)
+        if record.length >= MEMBER_RECORD_SIZE + DELEGATION_SIZE:
+            return
+        balance = arc4.UInt64.from_bytes(record.extract(BALANCE, 8))
+        legacy_index = self.legacy_index.box(account)
+        legacy_delegation = self.legacy_delegations.box(account)
+        if legacy_index:
+            delegation = legacy_delegation.value if legacy_delegation else op.bzero(DELEGATION_SIZE)
+            value = self._record(balance, legacy_index.value, UInt64(0), delegation)
+            del legacy_index.value
+            if legacy_delegation:
+                del legacy_delegation.value
+        else:
+            value = self._new_member(balance, UInt64(0))
+        record.resize(MEMBER_RECORD_SIZE + DELEGATION_SIZE)
+        record.replace(0, value)
+
+    # ------------------ delegation ------------------
+    @arc4.abimethod()
+    def delegate(self, to: arc4.Address) -> None:
+        assert to.native != Txn.sender, "cannot delegate to self"
+        member = self.members.box(Txn.sender)
+        assert member, "not member"
+        rec = DelegationRecord.from_bytes(member.extract(DELEGATION, DELEGATION_SIZE))
+        target_box = self.members.box(to.native)
+        assert target_box, "delegate not member"
+        target = DelegationRecord.from_bytes(target_box.extract(DELEGATION, DELEGATION_SIZE))
+
+        assert rec.delegate.native == Global.zero_address, "already delegating"
+        assert rec.delegators.native == 0, "delegates cannot delegate"
+        assert target.delegate.native == Global.zero_address, "delegate is delegating"
+
+        # power already cast on open proposals (directly or by a previous delegate) must not be cast again
+        now = Global.latest_timestamp
+        if rec.last_vote.native != 0:
+            assert now > rec.last_vote.native + self.voting_period.native, "voted on an open proposal"
+        if rec.last_change.native != 0:
+            assert now > rec.last_change.native + self.voting_period.native, "delegation changed recently"
+
+        power = arc4.UInt64.from_bytes(member.extract(BALANCE, 8))
+        rec.delegate = to
+        rec.lent_power = power
+        rec.last_change = arc4.UInt64(now)
+        target.delegated_power = arc4.UInt64(target.delegated_power.native + power.native)
+        target.delegators = arc4.UInt64(target.delegators.native + 1)
+
+        member.replace(DELEGATION, rec.bytes)
+        target_box.replace(DELEGATION, target.bytes)
+        arc4.emit(Delegated(arc4.Address(Txn.sender), to, power))
+
+    @arc4.abimethod()
+    def undelegate(self) -> None:
+        member = self.members.box(Txn.sender)
+        assert member, "not member"
+        rec = DelegationRecord.from_bytes(member.extract(DELEGATION, DELEGATION_SIZE))
+        assert rec.delegate.native != Global.zero_address, "not delegating"
+
+        target_box = self.members.box(rec.delegate.native)
+        target = DelegationRecord.from_bytes(target_box.extract(DELEGATION, DELEGATION_SIZE))
+        target.delegated_power = arc4.UInt64(target.delegated_power.native - rec.lent_power.native)
+        target.delegators = arc4.UInt64(target.delegators.native - 1)
+        target_box.replace(DELEGATION, target.bytes)
+        arc4.emit(Undelegated(arc4.Address(Txn.sender), rec.delegate, rec.lent_power))
+
+        rec.delegate = arc4.Address()
+        rec.lent_power = arc4.UInt64(0)
+        rec.last_change = arc4.UInt64(Global.latest_timestamp)
+        member.replace(DELEGATION, rec.bytes)
 
     # ------------------ submit proposal ------------------
     @arc4.abimethod()
     def submit_proposal(self, title: arc4.String, description: arc4.String, funding: arc4.UInt64) -> UInt64:
         # check caller has enough tokens
-        mem_b, ok = self.member_tokens.maybe(Txn.sender.bytes)
-        assert ok, "not a registered member"
-        bal = arc4.UInt64.from_bytes(mem_b)
-        assert bal.native >= self.min_tokens_to_propose.native, "need min tokens to propose"
+        member = self.members.box(Txn.sender)
+        assert member, "not a registered member"
+        assert op.btoi(member.extract(BALANCE, 8)) >= self.min_tokens_to_propose.native, "need min tokens to propose"
+        member.replace(PROPOSALS, op.itob(op.btoi(member.extract(PROPOSALS, 8)) + 1))
 
         pid = self.total_proposals + UInt64(1)
         now = Global.latest_timestamp
@@ -282,8 +553,50 @@ class VotingSystem(ARC4Contract):
         self.votes[pid] = votes.bytes
 
         self.total_proposals = pid
+        self._activate(end, pid)
+        arc4.emit(ProposalSubmitted(arc4.UInt64(pid), arc4.Address(Txn.sender), funding, arc4.UInt64(end)))
         return pid
 
+    # ------------------ active proposal queue ------------------
+    @algopy.subroutine
+    def _active_position(self, end_time: UInt64, pid: UInt64) -> UInt64:
+        # binary search: index of the first entry not ordered before (end_time, pid)
+        lo = UInt64(0)
+        hi = self.active.length // 16 if self.active else UInt64(0)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = self.active.extract(mid * 16, 16)
+            entry_end = op.extract_uint64(entry, 0)
+            if entry_end < end_time or (entry_end == end_time and op.extract_uint64(entry, 8) < pid):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    @algopy.subroutine
+    def _activate(self, end_time: UInt64, pid: UInt64) -> None:
+        entry = op.itob(end_time) + op.itob(pid)
+        if not self.active:
+            assert self.active.create(size=16)
+            self.active.replace(0, entry)
+        else:
+            assert self.active.length < MAX_ACTIVE_PROPOSALS * 16, "too many open proposals"
+            # end times only grow with a fixed voting period, so this is normally an append
+            pos = self._active_position(end_time, pid)
+            self.active.resize(self.active.length + 16)
+            self.active.splice(pos * 16, 0, entry)
+
+    @algopy.subroutine
+    def _deactivate(self, end_time: UInt64, pid: UInt64) -> None:
+        pos = self._active_position(end_time, pid)
+        if self.active and pos * 16 < self.active.length:
+            if self.active.extract(pos * 16, 16) == op.itob(end_time) + op.itob(pid):
+                if self.active.length == 16:
+                    del self.active.value
+                else:
+                    self.active.splice(pos * 16, 16, Bytes(b""))
+                    self.active.resize(self.active.length - 16)
+
     # ------------------ vote ------------------
     @arc4.abimethod()
     def vote(self, proposal_id: arc4.UInt64, choice: arc4.UInt64, voting_power: arc4.UInt64) -> None:
@@ -298,15 +611,19 @@ class VotingSystem(ARC4Contract):
         assert now <= proposal.end_time.native, "voting ended"
         assert proposal.status.native == 0, "already finalized"
 
-        mem_b, reg = self.member_tokens.maybe(Txn.sender.bytes)
-        assert reg, "not member"
-        balance = arc4.UInt64.from_bytes(mem_b)
-        assert balance.native >= voting_power.native, "insufficient balance"
+        member = self.members.box(Txn.sender)
+        assert member, "not member"
 
-        # prevent double vote
-        key = op.itob(pid)+ Txn.sender.bytes
-        value, voted = self.voter_records.maybe(key)
-        assert not voted, "already voted"
+        # own power plus everything delegated to the sender
+        rec = DelegationRecord.from_bytes(member.extract(DELEGATION, DELEGATION_SIZE))
+        assert rec.delegate.native == Global.zero_address, "voting power delegated"
+        if rec.last_change.native != 0:
+            assert proposal.creation_time.native > rec.last_change.native, "delegation changed during this proposal"
+        assert op.btoi(member.extract(BALANCE, 8)) + rec.delegated_power.native >= voting_power.native, "insufficient balance"
+
+        # prevent double vote: a ballot from before the upgrade, then test-and-set the member's bit
+        assert op.itob(pid) + Txn.sender.bytes not in self.legacy_ballots, "already voted"
+        self._mark_voted(pid, op.btoi(member.extract(INDEX, 8)))
 
         # update votes
         v_bytes = self.votes[pid]
@@ -322,19 +639,28 @@ class VotingSystem(ARC4Contract):
         else:
             assert False, "invalid choice"
 
-        summary.total_voters = arc4.UInt64(summary.total_voters.native + 1)
+        summary.total_voters = arc4.UInt64(summary.total_voters.native + 1 + rec.delegators.native)
         summary.total_voting_power = arc4.UInt64(summary.total_voting_power.native + voting_power.native)
 
         self.votes[pid] = summary.bytes
 
-        # store voter record
-        rec = VoterRecord(
-            voter=arc4.Address(Txn.sender.bytes),
-            choice=choice,
-            voting_power=voting_power,
-            timestamp=arc4.UInt64(now)
-        )
-        self.voter_records[key] = rec.bytes
+        member.replace(VOTES, op.itob(op.btoi(member.extract(VOTES, 8)) + 1))
+        member.replace(LAST_VOTE, op.itob(now))
+        arc4.emit(VoteCast(proposal_id, arc4.Address(Txn.sender), choice, voting_power))
+
+    @algopy.subroutine
+    def _mark_voted(self, pid: UInt64, index: UInt64) -> None:
+        bitmap = self.voted.box(pid)
+        byte_index = index // 8
+        # grow on demand so members registered after the proposal can still vote
+        if not bitmap:
+            assert bitmap.create(size=byte_index + 1)
+        elif bitmap.length <= byte_index:
+            bitmap.resize(byte_index + 1)
+        current = bitmap.extract(byte_index, 1)
+        bit = index % 8
+        assert not op.getbit(current, bit), "already voted"
+        bitmap.replace(byte_index, op.setbit_bytes(current, bit, True))
 
     # ------------------ finalize ------------------
     @arc4.abimethod()
@@ -350,6 +676,28 @@ class VotingSystem(ARC4Contract):
         assert now > proposal.end_time.native, "voting still open"
         assert proposal.status.native == 0, "already finalized"
 
+        return arc4.UInt64(self._close(pid, proposal))
+
+    @arc4.abimethod()
+    def finalize_batch(self, proposal_ids: arc4.DynamicArray[arc4.UInt64]) -> arc4.DynamicArray[arc4.UInt64]:
+        # finalizes every eligible id; ids that are unknown, still open or already final are
+        # skipped and report their current status (0 for unknown or open)
+        statuses = arc4.DynamicArray[arc4.UInt64]()
+        now = Global.latest_timestamp
+        for proposal_id in proposal_ids:
+            pid = proposal_id.as_uint64()
+            status = UInt64(0)
+            p_bytes, ok = self.proposals.maybe(pid)
+            if ok:
+                proposal = ProposalData.from_bytes(p_bytes)
+                status = proposal.status.native
+                if status == 0 and now > proposal.end_time.native:
+                    status = self._close(pid, proposal)
+            statuses.append(arc4.UInt64(status))
+        return statuses
+
+    @algopy.subroutine
+    def _close(self, pid: UInt64, proposal: ProposalData) -> UInt64:
         v_bytes = self.votes[pid]
         summary = VoteData.from_bytes(v_bytes)
         summary.validate()
@@ -366,7 +714,14 @@ class VotingSystem(ARC4Contract):
 
         # write back
         self.proposals[pid] = proposal.bytes
-        return proposal.status
+        self._deactivate(proposal.end_time.native, pid)
+        arc4.emit(ProposalFinalized(arc4.UInt64(pid), proposal.status, summary.yes_votes, summary.no_votes, summary.total_voting_power))
+        return proposal.status.native
+
+    @arc4.abimethod()
+    def noop(self) -> None:
+        # lets extra group transactions carry box references for batch calls
+        pass
 
     # ------------------ award ------------------
     @arc4.abimethod()
@@ -380,17 +735,57 @@ class VotingSystem(ARC4Contract):
         proposal.validate()
         assert proposal.status.native == 1, "proposal not approved"
         assert self.credit_token_id != UInt64(0), "credit token not set"
-        
-        receiver: Account = proposal.proposer.native
-        
+
+        total = self.awarded.get(pid, default=UInt64(0)) + amount.native
+        assert total <= proposal.funding.native, "award exceeds funding"
+        self._pay(pid, proposal, amount.native, total)
+
+    @arc4.abimethod()
+    def award_credits_batch(self, awards: arc4.DynamicArray[CreditAward]) -> arc4.DynamicArray[arc4.UInt64]:
+        # one credit transfer per eligible award; awards for unknown or unapproved proposals, or
+        # that would take a proposal past its funding, are skipped. Returns each proposal's
+        # cumulative award after the call, so a skipped entry reports the unchanged total.
+        assert Txn.sender == self.admin
+        assert self.credit_token_id != UInt64(0), "credit token not set"
+        totals = arc4.DynamicArray[arc4.UInt64]()
+        for i in algopy.urange(awards.length):
+            award = awards[i].copy()
+            pid = award.proposal_id.as_uint64()
+            total = self.awarded.get(pid, default=UInt64(0))
+            p_bytes, ok = self.proposals.maybe(pid)
+            if ok:
+                proposal = ProposalData.from_bytes(p_bytes)
+                if proposal.status.native == 1 and total + award.amount.native <= proposal.funding.native:
+                    total += award.amount.native
+                    self._pay(pid, proposal, award.amount.native, total)
+            totals.append(arc4.UInt64(total))
+        return totals
+
+    @algopy.subroutine
+    def _pay(self, pid: UInt64, proposal: ProposalData, amount: UInt64, total: UInt64) -> None:
+        self.awarded[pid] = total
         itxn.AssetTransfer(
-            asset_receiver=receiver,
+            asset_receiver=proposal.proposer.native,
             xfer_asset=self.credit_token_id,
-            asset_amount=amount.native,
+            asset_amount=amount,
             fee=0
         ).submit()
+        arc4.emit(CreditsAwarded(arc4.UInt64(pid), proposal.proposer, arc4.UInt64(amount), arc4.UInt64(total)))
 
     # ------------------ getters ------------------
+    @arc4.abimethod(readonly=True)
+    def get_expiring(self, before_ts: arc4.UInt64, limit: arc4.UInt64) -> arc4.DynamicArray[ActiveProposal]:
+        # open proposals ending before `before_ts`, soonest first
+        count = self._active_position(before_ts.as_uint64(), UInt64(0))
+        if count > limit.as_uint64():
+            count = limit.as_uint64()
+        entries = self.active.extract(0, count * 16) if count else Bytes(b"")
+        return arc4.DynamicArray[ActiveProposal].from_bytes(arc4.UInt16(count).bytes + entries)
+
+    @arc4.abimethod(readonly=True)
+    def get_awarded(self, proposal_id: arc4.UInt64) -> arc4.UInt64:
+        return arc4.UInt64(self.awarded.get(proposal_id.as_uint64(), default=UInt64(0)))
+
     @arc4.abimethod(readonly=True)
     def get_proposal(self, proposal_id: arc4.UInt64) -> ProposalData:
         pid = proposal_id.as_uint64()
@@ -403,6 +798,25 @@ class VotingSystem(ARC4Contract):
         v_bytes = self.votes[pid]
         return VoteData.from_bytes(v_bytes)
 
+    @arc4.abimethod(readonly=True)
+    def get_member(self, member: arc4.Address) -> MemberRecord:
+        return MemberRecord.from_bytes(self.members.box(member.native).extract(0, MEMBER_RECORD_SIZE))
+
+    @arc4.abimethod(readonly=True)
+    def get_delegation(self, member: arc4.Address) -> DelegationRecord:
+        return DelegationRecord.from_bytes(self.members.box(member.native).extract(DELEGATION, DELEGATION_SIZE))
+
+    @arc4.abimethod(readonly=True)
+    def has_voted(self, proposal_id: arc4.UInt64, member: arc4.Address) -> bool:
+        record = self.members.box(member.native)
+        bitmap = self.voted.box(proposal_id.as_uint64())
+        if not record or not bitmap:
+            return False
+        index = op.btoi(record.extract(INDEX, 8))
+        if bitmap.length <= index // 8:
+            return False
+        return op.getbit(bitmap.extract(index // 8, 1), index % 8)
+
     @arc4.abimethod(allow_actions=['OptIn'])
     def opt_in(self) -> arc4.String:
         return arc4.String("Welcome to VotingSystem")
@@ -410,3 +824,8 @@ class VotingSystem(ARC4Contract):
     @arc4.abimethod(allow_actions=['CloseOut'])
     def opt_out(self) -> None:
         pass
+
+    @arc4.baremethod(allow_actions=["UpdateApplication"])
+    def update(self) -> None:
+        assert Txn.sender == Global.creator_address, "only creator"
+
@@ -0,0 +1,213 @@
+"""
+Group planning for Climate DAO app calls.
+
+`GroupPlanner` packs many method calls to one app into as few atomic groups as the protocol
+allows. With group resource sharing a reference listed on any app call of a group is available to
+every call in it, so the calls' references are merged (shared boxes, accounts and assets listed
+once), spread over the calls themselves and only then over `noop` padding calls. A call joins the
+current group only while the merged references, the pooled opcode budget and the group size still
+fit, so a planned group never fails on a missing resource.
+
+References come from each client's `references` rules (derived from the contract's key
+prefixes), or, for calls without a rule or when asked, from `discover`, which simulates the call
+with unnamed resources allowed and reads back what it touched:
+
+    planner = GroupPlanner(voting)
+    for member, pid in ballots:
+        planner.add("vote", [pid, 1, 10], client=clients[member])
+    results = planner.execute()
+
+References are derived from chain state when a call is added, so calls whose references depend
+on an earlier call in the same plan (e.g. two `submit_proposal` calls competing for the next id)
+belong in separate plans.
+"""
+
+import base64
+import copy
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from algosdk import constants, transaction
+from algosdk.atomic_transaction_composer import AtomicTransactionComposer, TransactionWithSigner
+from algosdk.v2client.models import SimulateRequest
+
+from smart_contracts.climate_dao.client import (
+    APP_CALL_BUDGET,
+    MAX_ACCOUNTS_PER_TXN,
+    MAX_GROUP_SIZE,
+    MAX_REFS_PER_TXN,
+    AppClient,
+    References,
+)
+
+
+Layout = tuple[int, References, list[dict[str, list]]]  # padding calls, merged references, references per transaction
+
+
+@dataclass
+class PlannedCall:
+    client: AppClient
+    name: str
+    args: list
+    refs: References
+
+    @property
+    def txns(self) -> int:
+        # transaction arguments (e.g. join_dao's payment) travel in the same group
+        return 1 + sum(isinstance(arg, TransactionWithSigner) for arg in self.args)
+
+
+def discover(client: AppClient, name: str, args: list) -> References:
+    """References a call needs, found by simulating it with unnamed resources allowed"""
+    request = SimulateRequest(txn_groups=[], allow_unnamed_resources=True, allow_empty_signatures=True)
+    response = client.compose(name, args).simulate(client.algod_client, request).simulate_response
+    group = response["txn-groups"][0]
+    if group.get("failure-message"):
+        raise ValueError(f"{name} fails in simulation: {group['failure-message']}")
+
+    refs = References(budget_txns=max(1, -(-group.get("app-budget-consumed", 0) // APP_CALL_BUDGET)))
+    sections = [group.get("unnamed-resources-accessed") or {}]
+    sections += [result.get("unnamed-resources-accessed") or {} for result in group.get("txn-results", [])]
+    for section in sections:
+        for box in section.get("boxes", []):
+            refs.box(base64.b64decode(box.get("name", "")))
+        refs.extra_box_refs += section.get("extra-box-refs", 0)
+        for address in section.get("accounts", []):
+            refs.account(address)
+        for asset_id in section.get("assets", []):
+            refs.asset(asset_id)
+        for app_id in section.get("apps", []):
+            if app_id not in refs.apps:
+                refs.apps.append(app_id)
+        # holdings and locals need both halves available
+        for holding in section.get("asset-holdings", []):
+            refs.holding(holding["account"], holding["asset"])
+        for local in section.get("app-locals", []):
+            refs.account(local["account"])
+            if local["app"] != client.app_id and local["app"] not in refs.apps:
+                refs.apps.append(local["app"])
+    return refs
+
+
+def group_txns(calls: list[PlannedCall]) -> Optional[Layout]:
+    """(padding calls, merged references, each transaction's references) for `calls` sharing one group; None when they do not fit"""
+    refs = References(budget_txns=0)
+    for call in calls:
+        refs = refs.merge(call.refs)
+    app_calls = len(calls)
+    base = sum(call.txns for call in calls)
+    can_pad = "noop" in calls[0].client.METHODS
+    padding = max(0, refs.budget_txns - app_calls)
+    while base + padding <= MAX_GROUP_SIZE and (padding == 0 or can_pad):
+        slots = assign(refs, app_calls + padding)
+        if slots is not None:
+            return padding, refs, slots
+        padding += 1
+    return None
+
+
+def assign(refs: References, callers: int) -> Optional[list[dict[str, list]]]:
+    """Spread merged references over `callers` app calls: at most 8 each, at most 4 of them accounts
+
+    An account whose asset holding is touched goes into a call that lists the asset as well, so
+    such an asset is repeated beside each of those accounts. Returns None when they do not fit.
+    """
+    slots = [{"accounts": [], "foreign_assets": [], "foreign_apps": [], "boxes": []} for _ in range(callers)]
+    assets_of: dict[str, list[int]] = {}
+    for address, asset_id in refs.holdings:
+        assets_of.setdefault(address, []).append(asset_id)
+    held = {asset_id for _, asset_id in refs.holdings}
+    items = [("accounts", a) for a in refs.accounts] + [("foreign_assets", a) for a in refs.assets if a not in held]
+    items += [("foreign_apps", a) for a in refs.apps] + [("boxes", b) for b in refs.box_refs()]
+    for kind, item in items:
+        for slot in slots:
+            extra = [a for a in assets_of.get(item, []) if a not in slot["foreign_assets"]] if kind == "accounts" else []
+            if sum(len(v) for v in slot.values()) + 1 + len(extra) > MAX_REFS_PER_TXN:
+                continue
+            if kind == "accounts" and len(slot["accounts"]) >= MAX_ACCOUNTS_PER_TXN:
+                continue
+            slot[kind].append(item)
+            slot["foreign_assets"] += extra
+            break
+        else:
+            return None
+    return slots
+
+
+class GroupPlanner:
+    """Packs calls to one app into the fewest groups group resource sharing allows"""
+
+    def __init__(self, client: AppClient, simulate: bool = False):
+        self.client = client
+        self.simulate = simulate
+        self.calls: list[PlannedCall] = []
+
+    def add(self, name: str, args: list, client: Optional[AppClient] = None, refs: Optional[References] = None) -> int:
+        """Plan a call (from `client`, e.g. another sender of the same app); returns its position"""
+        client = client or self.client
+        if client.app_id != self.client.app_id:
+            raise ValueError("a planner packs calls to one app")
+        if refs is None:
+            has_rule = hasattr(client, f"_refs_{name}")
+            refs = discover(client, name, args) if self.simulate or not has_rule else client.references(name, args)
+        self.calls.append(PlannedCall(client, name, args, refs))
+        return len(self.calls) - 1
+
+    def plan(self) -> list[list[PlannedCall]]:
+        """Calls split into groups, in order, each as full as it can be"""
+        return [calls for calls, _ in self._plan()]
+
+    def compose(self, sp: Optional[transaction.SuggestedParams] = None) -> list[AtomicTransactionComposer]:
+        return [atc for _, atc in self._compose(sp)]
+
+    def execute(self) -> list[Any]:
+        """Send every group in turn; returns each call's ABI return value in the order added"""
+        results = []
+        for calls, atc in self._compose():
+            result = self.client.execute(atc, [box for call in calls for box in call.refs.boxes])
+            for call in calls:
+                if call.client is not self.client:
+                    call.client.observe_round(result.confirmed_round)
+                    for box in call.refs.boxes:
+                        call.client.cache.invalidate(call.client.app_id, box)
+            results += [abi_result.return_value for abi_result in result.abi_results[:len(calls)]]
+        self.calls = []
+        return results
+
+    def _plan(self) -> list[tuple[list[PlannedCall], Layout]]:
+        """Each group's calls with the layout `group_txns` found for them"""
+        groups: list[tuple[list[PlannedCall], Layout]] = []
+        for call in self.calls:
+            layout = group_txns(groups[-1][0] + [call]) if groups else None
+            if layout is not None:
+                groups[-1] = (groups[-1][0] + [call], layout)
+                continue
+            layout = group_txns([call])
+            if layout is None:
+                raise ValueError(f"{call.name} does not fit in one group")
+            groups.append(([call], layout))
+        return groups
+
+    def _compose(self, sp: Optional[transaction.SuggestedParams] = None) -> list[tuple[list[PlannedCall], AtomicTransactionComposer]]:
+        """Each planned group with its composer, planned once"""
+        sp = sp or self.client.suggested_params()
+        composers = []
+        for calls, (padding, refs, slots) in self._plan():
+            # the first call pays for the padding calls and every inner transaction
+            first_sp = copy.copy(sp)
+            first_sp.flat_fee = True
+            first_sp.fee = (1 + padding + refs.inner_txns) * max(sp.min_fee or 0, constants.MIN_TXN_FEE)
+            atc = AtomicTransactionComposer()
+            for i, call in enumerate(calls):
+                call.client.compose(call.name, call.args, sp=first_sp if i == 0 else sp, atc=atc, **_refs_kwargs(slots[i]))
+            pad_sp = copy.copy(sp)
+            pad_sp.flat_fee = True
+            pad_sp.fee = 0
+            for i in range(padding):
+                self.client.compose("noop", [], sp=pad_sp, atc=atc, note=(i + 1).to_bytes(2, "big"), **_refs_kwargs(slots[len(calls) + i]))
+            composers.append((calls, atc))
+        return composers
+
+
+def _refs_kwargs(slot: dict[str, list]) -> dict[str, Any]:
+    return {key: value or None for key, value in slot.items()}
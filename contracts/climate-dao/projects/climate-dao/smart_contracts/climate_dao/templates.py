@@ -0,0 +1,203 @@
+"""
+Pre-encoded transaction templates for high-volume senders.
+
+Building a method call through the AtomicTransactionComposer constructs transaction objects,
+ABI-encodes the arguments, sorts and msgpack-encodes every field and re-derives the ed25519 key
+from the private key on each signature. A relayer sending thousands of ballots a minute repeats all
+of that for fields that never change. A template packs the invariant fields (app id, method
+selector, fee, genesis, type, ...) once, straight from an algosdk prototype transaction so the bytes
+are canonical, and per call only packs the fields that vary: arguments, box references, sender,
+validity window and group id. The result is the same bytes (and txid) algosdk would produce:
+
+    vote = MethodTemplate(voting, "vote", params.get(), boxes=vote_boxes)
+    key = signing_key(private_key)
+    stxn = vote.call(key, sender, [proposal_id, 1, power], first, last)
+    await submitter.submit(stxn)
+
+Groups (e.g. join_dao's payment and call, with `args` leaving out the payment) are encoded twice:
+once to compute the group id, once with it. `test/performance/template_benchmark.py` measures the throughput per core.
+"""
+
+import base64
+import functools
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Sequence
+
+import msgpack
+from algosdk import abi, constants, encoding, transaction
+from nacl.signing import SigningKey
+
+from smart_contracts.climate_dao.client import (
+    ZERO_ADDRESS,
+    AppClient,
+    legacy_ballot_box,
+    member_box,
+    proposal_box,
+    voted_box,
+    votes_box,
+)
+
+_pack = msgpack.Packer(use_bin_type=True).pack
+_SIGNED_HEADER = b"\x82" + _pack("sig")  # 2-entry map, then the "sig" key
+_TXN_KEY = _pack("txn")
+
+# fields packed per call; everything else comes pre-packed from the prototype
+DYNAMIC_FIELDS = ("apaa", "apbx", "fv", "grp", "lv", "note", "snd")
+BoxNames = Callable[[str, Sequence[Any]], list[bytes]]  # (sender, args) -> box names
+
+
+def signing_key(private_key: str) -> SigningKey:
+    """ed25519 key of an algosdk private key, derived once and reused for every signature"""
+    return SigningKey(base64.b64decode(private_key)[:constants.key_len_bytes])
+
+
+def txid_digest(body: bytes) -> bytes:
+    return encoding.checksum(constants.txid_prefix + body)
+
+
+def group_id(bodies: Sequence[bytes]) -> bytes:
+    """Group id of encoded transactions (bodies encoded without a group id)"""
+    return encoding.checksum(constants.tgid_prefix + _pack({"txlist": [txid_digest(body) for body in bodies]}))
+
+
+def signed_envelope(signature: bytes, body: bytes) -> bytes:
+    """Canonical signed transaction {"sig": ..., "txn": ...} around an encoded body (keys already in order)"""
+    return _SIGNED_HEADER + _pack(signature) + _TXN_KEY + body
+
+
+@dataclass(frozen=True)
+class EncodedTxn:
+    """A signed transaction as canonical msgpack, accepted wherever SignedTransactions are"""
+    signed_bytes: bytes
+    txid: str
+    first_valid_round: int
+    last_valid_round: int
+
+    def get_txid(self) -> str:
+        return self.txid
+
+    @property
+    def transaction(self) -> "EncodedTxn":
+        # the submitter reads the validity window from `stxn.transaction`
+        return self
+
+    def dictify(self) -> dict:
+        # lets algosdk's msgpack_encode (e.g. AlgodClient.send_transactions) re-encode it
+        return msgpack.unpackb(self.signed_bytes, raw=False)
+
+
+class TransactionTemplate:
+    """Invariant fields of a prototype transaction, packed once"""
+
+    def __init__(self, prototype: transaction.Transaction):
+        # canonical msgpack omits zero values (e.g. the NoOp on-completion)
+        fields = {key: value for key, value in prototype.dictify().items() if value and key not in DYNAMIC_FIELDS}
+        self._static = {key: _pack(key) + _pack(value) for key, value in fields.items()}
+        self._order = sorted(set(self._static) | set(DYNAMIC_FIELDS))
+        self._keys = {key: _pack(key) for key in DYNAMIC_FIELDS}
+
+    def _encode(self, dynamic: dict[str, bytes]) -> bytes:
+        """Canonical body: every present field in key order, each dynamic value already packed"""
+        parts = []
+        for key in self._order:
+            static = self._static.get(key)
+            if static is not None:
+                parts.append(static)
+            elif key in dynamic:
+                parts.append(self._keys[key] + dynamic[key])
+        return _map_header(len(parts)) + b"".join(parts)
+
+    def _common(self, sender: str, first: int, last: int, note: Optional[bytes], group: Optional[bytes]) -> dict[str, bytes]:
+        dynamic = {"snd": _packed_address(sender), "lv": _pack(last)}
+        if first:
+            dynamic["fv"] = _pack(first)
+        if note:
+            dynamic["note"] = _pack(note)
+        if group:
+            dynamic["grp"] = _pack(group)
+        return dynamic
+
+    def encode(self, sender: str, first: int, last: int, note: Optional[bytes] = None, group: Optional[bytes] = None) -> bytes:
+        return self._encode(self._common(sender, first, last, note, group))
+
+    @staticmethod
+    def sign(key: SigningKey, body: bytes, first: int, last: int) -> EncodedTxn:
+        """Signed transaction for a body encoded with validity window `first`..`last`"""
+        digest = txid_digest(body)
+        signature = key.sign(constants.txid_prefix + body).signature
+        return EncodedTxn(signed_envelope(signature, body), base64.b32encode(digest).decode().strip("="), first, last)
+
+
+class MethodTemplate(TransactionTemplate):
+    """ABI method call to one app; per call only the arguments, boxes and sender fields change"""
+
+    def __init__(self, client: AppClient, name: str, sp: transaction.SuggestedParams, boxes: Optional[BoxNames] = None, foreign_assets: Optional[list[int]] = None, foreign_apps: Optional[list[int]] = None):
+        method = client.method(name)
+        if any(abi.is_abi_reference_type(arg.type) for arg in method.args):
+            raise ValueError(f"{name} takes reference arguments, which templates do not support")
+        super().__init__(transaction.ApplicationCallTxn(
+            ZERO_ADDRESS, _flat(sp), client.app_id, transaction.OnComplete.NoOpOC,
+            foreign_assets=foreign_assets, foreign_apps=foreign_apps,
+        ))
+        self.method = method
+        self.boxes = boxes
+        self._selector = _pack(method.get_selector())
+        # transaction arguments are separate transactions of the group (see payment_template)
+        self._encoders = [_encoder(arg.type) for arg in method.args if not abi.is_abi_transaction_type(arg.type)]
+
+    def encode(self, sender: str, args: Sequence[Any], first: int, last: int, note: Optional[bytes] = None, group: Optional[bytes] = None) -> bytes:
+        dynamic = self._common(sender, first, last, note, group)
+        packed_args = [self._selector] + [_pack(encode(value)) for encode, value in zip(self._encoders, args)]
+        dynamic["apaa"] = _array_header(len(packed_args)) + b"".join(packed_args)
+        if self.boxes is not None:
+            names = self.boxes(sender, args)
+            if names:
+                dynamic["apbx"] = _array_header(len(names)) + b"".join(b"\x81\xa1n" + _pack(name) for name in names)
+        return self._encode(dynamic)
+
+    def call(self, key: SigningKey, sender: str, args: Sequence[Any], first: int, last: int, note: Optional[bytes] = None) -> EncodedTxn:
+        """Encode and sign one standalone call"""
+        return self.sign(key, self.encode(sender, args, first, last, note), first, last)
+
+
+def payment_template(receiver: str, amount: int, sp: transaction.SuggestedParams) -> TransactionTemplate:
+    """Fixed-amount payment (e.g. join_dao's fee) from any sender"""
+    return TransactionTemplate(transaction.PaymentTxn(ZERO_ADDRESS, _flat(sp), receiver, amount))
+
+
+def vote_boxes(sender: str, args: Sequence[Any]) -> list[bytes]:
+    """Boxes a `vote(proposal_id, choice, power)` touches (proposal boxes up to 1KB), and the pre-bitmap ballot it checks"""
+    pid = args[0]
+    return [proposal_box(pid), votes_box(pid), _member_box(sender), voted_box(pid), legacy_ballot_box(pid, sender)]
+
+
+# decoding an address (base32 plus checksum) costs more than the rest of a call's encoding, and a
+# relayer sends for the same few senders over and over
+@functools.lru_cache(maxsize=4096)
+def _packed_address(address: str) -> bytes:
+    return _pack(encoding.decode_address(address))
+
+
+@functools.lru_cache(maxsize=4096)
+def _member_box(address: str) -> bytes:
+    return member_box(address)
+
+
+def _flat(sp: transaction.SuggestedParams) -> transaction.SuggestedParams:
+    fee = sp.fee if sp.flat_fee else max(sp.min_fee or 0, constants.MIN_TXN_FEE)
+    return transaction.SuggestedParams(fee, sp.first, sp.last, sp.gh, sp.gen, flat_fee=True, min_fee=sp.min_fee)
+
+
+def _encoder(arg_type: abi.ABIType) -> Callable[[Any], bytes]:
+    if isinstance(arg_type, abi.UintType):
+        size = arg_type.bit_size // 8
+        return lambda value: value.to_bytes(size, "big")
+    return arg_type.encode
+
+
+def _map_header(size: int) -> bytes:
+    return bytes([0x80 | size]) if size < 16 else b"\xde" + size.to_bytes(2, "big")
+
+
+def _array_header(size: int) -> bytes:
+    return bytes([0x90 | size]) if size < 16 else b"\xdc" + size.to_bytes(2, "big")
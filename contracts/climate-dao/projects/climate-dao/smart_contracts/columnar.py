@@ -0,0 +1,304 @@
+"""
+Columnar in-memory store for proposals and ballots.
+
+A read model kept as one dict per row pays for a hash table, a boxed int per number and a string
+per address on every record. That is a few hundred bytes for a ballot whose data fits in 30.
+These tables keep one typed `array` per field instead:
+
+ - numbers (ids, funding, timestamps, tallies, powers, rounds) in unboxed arrays ('Q' 8 bytes,
+   'B' 1 byte)
+ - addresses interned in a `StringTable` and stored as 4-byte codes, so a member who votes on a
+   thousand proposals is one string
+ - free text (titles, descriptions) offset-encoded: the UTF-8 bytes of every row in one
+   bytearray, plus an offsets array
+
+Queries work on whole columns and pass row indices (an 'I' array) between steps:
+
+    ballots = BallotTable()
+    ballots.add_events(events)                                   # VoteCast events
+    rows = ballots.where("proposal_id", "==", 7)
+    rows = ballots.where("power", ">=", 1_000_000, rows)
+    ballots.order_by("power", rows, descending=True, limit=10)   # the ten largest ballots
+    ballots.group_sum("choice", "power", rows)                   # {1: yes power, 2: no, 0: abstain}
+
+    proposals = ProposalTable.from_mirror(mirror)
+    proposals.rows(proposals.order_by("yes_votes", proposals.where("status", "==", 0), descending=True))
+
+NumPy is not a dependency of the contracts project, so the columns are stdlib arrays. The loops
+run in C through map/compress/sum wherever the query allows it.
+"""
+
+import heapq
+import operator
+import sys
+from array import array
+from collections import Counter
+from itertools import compress, repeat
+from typing import Any, Iterable, Optional
+
+from smart_contracts.climate_dao.client import Proposal, VoteSummary
+
+OPS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}  # plus "in", with a collection of values
+ROW_INDEX = "I"  # row positions passed between query steps
+
+Rows = Optional[Iterable[int]]
+
+
+class StringTable:
+    """Interns strings as dense integer codes"""
+
+    def __init__(self):
+        self.codes: dict[str, int] = {}
+        self.values: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: str) -> Optional[int]:
+        """The code of a string already interned, None otherwise"""
+        return self.codes.get(value)
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self.codes) + sys.getsizeof(self.values) + sum(map(sys.getsizeof, self.values))
+
+
+class TextColumn:
+    """Variable-length strings as one UTF-8 buffer and the offset where each row ends"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.ends = array("Q")
+
+    def __len__(self) -> int:
+        return len(self.ends)
+
+    def append(self, text: str) -> None:
+        self.data += text.encode("utf-8")
+        self.ends.append(len(self.data))
+
+    def __getitem__(self, row: int) -> str:
+        start = self.ends[row - 1] if row else 0
+        return self.data[start:self.ends[row]].decode("utf-8")
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self.data) + sys.getsizeof(self.ends)
+
+
+class Table:
+    """Typed columns of equal length; subclasses declare SCHEMA (name -> array typecode)"""
+
+    SCHEMA: dict[str, str] = {}
+    STRINGS: tuple[str, ...] = ()  # columns holding StringTable codes
+    TEXT: tuple[str, ...] = ()  # offset-encoded text columns
+
+    def __init__(self, strings: Optional[StringTable] = None):
+        self.strings = strings if strings is not None else StringTable()
+        self.columns = {name: array(typecode) for name, typecode in self.SCHEMA.items()}
+        self.text = {name: TextColumn() for name in self.TEXT}
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values())))
+
+    def append(self, **values: Any) -> int:
+        """Add a row; returns its position"""
+        row = len(self)
+        for name, column in self.columns.items():
+            value = values[name]
+            column.append(self.strings.code(value) if name in self.STRINGS else value)
+        for name, column in self.text.items():
+            column.append(values[name])
+        return row
+
+    def set(self, row: int, **values: Any) -> None:
+        """Overwrite numeric or interned fields of a row (text is append-only)"""
+        for name, value in values.items():
+            self.columns[name][row] = self.strings.code(value) if name in self.STRINGS else value
+
+    def get(self, row: int, name: str) -> Any:
+        if name in self.text:
+            return self.text[name][row]
+        value = self.columns[name][row]
+        return self.strings.values[value] if name in self.STRINGS else value
+
+    def row(self, row: int) -> dict[str, Any]:
+        return {name: self.get(row, name) for name in (*self.columns, *self.text)}
+
+    def rows(self, rows: Rows = None) -> list[dict[str, Any]]:
+        return [self.row(row) for row in (range(len(self)) if rows is None else rows)]
+
+    # ------------------ queries ------------------
+    def where(self, name: str, op: str, value: Any, rows: Rows = None) -> array:
+        """Positions of the rows (among `rows`, default all) whose `name` satisfies `op value`"""
+        column = self.columns[name]
+        if name in self.STRINGS:
+            value = self._codes(op, value)
+            if value is None:  # a string never interned matches nothing
+                return array(ROW_INDEX) if op != "!=" else self._all(rows)
+        if op == "in":
+            member = frozenset(value).__contains__
+            if rows is None:
+                return array(ROW_INDEX, compress(range(len(column)), map(member, column)))
+            return array(ROW_INDEX, (row for row in rows if member(column[row])))
+        test = OPS[op]
+        if rows is None:
+            return array(ROW_INDEX, compress(range(len(column)), map(test, column, repeat(value))))
+        return array(ROW_INDEX, (row for row in rows if test(column[row], value)))
+
+    def order_by(self, name: str, rows: Rows = None, descending: bool = False, limit: Optional[int] = None) -> array:
+        """Row positions sorted by a column; with `limit`, only the first `limit` of them"""
+        key = self.columns[name].__getitem__ if name not in self.STRINGS else lambda row: self.get(row, name)
+        rows = range(len(self)) if rows is None else rows
+        if limit is not None:
+            top = heapq.nlargest if descending else heapq.nsmallest
+            return array(ROW_INDEX, top(limit, rows, key=key))
+        return array(ROW_INDEX, sorted(rows, key=key, reverse=descending))
+
+    def sum(self, name: str, rows: Rows = None) -> int:
+        column = self.columns[name]
+        return sum(column) if rows is None else sum(map(column.__getitem__, rows))
+
+    def count_by(self, name: str, rows: Rows = None) -> dict[Any, int]:
+        column = self.columns[name]
+        counts = Counter(column) if rows is None else Counter(map(column.__getitem__, rows))
+        return self._decode_keys(name, counts)
+
+    def group_sum(self, by: str, name: str, rows: Rows = None) -> dict[Any, int]:
+        """Totals of `name` per distinct value of `by`"""
+        keys, values = self.columns[by], self.columns[name]
+        totals: dict[int, int] = {}
+        pairs = zip(keys, values) if rows is None else ((keys[row], values[row]) for row in rows)
+        for key, value in pairs:
+            totals[key] = totals.get(key, 0) + value
+        return self._decode_keys(by, totals)
+
+    def nbytes(self, include_strings: bool = True) -> int:
+        """Memory held by the columns (and the shared StringTable unless told otherwise)"""
+        size = sum(map(sys.getsizeof, self.columns.values())) + sum(column.nbytes() for column in self.text.values())
+        return size + (self.strings.nbytes() if include_strings else 0)
+
+    # ------------------ internals ------------------
+    def _codes(self, op: str, value: Any) -> Any:
+        if op == "in":
+            return {code for code in map(self.strings.lookup, value) if code is not None}
+        if op in ("==", "!="):
+            return self.strings.lookup(value)
+        raise ValueError(f"{op} is not supported on interned column")
+
+    def _all(self, rows: Rows) -> array:
+        return array(ROW_INDEX, range(len(self)) if rows is None else rows)
+
+    def _decode_keys(self, name: str, totals: dict) -> dict:
+        if name not in self.STRINGS:
+            return dict(totals)
+        return {self.strings.values[code]: total for code, total in totals.items()}
+
+
+class ProposalTable(Table):
+    """`ProposalData` with its `VoteData` and awarded credits, one row per proposal"""
+
+    SCHEMA = {
+        "id": "Q",
+        "funding": "Q",
+        "proposer": "I",
+        "creation_time": "Q",
+        "end_time": "Q",
+        "status": "B",  # 0=pending,1=approved,2=rejected,3=no_quorum
+        "yes_votes": "Q",
+        "no_votes": "Q",
+        "abstain_votes": "Q",
+        "total_voters": "Q",
+        "total_voting_power": "Q",
+        "awarded": "Q",
+    }
+    STRINGS = ("proposer",)
+    TEXT = ("title", "description")
+    TALLY = ("yes_votes", "no_votes", "abstain_votes", "total_voters", "total_voting_power")
+
+    def __init__(self, strings: Optional[StringTable] = None):
+        super().__init__(strings)
+        self.index: dict[int, int] = {}  # proposal id -> row
+
+    @classmethod
+    def from_mirror(cls, mirror, strings: Optional[StringTable] = None) -> "ProposalTable":
+        """Every proposal a `ChainMirror` holds"""
+        table = cls(strings)
+        with mirror.lock:
+            for pid in sorted(mirror.proposals):
+                table.upsert(pid, mirror.proposals[pid], mirror.summaries.get(pid), mirror.awarded.get(pid, 0))
+        return table
+
+    def upsert(self, pid: int, proposal: Proposal, summary: Optional[VoteSummary] = None, awarded: int = 0) -> int:
+        tally = dict(zip(self.TALLY, (summary.yes_votes, summary.no_votes, summary.abstain_votes, summary.total_voters, summary.total_voting_power))) if summary is not None else dict.fromkeys(self.TALLY, 0)
+        row = self.index.get(pid)
+        if row is not None:
+            self.set(row, status=proposal.status, end_time=proposal.end_time, awarded=awarded, **tally)
+            return row
+        row = self.index[pid] = self.append(
+            id=pid,
+            title=proposal.title,
+            description=proposal.description,
+            funding=proposal.funding,
+            proposer=proposal.proposer,
+            creation_time=proposal.creation_time,
+            end_time=proposal.end_time,
+            status=proposal.status,
+            awarded=awarded,
+            **tally,
+        )
+        return row
+
+    def set_tally(self, pid: int, summary: VoteSummary) -> None:
+        self.set(self.index[pid], yes_votes=summary.yes_votes, no_votes=summary.no_votes, abstain_votes=summary.abstain_votes, total_voters=summary.total_voters, total_voting_power=summary.total_voting_power)
+
+    def proposal(self, pid: int) -> Proposal:
+        row = self.index[pid]
+        return Proposal(*(self.get(row, name) for name in ("title", "description", "funding", "proposer", "creation_time", "end_time", "status")))
+
+    def tally(self, pid: int) -> VoteSummary:
+        row = self.index[pid]
+        return VoteSummary(*(self.columns[name][row] for name in self.TALLY))
+
+
+class BallotTable(Table):
+    """One row per ballot (a `VoteCast` event): who voted on what, how, with what power, when"""
+
+    SCHEMA = {"proposal_id": "Q", "voter": "I", "choice": "B", "power": "Q", "round": "Q"}
+    STRINGS = ("voter",)
+
+    def add(self, proposal_id: int, voter: str, choice: int, power: int, round: int = 0) -> int:
+        return self.append(proposal_id=proposal_id, voter=voter, choice=choice, power=power, round=round)
+
+    def add_events(self, events: Iterable) -> int:
+        """Append the VoteCast events among `events`; returns how many"""
+        added = 0
+        for event in events:
+            if event.name == "VoteCast":
+                self.add(event["proposal_id"], event["voter"], event["choice"], event["power"], event.round)
+                added += 1
+        return added
+
+    def tallies(self, rows: Rows = None) -> dict[int, tuple[int, int, int]]:
+        """(yes, no, abstain) power per proposal, from the ballots alone"""
+        proposals, choices, powers = self.columns["proposal_id"], self.columns["choice"], self.columns["power"]
+        totals: dict[int, list[int]] = {}
+        triples = zip(proposals, choices, powers) if rows is None else ((proposals[row], choices[row], powers[row]) for row in rows)
+        for pid, choice, power in triples:
+            tally = totals.get(pid)
+            if tally is None:
+                tally = totals[pid] = [0, 0, 0]
+            tally[(2, 0, 1)[choice]] += power  # choice 0=abstain, 1=yes, 2=no
+        return {pid: tuple(tally) for pid, tally in totals.items()}
@@ -0,0 +1,228 @@
+"""
+Idempotent deployment of the Climate DAO apps from the compiled ARC-56 artifacts.
+
+`deploy_all` brings the network in line with smart_contracts/artifacts:
+ - an app recorded in the deployment file that still exists is left alone when its on-chain
+   programs match the compiled bytecode, and updated in place (same app id, boxes kept) otherwise
+ - missing apps are created with the schema from the app spec and funded to their minimum balance
+ - ClimateDAO creates its DAO/credit tokens once (skipped when `credit_token_id` is already set)
+ - VotingSystem is linked to ClimateDAO and the credit token with a single atomic group of
+   admin setter calls, sent only when one of the linked values differs from global state
+ - after an update, member boxes written by an older VotingSystem are migrated to the current
+   record layout (`migrate_member`, up to a group of members at a time)
+
+Creates, updates and funding payments are independent, so each phase is sent together through
+the pipelined submitter and confirmed per round.
+"""
+
+import base64
+import json
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from algosdk import account, constants, encoding, error, logic, transaction
+from algosdk.atomic_transaction_composer import AccountTransactionSigner, AtomicTransactionComposer, TransactionWithSigner
+from algosdk.v2client import algod
+
+from smart_contracts.build import load_app_spec
+from smart_contracts.climate_dao.client import MAX_GROUP_SIZE, ClimateDAOClient, VotingSystemClient
+from smart_contracts.climate_dao.deploy_config import DAO_ADMIN, DAO_TOKEN_CONFIG
+from smart_contracts.submitter import submit_and_confirm
+
+APPS = ["ClimateDAO", "ImpactAnalytics", "VotingSystem"]
+DEPLOYMENT_FILE = Path(__file__).parent / "deployment_info.json"
+
+PAGE_SIZE = 2048
+MAX_EXTRA_PAGES = 3
+APP_MIN_BALANCE = 100_000
+TOKEN_CREATION_PAYMENT = 2_000_000  # ClimateDAO.create_dao_tokens asserts >= 2 ALGO
+
+
+@dataclass
+class CompiledApp:
+    name: str
+    approval: bytes
+    clear: bytes
+    global_ints: int
+    global_bytes: int
+    local_ints: int
+    local_bytes: int
+
+    @classmethod
+    def from_spec(cls, name: str, spec: dict) -> "CompiledApp":
+        schema = spec["state"]["schema"]
+        return cls(
+            name,
+            base64.b64decode(spec["byteCode"]["approval"]),
+            base64.b64decode(spec["byteCode"]["clear"]),
+            schema["global"]["ints"], schema["global"]["bytes"],
+            schema["local"]["ints"], schema["local"]["bytes"],
+        )
+
+    @property
+    def extra_pages(self) -> int:
+        # one spare page (when allowed) so in-place updates have room to grow
+        needed = max(0, math.ceil((len(self.approval) + len(self.clear)) / PAGE_SIZE) - 1)
+        if needed > MAX_EXTRA_PAGES:
+            raise ValueError(f"{self.name} needs {needed} extra pages; the limit is {MAX_EXTRA_PAGES}")
+        return min(needed + 1, MAX_EXTRA_PAGES)
+
+
+@dataclass
+class DeployReport:
+    app_ids: dict[str, int] = field(default_factory=dict)
+    created: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    tokens_created: bool = False
+    linked: bool = False
+    migrated: list[str] = field(default_factory=list)  # members moved to the current record layout
+    dao_token_id: int = 0
+    credit_token_id: int = 0
+
+
+def app_address(app_id: int) -> str:
+    return logic.get_application_address(app_id)
+
+
+def load_deployment(path: Path = DEPLOYMENT_FILE) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _on_chain(algod_client: algod.AlgodClient, app_id: Optional[int]) -> Optional[dict]:
+    if not app_id:
+        return None
+    try:
+        return algod_client.application_info(app_id)["params"]
+    except error.AlgodHTTPError as e:
+        if e.code == 404:
+            return None
+        raise
+
+
+def _check_updatable(app: CompiledApp, params: dict) -> None:
+    schema = params.get("global-state-schema", {})
+    if app.global_ints > schema.get("num-uint", 0) or app.global_bytes > schema.get("num-byte-slice", 0):
+        raise ValueError(f"{app.name} global schema grew; it cannot be updated in place, delete its app id from {DEPLOYMENT_FILE.name} to redeploy")
+    pages = params.get("extra-program-pages", 0)
+    if len(app.approval) + len(app.clear) > PAGE_SIZE * (1 + pages):
+        raise ValueError(f"{app.name} no longer fits its {pages} extra pages; delete its app id from {DEPLOYMENT_FILE.name} to redeploy")
+
+
+def deploy_all(algod_client: algod.AlgodClient, private_key: str, deployment_file: Path = DEPLOYMENT_FILE, network: str = "testnet") -> DeployReport:
+    """Create or update every app, create tokens once and link VotingSystem"""
+    sender = account.address_from_private_key(private_key)
+    signer = AccountTransactionSigner(private_key)
+    previous = load_deployment(deployment_file).get("apps", {})
+    compiled = {name: CompiledApp.from_spec(name, load_app_spec(name)) for name in APPS}
+    report = DeployReport()
+
+    # ------------------ create / update ------------------
+    sp = algod_client.suggested_params()
+    pending = []  # (name, signed txn, is_create)
+    for name, app in compiled.items():
+        app_id = previous.get(name, {}).get("app_id")
+        params = _on_chain(algod_client, app_id)
+        if params is None:
+            txn = transaction.ApplicationCreateTxn(
+                sender, sp, transaction.OnComplete.NoOpOC, app.approval, app.clear,
+                transaction.StateSchema(app.global_ints, app.global_bytes),
+                transaction.StateSchema(app.local_ints, app.local_bytes),
+                extra_pages=app.extra_pages,
+                note=f"{name} deploy".encode(),
+            )
+            pending.append((name, txn.sign(private_key), True))
+        elif base64.b64decode(params["approval-program"]) != app.approval or base64.b64decode(params["clear-state-program"]) != app.clear:
+            _check_updatable(app, params)
+            txn = transaction.ApplicationUpdateTxn(sender, sp, app_id, app.approval, app.clear)
+            pending.append((name, txn.sign(private_key), False))
+            report.app_ids[name] = app_id
+        else:
+            report.app_ids[name] = app_id
+            report.unchanged.append(name)
+
+    results = submit_and_confirm(algod_client, [stxn for _, stxn, _ in pending])
+    for (name, _, is_create), result in zip(pending, results):
+        if is_create:
+            report.app_ids[name] = result["application-index"]
+            report.created.append(name)
+        else:
+            report.updated.append(name)
+
+    # new app accounts need their minimum balance before they can hold boxes or assets
+    if report.created:
+        sp = algod_client.suggested_params()
+        payments = [transaction.PaymentTxn(sender, sp, app_address(report.app_ids[name]), APP_MIN_BALANCE).sign(private_key) for name in report.created]
+        submit_and_confirm(algod_client, payments)
+
+    # ------------------ tokens ------------------
+    dao = ClimateDAOClient(algod_client, report.app_ids["ClimateDAO"], sender, signer)
+    dao_state = dao.global_state()
+    if not dao_state.get("credit_token_id"):
+        sp = algod_client.suggested_params()
+        pay = transaction.PaymentTxn(sender, sp, dao.app_address, TOKEN_CREATION_PAYMENT)
+        call_sp = algod_client.suggested_params()
+        # the call pays for the two inner asset creations
+        call_sp.flat_fee = True
+        call_sp.fee = 3 * constants.MIN_TXN_FEE
+        atc = dao.compose("create_dao_tokens", [TransactionWithSigner(pay, signer)], sp=call_sp)
+        submit_and_confirm(algod_client, [atc.gather_signatures()])
+        dao_state = dao.global_state()
+        report.tokens_created = True
+    report.dao_token_id = dao_state.get("dao_token_id", 0)
+    report.credit_token_id = dao_state.get("credit_token_id", 0)
+
+    # ------------------ link VotingSystem ------------------
+    voting = VotingSystemClient(algod_client, report.app_ids["VotingSystem"], sender, signer)
+    voting_state = voting.global_state()
+    wanted = {
+        "linked_dao": encoding.decode_address(dao.app_address),
+        "credit_token_id": report.credit_token_id,
+        "total_token_supply": DAO_TOKEN_CONFIG["total_supply"],
+    }
+    if any(voting_state.get(key) != value for key, value in wanted.items()):
+        sp = algod_client.suggested_params()
+        atc = AtomicTransactionComposer()
+        voting.compose("set_linked_dao", [dao.app_address], sp=sp, atc=atc)
+        voting.compose("set_credit_token", [report.credit_token_id], sp=sp, atc=atc)
+        voting.compose("set_total_token_supply", [DAO_TOKEN_CONFIG["total_supply"]], sp=sp, atc=atc)
+        submit_and_confirm(algod_client, [atc.gather_signatures()])
+        report.linked = True
+
+    # ------------------ migrate members ------------------
+    if "VotingSystem" in report.updated:
+        legacy = voting.legacy_members()
+        groups = []
+        for start in range(0, len(legacy), MAX_GROUP_SIZE):
+            sp = algod_client.suggested_params()
+            atc = AtomicTransactionComposer()
+            for member in legacy[start:start + MAX_GROUP_SIZE]:
+                voting.compose("migrate_member", [member], sp=sp, atc=atc, boxes=voting.references("migrate_member", [member]).box_refs())
+            groups.append(atc.gather_signatures())
+        if groups:
+            submit_and_confirm(algod_client, groups)
+        report.migrated = legacy
+
+    save_deployment(report, sender, network, algod_client.status()["last-round"], deployment_file)
+    return report
+
+
+def save_deployment(report: DeployReport, deployer: str, network: str, current_round: int, path: Path = DEPLOYMENT_FILE) -> None:
+    dao_app_id = report.app_ids["ClimateDAO"]
+    info = {
+        "network": network,
+        "app_id": dao_app_id,
+        "app_address": app_address(dao_app_id),
+        "deployer": deployer,
+        "dao_admin": DAO_ADMIN,
+        "dao_token_id": report.dao_token_id or None,
+        "credit_token_id": report.credit_token_id or None,
+        "deployment_round": current_round,
+        "apps": {name: {"app_id": app_id, "app_address": app_address(app_id)} for name, app_id in report.app_ids.items()},
+    }
+    path.write_text(json.dumps(info, indent=2))
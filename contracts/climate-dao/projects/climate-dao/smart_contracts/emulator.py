@@ -0,0 +1,509 @@
+"""
+Mock algod backed by the contracts themselves.
+
+`EmulatedAlgod` runs contract.py behind the MockAlgod endpoints: every app created through it is
+an instance of ClimateDAO, ImpactAnalytics or VotingSystem executing in-process under
+algopy_testing, so deploys, joins, proposals, votes, finalization and awards follow the contract
+logic, offline and deterministically:
+
+    with EmulatedAlgod() as ledger, MockAlgodServer(ledger, block_time=0.05) as server:
+        report = deploy_all(PooledAlgodClient("", server.address), private_key)
+
+The app a create transaction instantiates is recognised by the method selectors in its approval
+program, so compiled artifacts deploy as they are; `deploy` creates an app directly. Groups are
+evaluated when they are submitted, in submission order, and a group that fails (an assertion in
+the contract, a missing route) is rejected with a logic eval error and leaves no trace. Accepted
+groups are confirmed with the next block, with their logs and created app ids as apply data.
+Simulate runs the group the same way and then rolls it back, and the application, box and
+global-state endpoints read the apps' live state.
+
+Fixtures that need a large state build it once, through `call` (a method call evaluated and
+committed straight away, no transactions or blocks), and then start every test from a snapshot:
+
+    ledger.call(voting_id, admin, "register_member", [member, 200_000_000])  # x 1000
+    base = ledger.snapshot()
+    ledger.restore(base)              # back to the fixture
+    other = ledger.fork(base)         # an independent ledger starting from it
+    ledger.warp(VOTING_PERIOD + 1)    # next block a voting period later
+
+`voting_fixture` builds the usual settlement fixture (a VotingSystem app with voted proposals)
+this way, for the keeper, reader and event tests and `keeper --mock`.
+
+Snapshots are copy-on-write at the value level: taking or restoring one copies the key tables of
+the app, box, account and chain state (dict copies, so milliseconds for thousands of members and
+proposals) while every stored value, immutable bytes and ints, is shared.
+
+Payments are not debited or credited; app state (global, local and boxes) is the only state
+rolled back, and inner transactions are left to algopy_testing. Inner asset transfers are
+reported in the apply data (`dt.itx`, as algod does) and, once their group commits, added up per
+receiver in `received` (senders are not debited), so a test can check what the apps paid out:
+
+    ledger.received[(proposer, credit_token_id)]
+
+It is not an AVM: the per-transaction reference limits, the requirement that boxes, accounts,
+assets and holdings be referenced by the group, the box I/O budget and the opcode budget are not
+checked, so a group that succeeds here can still be rejected by algod. Check those with simulate
+against a real node (e.g. LocalNet) before relying on a group's references or padding.
+"""
+
+import base64
+import contextvars
+import copy
+import functools
+import os
+import typing
+from dataclasses import dataclass
+from importlib import metadata
+from typing import Any, Optional
+
+from algopy import Account, ARC4Contract, OnCompleteAction, TransactionType, UInt64, gtxn
+from algopy_testing import algopy_testing_context
+from algosdk import abi, encoding
+
+from smart_contracts.climate_dao import client as clients
+from smart_contracts.climate_dao.contract import ClimateDAO, ImpactAnalytics, VotingSystem
+from smart_contracts.mock_algod import MockAlgod, txid_of
+
+# contract class -> the client describing its ABI methods
+CONTRACTS: dict[type[ARC4Contract], type[clients.AppClient]] = {
+    ClimateDAO: clients.ClimateDAOClient,
+    ImpactAnalytics: clients.ImpactAnalyticsClient,
+    VotingSystem: clients.VotingSystemClient,
+}
+TESTING_VERSIONS = ("1.",)  # algopy_testing releases whose ledger internals TestingLedger knows
+RETURN_PREFIX = bytes.fromhex("151f7c75")  # ARC-4 return value log prefix
+ON_COMPLETE = {0: "NoOp", 1: "OptIn", 2: "CloseOut", 3: "ClearState", 4: "UpdateApplication", 5: "DeleteApplication"}
+
+
+class LogicError(ValueError):
+    """A transaction of a group rejected by its app"""
+
+    def __init__(self, index: int, message: str, logs: Optional[list[list[bytes]]] = None):
+        super().__init__(f"transaction {index}: {message}")
+        self.index = index
+        self.reason = message
+        self.logs = logs or []  # logs of the transactions before it
+
+
+class TestingLedger:
+    """The algopy_testing context an EmulatedAlgod runs in; the one place that touches its internals
+
+    algopy_testing has no API for copying or replacing its ledger, so snapshots reach into the
+    LedgerContext's tables. Those are checked against the installed release up front, and an
+    untested release fails here rather than as a half-copied ledger later.
+    """
+
+    def __init__(self):
+        try:
+            version = metadata.version("algorand-python-testing")
+        except metadata.PackageNotFoundError:
+            version = "unknown"
+        if not version.startswith(TESTING_VERSIONS):
+            raise RuntimeError(f"algorand-python-testing {version} is not supported by the emulator (tested: {', '.join(v + 'x' for v in TESTING_VERSIONS)})")
+        # algopy_testing keeps its ledger in a context variable; the server calls in from its own
+        # thread, so the ledger lives in a context of its own that every evaluation enters
+        self._context = contextvars.Context()
+        self._manager = algopy_testing_context()
+        self.ctx = self._context.run(self._manager.__enter__)
+        missing = [name for name in (*_LEDGER_TABLES, "_get_app_data") if not hasattr(self.ctx.ledger, name)]
+        missing += [] if hasattr(self.ctx, "_ledger_context") else ["_ledger_context"]
+        if missing:
+            self.close()
+            raise RuntimeError(f"algorand-python-testing {version} changed its ledger internals (missing {', '.join(missing)})")
+
+    def run(self, function, *args):
+        """Call `function` inside the testing context"""
+        return self._context.run(function, *args)
+
+    def app_data(self, app_id: int):
+        return self.ctx.ledger._get_app_data(app_id)
+
+    def copy(self):
+        """A copy of the current ledger, for `install`"""
+        return _copy_ledger(self.ctx.ledger)
+
+    def install(self, ledger) -> None:
+        """Make a copy of `ledger` (from `copy`) the current one"""
+        self.ctx._ledger_context = _copy_ledger(ledger)
+        self.ctx.clear_transaction_context()
+
+    def close(self) -> None:
+        # the testing context has to be left from the context it was entered in
+        if self._manager is not None:
+            self._context.run(self._manager.__exit__, None, None, None)
+            self._manager = None
+
+
+@dataclass(frozen=True)
+class LedgerSnapshot:
+    """Everything an EmulatedAlgod holds at one point; restore or fork from it any number of times"""
+    ledger: Any  # algopy_testing LedgerContext (from TestingLedger.copy): apps, boxes, assets, accounts and global fields
+    contracts: dict[int, ARC4Contract]
+    chain: dict[str, Any]  # MockAlgod attributes: round, clock, accounts, apps, pool, blocks, results
+
+
+# MockAlgod attributes a snapshot keeps, with how each is copied
+_CHAIN = {
+    "round": None, "timestamp": None, "next_app_id": None,
+    "accounts": lambda accounts: {address: dict(info) for address, info in accounts.items()},
+    "apps": copy.deepcopy,
+    "pool": lambda pool: [dict(entry) for entry in pool],
+    "blocks": dict, "timestamps": dict, "results": dict, "_applied": dict, "received": dict,
+}
+
+
+class EmulatedAlgod(MockAlgod):
+    """MockAlgod whose apps run contract.py under algopy_testing; close it, or use it as a context manager"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # every accepted group is already applied, so it must land in the next block
+        self.max_block_txns = float("inf")
+        self.contracts: dict[int, ARC4Contract] = {}
+        self._applied: dict[str, dict] = {}  # txid -> apply data, until committed
+        self.received: dict[tuple[str, int], int] = {}  # (receiver, asset id) -> amount the apps' inner transfers sent
+        self.testing = TestingLedger()
+        self.ctx = self.testing.ctx
+
+    def close(self) -> None:
+        self.testing.close()
+
+    def __enter__(self) -> "EmulatedAlgod":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------ ledger helpers ------------------
+    def deploy(self, contract_class: type[ARC4Contract], creator: str) -> int:
+        """Create an app running `contract_class` directly, without a transaction; returns its id"""
+        with self.lock:
+            app_id = self.testing.run(self._create, contract_class, creator)
+            self.add_app(app_id, creator=creator)
+            self.next_app_id = max(self.next_app_id, app_id + 1)
+            return app_id
+
+    def app_state(self, app_id: int):
+        """algopy_testing's state of an app (`global_state`, `local_state` and `boxes` dicts)"""
+        return self.testing.app_data(app_id)
+
+    def get_global(self, app_id: int, key: str, default=None):
+        if app_id not in self.contracts:
+            return super().get_global(app_id, key, default)
+        value = self.app_state(app_id).global_state.get(key.encode(), default)
+        return _native(value) if value is not default else default
+
+    def get_box(self, app_id: int, name: bytes) -> Optional[bytes]:
+        if app_id not in self.contracts:
+            return super().get_box(app_id, name)
+        return self.app_state(app_id).boxes.get(name)
+
+    def box_names(self, app_id: int) -> list[bytes]:
+        if app_id not in self.contracts:
+            return super().box_names(app_id)
+        return list(self.app_state(app_id).boxes)
+
+    def apply(self, stxn: dict, rnd: int) -> dict:
+        """Apply data recorded when the group was evaluated, plus the app bookkeeping of MockAlgod"""
+        applied = self._applied.pop(txid_of(stxn["txn"]), {})
+        if "apid" in applied:
+            self.next_app_id = applied["apid"]
+        super().apply(stxn, rnd)
+        return applied
+
+    def call(self, app_id: int, sender: str, name: str, args: list, txns: Optional[list[dict]] = None) -> Any:
+        """Evaluate and commit one method call straight away; returns its decoded ABI return value
+
+        Transaction arguments (e.g. join_dao's payment) are passed in `txns` as transaction dicts,
+        in the decoded msgpack form (see `payment`), and are left out of `args`.
+        """
+        method = CONTRACTS[type(self.contracts[app_id])].METHODS[name]
+        values = iter(args)
+        app_args = [method.get_selector()] + [arg.type.encode(next(values)) for arg in method.args if not abi.is_abi_transaction_type(arg.type)]
+        call = {"type": "appl", "snd": encoding.decode_address(sender), "apid": app_id, "apaa": app_args}
+        with self.lock:
+            applied = self.evaluate([*(txns or []), call])
+        logs = applied[-1].get("dt", {}).get("lg", [])
+        if method.returns.type == abi.Returns.VOID or not logs or not logs[-1].startswith(RETURN_PREFIX):
+            return None
+        return method.returns.type.decode(logs[-1][len(RETURN_PREFIX):])
+
+    # ------------------ snapshots ------------------
+    def snapshot(self) -> LedgerSnapshot:
+        with self.lock:
+            chain = {name: getattr(self, name) if copier is None else copier(getattr(self, name)) for name, copier in _CHAIN.items()}
+            return LedgerSnapshot(self.testing.copy(), dict(self.contracts), chain)
+
+    def restore(self, snapshot: LedgerSnapshot) -> None:
+        """Return to `snapshot`; it stays usable for further restores and forks"""
+        with self.lock:
+            # contract instances only carry their app id; all of their state lives in the ledger
+            self.testing.install(snapshot.ledger)
+            self.contracts = dict(snapshot.contracts)
+            for name, copier in _CHAIN.items():
+                value = snapshot.chain[name]
+                setattr(self, name, value if copier is None else copier(value))
+
+    def fork(self, snapshot: Optional[LedgerSnapshot] = None) -> "EmulatedAlgod":
+        """A separate ledger starting from `snapshot` (default: the current state)"""
+        forked = type(self)()
+        forked.round_seconds = self.round_seconds
+        forked.min_fee = self.min_fee
+        forked.restore(snapshot or self.snapshot())
+        return forked
+
+    # ------------------ evaluation ------------------
+    def evaluate(self, txns: list[dict], commit: bool = True) -> list[dict]:
+        """Apply data of each transaction of a group; raises LogicError, with nothing applied, on failure"""
+        return self.testing.run(self._evaluate, txns, commit)
+
+    def _evaluate(self, txns: list[dict], commit: bool) -> list[dict]:
+        self.ctx.ledger.patch_global_fields(latest_timestamp=UInt64(self.timestamp), round=UInt64(self.round + 1))
+        snapshot = self._snapshot()
+        applied: list[dict] = []
+        try:
+            for i, txn in enumerate(txns):
+                try:
+                    applied.append(self._execute(txns, i))
+                except Exception as e:
+                    raise LogicError(i, f"logic eval error: {e or type(e).__name__}", [a.get("dt", {}).get("lg", []) for a in applied]) from e
+        except LogicError:
+            self._restore(snapshot)
+            raise
+        finally:
+            self.ctx.clear_transaction_context()
+        if not commit:
+            self._restore(snapshot)
+            return applied
+        for apply in applied:
+            for inner in apply.get("dt", {}).get("itx", []):
+                key = (encoding.encode_address(inner["txn"]["arcv"]), inner["txn"]["xaid"])
+                self.received[key] = self.received.get(key, 0) + inner["txn"].get("aamt", 0)
+        return applied
+
+    def _execute(self, txns: list[dict], index: int) -> dict:
+        txn = txns[index]
+        if txn.get("type") != "appl":
+            return {}
+        sender = encoding.encode_address(txn["snd"])
+        action = ON_COMPLETE[txn.get("apan", 0)]
+        args = txn.get("apaa") or []
+        if not txn.get("apid"):
+            if args or action != "NoOp":
+                raise ValueError("apps are created with a bare NoOp call")
+            contract_class = _contract_for(txn.get("apap", b""))
+            if contract_class is None:
+                raise ValueError("approval program is not one of the Climate DAO contracts")
+            return {"apid": self._create(contract_class, sender)}
+
+        contract = self.contracts.get(txn["apid"])
+        if contract is None:
+            raise ValueError(f"application {txn['apid']} does not exist")
+        if not args:
+            if action != "UpdateApplication":
+                raise ValueError(f"no bare method for {action}")
+            method, call_args = contract.update, []
+        else:
+            name = _method_names(type(contract)).get(args[0])
+            if name is None:
+                raise ValueError("no method matches the selector")
+            method = getattr(contract, name)
+            call_args = self._decode_args(type(contract), name, txns, index)
+
+        # the transaction's action, checked by the method's decorator (algopy_testing would
+        # otherwise default it to a bare method's only allowed action, as a plain string)
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": Account(sender), "on_completion": getattr(OnCompleteAction, action)}):
+            method(*call_args)
+        active = self.ctx.txn.last_active
+        applied = {}
+        logs = [bytes(active.logs(i)) for i in range(int(active.num_logs))]
+        if logs:
+            applied["lg"] = logs
+        transfers = [_asset_transfer(inner) for group in self.ctx.txn.last_group.itxn_groups for inner in group if inner.type == TransactionType.AssetTransfer]
+        if transfers:
+            applied["itx"] = transfers
+        return {"dt": applied} if applied else {}
+
+    def _create(self, contract_class: type[ARC4Contract], creator: str) -> int:
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": Account(creator)}):
+            contract = contract_class()
+        app_id = int(contract.__app_id__)
+        self.contracts[app_id] = contract
+        return app_id
+
+    def _decode_args(self, contract_class: type[ARC4Contract], name: str, txns: list[dict], index: int) -> list[Any]:
+        """Method arguments from the call's app args; transaction arguments are the group's preceding transactions"""
+        types = _arg_types(contract_class, name)
+        app_args = iter((txns[index].get("apaa") or [])[1:])
+        group_txn = index - sum(isinstance(arg_type, type) and issubclass(arg_type, gtxn.TransactionBase) for arg_type in types)
+        values = []
+        for arg_type in types:
+            if isinstance(arg_type, type) and issubclass(arg_type, gtxn.TransactionBase):
+                values.append(self._group_txn(arg_type, txns[group_txn]))
+                group_txn += 1
+            elif arg_type is UInt64:
+                values.append(UInt64(int.from_bytes(next(app_args), "big")))
+            else:
+                values.append(arg_type.from_bytes(next(app_args)))
+        return values
+
+    def _group_txn(self, arg_type: type, txn: dict):
+        if arg_type is not gtxn.PaymentTransaction or txn.get("type") != "pay":
+            raise ValueError(f"expected a {arg_type.__name__} argument")
+        return self.ctx.any.txn.payment(
+            sender=Account(encoding.encode_address(txn["snd"])),
+            receiver=Account(encoding.encode_address(txn.get("rcv", bytes(32)))),
+            amount=UInt64(txn.get("amt", 0)),
+        )
+
+    def _snapshot(self) -> dict[int, tuple[dict, dict, dict]]:
+        state = {}
+        for app_id in self.contracts:
+            data = self.app_state(app_id)
+            state[app_id] = (dict(data.global_state), dict(data.local_state), dict(data.boxes))
+        return state
+
+    def _restore(self, snapshot: dict[int, tuple[dict, dict, dict]]) -> None:
+        for app_id in list(self.contracts):
+            if app_id not in snapshot:
+                # created by the rolled back group
+                del self.contracts[app_id]
+                continue
+            data = self.app_state(app_id)
+            for current, saved in zip((data.global_state, data.local_state, data.boxes), snapshot[app_id]):
+                current.clear()
+                current.update(saved)
+
+    # ------------------ endpoints ------------------
+    def _send(self, body, **_):
+        pooled = len(self.pool)
+        status, content_type, payload = super()._send(body)
+        if status != 200:
+            return status, content_type, payload
+        entries = self.pool[pooled:]
+        # effects apply now, so the group has to be valid in the very next round
+        if any(entry["stxn"]["txn"].get("fv", 0) > self.round + 1 for entry in entries):
+            del self.pool[pooled:]
+            return self._json({"message": f"txn not yet valid in round {self.round + 1}"}, 400)
+        try:
+            applied = self.evaluate([entry["stxn"]["txn"] for entry in entries])
+        except LogicError as e:
+            del self.pool[pooled:]
+            return self._json({"message": f"TransactionPool.Remember: transaction {entries[e.index]['txid']}: {e.reason}"}, 400)
+        for entry, apply in zip(entries, applied):
+            self._applied[entry["txid"]] = apply
+        return status, content_type, payload
+
+    def simulate_group(self, stxns: list[dict], allow_empty_signatures: bool = False) -> tuple[list[list[bytes]], Optional[tuple[int, str]]]:
+        for i, stxn in enumerate(stxns):
+            if not stxn.get("sig") and not allow_empty_signatures:
+                return [], (i, "signature missing")
+        try:
+            applied = self.evaluate([stxn["txn"] for stxn in stxns], commit=False)
+        except LogicError as e:
+            return e.logs, (e.index, e.reason)
+        return [apply.get("dt", {}).get("lg", []) for apply in applied], None
+
+    def _application(self, app_id, **_):
+        app = self.apps.get(int(app_id))
+        if app is None or int(app_id) not in self.contracts:
+            return super()._application(app_id)
+        state = []
+        for key, value in self.app_state(int(app_id)).global_state.items():
+            value = _native(value)
+            encoded_key = base64.b64encode(key).decode()
+            if isinstance(value, int):
+                state.append({"key": encoded_key, "value": {"type": 2, "uint": value, "bytes": ""}})
+            else:
+                state.append({"key": encoded_key, "value": {"type": 1, "uint": 0, "bytes": base64.b64encode(value).decode()}})
+        return self._json({**app, "params": {**app["params"], "global-state": state}})
+
+
+@functools.cache
+def _method_names(contract_class: type[ARC4Contract]) -> dict[bytes, str]:
+    return {method.get_selector(): name for name, method in CONTRACTS[contract_class].METHODS.items()}
+
+
+@functools.cache
+def _arg_types(contract_class: type[ARC4Contract], name: str) -> list[type]:
+    hints = typing.get_type_hints(getattr(contract_class, name))
+    hints.pop("return", None)
+    return list(hints.values())
+
+
+def _contract_for(approval: bytes) -> Optional[type[ARC4Contract]]:
+    """The contract whose every method selector appears in an approval program"""
+    for contract_class in CONTRACTS:
+        if all(selector in approval for selector in _method_names(contract_class)):
+            return contract_class
+    return None
+
+
+def payment(sender: str, receiver: str, amount: int) -> dict:
+    """Payment transaction dict, for `EmulatedAlgod.call`'s transaction arguments"""
+    return {"type": "pay", "snd": encoding.decode_address(sender), "rcv": encoding.decode_address(receiver), "amt": amount}
+
+
+def voting_fixture(ledger: EmulatedAlgod, admin: str, proposals: list[tuple[int, int, int]], total_token_supply: int = 1000, credit_token_id: int = 9000) -> tuple[int, list[str]]:
+    """A VotingSystem app administered by `admin` with one open proposal per (funding, yes, no) tally
+
+    One member votes yes and another no on every proposal, each proposal from a member of its own;
+    they all close a voting period after the current block (`warp` past it to settle them).
+    Returns the app id and the proposers.
+    """
+    app_id = ledger.deploy(VotingSystem, admin)
+    ledger.call(app_id, admin, "set_total_token_supply", [total_token_supply])
+    ledger.call(app_id, admin, "set_credit_token", [credit_token_id])
+    power = max([1] + [max(yes, no) for _, yes, no in proposals])
+    voters = [encoding.encode_address(os.urandom(32)) for _ in range(2)]
+    for voter in voters:
+        ledger.call(app_id, admin, "register_member", [voter, power])
+    min_tokens = int.from_bytes(ledger.get_global(app_id, "min_tokens_to_propose"), "big")  # an arc4.UInt64
+    proposers = []
+    for funding, yes, no in proposals:
+        proposer = encoding.encode_address(os.urandom(32))
+        ledger.call(app_id, admin, "register_member", [proposer, min_tokens])
+        pid = ledger.call(app_id, proposer, "submit_proposal", ["Proposal", "", funding])
+        for voter, choice, amount in zip(voters, (1, 2), (yes, no)):
+            if amount:
+                ledger.call(app_id, voter, "vote", [pid, choice, amount])
+        proposers.append(proposer)
+    return app_id, proposers
+
+
+# LedgerContext attributes _copy_ledger copies or resets
+_LEDGER_TABLES = ("_app_data", "_asset_data", "_account_data", "_blocks", "_global_fields", "_app_id", "_asset_id")
+
+
+def _copy_ledger(source):
+    """algopy_testing ledger with its own key tables, sharing the (immutable) stored values; only TestingLedger calls it"""
+    ledger = copy.copy(source)
+    ledger._app_data = {}
+    for app_id, data in source._app_data.items():
+        clone = copy.copy(data)
+        clone.fields = dict(data.fields)
+        clone.global_state = dict(data.global_state)
+        clone.local_state = dict(data.local_state)
+        clone.boxes = dict(data.boxes)
+        ledger._app_data[app_id] = clone
+    ledger._asset_data = {asset_id: dict(fields) for asset_id, fields in source._asset_data.items()}
+    ledger._account_data = copy.deepcopy(source._account_data)
+    ledger._blocks = copy.deepcopy(source._blocks)
+    ledger._global_fields = dict(source._global_fields)
+    # fresh id counters: they skip ids already taken, so both sides hand out the same next ids
+    ledger._app_id = iter(range(1001, 2**64))
+    ledger._asset_id = iter(range(1001, 2**64))
+    return ledger
+
+
+def _asset_transfer(inner) -> dict:
+    """Inner asset transfer result as an apply data `itx` entry"""
+    txn = {"type": "axfer", "snd": inner.sender.bytes.value, "arcv": inner.asset_receiver.bytes.value, "xaid": int(inner.xfer_asset.id)}
+    if inner.asset_amount:
+        txn["aamt"] = int(inner.asset_amount)
+    return {"txn": txn}
+
+
+def _native(value) -> Any:
+    """Global state value as int or bytes (algopy_testing keeps some as UInt64 / Bytes)"""
+    return value if isinstance(value, (int, bytes)) else value.value
@@ -0,0 +1,153 @@
+"""
+ARC-28 events of the Climate DAO apps, decoded from block data.
+
+Every state-changing contract method logs an event: the first 4 bytes of the SHA-512/256 hash of
+the event signature (e.g. `VoteCast(uint64,address,uint64,uint64)`) followed by the ARC-4 encoded
+fields. `EventStream` follows the chain round by round, fetches each block once (msgpack, logs of
+inner transactions included) and yields the events of the watched apps in block order, so an
+indexer can maintain its read model from logs alone:
+
+    for event in EventStream(algod_client, {voting_app_id}, start_round=deployment_round):
+        apply(event)
+
+The signatures mirror the event structs in contract.py (the same events listed in the compiled
+arc56 app specs).
+"""
+
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Optional
+
+import msgpack
+from algosdk import abi, encoding, error
+from algosdk.v2client import algod
+
+# event name -> (field name, ARC-4 type) in declaration order
+EVENTS: dict[str, list[tuple[str, str]]] = {
+    # ClimateDAO
+    "TokensCreated": [("dao_token", "uint64"), ("credit_token", "uint64")],
+    "MemberJoined": [("member", "address"), ("minted", "uint64"), ("balance", "uint64")],
+    # ImpactAnalytics
+    "ProjectRegistered": [("project_id", "uint64"), ("creator", "address"), ("ai_score", "uint64")],
+    # VotingSystem
+    "SettingChanged": [("name", "string"), ("value", "byte[]")],
+    "MemberRegistered": [("member", "address"), ("tokens", "uint64"), ("index", "uint64")],
+    "Delegated": [("member", "address"), ("delegate", "address"), ("power", "uint64")],
+    "Undelegated": [("member", "address"), ("delegate", "address"), ("power", "uint64")],
+    "ProposalSubmitted": [("proposal_id", "uint64"), ("proposer", "address"), ("funding", "uint64"), ("end_time", "uint64")],
+    "VoteCast": [("proposal_id", "uint64"), ("voter", "address"), ("choice", "uint64"), ("power", "uint64")],
+    "ProposalFinalized": [("proposal_id", "uint64"), ("status", "uint64"), ("yes_votes", "uint64"), ("no_votes", "uint64"), ("total_voting_power", "uint64")],
+    "CreditsAwarded": [("proposal_id", "uint64"), ("receiver", "address"), ("amount", "uint64"), ("total", "uint64")],
+}
+
+
+def signature(name: str) -> str:
+    return f"{name}({','.join(arc4_type for _, arc4_type in EVENTS[name])})"
+
+
+def selector(name: str) -> bytes:
+    return encoding.checksum(signature(name).encode())[:4]
+
+
+_TYPES = {name: abi.ABIType.from_string(f"({','.join(t for _, t in fields)})") for name, fields in EVENTS.items()}
+_BY_SELECTOR = {selector(name): name for name in EVENTS}
+
+
+@dataclass(frozen=True)
+class Event:
+    """One decoded event and where it was logged"""
+    name: str
+    fields: dict[str, Any]
+    app_id: int
+    round: int
+    txn_index: int  # position of the top-level transaction in the block
+    log_index: int  # position among the events of that transaction (inner calls included)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.fields[key]
+
+
+def encode_event(name: str, **fields: Any) -> bytes:
+    """Log bytes for an event, as `arc4.emit` produces them"""
+    values = [fields[field] for field, _ in EVENTS[name]]
+    return selector(name) + _TYPES[name].encode(values)
+
+
+def decode_log(raw: bytes) -> Optional[tuple[str, dict[str, Any]]]:
+    """(name, fields) for an event log, None for any other log (e.g. ABI return values)"""
+    name = _BY_SELECTOR.get(raw[:4])
+    if name is None:
+        return None
+    values = _TYPES[name].decode(raw[4:])
+    return name, {
+        # byte[] decodes to a list of ints
+        field: bytes(value) if arc4_type == "byte[]" else value
+        for (field, arc4_type), value in zip(EVENTS[name], values)
+    }
+
+
+def _logs(stxn: dict, app_id: int) -> Iterator[tuple[int, bytes]]:
+    """(app id, log) of a block transaction and its inner transactions, in execution order"""
+    apply = stxn.get("dt") or {}
+    for log in apply.get("lg") or []:
+        yield app_id, log
+    for inner in apply.get("itx") or []:
+        yield from _logs(inner, (inner.get("txn") or {}).get("apid", 0))
+
+
+def events_in_block(block: dict, app_ids: Optional[Iterable[int]] = None) -> list[Event]:
+    """Events in a msgpack-decoded block, optionally only those logged by `app_ids`"""
+    watched = set(app_ids) if app_ids is not None else None
+    rnd = block.get("rnd", 0)
+    events = []
+    for txn_index, stxn in enumerate(block.get("txns") or []):
+        # an app-creating call has no apid in the transaction; the new id is in the apply data
+        app_id = (stxn.get("txn") or {}).get("apid") or stxn.get("apid", 0)
+        log_index = 0
+        for source, log in _logs(stxn, app_id):
+            if watched is not None and source not in watched:
+                continue
+            decoded = decode_log(log)
+            if decoded is None:
+                continue
+            events.append(Event(decoded[0], decoded[1], source, rnd, txn_index, log_index))
+            log_index += 1
+    return events
+
+
+class EventStream:
+    """Events of the watched apps, round by round from `start_round` (one block read per round)"""
+
+    def __init__(self, algod_client: algod.AlgodClient, app_ids: Iterable[int], start_round: int):
+        self.algod_client = algod_client
+        self.app_ids = set(app_ids)
+        self.next_round = start_round
+        self.blocks_read = 0
+
+    def read_round(self, rnd: int) -> list[Event]:
+        raw = self.algod_client.block_info(rnd, response_format="msgpack")
+        self.blocks_read += 1
+        block = msgpack.unpackb(raw, raw=False, strict_map_key=False)["block"]
+        return events_in_block(block, self.app_ids)
+
+    def poll(self) -> list[Event]:
+        """Events of every round committed since the last call, without waiting"""
+        last = self.algod_client.status()["last-round"]
+        events = []
+        while self.next_round <= last:
+            events += self.read_round(self.next_round)
+            self.next_round += 1
+        return events
+
+    def __iter__(self) -> Iterator[Event]:
+        """Follow the chain forever, waiting for each new round"""
+        while True:
+            try:
+                events = self.read_round(self.next_round)
+            except error.AlgodHTTPError as e:
+                if e.code != 404:
+                    raise
+                # not committed yet
+                self.algod_client.status_after_block(self.next_round - 1)
+                continue
+            self.next_round += 1
+            yield from events
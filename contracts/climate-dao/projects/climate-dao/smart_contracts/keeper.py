@@ -0,0 +1,265 @@
+"""
+Settlement keeper: finalizes expired proposals and awards credits to approved ones.
+
+For every new round the keeper:
+ - reads the block timestamp and the `active` box (one box read) to find open proposals whose
+   `end_time` has passed
+ - finalizes them with `finalize_batch` groups, all in flight at once through the
+   TransactionSubmitter, and decodes the returned statuses from the confirmation logs
+ - awards credits to newly approved proposals with one `award_credits_batch` group per
+   AWARD_BATCH_SIZE proposals (fewer when long proposal boxes need more references than a group
+   holds), every fee in the group (including the inner asset transfers) pooled on the first
+   transaction
+
+Progress is kept in a JSON checkpoint so restarts are idempotent:
+ - "round": last round fully processed
+ - "approved": finalized as approved, award not yet confirmed
+ - "awarded": awards confirmed on chain
+ - "pending": award groups signed and sent but not yet confirmed, with their signed bytes
+
+A pending group is written to the checkpoint before it is sent. On restart it is looked up in the
+blocks of its validity window; if it is not there and the window is still open, the very same
+signed bytes are re-sent (a transaction id can only ever commit once), otherwise the award is
+rebuilt. The short validity window (`validity` rounds) keeps that lookup cheap. A rebuilt award
+only asks for what the on-chain `awarded_` ledger says is still unpaid, and the contract rejects
+anything past a proposal's funding, so even a lost checkpoint cannot pay twice.
+
+    python -m smart_contracts keeper           # VotingSystem from deployment_info.json
+    python -m smart_contracts keeper --mock    # against an in-process mock algod
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from algosdk import encoding, error
+
+from smart_contracts.climate_dao.client import Proposal, VotingSystemClient, awarded_box
+from smart_contracts.params_cache import SuggestedParamsCache
+from smart_contracts.submitter import TransactionExpiredError, TransactionSubmitter
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = Path(__file__).parent / "keeper_checkpoint.json"
+RETURN_PREFIX = bytes.fromhex("151f7c75")  # ARC-4 return value log prefix
+
+
+@dataclass
+class Checkpoint:
+    round: int = 0
+    approved: list[int] = field(default_factory=list)
+    awarded: list[int] = field(default_factory=list)
+    pending: list[dict] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: Path) -> "Checkpoint":
+        try:
+            return cls(**json.loads(path.read_text()))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self, path: Path) -> None:
+        # write-then-rename so a crash never leaves a truncated checkpoint
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(asdict(self), indent=2))
+        os.replace(tmp, path)
+
+
+def decode_return(method, result: dict):
+    """ABI return value from the logs of a confirmation result"""
+    for log in reversed(result.get("logs", [])):
+        raw = base64.b64decode(log)
+        if raw.startswith(RETURN_PREFIX):
+            return method.returns.type.decode(raw[len(RETURN_PREFIX):])
+    raise ValueError(f"no ABI return in {result.get('txid')}")
+
+
+class Keeper:
+    """Round-driven finalization and credit awards for one VotingSystem app"""
+
+    def __init__(
+        self,
+        client: VotingSystemClient,
+        checkpoint_path: Path = CHECKPOINT_FILE,
+        amount_for: Optional[Callable[[Proposal], int]] = None,
+        batch_size: int = 24,
+        max_in_flight: int = 16,
+        validity: int = 50,
+    ):
+        self.client = client
+        self.algod_client = client.algod_client
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint = Checkpoint.load(checkpoint_path)
+        self.amount_for = amount_for or (lambda proposal: proposal.funding)
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.params = SuggestedParamsCache(self.algod_client, validity=validity)
+        self.submitter: Optional[TransactionSubmitter] = None
+        self.stats = {"rounds": 0, "finalized": 0, "awarded": 0}
+        self._in_flight: set[str] = set()
+
+    # ------------------ main loop ------------------
+    async def run(self, rounds: Optional[int] = None) -> None:
+        """Process rounds as they are produced (forever, or `rounds` new rounds)"""
+        async with TransactionSubmitter(self.algod_client, self.max_in_flight) as submitter:
+            self.submitter = submitter
+            if not self.checkpoint.round:
+                status = await asyncio.to_thread(self.algod_client.status)
+                self.checkpoint.round = status["last-round"] - 1
+            processed = 0
+            while rounds is None or processed < rounds:
+                status = await asyncio.to_thread(self.algod_client.status_after_block, self.checkpoint.round)
+                # rounds missed while down need no replay: the queue holds every open proposal
+                await self.step(status["last-round"])
+                processed += 1
+
+    async def step(self, rnd: int) -> None:
+        """Settle everything that expired by round `rnd`"""
+        block = await asyncio.to_thread(self.algod_client.block_info, rnd)
+        timestamp = block["block"].get("ts", 0)
+        self.client.observe_round(rnd)
+        self.params.observe_round(rnd)
+
+        await self.resolve_pending(rnd)
+        expired = await asyncio.to_thread(self.client.expiring, timestamp)
+        if expired:
+            await self.finalize([pid for _, pid in expired])
+        if self.checkpoint.approved:
+            await self.award(self.checkpoint.approved)
+
+        self.checkpoint.round = rnd
+        self.checkpoint.save(self.checkpoint_path)
+        self.stats["rounds"] += 1
+
+    # ------------------ finalize ------------------
+    async def finalize(self, proposal_ids: list[int]) -> dict[int, int]:
+        """Finalize in `batch_size` groups sent concurrently; returns id -> status"""
+        method = self.client.method("finalize_batch")
+        chunks = [proposal_ids[i:i + self.batch_size] for i in range(0, len(proposal_ids), self.batch_size)]
+        futures, written = [], []
+        for chunk in chunks:
+            atc, boxes = await asyncio.to_thread(self.client.compose_finalize_batch, chunk, self.params.get())
+            futures.append(await self.submitter.submit(atc.gather_signatures()))
+            written += boxes
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        for box in written:
+            self.client.cache.invalidate(self.client.app_id, box)
+
+        statuses = {}
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                # still queued on chain; the next round retries
+                logger.warning("finalize_batch %s failed: %s", chunk, result)
+                continue
+            for pid, status in zip(chunk, decode_return(method, result)):
+                statuses[pid] = status
+                if status == 1 and pid not in self.checkpoint.awarded and pid not in self.checkpoint.approved:
+                    self.checkpoint.approved.append(pid)
+        self.stats["finalized"] += sum(1 for status in statuses.values() if status)
+        self.checkpoint.save(self.checkpoint_path)
+        return statuses
+
+    # ------------------ awards ------------------
+    async def award(self, proposal_ids: list[int]) -> None:
+        """Award credits with pooled-fee `award_credits_batch` groups, as many proposals in each as fit"""
+        todo = [pid for pid in proposal_ids if pid not in self.checkpoint.awarded and not self._is_pending(pid)]
+        groups = await asyncio.to_thread(self._compose_awards, todo)
+        paying = {pid for chunk, _ in groups for pid in chunk}
+        settled = [pid for pid in todo if pid not in paying]
+        if settled:
+            # already paid in full
+            self._mark_awarded({"proposals": settled})
+        # recorded before sending so a crash between send and confirmation is recoverable
+        pending = [(self._record_pending(chunk, signed), signed) for chunk, signed in groups]
+        self.checkpoint.save(self.checkpoint_path)
+        await asyncio.gather(*(self._send(entry, signed) for entry, signed in pending))
+
+    def _compose_awards(self, proposal_ids: list[int]) -> list[tuple[list[int], list]]:
+        """Signed award groups for the unpaid part of each proposal's award, with the proposals each pays"""
+        awards = []
+        for pid in proposal_ids:
+            proposal = self.client.get_proposal(pid)
+            due = min(self.amount_for(proposal), proposal.funding - self.client.awarded(pid))
+            if due > 0:
+                awards.append((pid, due))
+        if not awards:
+            return []
+        groups = self.client.compose_award_batches(awards, self.params.get())
+        return [([pid for pid, _ in chunk], atc.gather_signatures()) for chunk, atc, _ in groups]
+
+    def _record_pending(self, proposal_ids: list[int], signed: list) -> dict:
+        entry = {
+            "proposals": list(proposal_ids),
+            "txids": [stxn.get_txid() for stxn in signed],
+            "first_valid": signed[0].transaction.first_valid_round,
+            "last_valid": signed[0].transaction.last_valid_round,
+            "group": [encoding.msgpack_encode(stxn) for stxn in signed],
+        }
+        self.checkpoint.pending.append(entry)
+        return entry
+
+    async def _send(self, entry: dict, signed: list) -> None:
+        txid = entry["txids"][0]
+        self._in_flight.add(txid)
+        try:
+            await (await self.submitter.submit(signed))
+        except TransactionExpiredError:
+            logger.warning("award group %s expired unconfirmed", entry["proposals"])
+            self._drop_pending(entry)
+        except error.AlgodHTTPError as e:
+            # e.g. a re-send of a group that already committed; resolve_pending settles it
+            logger.info("award group %s rejected: %s", entry["proposals"], e)
+        else:
+            self._mark_awarded(entry)
+        finally:
+            self._in_flight.discard(txid)
+        self.checkpoint.save(self.checkpoint_path)
+
+    def _mark_awarded(self, entry: dict) -> None:
+        for pid in entry["proposals"]:
+            if pid not in self.checkpoint.awarded:
+                self.checkpoint.awarded.append(pid)
+            if pid in self.checkpoint.approved:
+                self.checkpoint.approved.remove(pid)
+            self.client.cache.invalidate(self.client.app_id, awarded_box(pid))
+        self.stats["awarded"] += len(entry["proposals"])
+        self._drop_pending(entry)
+
+    def _drop_pending(self, entry: dict) -> None:
+        if entry in self.checkpoint.pending:
+            self.checkpoint.pending.remove(entry)
+
+    def _is_pending(self, pid: int) -> bool:
+        return any(pid in entry["proposals"] for entry in self.checkpoint.pending)
+
+    # ------------------ restart ------------------
+    async def resolve_pending(self, current: int) -> None:
+        """Settle award groups sent earlier (before a restart, or rejected on re-send)"""
+        for entry in list(self.checkpoint.pending):
+            if entry["txids"][0] in self._in_flight:
+                continue
+            if await self._landed(entry, current):
+                self._mark_awarded(entry)
+            elif current < entry["last_valid"]:
+                # the same signed bytes: if they already committed, algod rejects them
+                signed = [encoding.msgpack_decode(raw) for raw in entry["group"]]
+                await self._send(entry, signed)
+            else:
+                self._drop_pending(entry)
+        self.checkpoint.save(self.checkpoint_path)
+
+    async def _landed(self, entry: dict, current: int) -> bool:
+        txid = entry["txids"][0]
+        for rnd in range(entry["first_valid"], min(entry["last_valid"], current) + 1):
+            try:
+                response = await asyncio.to_thread(self.algod_client.get_block_txids, rnd)
+            except error.AlgodHTTPError:
+                continue
+            if txid in (response.get("blockTxids") or []):
+                return True
+        return False
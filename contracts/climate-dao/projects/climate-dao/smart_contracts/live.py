@@ -0,0 +1,187 @@
+"""
+Live vote tallies over server-sent events.
+
+Each sync of the `ChainMirror` reads a proposal's `votes_` box once if the round changed it
+(see mirror.py). `TallyHub` turns that read into one SSE message per proposal and hands the same
+bytes to every watcher of that proposal. Live tallies therefore cost one chain read per round,
+however many viewers there are:
+
+    GET /api/proposals/7/stream          one proposal
+    GET /api/stream?proposals=7,8,9      several proposals
+    GET /api/stream                      every proposal
+
+A watcher first gets the current tally of each proposal it follows. After that it gets one
+`tally` event for each round that changes one of them:
+
+    id: 1042
+    event: tally
+    data: {"proposal_id":7,"round":1042,"yes_votes":...,"delta":{"yes_votes":5,...}}
+
+`delta` is the change since the previous published round. A watcher that cannot keep up is not
+buffered without bound. It only keeps the latest message per proposal, so it skips to the newest
+tally (the `id` shows the gap). Idle streams get a comment line every `heartbeat` seconds, which
+keeps proxies from closing them and shows dead connections up.
+
+    hub = TallyHub(mirror)
+    server = StreamingAPIServer(ReadAPI(mirror), hub).start()
+"""
+
+import asyncio
+import json
+import re
+from collections import defaultdict
+from dataclasses import asdict, fields
+from typing import Iterable, Optional
+from urllib import parse
+
+from smart_contracts.api import ReadAPI, ReadAPIServer, Response
+from smart_contracts.climate_dao.client import VoteSummary
+from smart_contracts.mirror import Changes, ChainMirror
+
+DEFAULT_HEARTBEAT = 15.0
+RETRY_MS = 2000  # reconnect delay suggested to EventSource clients
+TALLY_FIELDS = [f.name for f in fields(VoteSummary)]
+STREAM_PATH = re.compile(r"^/api/(?:proposals/(?P<pid>\d+)/)?stream$")
+SSE_HEADERS = (
+    "HTTP/1.1 200 OK\r\n"
+    "Content-Type: text/event-stream\r\n"
+    "Cache-Control: no-cache\r\n"
+    "Connection: keep-alive\r\n"
+    "X-Accel-Buffering: no\r\n\r\n"
+    f"retry: {RETRY_MS}\n\n"
+).encode()
+
+
+def tally_message(pid: int, rnd: int, summary: VoteSummary, previous: Optional[VoteSummary]) -> bytes:
+    """One encoded `tally` event"""
+    tally = asdict(summary)
+    before = asdict(previous) if previous is not None else dict.fromkeys(TALLY_FIELDS, 0)
+    payload = {"proposal_id": pid, "round": rnd, **tally, "delta": {name: tally[name] - before[name] for name in TALLY_FIELDS}}
+    return f"id: {rnd}\nevent: tally\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n".encode()
+
+
+class Watcher:
+    """One subscriber: the latest undelivered message per proposal, and a flag to wake its writer"""
+
+    __slots__ = ("pids", "pending", "ready")
+
+    def __init__(self, pids: Optional[frozenset[int]]):
+        self.pids = pids  # None: every proposal
+        self.pending: dict[int, bytes] = {}
+        self.ready = asyncio.Event()
+
+    def push(self, pid: int, message: bytes) -> None:
+        self.pending[pid] = message  # a newer tally replaces one not yet sent
+        self.ready.set()
+
+    async def next(self, timeout: Optional[float] = None) -> list[bytes]:
+        """Messages waiting for this watcher; empty if `timeout` passes first"""
+        if not self.pending:
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self.ready.clear()
+        messages = list(self.pending.values())
+        self.pending.clear()
+        return messages
+
+
+class TallyHub:
+    """Fans tally changes from the mirror out to watchers; every method runs on the event loop"""
+
+    def __init__(self, mirror: ChainMirror):
+        self.mirror = mirror
+        self.by_proposal: dict[int, set[Watcher]] = defaultdict(set)
+        self.everything: set[Watcher] = set()
+        # pid -> (round, summary) last sent; starts from what the mirror already holds, so the first
+        # delta after the hub is created covers only the votes since then
+        with mirror.lock:
+            self.published: dict[int, tuple[int, VoteSummary]] = {pid: (mirror.round, summary) for pid, summary in mirror.summaries.items()}
+        self.stats = {"rounds": 0, "messages": 0, "deliveries": 0}
+
+    @property
+    def watchers(self) -> int:
+        return len(self.everything) + sum(len(watchers) for watchers in self.by_proposal.values())
+
+    def subscribe(self, pids: Optional[Iterable[int]] = None) -> Watcher:
+        """A new watcher, primed with the current tally of each proposal it follows"""
+        watcher = Watcher(frozenset(pids) if pids is not None else None)
+        if watcher.pids is None:
+            self.everything.add(watcher)
+        else:
+            for pid in watcher.pids:
+                self.by_proposal[pid].add(watcher)
+        with self.mirror.lock:
+            current = {pid: summary for pid, summary in self.mirror.summaries.items() if watcher.pids is None or pid in watcher.pids}
+        for pid, summary in sorted(current.items()):
+            watcher.push(pid, tally_message(pid, self.mirror.round, summary, None))
+        return watcher
+
+    def unsubscribe(self, watcher: Watcher) -> None:
+        self.everything.discard(watcher)
+        for pid in watcher.pids or ():
+            watchers = self.by_proposal.get(pid)
+            if watchers is not None:
+                watchers.discard(watcher)
+                if not watchers:
+                    del self.by_proposal[pid]
+
+    def publish(self, changes: Changes) -> None:
+        """Push the tallies a sync changed; use as a `ReadAPIServer.on_sync` hook"""
+        if not changes.summaries:
+            return
+        self.stats["rounds"] += 1
+        with self.mirror.lock:
+            summaries = {pid: self.mirror.summaries.get(pid) for pid in changes.summaries}
+        for pid, summary in sorted(summaries.items()):
+            if summary is None:
+                continue
+            previous = self.published.get(pid)
+            if previous is not None and previous[1] == summary:
+                continue
+            self.published[pid] = (changes.round, summary)
+            message = tally_message(pid, changes.round, summary, previous[1] if previous else None)
+            self.stats["messages"] += 1
+            for watchers in (self.by_proposal.get(pid, ()), self.everything):
+                for watcher in watchers:
+                    watcher.push(pid, message)
+                self.stats["deliveries"] += len(watchers)
+
+
+class StreamingAPIServer(ReadAPIServer):
+    """ReadAPIServer that also serves the SSE tally streams"""
+
+    def __init__(self, api: ReadAPI, hub: TallyHub, *args, heartbeat: float = DEFAULT_HEARTBEAT, **kwargs):
+        super().__init__(api, *args, **kwargs)
+        self.hub = hub
+        self.heartbeat = heartbeat
+        self.on_sync.append(hub.publish)
+
+    async def dispatch(self, method: str, target: str, headers: dict[str, str], writer: asyncio.StreamWriter) -> Response:
+        url = parse.urlsplit(target)
+        match = STREAM_PATH.match(url.path)
+        if match is None or method != "GET":
+            return await super().dispatch(method, target, headers, writer)
+        if match.group("pid") is not None:
+            pids = [int(match.group("pid"))]
+        else:
+            query = parse.parse_qs(url.query).get("proposals")
+            try:
+                pids = [int(pid) for pid in ",".join(query).split(",") if pid] if query else None
+            except ValueError:
+                return 400, {"Content-Type": "text/plain"}, b"proposals must be a list of ids"
+        await self._stream(self.hub.subscribe(pids), writer)
+        return 0, {}, b""
+
+    async def _stream(self, watcher: Watcher, writer: asyncio.StreamWriter) -> None:
+        try:
+            writer.write(SSE_HEADERS)
+            while not writer.is_closing():
+                messages = await watcher.next(self.heartbeat)
+                writer.write(b"".join(messages) if messages else b": heartbeat\n\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.hub.unsubscribe(watcher)
@@ -0,0 +1,160 @@
+"""
+Local read model of the Climate DAO apps, kept in sync from block events.
+
+Dashboards and APIs should not go to the chain for every page view. `ChainMirror` follows the
+apps with an `EventStream` (one block read per round) and keeps proposals, vote summaries, member
+records, DAO balances and impact totals in memory. Each round's events only mark what they
+touched; the touched boxes are then read once for the whole round, so a proposal that received
+500 votes in a round costs one `votes_` read. Values carried by the events themselves (DAO
+balances, awarded totals, project AI scores) are taken from the events without a read.
+
+Every entry remembers the round it last changed in (`changed`), which read APIs use as a
+version: a response computed for that round stays valid until the entry changes again.
+
+    mirror = ChainMirror(voting, dao=dao, impact=impact, start_round=deployment_round)
+    mirror.sync()                       # catch up with the chain; returns what changed
+    mirror.proposals[7], mirror.summaries[7], mirror.members[address]
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from smart_contracts.climate_dao.client import (
+    ClimateDAOClient,
+    ImpactAnalyticsClient,
+    Member,
+    Proposal,
+    VoteSummary,
+    VotingSystemClient,
+)
+from smart_contracts.events import Event, EventStream
+
+# keys of `ChainMirror.changed`
+PROPOSALS = "proposals"
+MEMBERS = "members"
+IMPACT = "impact"
+
+IMPACT_TOTALS = ("total_projects", "total_co2_saved", "total_trees_planted", "total_renewable_energy")
+
+
+@dataclass
+class Changes:
+    """What one `sync` changed"""
+    round: int
+    proposals: set[int] = field(default_factory=set)
+    summaries: set[int] = field(default_factory=set)  # proposals whose VoteData changed
+    members: set[str] = field(default_factory=set)
+    impact: bool = False
+
+    def __bool__(self) -> bool:
+        return bool(self.proposals or self.summaries or self.members or self.impact)
+
+
+class ChainMirror:
+    """In-memory copy of proposals, tallies, members and impact totals, updated round by round"""
+
+    def __init__(self, voting: VotingSystemClient, dao: Optional[ClimateDAOClient] = None, impact: Optional[ImpactAnalyticsClient] = None, start_round: int = 0):
+        self.voting = voting
+        self.dao = dao
+        self.impact_client = impact
+        app_ids = {client.app_id for client in (voting, dao, impact) if client is not None}
+        self.stream = EventStream(voting.algod_client, app_ids, start_round)
+        self.round = start_round - 1  # last round applied
+
+        self.proposals: dict[int, Proposal] = {}
+        self.summaries: dict[int, VoteSummary] = {}
+        self.awarded: dict[int, int] = {}
+        self.members: dict[str, Member] = {}
+        self.dao_balances: dict[str, int] = {}
+        self.impact: dict[str, int] = {name: 0 for name in IMPACT_TOTALS}
+        self.ai_scores: dict[int, int] = {}
+        # (kind,) or (kind, key) -> round it last changed in
+        self.changed: dict[tuple, int] = {}
+        self.lock = threading.Lock()
+
+    # ------------------ sync ------------------
+    def sync(self) -> Changes:
+        """Apply every round committed since the last sync"""
+        last = self.voting.algod_client.status()["last-round"]
+        changes = Changes(last)
+        while self.stream.next_round <= last:
+            rnd = self.stream.next_round
+            events = self.stream.read_round(rnd)
+            self.stream.next_round += 1
+            if events:
+                self._apply_round(rnd, events, changes)
+        self.round = max(self.round, last)
+        return changes
+
+    def _apply_round(self, rnd: int, events: list[Event], changes: Changes) -> None:
+        proposals: set[int] = set()
+        summaries: set[int] = set()
+        members: set[str] = set()
+        impact = False
+        with self.lock:
+            for event in events:
+                if event.app_id == self.voting.app_id:
+                    if event.name == "ProposalSubmitted":
+                        proposals.add(event["proposal_id"])
+                        summaries.add(event["proposal_id"])
+                        members.add(event["proposer"])
+                    elif event.name == "VoteCast":
+                        summaries.add(event["proposal_id"])
+                        members.add(event["voter"])
+                    elif event.name == "ProposalFinalized":
+                        proposals.add(event["proposal_id"])
+                    elif event.name == "CreditsAwarded":
+                        self.awarded[event["proposal_id"]] = event["total"]
+                        proposals.add(event["proposal_id"])
+                    elif event.name == "MemberRegistered":
+                        members.add(event["member"])
+                    elif event.name in ("Delegated", "Undelegated"):
+                        members.update((event["member"], event["delegate"]))
+                elif event.name == "MemberJoined":
+                    self.dao_balances[event["member"]] = event["balance"]
+                    members.add(event["member"])
+                elif event.name == "ProjectRegistered":
+                    self.ai_scores[event["project_id"]] = event["ai_score"]
+                    impact = True
+
+        # one read per touched box, outside the lock
+        self.voting.observe_round(rnd)
+        read_proposals = {pid: self.voting.get_proposal(pid, resolve=True) for pid in proposals}
+        read_summaries = {pid: self.voting.get_vote_summary(pid) for pid in summaries}
+        read_members = {member: self.voting.get_member(member) for member in members}
+        totals = None
+        if impact and self.impact_client is not None:
+            state = self.impact_client.global_state()
+            totals = {name: state.get(name, 0) for name in IMPACT_TOTALS}
+
+        with self.lock:
+            for pid, proposal in read_proposals.items():
+                if proposal is not None:
+                    self.proposals[pid] = proposal
+                    self.changed[(PROPOSALS, pid)] = rnd
+            for pid, summary in read_summaries.items():
+                if summary is not None:
+                    self.summaries[pid] = summary
+                    self.changed[(PROPOSALS, pid)] = rnd
+            for member, record in read_members.items():
+                if record is not None:
+                    self.members[member] = record
+                self.changed[(MEMBERS, member)] = rnd
+            if read_proposals or read_summaries:
+                self.changed[(PROPOSALS,)] = rnd
+            if read_members:
+                self.changed[(MEMBERS,)] = rnd
+            if impact:
+                if totals is not None:
+                    self.impact = totals
+                self.changed[(IMPACT,)] = rnd
+        changes.proposals |= proposals
+        changes.summaries |= summaries
+        changes.members |= members
+        changes.impact = changes.impact or impact
+
+    # ------------------ versions ------------------
+    def version(self, *key) -> int:
+        """Round in which the entry (or collection) last changed; 0 if it never did"""
+        return self.changed.get(key, 0)
@@ -0,0 +1,446 @@
+"""
+Local stand-in for algod, used by tests and offline runs.
+
+`MockAlgod` holds an in-memory ledger (round, accounts, apps, boxes, transaction pool and
+blocks) and answers the algod REST endpoints our code uses. Submitted transactions sit in the
+pool until the next round is produced, then land in that round's block. `MockAlgodServer` serves it over HTTP/1.1 with keep-alive from an
+asyncio loop on a background thread, so real `AlgodClient`s (pooled or not) can talk to it.
+
+Fault injection (`fail_next`, `latency`) lets tests exercise retries and concurrency, and
+`block_time` makes the server produce rounds on its own so round watchers can be tested.
+smart_contracts/emulator.py runs contract.py itself behind the same endpoints.
+"""
+
+import asyncio
+import base64
+import json
+import re
+import threading
+from typing import Optional
+from urllib import parse
+
+import msgpack
+from algosdk import encoding
+
+GENESIS_ID = "mocknet-v1"
+GENESIS_HASH = base64.b64encode(b"climate-dao-mocknet-genesis-hash").decode()
+WAIT_FOR_BLOCK = re.compile(r"^/v2/status/wait-for-block-after/(?P<after>\d+)$")
+
+
+class MockAlgod:
+    """In-memory ledger plus a request router returning (status, content type, body)"""
+
+    def __init__(self, start_round: int = 1000, start_timestamp: int = 1_700_000_000):
+        self.round = start_round
+        self.timestamp = start_timestamp
+        self.round_seconds = 3
+        self.min_fee = 1000
+        self.accounts: dict[str, dict] = {}
+        self.apps: dict[int, dict] = {}
+        self.boxes: dict[tuple[int, bytes], bytes] = {}
+        self.next_app_id = 1001
+
+        # transaction pool, committed blocks and per-txid results
+        self.pool: list[dict] = []
+        self.blocks: dict[int, list[dict]] = {}
+        self.timestamps: dict[int, int] = {}  # round -> block timestamp, for rounds produced here
+        self.results: dict[str, dict] = {}
+        self.max_block_txns = 5000
+        self.lock = threading.RLock()
+
+        # fault injection and counters
+        self.fail_next = 0
+        self.fail_status = 503
+        self.latency = 0.0
+        self.requests = 0
+        self.connections = 0
+        self.simulations = 0
+        self.paths: list[str] = []
+
+        self._routes = [
+            ("GET", re.compile(r"^/health$"), self._health),
+            ("GET", re.compile(r"^/v2/status$"), self._status),
+            ("GET", WAIT_FOR_BLOCK, self._status),
+            ("GET", re.compile(r"^/v2/transactions/params$"), self._params),
+            ("GET", re.compile(r"^/v2/accounts/(?P<address>[A-Z2-7]+)$"), self._account),
+            ("GET", re.compile(r"^/v2/applications/(?P<app_id>\d+)$"), self._application),
+            ("GET", re.compile(r"^/v2/applications/(?P<app_id>\d+)/box$"), self._box),
+            ("GET", re.compile(r"^/v2/applications/(?P<app_id>\d+)/boxes$"), self._boxes),
+            ("POST", re.compile(r"^/v2/transactions$"), self._send),
+            ("POST", re.compile(r"^/v2/transactions/simulate$"), self._simulate),
+            ("GET", re.compile(r"^/v2/transactions/pending/(?P<txid>[A-Z2-7]+)$"), self._pending),
+            ("GET", re.compile(r"^/v2/blocks/(?P<rnd>\d+)/txids$"), self._block_txids),
+            ("GET", re.compile(r"^/v2/blocks/(?P<rnd>\d+)$"), self._block),
+        ]
+
+    # ------------------ ledger helpers ------------------
+    def add_account(self, address: str, amount: int = 10_000_000) -> None:
+        self.accounts[address] = {"address": address, "amount": amount}
+
+    def add_app(self, app_id: int, creator: str = "", global_state: Optional[dict] = None) -> None:
+        self.apps[app_id] = {"id": app_id, "params": {"creator": creator, "global-state": []}}
+        for key, value in (global_state or {}).items():
+            self.set_global(app_id, key, value)
+
+    def set_global(self, app_id: int, key: str, value) -> None:
+        """Set one global state value (int or bytes) of an app"""
+        encoded_key = base64.b64encode(key.encode()).decode()
+        state = [item for item in self.apps[app_id]["params"]["global-state"] if item["key"] != encoded_key]
+        if isinstance(value, int):
+            state.append({"key": encoded_key, "value": {"type": 2, "uint": value, "bytes": ""}})
+        else:
+            state.append({"key": encoded_key, "value": {"type": 1, "uint": 0, "bytes": base64.b64encode(value).decode()}})
+        self.apps[app_id]["params"]["global-state"] = state
+
+    def get_global(self, app_id: int, key: str, default=None):
+        encoded_key = base64.b64encode(key.encode()).decode()
+        for item in self.apps[app_id]["params"]["global-state"]:
+            if item["key"] == encoded_key:
+                value = item["value"]
+                return value["uint"] if value["type"] == 2 else base64.b64decode(value["bytes"])
+        return default
+
+    def set_box(self, app_id: int, name: bytes, value: bytes) -> None:
+        self.boxes[(app_id, name)] = value
+
+    def get_box(self, app_id: int, name: bytes) -> Optional[bytes]:
+        return self.boxes.get((app_id, name))
+
+    def box_names(self, app_id: int) -> list[bytes]:
+        return [name for (aid, name) in self.boxes if aid == app_id]
+
+    def advance(self, rounds: int = 1) -> None:
+        """Produce `rounds` blocks, committing pooled transactions that are still valid"""
+        with self.lock:
+            for _ in range(rounds):
+                self.round += 1
+                self.timestamp += self.round_seconds
+                block, remaining = [], []
+                for entry in self.pool:
+                    txn = entry["stxn"]["txn"]
+                    if txn.get("lv", 0) < self.round:
+                        self.results[entry["txid"]] = {"pool-error": "transaction expired", "txn": {}}
+                    elif txn.get("fv", 0) > self.round or len(block) >= self.max_block_txns:
+                        remaining.append(entry)
+                    else:
+                        entry["apply"] = self.apply(entry["stxn"], self.round)
+                        block.append(entry)
+                        self.results[entry["txid"]] = {"confirmed-round": self.round, "pool-error": "", **self._apply_json(entry["apply"])}
+                self.pool = remaining
+                self.blocks[self.round] = block
+                self.timestamps[self.round] = self.timestamp
+
+    def warp(self, seconds: int) -> None:
+        """Produce the next block `seconds` after the last one (e.g. to get past a voting period)"""
+        if seconds < 0:
+            raise ValueError("the clock only moves forward")
+        with self.lock:
+            self.timestamp += seconds - self.round_seconds
+            self.advance()
+
+    def apply(self, stxn: dict, rnd: int) -> dict:
+        """Apply data for a committed transaction; the mock only tracks app creation and program updates"""
+        txn = stxn["txn"]
+        if txn.get("type") != "appl":
+            return {}
+        if not txn.get("apid"):
+            app_id = self.next_app_id
+            self.next_app_id += 1
+            self.add_app(app_id, creator=encoding.encode_address(txn["snd"]))
+            params = self.apps[app_id]["params"]
+            params["global-state-schema"] = {"num-uint": txn.get("apgs", {}).get("nui", 0), "num-byte-slice": txn.get("apgs", {}).get("nbs", 0)}
+            params["local-state-schema"] = {"num-uint": txn.get("apls", {}).get("nui", 0), "num-byte-slice": txn.get("apls", {}).get("nbs", 0)}
+            params["extra-program-pages"] = txn.get("apep", 0)
+            self._set_programs(app_id, txn)
+            return {"apid": app_id}
+        if txn.get("apan") == 4 and txn["apid"] in self.apps:  # UpdateApplication
+            self._set_programs(txn["apid"], txn)
+        return {}
+
+    def _set_programs(self, app_id: int, txn: dict) -> None:
+        params = self.apps[app_id]["params"]
+        params["approval-program"] = base64.b64encode(txn.get("apap", b"")).decode()
+        params["clear-state-program"] = base64.b64encode(txn.get("apsu", b"")).decode()
+
+    def simulate_call(self, txn: dict) -> list[bytes]:
+        """Logs of a simulated transaction; raise ValueError to fail it (nothing is modelled here)"""
+        return []
+
+    def simulate_group(self, stxns: list[dict], allow_empty_signatures: bool = False) -> tuple[list[list[bytes]], Optional[tuple[int, str]]]:
+        """Logs of each transaction evaluated and, when one fails, (its index, the reason)"""
+        logs = []
+        for i, stxn in enumerate(stxns):
+            try:
+                if not stxn.get("sig") and not allow_empty_signatures:
+                    raise ValueError("signature missing")
+                logs.append(self.simulate_call(stxn["txn"]))
+            except ValueError as e:
+                return logs, (i, str(e))
+        return logs, None
+
+    @staticmethod
+    def _apply_json(apply: dict) -> dict:
+        result = {}
+        if "apid" in apply:
+            result["application-index"] = apply["apid"]
+        if "caid" in apply:
+            result["asset-index"] = apply["caid"]
+        logs = apply.get("dt", {}).get("lg")
+        if logs:
+            result["logs"] = [base64.b64encode(log).decode() for log in logs]
+        return result
+
+    # ------------------ routing ------------------
+    def handle(self, method: str, target: str, body: bytes) -> tuple[int, str, bytes]:
+        with self.lock:
+            self.requests += 1
+            url = parse.urlsplit(target)
+            self.paths.append(url.path)
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                return self._json({"message": "injected failure"}, self.fail_status)
+            query = dict(parse.parse_qsl(url.query))
+            for route_method, pattern, handler in self._routes:
+                match = pattern.match(url.path)
+                if match and route_method == method:
+                    return handler(query=query, body=body, **match.groupdict())
+            return self._json({"message": f"no route for {method} {url.path}"}, 404)
+
+    @staticmethod
+    def _json(payload, status: int = 200) -> tuple[int, str, bytes]:
+        return status, "application/json", json.dumps(payload).encode()
+
+    # ------------------ endpoints ------------------
+    def _health(self, **_):
+        return self._json({})
+
+    def _status(self, **_):
+        return self._json({"last-round": self.round, "time-since-last-round": 0, "catchup-time": 0})
+
+    def _params(self, **_):
+        return self._json({
+            "consensus-version": "future",
+            "fee": 0,
+            "min-fee": self.min_fee,
+            "genesis-hash": GENESIS_HASH,
+            "genesis-id": GENESIS_ID,
+            "last-round": self.round,
+        })
+
+    def _account(self, address, **_):
+        info = self.accounts.get(address)
+        if info is None:
+            info = {"address": address, "amount": 0}
+        return self._json({**info, "round": self.round})
+
+    def _application(self, app_id, **_):
+        app = self.apps.get(int(app_id))
+        if app is None:
+            return self._json({"message": "application does not exist"}, 404)
+        return self._json(app)
+
+    def _box(self, app_id, query, **_):
+        name = query.get("name", "")
+        raw_name = base64.b64decode(name[4:]) if name.startswith("b64:") else name.encode()
+        value = self.get_box(int(app_id), raw_name)
+        if value is None:
+            return self._json({"message": "box not found"}, 404)
+        return self._json({
+            "name": base64.b64encode(raw_name).decode(),
+            "round": self.round,
+            "value": base64.b64encode(value).decode(),
+        })
+
+    def _boxes(self, app_id, **_):
+        names = [{"name": base64.b64encode(name).decode()} for name in self.box_names(int(app_id))]
+        return self._json({"boxes": names})
+
+    def _send(self, body, **_):
+        unpacker = msgpack.Unpacker(raw=False, strict_map_key=False)
+        unpacker.feed(body)
+        entries = []
+        for stxn in unpacker:
+            txn = stxn.get("txn", {})
+            txid = txid_of(txn)
+            if txid in self.results or any(e["txid"] == txid for e in self.pool):
+                return self._json({"message": f"transaction already in ledger: {txid}"}, 400)
+            if txn.get("lv", 0) < self.round + 1:
+                return self._json({"message": f"txn dead: round {self.round + 1} outside of {txn.get('fv', 0)}--{txn.get('lv', 0)}"}, 400)
+            entries.append({"txid": txid, "stxn": stxn})
+        if not entries:
+            return self._json({"message": "empty transaction group"}, 400)
+        # fees are pooled across a group
+        if sum(e["stxn"]["txn"].get("fee", 0) for e in entries) < self.min_fee * len(entries):
+            return self._json({"message": "group fee below minimum"}, 400)
+        self.pool.extend(entries)
+        return self._json({"txId": entries[0]["txid"]})
+
+    def _simulate(self, body, **_):
+        """Evaluate groups without committing them; `simulate_group` decides the outcome"""
+        self.simulations += 1
+        request = msgpack.unpackb(body, raw=False, strict_map_key=False)
+        groups = []
+        for group in request.get("txn-groups") or []:
+            txns = group.get("txns") or []
+            logs, failure = self.simulate_group(txns, bool(request.get("allow-empty-signatures")))
+            results = [{"txn-result": {"txn": {}, "pool-error": "", "logs": [base64.b64encode(log).decode() for log in txn_logs]}} for txn_logs in logs]
+            # evaluation stops at the failing transaction
+            results += [{"txn-result": {"txn": {}, "pool-error": ""}}] * (len(txns) - len(results))
+            failed = {"failure-message": f"transaction {failure[0]}: {failure[1]}", "failed-at": [failure[0]]} if failure else {}
+            groups.append({"txn-results": results, **failed})
+        overrides = {key: True for key in ("allow-empty-signatures", "allow-unnamed-resources") if request.get(key)}
+        return self._json({"version": 2, "last-round": self.round, "txn-groups": groups, **({"eval-overrides": overrides} if overrides else {})})
+
+    def _pending(self, txid, **_):
+        result = self.results.get(txid)
+        if result is None:
+            if any(e["txid"] == txid for e in self.pool):
+                return self._json({"confirmed-round": 0, "pool-error": "", "txn": {}})
+            return self._json({"message": "txn does not exist"}, 404)
+        return self._json({"txn": {}, **result})
+
+    def _block_txids(self, rnd, **_):
+        block = self._block_entries(int(rnd))
+        if block is None:
+            return self._json({"message": "ledger does not have entry"}, 404)
+        return self._json({"blockTxids": [entry["txid"] for entry in block]})
+
+    def _block_entries(self, rnd: int) -> Optional[list[dict]]:
+        # rounds up to the current one exist (empty when nothing was committed in them)
+        return self.blocks.get(rnd, []) if rnd <= self.round else None
+
+    def _block(self, rnd, query, **_):
+        block = self._block_entries(int(rnd))
+        if block is None:
+            return self._json({"message": "ledger does not have entry"}, 404)
+        payset = [{**entry["stxn"], **entry.get("apply", {})} for entry in block]
+        timestamp = self.block_timestamp(int(rnd))
+        payload = {"block": {"rnd": int(rnd), "ts": timestamp, "txns": payset}}
+        if query.get("format") == "msgpack":
+            return 200, "application/msgpack", msgpack.packb(payload, use_bin_type=True)
+        return self._json({"block": {"rnd": int(rnd), "ts": timestamp, "txids": [entry["txid"] for entry in block]}})
+
+    def block_timestamp(self, rnd: int) -> int:
+        return self.timestamps.get(rnd, self.timestamp - (self.round - rnd) * self.round_seconds)
+
+
+def txid_of(txn: dict) -> str:
+    """Transaction id of a decoded (canonical msgpack) transaction dict"""
+    digest = encoding.checksum(b"TX" + msgpack.packb(txn, use_bin_type=True))
+    return base64.b32encode(digest).decode().strip("=")
+
+
+class MockAlgodServer:
+    """Serves a MockAlgod over HTTP/1.1 (keep-alive) on a background asyncio loop"""
+
+    def __init__(self, ledger: Optional[MockAlgod] = None, host: str = "127.0.0.1", port: int = 0, block_time: Optional[float] = None, wait_timeout: float = 1.0):
+        self.ledger = ledger if ledger is not None else MockAlgod()
+        self.host = host
+        self.port = port
+        self.block_time = block_time
+        self.wait_timeout = wait_timeout
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    @property
+    def address(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "MockAlgodServer":
+        self._thread = threading.Thread(target=self._run, name="mock-algod", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self) -> None:
+        if self.loop is None:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop = None
+
+    def __enter__(self) -> "MockAlgodServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._server = self.loop.run_until_complete(asyncio.start_server(self._serve_connection, self.host, self.port))
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.block_time:
+            self.loop.create_task(self._produce_blocks())
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.run_until_complete(self._server.wait_closed())
+            self.loop.close()
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.ledger.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                if self.ledger.latency:
+                    await asyncio.sleep(self.ledger.latency)
+                status, content_type, payload = await self.dispatch(method, target, body)
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # server shutdown; ending quietly keeps asyncio's stream callback from logging it
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> tuple[int, str, bytes]:
+        match = WAIT_FOR_BLOCK.match(parse.urlsplit(target).path)
+        if method == "GET" and match:
+            # like algod, hold the request until a later round exists (or the wait times out)
+            deadline = self.loop.time() + self.wait_timeout
+            while self.ledger.round <= int(match.group("after")) and self.loop.time() < deadline:
+                await asyncio.sleep(0.002)
+        return self.ledger.handle(method, target, body)
+
+    async def _produce_blocks(self) -> None:
+        while True:
+            await asyncio.sleep(self.block_time)
+            self.ledger.advance()
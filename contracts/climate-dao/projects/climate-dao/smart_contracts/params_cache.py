@@ -0,0 +1,126 @@
+"""
+Cached suggested transaction parameters.
+
+Calling `algod_client.suggested_params()` before every transaction adds a full round-trip to each
+submission. `SuggestedParamsCache` refreshes the parameters once per round from a background
+thread (blocking on `status_after_block`, or sleeping `ttl` seconds when a fixed refresh interval
+is preferred) and hands out copies whose validity window starts at the latest known round:
+
+    params = SuggestedParamsCache(algod_client).start()
+    txn = transaction.PaymentTxn(sender, params.get(), receiver, amount)
+
+Without the background thread, `get()` refreshes lazily once the cached copy is older than `ttl`,
+or than about one block (DEFAULT_TTL) when no `ttl` is given, so fees and the window keep up.
+"""
+
+import copy
+import threading
+import time
+from typing import Optional
+
+from algosdk import transaction
+from algosdk.v2client import algod
+
+MAX_VALIDITY = 1000  # protocol limit on last_valid - first_valid
+DEFAULT_TTL = 3.0  # seconds, about one block: how long get() serves a copy when no thread refreshes it
+
+
+class SuggestedParamsCache:
+    """Per-round cache of SuggestedParams with correct first/last validity windows"""
+
+    def __init__(self, algod_client: algod.AlgodClient, validity: int = MAX_VALIDITY, ttl: Optional[float] = None):
+        if not 0 < validity <= MAX_VALIDITY:
+            raise ValueError(f"validity must be between 1 and {MAX_VALIDITY} rounds")
+        self.algod_client = algod_client
+        self.validity = validity
+        self.ttl = ttl
+        self.refreshes = 0
+        self._params: Optional[transaction.SuggestedParams] = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def round(self) -> int:
+        return self._params.first if self._params is not None else 0
+
+    # ------------------ public ------------------
+    def get(self, validity: Optional[int] = None) -> transaction.SuggestedParams:
+        """Return a private copy valid from the latest known round for `validity` rounds"""
+        validity = validity or self.validity
+        if not 0 < validity <= MAX_VALIDITY:
+            raise ValueError(f"validity must be between 1 and {MAX_VALIDITY} rounds")
+        with self._lock:
+            ttl = self.ttl if self.ttl is not None else DEFAULT_TTL
+            stale = self._params is None or (self._thread is None and time.monotonic() - self._fetched_at > ttl)
+        if stale:
+            self.refresh()
+        with self._lock:
+            params = copy.copy(self._params)
+        params.last = params.first + validity
+        return params
+
+    def refresh(self) -> transaction.SuggestedParams:
+        """Fetch fresh params from algod"""
+        params = self.algod_client.suggested_params()
+        self._store(params)
+        return params
+
+    def observe_round(self, current_round: int) -> None:
+        """Move the validity window forward when a newer round is seen elsewhere (fees are kept)"""
+        with self._lock:
+            if self._params is not None and current_round > self._params.first:
+                self._params.first = current_round
+                self._params.last = current_round + self.validity
+
+    def start(self) -> "SuggestedParamsCache":
+        """Prime the cache and keep it fresh from a daemon thread"""
+        if self._thread is None:
+            self.refresh()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="suggested-params", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self) -> "SuggestedParamsCache":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ------------------ internals ------------------
+    def _store(self, params: transaction.SuggestedParams) -> None:
+        with self._lock:
+            # never move backwards if a slow refresh races with a newer one (or a round seen elsewhere),
+            # but take its fees either way
+            if self._params is not None and params.first < self._params.first:
+                params.first, params.last = self._params.first, self._params.last
+            self._params = params
+            self._fetched_at = time.monotonic()
+            self.refreshes += 1
+
+    def _watch(self) -> None:
+        backoff = 0.5
+        while not self._stop.is_set():
+            try:
+                if self.ttl is not None:
+                    if self._stop.wait(self.ttl):
+                        return
+                else:
+                    # long-polls until the next block is committed
+                    self.algod_client.status_after_block(self.round)
+                if not self._stop.is_set():
+                    self.refresh()
+                backoff = 0.5
+            except Exception:
+                # keep serving the last good params; the window still has room
+                if self._stop.wait(backoff):
+                    return
+                backoff = min(backoff * 2, 10.0)
@@ -0,0 +1,151 @@
+"""
+Batched readonly ABI calls through algod's simulate endpoint.
+
+Calling a readonly method (`get_proposal`, `get_vote_summary`, `get_member_tokens`, ...) costs one
+simulate request per call. `SimulateReader` puts up to a full group (16) of readonly calls, to any
+of our apps, into one simulate request with empty signatures and unnamed resources allowed, then
+hands each caller its own decoded return value:
+
+    reader = SimulateReader(algod_client)
+    proposals = reader.read_many([(voting, "get_proposal", [pid]) for pid in range(1, 41)])  # 3 requests
+
+Under concurrent load the async `read` coalesces calls on its own: a call waits at most `linger`
+seconds for others to join its batch, and a full batch goes out at once.
+
+    async def show(pid):
+        summary = await reader.read(voting, "get_vote_summary", [pid])
+
+Identical calls in one batch share a slot. A call that fails (e.g. `get_proposal` of an unknown
+id) fails alone: simulate stops at the failing transaction, which is taken out and the rest of the
+batch simulated again. Nothing is signed or committed; the sender (the app client's sender when it
+has one) only has to be able to cover the minimum fees.
+"""
+
+import asyncio
+import copy
+from typing import Any, Optional, Sequence
+
+from algosdk import constants
+from algosdk.atomic_transaction_composer import AtomicTransactionComposer, EmptySigner
+from algosdk.v2client import algod
+from algosdk.v2client.models import SimulateRequest
+
+from smart_contracts.climate_dao.client import MAX_GROUP_SIZE, ZERO_ADDRESS, AppClient
+from smart_contracts.params_cache import SuggestedParamsCache
+
+ReadCall = tuple[AppClient, str, Sequence[Any]]  # (client, readonly method name, args)
+
+
+class ReadError(Exception):
+    """A readonly call that failed in simulation"""
+
+
+class SimulateReader:
+    """Coalesces readonly ABI calls into simulate requests of up to one group each"""
+
+    def __init__(self, algod_client: algod.AlgodClient, sender: str = ZERO_ADDRESS, max_batch: int = MAX_GROUP_SIZE, linger: float = 0.002, params: Optional[SuggestedParamsCache] = None):
+        if not 0 < max_batch <= MAX_GROUP_SIZE:
+            raise ValueError(f"max_batch must be between 1 and {MAX_GROUP_SIZE}")
+        self.algod_client = algod_client
+        self.sender = sender
+        self.max_batch = max_batch
+        self.linger = linger
+        self.params = params if params is not None else SuggestedParamsCache(algod_client, ttl=1.0)
+        self.stats = {"reads": 0, "simulations": 0, "coalesced": 0}
+        self._queue: list[tuple[ReadCall, asyncio.Future]] = []
+        self._flusher: Optional[asyncio.TimerHandle] = None
+
+    # ------------------ sync ------------------
+    def read_many(self, calls: Sequence[ReadCall], return_exceptions: bool = False) -> list[Any]:
+        """Return values of `calls` in order, `max_batch` calls per simulate request"""
+        results: list[Any] = []
+        for start in range(0, len(calls), self.max_batch):
+            results += self._simulate(calls[start:start + self.max_batch])
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, ReadError):
+                    raise result
+        return results
+
+    def read_one(self, client: AppClient, name: str, args: Sequence[Any]) -> Any:
+        return self.read_many([(client, name, args)])[0]
+
+    # ------------------ async ------------------
+    async def read(self, client: AppClient, name: str, args: Sequence[Any]) -> Any:
+        """Return value of one readonly call, batched with the calls made around it"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append(((client, name, args), future))
+        if len(self._queue) >= self.max_batch:
+            self._flush()
+        elif self._flusher is None:
+            self._flusher = asyncio.get_running_loop().call_later(self.linger, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        while self._queue:
+            batch, self._queue = self._queue[:self.max_batch], self._queue[self.max_batch:]
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: list[tuple[ReadCall, asyncio.Future]]) -> None:
+        try:
+            results = await asyncio.to_thread(self._simulate, [call for call, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    # ------------------ simulate ------------------
+    def _simulate(self, calls: Sequence[ReadCall]) -> list[Any]:
+        """Return values (or ReadErrors) of at most one group of calls"""
+        self.stats["reads"] += len(calls)
+        slots: dict[tuple, int] = {}
+        unique: list[ReadCall] = []
+        positions = []
+        for client, name, args in calls:
+            method = client.method(name)
+            key = (client.app_id, name, tuple(arg.type.encode(value) for arg, value in zip(method.args, args)))
+            if key not in slots:
+                slots[key] = len(unique)
+                unique.append((client, name, args))
+            positions.append(slots[key])
+        self.stats["coalesced"] += len(calls) - len(unique)
+
+        values: list[Any] = [None] * len(unique)
+        todo = list(range(len(unique)))
+        while todo:
+            response = self._simulate_group([unique[i] for i in todo])
+            self.stats["simulations"] += 1
+            if not response.failure_message:
+                for i, result in zip(todo, response.abi_results):
+                    values[i] = ReadError(str(result.decode_error)) if result.decode_error else result.return_value
+                break
+            failed = todo[(response.failed_at or [0])[0]]
+            values[failed] = ReadError(f"{unique[failed][1]} failed: {response.failure_message}")
+            todo.remove(failed)
+        return [values[i] for i in positions]
+
+    def _simulate_group(self, calls: list[ReadCall]):
+        sp = copy.copy(self.params.get())
+        sp.flat_fee = True
+        sp.fee = max(sp.min_fee or 0, constants.MIN_TXN_FEE)
+        atc = AtomicTransactionComposer()
+        signer = EmptySigner()
+        for client, name, args in calls:
+            atc.add_method_call(
+                app_id=client.app_id,
+                method=client.method(name),
+                sender=client.sender or self.sender,
+                sp=sp,
+                signer=signer,
+                method_args=list(args),
+            )
+        request = SimulateRequest(txn_groups=[], allow_empty_signatures=True, allow_unnamed_resources=True)
+        return atc.simulate(self.algod_client, request)
@@ -0,0 +1,114 @@
+"""
+Multi-process ed25519 signing for bulk operations.
+
+`txn.sign(private_key)` decodes the key and signs on the calling core, one transaction at a time,
+so a mass `register_member` or an airdrop is bound by one core's signing rate. `SigningPool`
+spreads batches over worker processes instead. Each worker receives the keys once, when it starts,
+and keeps the ed25519 signing keys for its lifetime; mnemonics are converted once, in the parent.
+Results come back as canonical signed bytes, in input order:
+
+    with SigningPool.from_mnemonics([os.environ["DEPLOYER_MNEMONIC"]]) as pool:
+        signed = pool.sign(txns)                      # list of signed msgpack bytes
+        algod_client.send_raw_transaction(base64.b64encode(b"".join(signed)))
+
+`pool.signer()` is a TransactionSigner, so composed groups can be signed through the pool
+too, and `sign_bodies` takes already-encoded bodies (e.g. from climate_dao/templates.py) without
+re-encoding them.
+"""
+
+import base64
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional, Sequence
+
+from algosdk import account, constants, encoding, mnemonic, transaction
+from algosdk.atomic_transaction_composer import TransactionSigner
+
+from smart_contracts.climate_dao.templates import signed_envelope
+
+DEFAULT_CHUNK = 256  # max transactions per task: large enough to amortize the IPC round-trip
+
+_keys: dict[str, object] = {}  # worker-local: address -> nacl SigningKey
+
+
+def _load_keys(seeds: dict[str, bytes]) -> None:
+    from nacl.signing import SigningKey
+
+    _keys.clear()
+    _keys.update({address: SigningKey(seed) for address, seed in seeds.items()})
+
+
+def _sign_chunk(chunk: list[tuple[str, bytes]]) -> list[bytes]:
+    signed = []
+    for address, body in chunk:
+        signed.append(signed_envelope(_keys[address].sign(constants.txid_prefix + body).signature, body))
+    return signed
+
+
+class SigningPool:
+    """Process pool holding a set of signing keys, signing batches in parallel"""
+
+    def __init__(self, private_keys: Iterable[str], processes: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK, mp_context: Optional[str] = None):
+        seeds = {}
+        for private_key in private_keys:
+            seeds[account.address_from_private_key(private_key)] = base64.b64decode(private_key)[:constants.key_len_bytes]
+        if not seeds:
+            raise ValueError("at least one key is required")
+        self.addresses = set(seeds)
+        self.chunk_size = chunk_size
+        self.processes = processes or os.cpu_count() or 1
+        context = multiprocessing.get_context(mp_context) if mp_context else None
+        self._executor = ProcessPoolExecutor(self.processes, mp_context=context, initializer=_load_keys, initargs=(seeds,))
+
+    @classmethod
+    def from_mnemonics(cls, mnemonics: Iterable[str], **kwargs) -> "SigningPool":
+        return cls([mnemonic.to_private_key(words) for words in mnemonics], **kwargs)
+
+    # ------------------ signing ------------------
+    def sign_bodies(self, bodies: Sequence[tuple[str, bytes]]) -> list[bytes]:
+        """Signed bytes for (signer address, canonical unsigned transaction bytes) pairs, in order"""
+        unknown = {address for address, _ in bodies} - self.addresses
+        if unknown:
+            raise ValueError(f"no key for {', '.join(sorted(unknown))}")
+        # every worker gets a share of small batches too
+        size = max(1, min(self.chunk_size, math.ceil(len(bodies) / self.processes)))
+        chunks = [list(bodies[i:i + size]) for i in range(0, len(bodies), size)]
+        signed: list[bytes] = []
+        for result in self._executor.map(_sign_chunk, chunks):
+            signed += result
+        return signed
+
+    def sign(self, txns: Sequence[transaction.Transaction]) -> list[bytes]:
+        """Signed bytes of each transaction, signed with its sender's key, in order"""
+        return self.sign_bodies([(txn.sender, _body(txn)) for txn in txns])
+
+    def signer(self) -> "PoolSigner":
+        return PoolSigner(self)
+
+    # ------------------ lifecycle ------------------
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self) -> "SigningPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class PoolSigner(TransactionSigner):
+    """TransactionSigner backed by a SigningPool; each transaction is signed with its sender's key"""
+
+    def __init__(self, pool: SigningPool):
+        super().__init__()
+        self.pool = pool
+
+    def sign_transactions(self, txn_group: list[transaction.Transaction], indexes: list[int]) -> list[transaction.SignedTransaction]:
+        signed = self.pool.sign_bodies([(txn_group[i].sender, _body(txn_group[i])) for i in indexes])
+        return [encoding.msgpack_decode(base64.b64encode(raw).decode()) for raw in signed]
+
+
+def _body(txn: transaction.Transaction) -> bytes:
+    return base64.b64decode(encoding.msgpack_encode(txn))
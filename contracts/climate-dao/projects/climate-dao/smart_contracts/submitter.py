@@ -0,0 +1,238 @@
+"""
+Pipelined transaction submission with per-round confirmation tracking.
+
+`transaction.wait_for_confirmation` polls `pending_transaction_info` in a loop for each txid.
+`TransactionSubmitter` instead:
+ - accepts signed transactions or atomic groups and sends them with at most `max_in_flight`
+   groups awaiting confirmation at any time (`submit` waits for a free slot, giving backpressure)
+ - runs one watcher task that blocks on `status_after_block`, and for every new round reads the
+   block's txid list once, resolving the future of each of our txids found in it
+ - fetches the block body only for rounds that confirmed one of our transactions, to fill in
+   apply data (created app/asset ids and logs) without a per-txid request
+ - fails the futures of transactions whose last valid round passes unconfirmed
+
+Results mirror the fields of `pending_transaction_info` that callers rely on
+("confirmed-round", "application-index", "asset-index", "logs").
+
+    async with TransactionSubmitter(algod_client) as submitter:
+        futures = [await submitter.submit(stxn) for stxn in signed_txns]
+        results = await asyncio.gather(*futures)
+"""
+
+import asyncio
+import base64
+from dataclasses import dataclass
+from typing import AsyncIterable, Callable, Iterable, Optional, Union
+
+import msgpack
+from algosdk.v2client import algod
+
+SignedTxn = object  # SignedTransaction, LogicSigTransaction or MultisigTransaction
+Callback = Callable[[str, Optional[dict], Optional[BaseException]], None]
+
+
+class TransactionExpiredError(Exception):
+    """The transaction's validity window passed before it was seen in a block"""
+
+
+@dataclass
+class _Pending:
+    future: asyncio.Future
+    first_valid: int
+    last_valid: int
+    callback: Optional[Callback] = None
+
+
+class TransactionSubmitter:
+    """Bounded-concurrency submitter confirming transactions once per round"""
+
+    def __init__(self, algod_client: algod.AlgodClient, max_in_flight: int = 64, fetch_apply_data: bool = True):
+        self.algod_client = algod_client
+        self.max_in_flight = max_in_flight
+        self.fetch_apply_data = fetch_apply_data
+        self.round = 0
+        self.stats = {"submitted": 0, "confirmed": 0, "failed": 0, "rounds_watched": 0}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending: dict[str, _Pending] = {}
+        self._watcher: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    # ------------------ lifecycle ------------------
+    async def start(self) -> "TransactionSubmitter":
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._wakeup = asyncio.Event()
+        status = await asyncio.to_thread(self.algod_client.status)
+        self.round = status["last-round"]
+        self._watcher = asyncio.create_task(self._watch())
+        return self
+
+    async def stop(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            await asyncio.gather(self._watcher, return_exceptions=True)
+            self._watcher = None
+        for txid, pending in list(self._pending.items()):
+            self._resolve(txid, None, asyncio.CancelledError("submitter stopped"))
+
+    async def __aenter__(self) -> "TransactionSubmitter":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def drain(self) -> None:
+        """Wait until every submitted transaction is confirmed or failed"""
+        futures = [p.future for p in self._pending.values()]
+        if futures:
+            await asyncio.gather(*futures, return_exceptions=True)
+
+    # ------------------ submission ------------------
+    async def submit(self, txns: Union[SignedTxn, list], callback: Optional[Callback] = None) -> asyncio.Future:
+        """Send one signed transaction or group; returns a future for the group's first txid
+
+        Futures for every txid of the group are available through `future_for(txid)`. Submitting a
+        group that is still pending returns the future it already has, without sending it again.
+        """
+        group = list(txns) if isinstance(txns, (list, tuple)) else [txns]
+        txids = [stxn.get_txid() for stxn in group]
+        existing = self._existing(txids)
+        if existing is not None:
+            return existing
+        await self._slots.acquire()
+        existing = self._existing(txids)  # submitted by another task while we waited for a slot
+        if existing is not None:
+            self._slots.release()
+            return existing
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in group]
+        for txid, future, stxn in zip(txids, futures, group):
+            txn = stxn.transaction
+            self._pending[txid] = _Pending(future, txn.first_valid_round, txn.last_valid_round, callback)
+        # the slot is held until the whole group settles (groups confirm or fail atomically)
+        futures[-1].add_done_callback(lambda _: self._slots.release())
+
+        try:
+            await asyncio.to_thread(self._send, group)
+        except BaseException as e:
+            # rejected, connection lost, timed out or cancelled: the whole group settles with it
+            for txid in txids:
+                self._resolve(txid, None, e)
+            if not isinstance(e, Exception):
+                raise
+        else:
+            self.stats["submitted"] += len(group)
+            self._wakeup.set()
+        return futures[0]
+
+    def _existing(self, txids: list[str]) -> Optional[asyncio.Future]:
+        pending = [txid for txid in txids if txid in self._pending]
+        if not pending:
+            return None
+        if pending != txids:
+            raise ValueError(f"transactions {pending} are already pending in another group")
+        return self._pending[txids[0]].future
+
+    def _send(self, group: list) -> None:
+        raw = [getattr(stxn, "signed_bytes", None) for stxn in group]
+        if all(raw):
+            # pre-encoded transactions (templates.EncodedTxn) go out as they are
+            self.algod_client.send_raw_transaction(base64.b64encode(b"".join(raw)))
+        else:
+            self.algod_client.send_transactions(group)
+
+    def future_for(self, txid: str) -> asyncio.Future:
+        return self._pending[txid].future
+
+    async def submit_all(self, stream: Union[Iterable, AsyncIterable], callback: Optional[Callback] = None) -> list:
+        """Submit every item of a (possibly async) stream and wait for all confirmations"""
+        futures = []
+        if hasattr(stream, "__aiter__"):
+            async for item in stream:
+                futures.append(await self.submit(item, callback))
+        else:
+            for item in stream:
+                futures.append(await self.submit(item, callback))
+        return await asyncio.gather(*futures, return_exceptions=True)
+
+    # ------------------ confirmation ------------------
+    def _resolve(self, txid: str, result: Optional[dict], exc: Optional[BaseException]) -> None:
+        pending = self._pending.pop(txid, None)
+        if pending is None or pending.future.done():
+            return
+        if exc is not None:
+            pending.future.set_exception(exc)
+            self.stats["failed"] += 1
+        else:
+            pending.future.set_result(result)
+            self.stats["confirmed"] += 1
+        if pending.callback is not None:
+            pending.callback(txid, result, exc)
+
+    async def _watch(self) -> None:
+        while True:
+            if not self._pending:
+                # nothing to confirm; sleep until the next submission
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                # rounds before the earliest first-valid round cannot hold our transactions
+                if self._pending:
+                    earliest = min(p.first_valid for p in self._pending.values())
+                    self.round = max(self.round, earliest - 1)
+            try:
+                status = await asyncio.to_thread(self.algod_client.status_after_block, self.round)
+                last_round = status["last-round"]
+                for rnd in range(self.round + 1, last_round + 1):
+                    await self._process_round(rnd)
+                    self.round = rnd
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # transient algod failures: the next status_after_block call picks up where we left
+                await asyncio.sleep(0.5)
+
+    async def _process_round(self, rnd: int) -> None:
+        self.stats["rounds_watched"] += 1
+        response = await asyncio.to_thread(self.algod_client.get_block_txids, rnd)
+        block_txids = response.get("blockTxids") or []
+        ours = [(index, txid) for index, txid in enumerate(block_txids) if txid in self._pending]
+
+        apply_data = {}
+        if ours and self.fetch_apply_data:
+            raw = await asyncio.to_thread(self.algod_client.block_info, rnd, "msgpack")
+            payset = msgpack.unpackb(raw, raw=False, strict_map_key=False)["block"].get("txns", [])
+            apply_data = {txid: payset[index] for index, txid in ours if index < len(payset)}
+
+        for _, txid in ours:
+            result = {"txid": txid, "confirmed-round": rnd, "pool-error": ""}
+            result.update(_apply_fields(apply_data.get(txid, {})))
+            self._resolve(txid, result, None)
+
+        for txid, pending in list(self._pending.items()):
+            if pending.last_valid < rnd:
+                self._resolve(txid, None, TransactionExpiredError(f"{txid} not confirmed by round {pending.last_valid}"))
+
+
+def _apply_fields(entry: dict) -> dict:
+    fields = {}
+    if entry.get("apid"):
+        fields["application-index"] = entry["apid"]
+    if entry.get("caid"):
+        fields["asset-index"] = entry["caid"]
+    logs = entry.get("dt", {}).get("lg")
+    if logs:
+        fields["logs"] = [base64.b64encode(log if isinstance(log, bytes) else log.encode()).decode() for log in logs]
+    return fields
+
+
+def submit_and_confirm(algod_client: algod.AlgodClient, groups: Iterable, max_in_flight: int = 64) -> list:
+    """Blocking helper for scripts: submit every group and return the confirmation results"""
+
+    async def run():
+        async with TransactionSubmitter(algod_client, max_in_flight) as submitter:
+            return await submitter.submit_all(groups)
+
+    results = asyncio.run(run())
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
@@ -0,0 +1,304 @@
+"""
+Shared HTTP transport for algod and indexer clients.
+
+algosdk opens a fresh urllib connection (and TLS handshake) for every call. The clients here
+keep the same algosdk API but route requests through `HTTPTransport`, which provides:
+ - persistent keep-alive connections, reused across calls and threads
+ - bounded concurrency (at most `max_connections` requests on the wire at once)
+ - exponential-backoff retries with jitter for connection errors, 429 and 5xx responses; requests
+   that are not idempotent (POST /v2/transactions, ...) are only retried when they provably never
+   reached the server, i.e. the connection could not be opened
+ - coalescing of identical in-flight GETs, so N threads asking for `/v2/status` cost one request
+ - a timeout on every request
+
+Use `get_algod_client()` / `get_indexer_client()` to share one pooled client per process.
+"""
+
+import http.client
+import json
+import os
+import random
+import select
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib import parse
+
+from algosdk import constants, error
+from algosdk.v2client import algod, indexer
+
+DEFAULT_ALGOD_SERVER = "https://testnet-api.algonode.cloud"
+DEFAULT_INDEXER_SERVER = "https://testnet-idx.algonode.cloud"
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class RequestNotSent(ConnectionError):
+    """The connection could not be opened, so no byte of the request reached the server"""
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff: backoff * 2**attempt seconds, capped, with 50-100% jitter"""
+    attempts: int = 5
+    backoff: float = 0.1
+    max_backoff: float = 5.0
+    retry_statuses: tuple = (429, 500, 502, 503, 504)
+
+    def delay(self, attempt: int) -> float:
+        return min(self.max_backoff, self.backoff * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
+@dataclass
+class Response:
+    status: int
+    body: bytes
+    headers: dict = field(default_factory=dict)
+
+
+class HTTPTransport:
+    """Keep-alive connection pool for a single base URL"""
+
+    def __init__(self, base_url: str, max_connections: int = 8, timeout: float = 30, retry: Optional[RetryPolicy] = None):
+        url = parse.urlsplit(base_url)
+        self.scheme = url.scheme or "http"
+        self.host = url.hostname or "localhost"
+        self.port = url.port
+        self.base_path = url.path.rstrip("/")
+        self.timeout = timeout
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.max_connections = max_connections
+
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._idle: list[http.client.HTTPConnection] = []
+        self._idle_lock = threading.Lock()
+        self._inflight: dict[tuple, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "coalesced": 0, "connections_opened": 0}
+
+    # ------------------ public ------------------
+    def request(self, method: str, path: str, headers: Optional[dict] = None, body: Optional[bytes] = None, timeout: Optional[float] = None) -> Response:
+        headers = headers or {}
+        if method != "GET" or body:
+            return self._request_with_retry(method, path, headers, body, timeout)
+
+        key = (path, tuple(sorted(headers.items())))
+        with self._inflight_lock:
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = Future()
+                self._inflight[key] = pending
+        if not owner:
+            self._count("coalesced")
+            return pending.result()
+
+        try:
+            response = self._request_with_retry(method, path, headers, body, timeout)
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        else:
+            pending.set_result(response)
+            return response
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def close(self) -> None:
+        with self._idle_lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    # ------------------ internals ------------------
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _request_with_retry(self, method, path, headers, body, timeout) -> Response:
+        idempotent = method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            try:
+                response = self._send(method, path, headers, body, timeout)
+            except (OSError, http.client.HTTPException) as e:
+                # a POST that may have reached the server is never sent twice
+                if attempt + 1 >= self.retry.attempts or not (idempotent or isinstance(e, RequestNotSent)):
+                    raise
+            else:
+                if not idempotent or response.status not in self.retry.retry_statuses or attempt + 1 >= self.retry.attempts:
+                    return response
+            self._count("retries")
+            time.sleep(self.retry.delay(attempt))
+            attempt += 1
+
+    def _send(self, method, path, headers, body, timeout) -> Response:
+        with self._slots:
+            self._count("requests")
+            conn, reused = self._checkout(timeout)
+            try:
+                return self._roundtrip(conn, method, path, headers, body)
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                if not reused or method not in IDEMPOTENT_METHODS:
+                    raise
+            # the server dropped an idle keep-alive connection; retry once on a fresh one
+            conn, _ = self._checkout(timeout, fresh=True)
+            try:
+                return self._roundtrip(conn, method, path, headers, body)
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                raise
+
+    def _roundtrip(self, conn, method, path, headers, body) -> Response:
+        if conn.sock is None:
+            try:
+                conn.connect()
+            except OSError as e:
+                raise RequestNotSent(f"could not connect to {self.host}: {e}") from e
+        conn.request(method, self.base_path + path, body=body, headers=headers)
+        resp = conn.getresponse()
+        data = resp.read()
+        response = Response(resp.status, data, dict(resp.getheaders()))
+        if resp.will_close:
+            conn.close()
+        else:
+            with self._idle_lock:
+                self._idle.append(conn)
+        return response
+
+    def _checkout(self, timeout, fresh: bool = False) -> tuple[http.client.HTTPConnection, bool]:
+        if not fresh:
+            with self._idle_lock:
+                while self._idle:
+                    conn = self._idle.pop()
+                    if _dropped(conn):
+                        conn.close()
+                        continue
+                    conn.timeout = timeout or self.timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(conn.timeout)
+                    return conn, True
+        conn_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        self._count("connections_opened")
+        return conn_class(self.host, self.port, timeout=timeout or self.timeout), False
+
+
+def _dropped(conn: http.client.HTTPConnection) -> bool:
+    """True if the server closed an idle keep-alive connection (it reads as ready, at EOF)"""
+    if conn.sock is None:
+        return True
+    try:
+        return bool(select.select([conn.sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+
+def _build_url(requrl: str, params) -> str:
+    if requrl not in constants.unversioned_paths:
+        requrl = algod.api_version_path_prefix + requrl
+    if params:
+        requrl = requrl + "?" + parse.urlencode(params)
+    return requrl
+
+
+def _error_message(body: bytes) -> tuple[str, dict]:
+    try:
+        payload = json.loads(body)
+        return payload.get("message", body.decode("utf-8", errors="replace")), payload
+    except ValueError:
+        return body.decode("utf-8", errors="replace"), {}
+
+
+# -----------------------------
+# algosdk clients on top of the transport
+# -----------------------------
+class PooledAlgodClient(algod.AlgodClient):
+    """AlgodClient whose requests go through a shared HTTPTransport"""
+
+    def __init__(self, algod_token: str, algod_address: str, headers: Optional[dict] = None, transport: Optional[HTTPTransport] = None, **transport_options):
+        super().__init__(algod_token, algod_address, headers)
+        self.transport = transport if transport is not None else HTTPTransport(algod_address, **transport_options)
+
+    def algod_request(self, method, requrl, params=None, data=None, headers=None, response_format="json", timeout=30):
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header.update({constants.algod_auth_header: self.algod_token})
+
+        resp = self.transport.request(method, _build_url(requrl, params), header, data, timeout)
+        if resp.status >= 400:
+            message, payload = _error_message(resp.body)
+            raise error.AlgodHTTPError(message, resp.status, payload.get("data"))
+        if response_format != "json":
+            return resp.body
+        if not resp.body:
+            return {}
+        try:
+            return json.loads(resp.body)
+        except ValueError as e:
+            raise error.AlgodResponseError("Failed to parse JSON response from algod") from e
+
+
+class PooledIndexerClient(indexer.IndexerClient):
+    """IndexerClient whose requests go through a shared HTTPTransport"""
+
+    def __init__(self, indexer_token: str, indexer_address: str, headers: Optional[dict] = None, transport: Optional[HTTPTransport] = None, **transport_options):
+        super().__init__(indexer_token, indexer_address, headers)
+        self.transport = transport if transport is not None else HTTPTransport(indexer_address, **transport_options)
+
+    def indexer_request(self, method, requrl, params=None, data=None, headers=None, timeout=30):
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth and self.indexer_token:
+            header.update({constants.indexer_auth_header: self.indexer_token})
+
+        resp = self.transport.request(method, _build_url(requrl, params), header, data, timeout)
+        if resp.status >= 400:
+            message, _ = _error_message(resp.body)
+            raise error.IndexerHTTPError(message)
+        return json.loads(resp.body)
+
+
+# -----------------------------
+# Process-wide shared clients
+# -----------------------------
+_clients: dict[tuple, object] = {}
+_clients_lock = threading.Lock()
+
+
+def _server_from_env(prefix: str, default: str) -> str:
+    server = os.getenv(f"{prefix}_SERVER", default)
+    port = os.getenv(f"{prefix}_PORT")
+    return f"{server}:{port}" if port else server
+
+
+def get_algod_client(address: Optional[str] = None, token: Optional[str] = None, **transport_options) -> PooledAlgodClient:
+    """Shared algod client; defaults come from ALGOD_SERVER/ALGOD_PORT/ALGOD_TOKEN (TestNet otherwise)"""
+    address = address or _server_from_env("ALGOD", DEFAULT_ALGOD_SERVER)
+    token = token if token is not None else os.getenv("ALGOD_TOKEN", "")
+    key = ("algod", address, token)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = PooledAlgodClient(token, address, headers={"User-Agent": "AlgoKit"}, **transport_options)
+        return _clients[key]
+
+
+def get_indexer_client(address: Optional[str] = None, token: Optional[str] = None, **transport_options) -> PooledIndexerClient:
+    """Shared indexer client; defaults come from INDEXER_SERVER/INDEXER_PORT/INDEXER_TOKEN"""
+    address = address or _server_from_env("INDEXER", DEFAULT_INDEXER_SERVER)
+    token = token if token is not None else os.getenv("INDEXER_TOKEN", "")
+    key = ("indexer", address, token)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = PooledIndexerClient(token, address, **transport_options)
+        return _clients[key]
@@ -0,0 +1,159 @@
+"""
+Memory and query cost of the columnar read model against per-row dicts
+Builds the same ballots (voter records) and proposals as a list of dicts, the shape of
+`memory_usage_test` in load_test.py, and as smart_contracts/columnar.py tables. It then reports
+bytes per record (traced with tracemalloc) and the time of a few dashboard queries on each.
+No network required.
+
+    python test/performance/columnar_benchmark.py                     # 1,000,000 ballots
+    python test/performance/columnar_benchmark.py --ballots 200000 --voters 5000
+"""
+
+import argparse
+import gc
+import hashlib
+import heapq
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algosdk import encoding
+
+from smart_contracts.climate_dao.client import Proposal, VoteSummary
+from smart_contracts.columnar import BallotTable, ProposalTable, StringTable
+
+CATEGORIES = ["renewable", "reforestation", "transport"]
+
+
+def ballot_fields(count, voters, proposals):
+    """Deterministic ballots: (proposal_id, voter address bytes, choice, power, round)"""
+    for i in range(count):
+        mixed = (i * 2654435761) & 0xFFFFFFFF
+        yield mixed % proposals + 1, voters[mixed % len(voters)], mixed % 3, mixed % 1_000_000_007 + 1, 1000 + i // 1000
+
+
+def traced(build):
+    """(result, bytes allocated while building it)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def build_ballot_dicts(options, voters):
+    # a fresh string per row, as decoding each event or API response gives
+    return [
+        {"proposal_id": pid, "voter": voter.decode(), "choice": choice, "power": power, "round": rnd}
+        for pid, voter, choice, power, rnd in ballot_fields(options.ballots, voters, options.proposals)
+    ]
+
+
+def build_ballot_table(options, voters):
+    table = BallotTable()
+    for pid, voter, choice, power, rnd in ballot_fields(options.ballots, voters, options.proposals):
+        table.add(pid, voter.decode(), choice, power, rnd)
+    return table
+
+
+def dict_queries(rows):
+    selected = [row for row in rows if row["proposal_id"] == 7 and row["power"] >= 500_000_000]
+    top = heapq.nlargest(10, rows, key=lambda row: row["power"])
+    tallies = {}
+    for row in rows:
+        tally = tallies.setdefault(row["proposal_id"], [0, 0, 0])
+        tally[(2, 0, 1)[row["choice"]]] += row["power"]
+    return len(selected), [row["power"] for row in top], tallies
+
+
+def table_queries(table):
+    selected = table.where("power", ">=", 500_000_000, table.where("proposal_id", "==", 7))
+    top = table.order_by("power", descending=True, limit=10)
+    tallies = table.tallies()
+    return len(selected), [table.get(row, "power") for row in top], {pid: list(tally) for pid, tally in tallies.items()}
+
+
+def description(j):
+    """A distinct 1 KB description per proposal (a constant would be shared by every dict)"""
+    return f"{j:08d}" + "A" * 992
+
+
+def proposal_benchmark(count, voters):
+    def as_dicts():
+        return [
+            {
+                "id": j,
+                "title": f"Proposal {j}",
+                "description": description(j),
+                "funding": j * 1000,
+                "proposer": voters[j % len(voters)].decode(),
+                "creation_time": 1_700_000_000 + j,
+                "end_time": 1_700_604_800 + j,
+                "status": j % 4,
+                "yes_votes": j * 10,
+                "no_votes": j,
+                "abstain_votes": 0,
+                "total_voters": j % 50,
+                "total_voting_power": j * 11,
+                "category": CATEGORIES[j % 3],
+            }
+            for j in range(1, count + 1)
+        ]
+
+    def as_table():
+        table = ProposalTable(StringTable())
+        for j in range(1, count + 1):
+            proposal = Proposal(f"Proposal {j}", description(j), j * 1000, voters[j % len(voters)].decode(), 1_700_000_000 + j, 1_700_604_800 + j, j % 4)
+            table.upsert(j, proposal, VoteSummary(j * 10, j, 0, j % 50, j * 11))
+        return table
+
+    _, dict_bytes = traced(as_dicts)
+    _, table_bytes = traced(as_table)
+    print(f"\n{count:,} proposals with 1 KB descriptions")
+    print(f"   dicts     {dict_bytes / count:10,.1f} bytes/proposal")
+    print(f"   columnar  {table_bytes / count:10,.1f} bytes/proposal  ({dict_bytes / table_bytes:.1f}x smaller)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ballots", type=int, default=1_000_000, help="voter records")
+    parser.add_argument("--voters", type=int, default=20_000, help="distinct voter addresses")
+    parser.add_argument("--proposals", type=int, default=500, help="proposals the ballots are spread over")
+    parser.add_argument("--proposal-rows", type=int, default=10_000, help="rows for the proposal comparison")
+    options = parser.parse_args()
+
+    voters = [encoding.encode_address(hashlib.sha256(i.to_bytes(8, "big")).digest()).encode() for i in range(options.voters)]
+    count = options.ballots
+    print(f"{count:,} voter records ({options.voters:,} voters, {options.proposals} proposals)")
+
+    (rows, dict_bytes), dict_build = timed(lambda: traced(lambda: build_ballot_dicts(options, voters)))
+    dict_result, dict_query = timed(lambda: dict_queries(rows))
+    del rows
+    (table, table_bytes), table_build = timed(lambda: traced(lambda: build_ballot_table(options, voters)))
+    table_result, table_query = timed(lambda: table_queries(table))
+    assert dict_result == table_result, "columnar queries disagree with the dict rows"
+
+    print(f"{'':<10} {'bytes/record':>14} {'total MB':>10} {'queries':>10}")
+    print(f"{'dicts':<10} {dict_bytes / count:14,.1f} {dict_bytes / 2**20:10,.1f} {dict_query:9.3f}s")
+    print(f"{'columnar':<10} {table_bytes / count:14,.1f} {table_bytes / 2**20:10,.1f} {table_query:9.3f}s")
+    print(f"columnar is {dict_bytes / table_bytes:.1f}x smaller ({table.nbytes() / count:.1f} bytes/record by nbytes())")
+    print(f"build time (traced): dicts {dict_build:.2f}s, columnar {table_build:.2f}s")
+
+    proposal_benchmark(options.proposal_rows, voters)
+
+
+if __name__ == "__main__":
+    main()
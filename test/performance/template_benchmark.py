@@ -0,0 +1,100 @@
+"""
+Transaction build-and-sign throughput for vote ballots
+Compares, on one core, the AtomicTransactionComposer path, plain algosdk transaction objects and the
+pre-encoded templates in smart_contracts/climate_dao/templates.py, then template bodies signed
+across cores by smart_contracts/signing.py. No network required.
+
+    python test/performance/template_benchmark.py            # 5000 ballots per path
+    python test/performance/template_benchmark.py --count 20000 --processes 8
+"""
+
+import argparse
+import base64
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algosdk import account, encoding, transaction
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from smart_contracts.climate_dao.client import VotingSystemClient
+from smart_contracts.climate_dao.templates import MethodTemplate, signing_key, vote_boxes
+from smart_contracts.signing import SigningPool
+
+APP_ID = 1001
+GENESIS_HASH = base64.b64encode(b"climate-dao-mocknet-genesis-hash").decode()
+
+
+def composer_path(client, sp, ballots):
+    """What callers do today: one composer per ballot"""
+    out = []
+    for pid, power in ballots:
+        atc = client.compose("vote", [pid, 1, power], sp=sp, boxes=vote_boxes(client.sender, [pid]))
+        out += [base64.b64decode(encoding.msgpack_encode(stxn)) for stxn in atc.gather_signatures()]
+    return out
+
+
+def object_path(client, sp, ballots, private_key):
+    """Transaction objects built by hand, signed with txn.sign(private_key)"""
+    method = client.method("vote")
+    selector = method.get_selector()
+    out = []
+    for pid, power in ballots:
+        args = [selector] + [arg.type.encode(value) for arg, value in zip(method.args, [pid, 1, power])]
+        boxes = [(APP_ID, name) for name in vote_boxes(client.sender, [pid])]
+        txn = transaction.ApplicationCallTxn(client.sender, sp, APP_ID, transaction.OnComplete.NoOpOC, app_args=args, boxes=boxes)
+        out.append(base64.b64decode(encoding.msgpack_encode(txn.sign(private_key))))
+    return out
+
+
+def template_path(client, sp, ballots, private_key):
+    template = MethodTemplate(client, "vote", sp, boxes=vote_boxes)
+    key = signing_key(private_key)
+    return [template.call(key, client.sender, [pid, 1, power], sp.first, sp.last).signed_bytes for pid, power in ballots]
+
+
+def pool_path(client, sp, ballots, pool):
+    """Template bodies built here, signed by the worker processes"""
+    template = MethodTemplate(client, "vote", sp, boxes=vote_boxes)
+    return pool.sign_bodies([(client.sender, template.encode(client.sender, [pid, 1, power], sp.first, sp.last)) for pid, power in ballots])
+
+
+def measure(name, fn, count):
+    start = time.perf_counter()
+    signed = fn()
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed
+    print(f"{name:<22} {elapsed:8.3f}s  {rate:10,.0f} txn/s")
+    return signed, rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=5000, help="ballots per path")
+    parser.add_argument("--processes", type=int, default=None, help="signing workers (default: one per core)")
+    options = parser.parse_args()
+
+    private_key, sender = account.generate_account()
+    client = VotingSystemClient(None, APP_ID, sender, AccountTransactionSigner(private_key))
+    sp = transaction.SuggestedParams(1000, 1000, 2000, GENESIS_HASH, "mocknet-v1", flat_fee=True)
+    ballots = [(i % 500 + 1, 10 + i) for i in range(options.count)]
+
+    print(f"Building and signing {options.count} vote calls per path")
+    composed, base = measure("composer", lambda: composer_path(client, sp, ballots), options.count)
+    objects, _ = measure("transaction objects", lambda: object_path(client, sp, ballots, private_key), options.count)
+    templated, rate = measure("template", lambda: template_path(client, sp, ballots, private_key), options.count)
+    assert composed == objects == templated, "paths produced different bytes"
+    print(f"template speed-up over composer: {rate / base:.1f}x (identical signed bytes)")
+
+    with SigningPool([private_key], processes=options.processes) as pool:
+        pool.sign_bodies([(sender, b"warm-up")] * pool.processes)  # start the workers outside the timing
+        pooled, pool_rate = measure(f"template + {pool.processes} signers", lambda: pool_path(client, sp, ballots, pool), options.count)
+    assert pooled == templated, "signing pool produced different bytes"
+    print(f"signing pool speed-up over composer: {pool_rate / base:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
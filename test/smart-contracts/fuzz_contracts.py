@@ -0,0 +1,375 @@
+"""
+Model-based stateful fuzzing of the Climate DAO contracts
+Drives ClimateDAO and VotingSystem in-process (smart_contracts/emulator.py) with random sequences of
+join_dao, register_member, delegate, undelegate, submit_proposal, vote, finalize and award_credits,
+valid and invalid alike, plus clock jumps. A Python reference model predicts every outcome
+(accepted or rejected, and the return value), and the contracts' boxes are checked against the
+model's invariants: tallies add up, nobody votes twice, delegated power matches what delegators
+lent, statuses only leave pending once, awards stay within funding and equal the credit tokens
+each proposer received, and the active queue holds exactly the open proposals in end-time order.
+
+    python test/smart-contracts/fuzz_contracts.py --ops 20000 --seed 7
+    python test/smart-contracts/fuzz_contracts.py --ops 200000 --workers 8   # seeds 7..14, one per worker
+
+Each worker runs its own seed; a failure reports the seed and the operations leading to it, and
+re-running that seed replays them exactly.
+"""
+
+import argparse
+import collections
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algosdk import encoding, logic
+
+from smart_contracts.climate_dao import client as voting
+from smart_contracts.climate_dao.contract import ClimateDAO, VotingSystem
+from smart_contracts.emulator import EmulatedAlgod, LogicError, payment
+
+VOTING_PERIOD = 604800
+MIN_TOKENS_TO_PROPOSE = 100_000_000
+JOIN_TOKENS = 1000 * 1_000_000
+CLOCK_JUMPS = (3, 3600, 86400, VOTING_PERIOD, VOTING_PERIOD + 1)
+PENDING = 0
+
+
+class FuzzFailure(AssertionError):
+    """The contracts and the reference model disagree"""
+
+
+@dataclass
+class DelegationModel:
+    delegate: Optional[str] = None
+    lent_power: int = 0
+    delegated_power: int = 0
+    delegators: int = 0
+    last_change: int = 0
+    last_vote: int = 0
+
+
+@dataclass
+class ProposalModel:
+    proposer: str
+    funding: int
+    creation_time: int
+    end_time: int
+    status: int = PENDING
+    tally: list[int] = field(default_factory=lambda: [0, 0, 0, 0, 0])  # yes, no, abstain, voters, power
+    voters: set[str] = field(default_factory=set)
+    awarded: int = 0
+
+
+class Model:
+    """What the contracts should do, in plain Python"""
+
+    QUORUM_PERCENT = 10
+
+    def __init__(self, admin: str, supply: int):
+        self.admin = admin
+        self.supply = supply
+        self.dao_balances: dict[str, int] = {}
+        self.tokens: dict[str, int] = {}  # VotingSystem member -> registered tokens
+        self.delegations: dict[str, DelegationModel] = {}
+        self.proposals: dict[int, ProposalModel] = {}
+
+    # each method returns the expected return value, or raises Rejected
+    def join_dao(self, sender: str, amount: int, to_app: bool) -> int:
+        _require(to_app and amount >= 1_000_000)
+        balance = self.dao_balances.get(sender)
+        self.dao_balances[sender] = JOIN_TOKENS if balance is None else balance + amount
+        return self.dao_balances[sender]
+
+    def register_member(self, sender: str, member: str, tokens: int) -> None:
+        _require(sender == self.admin)
+        self.tokens[member] = tokens
+        record = self.delegations.setdefault(member, DelegationModel())
+        if record.delegate is not None:
+            # the power lent follows the new balance
+            self.delegations[record.delegate].delegated_power += tokens - record.lent_power
+            record.lent_power = tokens
+
+    def delegate(self, sender: str, to: str, now: int) -> None:
+        _require(to != sender and sender in self.tokens and to in self.tokens)
+        record, target = self.delegations[sender], self.delegations[to]
+        _require(record.delegate is None and record.delegators == 0 and target.delegate is None)
+        # no power cast on a proposal still open, no second change within a voting period
+        _require(record.last_vote == 0 or now > record.last_vote + VOTING_PERIOD)
+        _require(record.last_change == 0 or now > record.last_change + VOTING_PERIOD)
+        record.delegate, record.lent_power, record.last_change = to, self.tokens[sender], now
+        target.delegated_power += record.lent_power
+        target.delegators += 1
+
+    def undelegate(self, sender: str, now: int) -> None:
+        record = self.delegations.get(sender)
+        _require(record is not None and record.delegate is not None)
+        target = self.delegations[record.delegate]
+        target.delegated_power -= record.lent_power
+        target.delegators -= 1
+        record.delegate, record.lent_power, record.last_change = None, 0, now
+
+    def submit_proposal(self, sender: str, funding: int, now: int) -> int:
+        _require(self.tokens.get(sender, 0) >= MIN_TOKENS_TO_PROPOSE)
+        pid = len(self.proposals) + 1
+        self.proposals[pid] = ProposalModel(sender, funding, now, now + VOTING_PERIOD)
+        return pid
+
+    def vote(self, sender: str, pid: int, choice: int, power: int, now: int) -> None:
+        proposal = self.proposals.get(pid)
+        _require(proposal is not None and now <= proposal.end_time and proposal.status == PENDING)
+        record = self.delegations.get(sender)
+        _require(record is not None and record.delegate is None)
+        _require(record.last_change == 0 or proposal.creation_time > record.last_change)
+        _require(self.tokens[sender] + record.delegated_power >= power)
+        _require(sender not in proposal.voters and choice in (0, 1, 2))
+        proposal.voters.add(sender)
+        proposal.tally[(2, 0, 1)[choice]] += power  # choice 0 abstains, 1 yes, 2 no
+        proposal.tally[3] += 1 + record.delegators  # delegators count as voters through their delegate
+        proposal.tally[4] += power
+        record.last_vote = now
+
+    def finalize(self, pid: int, now: int) -> int:
+        proposal = self.proposals.get(pid)
+        _require(proposal is not None and now > proposal.end_time and proposal.status == PENDING)
+        yes, no, _, _, power = proposal.tally
+        if power < self.supply * self.QUORUM_PERCENT // 100:
+            proposal.status = 3
+        else:
+            proposal.status = 1 if yes > no else 2
+        return proposal.status
+
+    def award_credits(self, sender: str, pid: int, amount: int) -> None:
+        proposal = self.proposals.get(pid)
+        _require(sender == self.admin and proposal is not None and proposal.status == 1)
+        _require(proposal.awarded + amount <= proposal.funding)
+        proposal.awarded += amount
+
+
+class Rejected(Exception):
+    """The model expects the call to fail"""
+
+
+def _require(condition: bool) -> None:
+    if not condition:
+        raise Rejected
+
+
+class Fuzzer:
+    """Random operations against the emulated apps, each checked against the model"""
+
+    def __init__(self, seed: int, accounts: int = 48, supply: int = 2_000_000_000, check_every: int = 500, model_class: type[Model] = Model):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.check_every = check_every
+        self.ledger = EmulatedAlgod()
+        self.admin = encoding.encode_address(self.rng.randbytes(32))
+        self.accounts = [encoding.encode_address(self.rng.randbytes(32)) for _ in range(accounts)]
+        self.model = model_class(self.admin, supply)
+        self.trace: collections.deque = collections.deque(maxlen=25)
+        self.counts: collections.Counter = collections.Counter()
+
+        self.dao_id = self.ledger.deploy(ClimateDAO, self.admin)
+        self.voting_id = self.ledger.deploy(VotingSystem, self.admin)
+        self.dao_address = logic.get_application_address(self.dao_id)
+        self.ledger.call(self.dao_id, self.admin, "create_dao_tokens", [], txns=[payment(self.admin, self.dao_address, 2_000_000)])
+        self.credit_token = self.ledger.get_global(self.dao_id, "credit_token_id")
+        self.ledger.call(self.voting_id, self.admin, "set_credit_token", [self.credit_token])
+        self.ledger.call(self.voting_id, self.admin, "set_total_token_supply", [supply])
+
+    def close(self) -> None:
+        self.ledger.close()
+
+    # ------------------ operations ------------------
+    def run(self, ops: int) -> collections.Counter:
+        operations = [self.join_dao, self.register_member, self.delegate, self.undelegate, self.submit_proposal, self.vote, self.finalize, self.award_credits, self.warp]
+        weights = [8, 12, 6, 3, 8, 50, 10, 8, 4]
+        for i in range(ops):
+            self.rng.choices(operations, weights)[0]()
+            if (i + 1) % self.check_every == 0:
+                self.check_state()
+        self.check_state()
+        return self.counts
+
+    def join_dao(self):
+        sender = self.rng.choice(self.accounts)
+        amount = self.rng.choice((500_000, 1_000_000, 3_000_000))
+        to_app = self.rng.random() > 0.05
+        receiver = self.dao_address if to_app else sender
+        self._check("join_dao", (sender, amount, to_app), self.dao_id, sender, [], lambda: self.model.join_dao(sender, amount, to_app),
+                    txns=[payment(sender, receiver, amount)])
+
+    def register_member(self):
+        sender = self.admin if self.rng.random() > 0.05 else self.rng.choice(self.accounts)
+        member = self.rng.choice(self.accounts)
+        tokens = self.rng.choice((0, 50_000_000, MIN_TOKENS_TO_PROPOSE, 250_000_000, 1_000_000_000))
+        self._check("register_member", (sender, member, tokens), self.voting_id, sender, [member, tokens], lambda: self.model.register_member(sender, member, tokens))
+
+    def delegate(self):
+        members = list(self.model.tokens)
+        sender = self.rng.choice(members) if members and self.rng.random() > 0.1 else self.rng.choice(self.accounts)
+        to = self.rng.choice(members) if members and self.rng.random() > 0.1 else self.rng.choice(self.accounts)
+        now = self.ledger.timestamp
+        self._check("delegate", (sender, to), self.voting_id, sender, [to], lambda: self.model.delegate(sender, to, now))
+
+    def undelegate(self):
+        delegating = [member for member, record in self.model.delegations.items() if record.delegate is not None]
+        sender = self.rng.choice(delegating) if delegating and self.rng.random() > 0.2 else self.rng.choice(self.accounts)
+        now = self.ledger.timestamp
+        self._check("undelegate", (sender,), self.voting_id, sender, [], lambda: self.model.undelegate(sender, now))
+
+    def submit_proposal(self):
+        sender = self.rng.choice(self.accounts)
+        funding = self.rng.randrange(0, 10_000)
+        now = self.ledger.timestamp
+        self._check("submit_proposal", (sender, funding), self.voting_id, sender, ["Fuzz", "", funding], lambda: self.model.submit_proposal(sender, funding, now))
+
+    def vote(self):
+        members = list(self.model.tokens)
+        sender = self.rng.choice(members) if members and self.rng.random() > 0.1 else self.rng.choice(self.accounts)
+        open_ids = [pid for pid, p in self.model.proposals.items() if p.status == PENDING and p.end_time >= self.ledger.timestamp]
+        pid = self.rng.choice(open_ids) if open_ids and self.rng.random() > 0.2 else self._pick_proposal()
+        choice = self.rng.choice((0, 1, 1, 2, 2, 3))
+        power = self.rng.choice((1, 10_000_000, 50_000_000, self.model.tokens.get(sender, 0), 2_000_000_000))
+        now = self.ledger.timestamp
+        self._check("vote", (sender, pid, choice, power), self.voting_id, sender, [pid, choice, power], lambda: self.model.vote(sender, pid, choice, power, now))
+
+    def finalize(self):
+        pid = self._pick_proposal()
+        sender = self.rng.choice(self.accounts)
+        now = self.ledger.timestamp
+        self._check("finalize", (pid,), self.voting_id, sender, [pid], lambda: self.model.finalize(pid, now))
+
+    def award_credits(self):
+        sender = self.admin if self.rng.random() > 0.05 else self.rng.choice(self.accounts)
+        approved = [pid for pid, p in self.model.proposals.items() if p.status == 1]
+        pid = self.rng.choice(approved) if approved and self.rng.random() > 0.3 else self._pick_proposal()
+        amount = self.rng.randrange(0, 5_000)
+        self._check("award_credits", (sender, pid, amount), self.voting_id, sender, [pid, amount], lambda: self.model.award_credits(sender, pid, amount))
+
+    def warp(self):
+        seconds = self.rng.choice(CLOCK_JUMPS)
+        self.trace.append(("warp", seconds))
+        self.ledger.warp(seconds)
+        self.counts["warp"] += 1
+
+    def _pick_proposal(self) -> int:
+        # mostly existing ids, sometimes the next or an unknown one
+        return self.rng.randint(1, len(self.model.proposals) + 2)
+
+    def _check(self, name, params, app_id, sender, args, predict, txns=None):
+        self.trace.append((name, *params))
+        try:
+            expected, expect_ok = predict(), True
+        except Rejected:
+            expected, expect_ok = None, False
+        try:
+            actual, ok = self.ledger.call(app_id, sender, name, args, txns=txns), True
+        except LogicError as e:
+            actual, ok = e.reason, False
+        if ok != expect_ok or (ok and actual != expected):
+            self.fail(f"{name}{params}: contract {'returned ' + repr(actual) if ok else 'rejected it (' + str(actual) + ')'}, model {'expected ' + repr(expected) if expect_ok else 'expected a rejection'}")
+        self.counts[f"{name} {'ok' if ok else 'rejected'}"] += 1
+
+    def fail(self, message: str) -> None:
+        steps = "\n  ".join(repr(step) for step in self.trace)
+        raise FuzzFailure(f"seed {self.seed}: {message}\nlast operations:\n  {steps}")
+
+    # ------------------ invariants ------------------
+    def check_state(self) -> None:
+        """Compare every box the model knows about with the model, plus the cross-box invariants"""
+        box = lambda name: self.ledger.get_box(self.voting_id, name)
+        records = {member: voting.Member.decode(box(voting.member_box(member))) for member in self.model.tokens}
+        for member, tokens in self.model.tokens.items():
+            if records[member].balance != tokens:
+                self.fail(f"member tokens of {member} differ")
+        delegations = {member: voting.Delegation.from_member_box(box(voting.member_box(member))) for member in self.model.tokens}
+        for member, expected in self.model.delegations.items():
+            record = delegations[member]
+            if (record.delegate if record.is_delegating else None, record.lent_power, record.delegated_power, record.delegators) != \
+                    (expected.delegate, expected.lent_power, expected.delegated_power, expected.delegators):
+                self.fail(f"delegation record of {member} differs")
+            lent = [other for other in delegations.values() if other.delegate == member]
+            if sum(other.lent_power for other in lent) != record.delegated_power or len(lent) != record.delegators:
+                self.fail(f"power delegated to {member} does not add up to what its delegators lent")
+        if sum(record.proposals for record in records.values()) != len(self.model.proposals):
+            self.fail("member proposal counters do not add up to the proposals")
+        if sum(record.votes for record in records.values()) != sum(len(p.voters) for p in self.model.proposals.values()):
+            self.fail("member ballot counters do not add up to the ballots")
+        open_entries = []
+        for pid, expected in self.model.proposals.items():
+            proposal = voting.Proposal.decode(box(voting.proposal_box(pid)))
+            summary = voting.VoteSummary.decode(box(voting.votes_box(pid)))
+            if proposal.status != expected.status:
+                self.fail(f"proposal {pid} has status {proposal.status}, model {expected.status}")
+            if list(voting.VOTE_DATA_TYPE.decode(box(voting.votes_box(pid)))) != expected.tally:
+                self.fail(f"proposal {pid} tally {summary}, model {expected.tally}")
+            if summary.yes_votes + summary.no_votes + summary.abstain_votes != summary.total_voting_power:
+                self.fail(f"proposal {pid} choices do not add up to its voting power")
+            voted = voting.bitmap_indexes(box(voting.voted_box(pid)) or b"")
+            if len(voted) != len(expected.voters):
+                self.fail(f"proposal {pid} has {len(voted)} voted bits for {len(expected.voters)} ballots")
+            awarded = box(voting.awarded_box(pid))
+            if int.from_bytes(awarded or b"", "big") != expected.awarded or expected.awarded > proposal.funding:
+                self.fail(f"proposal {pid} awarded total differs or exceeds its funding")
+            if proposal.status == PENDING:
+                open_entries.append((proposal.end_time, pid))
+        if voting.decode_active(box(voting.ACTIVE_BOX) or b"") != sorted(open_entries):
+            self.fail("active queue does not hold exactly the open proposals in end-time order")
+        awarded: dict[str, int] = {}
+        for expected in self.model.proposals.values():
+            awarded[expected.proposer] = awarded.get(expected.proposer, 0) + expected.awarded
+        for proposer, total in awarded.items():
+            if self.ledger.received.get((proposer, self.credit_token), 0) != total:
+                self.fail(f"{proposer} holds {self.ledger.received.get((proposer, self.credit_token), 0)} credit tokens for {total} awarded")
+        if sum(amount for (_, asset_id), amount in self.ledger.received.items() if asset_id == self.credit_token) != sum(awarded.values()):
+            self.fail("credit tokens were paid to accounts without awards")
+        for member, balance in self.model.dao_balances.items():
+            if voting.DaoMember.decode(self.ledger.get_box(self.dao_id, voting.member_box(member))).balance != balance:
+                self.fail(f"DAO balance of {member} differs")
+
+
+def fuzz(seed: int, ops: int, accounts: int = 48) -> tuple[int, float, collections.Counter]:
+    """Run one seed; returns (ops, seconds, operation counts)"""
+    fuzzer = Fuzzer(seed, accounts)
+    try:
+        start = time.perf_counter()
+        counts = fuzzer.run(ops)
+        return ops, time.perf_counter() - start, counts
+    finally:
+        fuzzer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ops", type=int, default=20_000, help="operations in total, split across workers")
+    parser.add_argument("--seed", type=int, default=7, help="seed of the first worker; worker i runs seed + i")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes, one seed each")
+    parser.add_argument("--accounts", type=int, default=48, help="accounts the operations pick from")
+    options = parser.parse_args()
+
+    per_worker = -(-options.ops // options.workers)
+    seeds = [options.seed + i for i in range(options.workers)]
+    start = time.perf_counter()
+    if options.workers == 1:
+        results = [fuzz(seeds[0], per_worker, options.accounts)]
+    else:
+        with ProcessPoolExecutor(options.workers) as pool:
+            results = list(pool.map(fuzz, seeds, [per_worker] * len(seeds), [options.accounts] * len(seeds)))
+    elapsed = time.perf_counter() - start
+
+    counts = sum((result[2] for result in results), collections.Counter())
+    total = sum(result[0] for result in results)
+    for name, count in sorted(counts.items()):
+        print(f"{name:<26} {count:>9,}")
+    print(f"{total:,} operations over seeds {seeds[0]}..{seeds[-1]} in {elapsed:.1f}s: {total / elapsed:,.0f} ops/s, no divergence")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,14 @@ Smart Contract Unit Tests for TerraLinke Climate DAO
 Simple version without unicode characters for Windows compatibility
 """
 
+import sys
 import unittest
-from algosdk.v2client import algod
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from smart_contracts.transport import get_algod_client
 import json
 import base64
 
@@ -17,7 +23,7 @@ class TestClimateDAOContract(unittest.TestCase):
         # Algorand TestNet configuration
         cls.algod_address = "https://testnet-api.algonode.cloud"
         cls.algod_token = ""
-        cls.algod_client = algod.AlgodClient(cls.algod_token, cls.algod_address)
+        cls.algod_client = get_algod_client(cls.algod_address, cls.algod_token)
         
         # Contract ID from deployment (replace with actual deployed contract)
         cls.app_id = 744174033  # Current TestNet deployment
@@ -0,0 +1,157 @@
+"""
+Unit tests for the chain mirror and the read API
+Proposals and votes go through the contract on the emulated ledger; the mirror follows their blocks
+"""
+
+import gzip
+import json
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algosdk import account
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from smart_contracts.api import ReadAPI, ReadAPIServer
+from smart_contracts.climate_dao.client import VotingSystemClient
+from smart_contracts.climate_dao.contract import VotingSystem
+from smart_contracts.emulator import EmulatedAlgod
+from smart_contracts.mirror import PROPOSALS, ChainMirror
+from smart_contracts.mock_algod import MockAlgodServer
+from smart_contracts.transport import HTTPTransport, PooledAlgodClient
+
+
+class MirrorTest(unittest.TestCase):
+    """Three members and two proposals; each test gets a fresh chain"""
+
+    def setUp(self):
+        self.ledger = EmulatedAlgod()
+        self.server = MockAlgodServer(self.ledger, block_time=0.02).start()
+        self.algod_client = PooledAlgodClient("", self.server.address)
+        self.start_round = self.ledger.round + 1
+        admin_key, admin = account.generate_account()
+        self.app_id = self.ledger.deploy(VotingSystem, admin)
+        admin_client = self.client(admin_key)
+        admin_client.call("set_total_token_supply", [1_000_000_000])
+        self.keys = [account.generate_account()[0] for _ in range(3)]
+        for key in self.keys:
+            admin_client.register_member(account.address_from_private_key(key), 200_000_000)
+        self.pids = [self.client(self.keys[0]).submit_proposal(title, "Restore the wetland", 100) for title in ("Kelp", "Peat")]
+        self.mirror = ChainMirror(VotingSystemClient(self.algod_client, self.app_id), start_round=self.start_round)
+
+    def tearDown(self):
+        self.algod_client.transport.close()
+        self.server.stop()
+        self.ledger.close()
+
+    def client(self, private_key):
+        return VotingSystemClient(self.algod_client, self.app_id, account.address_from_private_key(private_key), AccountTransactionSigner(private_key))
+
+    def address(self, index):
+        return account.address_from_private_key(self.keys[index])
+
+
+class TestChainMirror(MirrorTest):
+    """The mirror matches the chain and versions only what a round touched"""
+
+    def test_sync_follows_the_chain(self):
+        changes = self.mirror.sync()
+        self.assertEqual(changes.proposals, set(self.pids))
+        self.assertEqual(changes.members, {self.address(i) for i in range(3)})
+        self.assertEqual(self.mirror.proposals[self.pids[0]].title, "Kelp")
+        self.assertEqual(self.mirror.members[self.address(0)].proposals, 2)
+
+        untouched = self.mirror.version(PROPOSALS, self.pids[1])
+        self.client(self.keys[1]).vote(self.pids[0], 1, 5)
+        self.client(self.keys[2]).vote(self.pids[0], 2, 3)
+        changes = self.mirror.sync()
+        self.assertEqual((changes.proposals, changes.summaries), (set(), {self.pids[0]}))
+        summary = self.mirror.summaries[self.pids[0]]
+        self.assertEqual((summary.yes_votes, summary.no_votes, summary.total_voters), (5, 3, 2))
+        self.assertEqual(summary, VotingSystemClient(self.algod_client, self.app_id).get_vote_summary(self.pids[0]))
+        self.assertGreater(self.mirror.version(PROPOSALS, self.pids[0]), untouched)
+        self.assertEqual(self.mirror.version(PROPOSALS, self.pids[1]), untouched)
+        self.assertFalse(self.mirror.sync())
+
+
+class TestReadAPI(MirrorTest):
+    """Responses are rendered once per version and revalidated by ETag"""
+
+    def setUp(self):
+        super().setUp()
+        self.mirror.sync()
+        self.api = ReadAPI(self.mirror)
+
+    def get(self, path, **headers):
+        return self.api.handle("GET", path, {name.replace("_", "-"): value for name, value in headers.items()})
+
+    def test_proposals(self):
+        status, headers, body = self.get(f"/api/proposals/{self.pids[0]}")
+        self.assertEqual(status, 200)
+        proposal = json.loads(body)
+        self.assertEqual((proposal["title"], proposal["status_name"], proposal["votes"]["total_voters"]), ("Kelp", "pending", 0))
+        listing = json.loads(self.get("/api/proposals")[2])
+        self.assertEqual([item["id"] for item in listing], self.pids)
+        self.assertEqual(json.loads(self.get(f"/api/members/{self.address(0)}")[2])["proposals"], 2)
+        self.assertEqual(json.loads(self.get("/api/dashboard")[2])["by_status"]["pending"], 2)
+        self.assertEqual(self.get("/api/proposals/99")[0], 404)
+        self.assertEqual(self.get("/api/nothing")[0], 404)
+        self.assertEqual(self.api.handle("POST", "/api/proposals", {})[0], 405)
+
+    def test_conditional_get(self):
+        path = f"/api/proposals/{self.pids[0]}"
+        _, headers, body = self.get(path)
+        etag = headers["ETag"]
+        status, headers, body = self.get(path, if_none_match=etag)
+        self.assertEqual((status, headers["ETag"], body), (304, etag, b""))
+        rendered = self.api.stats["rendered"]
+        for _ in range(5):
+            self.get(path)
+        self.assertEqual(self.api.stats["rendered"], rendered)
+
+        other = f"/api/proposals/{self.pids[1]}"
+        other_etag = self.get(other)[1]["ETag"]
+        self.client(self.keys[1]).vote(self.pids[0], 1, 5)
+        self.mirror.sync()
+        status, headers, body = self.get(path, if_none_match=etag)
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers["ETag"], etag)
+        self.assertEqual(json.loads(body)["votes"]["yes_votes"], 5)
+        self.assertEqual(self.get(other, if_none_match=other_etag)[0], 304)
+
+    def test_dashboard_only_changes_with_its_data(self):
+        _, headers, body = self.get("/api/dashboard")
+        self.assertNotIn("round", json.loads(body))  # it would go stale behind the version
+        self.ledger.advance(3)
+        self.mirror.sync()
+        self.assertEqual(self.get("/api/dashboard", if_none_match=headers["ETag"])[0], 304)
+        self.assertEqual(self.get("/api/dashboard")[2], body)
+
+    def test_gzip(self):
+        status, headers, body = self.get("/api/proposals", accept_encoding="gzip, deflate")
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertTrue(headers["ETag"].endswith('-gz"'))
+        self.assertEqual(gzip.decompress(body), self.get("/api/proposals")[2])
+        self.assertEqual(self.get("/api/proposals", accept_encoding="gzip", if_none_match=headers["ETag"])[0], 304)
+        self.assertNotIn("Content-Encoding", self.get("/api/status", accept_encoding="gzip")[1])  # too small
+
+    def test_server(self):
+        with ReadAPIServer(self.api, sync_interval=0.05) as server:
+            transport = HTTPTransport(server.address)
+            try:
+                response = transport.request("GET", "/api/proposals", {"Accept-Encoding": "gzip"})
+                self.assertEqual(response.status, 200)
+                self.assertEqual(len(json.loads(gzip.decompress(response.body))), 2)
+                etag = response.headers["ETag"]
+                self.assertEqual(transport.request("GET", "/api/proposals", {"Accept-Encoding": "gzip", "If-None-Match": etag}).status, 304)
+                head = transport.request("HEAD", "/api/proposals", {"Accept-Encoding": "gzip"})
+                self.assertEqual((head.status, head.body, head.headers["Content-Length"]), (200, b"", str(len(response.body))))
+            finally:
+                transport.close()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
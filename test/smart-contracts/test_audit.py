@@ -0,0 +1,100 @@
+"""
+Unit tests for the off-chain tally audit
+Votes go through the contract on the emulated ledger; the audit replays their block logs over HTTP
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algosdk import account
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from smart_contracts.audit import Mismatch, TallyAudit
+from smart_contracts.climate_dao.client import VOTE_DATA_TYPE, VotingSystemClient, voted_box, votes_box
+from smart_contracts.climate_dao.contract import VotingSystem
+from smart_contracts.emulator import EmulatedAlgod
+from smart_contracts.mock_algod import MockAlgodServer
+from smart_contracts.transport import PooledAlgodClient
+
+
+class TestTallyAudit(unittest.TestCase):
+    """Two proposals, five members, two of them delegating to the first"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ledger = EmulatedAlgod()
+        cls.server = MockAlgodServer(cls.ledger, block_time=0.02).start()
+        cls.algod_client = PooledAlgodClient("", cls.server.address)
+        cls.start_round = cls.ledger.round + 1
+        admin_key, admin = account.generate_account()
+        cls.app_id = cls.ledger.deploy(VotingSystem, admin)
+        admin_client = cls.client(admin_key)
+        admin_client.call("set_total_token_supply", [1_000_000_000])
+        cls.keys = [account.generate_account()[0] for _ in range(5)]
+        for key in cls.keys:
+            admin_client.register_member(account.address_from_private_key(key), 200_000_000)
+        delegate = account.address_from_private_key(cls.keys[0])
+        cls.client(cls.keys[3]).delegate(delegate)
+        cls.client(cls.keys[4]).delegate(delegate)
+
+        cls.pids = [cls.client(cls.keys[1]).submit_proposal(title, "", 100) for title in ("Kelp", "Peat")]
+        for key, pid, choice, power in [
+            (cls.keys[0], cls.pids[0], 1, 600_000_000),  # own power plus two delegators'
+            (cls.keys[1], cls.pids[0], 2, 50_000_000),
+            (cls.keys[2], cls.pids[0], 0, 10),
+            (cls.keys[1], cls.pids[1], 1, 7),
+        ]:
+            cls.client(key).vote(pid, choice, power)
+        cls.admin_client = admin_client
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.algod_client.transport.close()
+        cls.server.stop()
+        cls.ledger.close()
+
+    @classmethod
+    def client(cls, private_key):
+        return VotingSystemClient(cls.algod_client, cls.app_id, account.address_from_private_key(private_key), AccountTransactionSigner(private_key))
+
+    def test_replay_matches_summaries(self):
+        audit = TallyAudit(self.admin_client, self.start_round, workers=1)
+        report = audit.run()
+        self.assertTrue(report.ok, report.mismatches)
+        self.assertEqual((report.proposals, report.votes), (2, 4))
+        summary = audit.recomputed(self.pids[0])
+        self.assertEqual((summary.yes_votes, summary.no_votes, summary.abstain_votes), (600_000_000, 50_000_000, 10))
+        self.assertEqual(summary.total_voters, 5)  # the delegate's ballot counts their two delegators
+
+    def test_parallel_replay_matches_sequential(self):
+        sequential = TallyAudit(self.admin_client, self.start_round, workers=1)
+        sequential.run()
+        parallel = TallyAudit(self.admin_client, self.start_round, workers=2, chunk_rounds=3)
+        report = parallel.run()
+        self.assertTrue(report.ok, report.mismatches)
+        self.assertEqual(parallel.tallies, sequential.tallies)
+
+    def test_tampered_boxes_are_reported(self):
+        pid = self.pids[1]
+        state = self.ledger.app_state(self.app_id)
+        original_votes, original_voted = state.boxes[votes_box(pid)], state.boxes[voted_box(pid)]
+        try:
+            state.boxes[votes_box(pid)] = VOTE_DATA_TYPE.encode([8, 0, 0, 1, 8])
+            state.boxes[voted_box(pid)] = bytes(len(original_voted))
+            # a fresh client: the shared one has these boxes cached for the current round
+            report = TallyAudit(VotingSystemClient(self.algod_client, self.app_id), self.start_round, [pid], workers=1).run()
+        finally:
+            state.boxes[votes_box(pid)], state.boxes[voted_box(pid)] = original_votes, original_voted
+        self.assertEqual(report.mismatches, [
+            Mismatch(pid, "yes_votes", 7, 8),
+            Mismatch(pid, "total_voting_power", 7, 8),
+            Mismatch(pid, "ballots", 1, 0),
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
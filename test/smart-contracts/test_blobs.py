@@ -0,0 +1,155 @@
+"""
+Unit tests for the content-addressed description store
+Covers the filesystem store, the HTTP stand-in and proposals submitted with blob references
+"""
+
+import sys
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algosdk import account
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from smart_contracts.blobs import BlobClient, BlobError, BlobServer, BlobStore, content_hash, parse_reference
+from smart_contracts.climate_dao.client import VotingSystemClient, proposal_box
+from smart_contracts.climate_dao.contract import VotingSystem
+from smart_contracts.emulator import EmulatedAlgod
+from smart_contracts.mock_algod import MockAlgodServer
+from smart_contracts.transport import HTTPTransport, PooledAlgodClient
+
+TEXT = "Restore 40ha of mangroves along the delta. " * 200
+
+
+class BlobTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = BlobStore(Path(self.tmp.name))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+class TestBlobStore(BlobTest):
+    """Blobs are compressed on disk, deduplicated and checked on read"""
+
+    def test_round_trip(self):
+        digest = self.store.put(TEXT.encode())
+        self.assertEqual(digest, content_hash(TEXT.encode()))
+        self.assertEqual(self.store.get(digest), TEXT.encode())
+        self.assertLess(self.store.path(digest).stat().st_size, len(TEXT) // 10)
+        self.assertEqual(self.store.put(TEXT.encode()), digest)
+        self.assertEqual(len(list(Path(self.tmp.name).rglob("*.z"))), 1)
+        self.assertIsNone(self.store.get(content_hash(b"missing")))
+
+    def test_corruption_is_detected(self):
+        digest = self.store.put(b"original")
+        other = self.store.put(b"tampered")
+        self.store.path(digest).write_bytes(self.store.path(other).read_bytes())
+        with self.assertRaises(BlobError):
+            BlobClient(store=self.store).get(digest)
+        with self.assertRaises(BlobError):
+            self.store.put_compressed(digest, self.store.get_compressed(other))
+
+    def test_oversized_blobs_are_refused(self):
+        store = BlobStore(Path(self.tmp.name), max_bytes=1000)
+        bomb = zlib.compress(bytes(1001), 9)
+        self.assertLess(len(bomb), 100)
+        with self.assertRaisesRegex(BlobError, "larger than 1000 bytes"):
+            store.put_compressed(content_hash(bytes(1001)), bomb)
+        with self.assertRaisesRegex(BlobError, "the limit is 1000"):
+            store.put(bytes(1001))
+        digest = store.put(bytes(1000))
+        self.assertEqual(store.get(digest), bytes(1000))
+        with self.assertRaisesRegex(BlobError, "truncated"):
+            store.put_compressed(digest, store.get_compressed(digest)[:-4])
+
+    def test_references(self):
+        client = BlobClient(store=self.store)
+        ref = client.reference(TEXT)
+        self.assertEqual(parse_reference(ref), (content_hash(TEXT.encode()), len(TEXT)))
+        self.assertEqual(client.resolve(ref), TEXT)
+        self.assertEqual(client.resolve("Inline description"), "Inline description")
+        with self.assertRaises(BlobError):
+            client.get(*parse_reference(ref)[:1], length=len(TEXT) + 1)
+
+
+class TestBlobServer(BlobTest):
+    """Blobs stored and fetched over HTTP; fetched blobs are verified once and cached"""
+
+    def setUp(self):
+        super().setUp()
+        self.server = BlobServer(self.store).start()
+        self.client = BlobClient(self.server.address)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+        super().tearDown()
+
+    def test_put_and_cached_get(self):
+        digest = self.client.put(TEXT.encode())
+        self.assertEqual(self.store.get(digest), TEXT.encode())
+
+        reader = BlobClient(self.server.address)
+        try:
+            for _ in range(3):
+                self.assertEqual(reader.get(digest, len(TEXT)), TEXT.encode())
+            self.assertEqual(reader.stats, {"hits": 2, "fetches": 1})
+            with self.assertRaisesRegex(BlobError, "not found"):
+                reader.get(content_hash(b"missing"))
+        finally:
+            reader.close()
+        self.assertEqual(self.server.requests, 3)  # put, one fetch, one miss
+
+    def test_put_body_is_capped(self):
+        with BlobServer(BlobStore(Path(self.tmp.name), max_bytes=1000)) as server:
+            transport = HTTPTransport(server.address)
+            try:
+                body = bytes(range(256)) * 8
+                response = transport.request("PUT", f"/blobs/{content_hash(body)}", {"Content-Type": "application/zlib"}, body)
+                self.assertEqual(response.status, 413)
+            finally:
+                transport.close()
+
+    def test_cache_is_bounded(self):
+        client = BlobClient(self.server.address, cache_bytes=100)
+        try:
+            digests = [client.put(bytes([i]) * 40) for i in range(4)]
+            self.assertEqual(list(client._cache), digests[2:])
+        finally:
+            client.close()
+
+
+class TestProposalDescriptions(BlobTest):
+    """Proposals submitted through a client with blobs keep a constant-size box"""
+
+    def test_constant_size_proposal_boxes(self):
+        with EmulatedAlgod() as ledger, MockAlgodServer(ledger, block_time=0.02) as server:
+            algod_client = PooledAlgodClient("", server.address)
+            admin_key, admin = account.generate_account()
+            app_id = ledger.deploy(VotingSystem, admin)
+            ledger.call(app_id, admin, "register_member", [admin, 200_000_000])
+            voting = VotingSystemClient(algod_client, app_id, admin, AccountTransactionSigner(admin_key), blobs=BlobClient(store=self.store))
+
+            titles = {"Kelp": "Short", "Peatland rewetting": TEXT}
+            pids = {title: voting.submit_proposal(title, text, 100) for title, text in titles.items()}
+            long = pids["Peatland rewetting"]
+            # only the title changes the box size; every description takes the reference's fixed size
+            sizes = {len(ledger.get_box(app_id, proposal_box(pid))) - len(title) for title, pid in pids.items()}
+            self.assertEqual(len(sizes), 1)
+            self.assertLess(sizes.pop(), 256)
+
+            self.assertTrue(voting.get_proposal(long).description.startswith("blob:"))
+            self.assertEqual(voting.get_proposal(long, resolve=True).description, TEXT)
+            plain = VotingSystemClient(algod_client, app_id)
+            self.assertEqual(plain.get_proposal(long).description, voting.get_proposal(long).description)
+            algod_client.transport.close()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
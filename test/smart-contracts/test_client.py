@@ -0,0 +1,323 @@
+"""
+Unit tests for the Python client SDK box cache
+Runs offline against a fake algod that counts box reads
+"""
+
+import base64
+import math
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algosdk import account, encoding, error, transaction
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from smart_contracts.climate_dao.client import (
+    ACTIVE_BOX,
+    AWARD_BATCH_SIZE,
+    BoxCache,
+    GroupOverflow,
+    MAX_GROUP_SIZE,
+    PROPOSAL_TYPE,
+    VOTE_DATA_TYPE,
+    MAX_REFS_PER_TXN,
+    MEMBER_TYPE,
+    VotingSystemClient,
+    awarded_box,
+    member_box,
+    proposal_box,
+    votes_box,
+    voted_box,
+)
+from smart_contracts.climate_dao.planner import GroupPlanner, discover
+
+
+class FakeAlgod:
+    """Just enough of AlgodClient for box reads"""
+
+    def __init__(self):
+        self.boxes = {}
+        self.round = 10
+        self.box_reads = 0
+
+    def application_box_by_name(self, app_id, name):
+        self.box_reads += 1
+        if name not in self.boxes:
+            raise error.AlgodHTTPError("box not found", 404)
+        return {"name": base64.b64encode(name).decode(), "round": self.round, "value": base64.b64encode(self.boxes[name]).decode()}
+
+
+class TestBoxCache(unittest.TestCase):
+    """Read-through caching of proposal/vote/member boxes"""
+
+    def setUp(self):
+        self.algod = FakeAlgod()
+        self.client = VotingSystemClient(self.algod, app_id=1234)
+        _, self.proposer = account.generate_account()
+        self.algod.boxes[proposal_box(1)] = PROPOSAL_TYPE.encode(["Solar", "Panels", 5000, self.proposer, 100, 700, 0])
+        self.algod.boxes[votes_box(1)] = VOTE_DATA_TYPE.encode([10, 5, 0, 2, 15])
+
+    def test_repeated_reads_hit_cache(self):
+        """Reading the same box twice in a round costs one algod call"""
+        first = self.client.get_proposal(1)
+        second = self.client.get_proposal(1)
+        self.assertEqual(first, second)
+        self.assertEqual(first.title, "Solar")
+        self.assertEqual(first.proposer, self.proposer)
+        self.assertEqual(self.algod.box_reads, 1)
+
+    def test_new_round_invalidates(self):
+        """Observing a newer round drops entries read at older rounds"""
+        self.assertEqual(self.client.get_vote_summary(1).yes_votes, 10)
+        self.algod.boxes[votes_box(1)] = VOTE_DATA_TYPE.encode([20, 5, 0, 3, 25])
+        self.assertEqual(self.client.get_vote_summary(1).yes_votes, 10)
+
+        self.algod.round = 11
+        self.client.observe_round(11)
+        self.assertEqual(self.client.get_vote_summary(1).yes_votes, 20)
+        self.assertEqual(self.algod.box_reads, 2)
+
+    def test_missing_box_is_cached(self):
+        """Non-members are remembered until the round changes"""
+        _, stranger = account.generate_account()
+        self.assertEqual(self.client.member_tokens(stranger), 0)
+        self.assertEqual(self.client.member_tokens(stranger), 0)
+        self.assertEqual(self.algod.box_reads, 1)
+
+        self.algod.boxes[member_box(stranger)] = MEMBER_TYPE.encode([500, 0, 0, 0, 0])
+        self.client.observe_round(11)
+        self.assertEqual(self.client.member_tokens(stranger), 500)
+
+    def test_lru_and_ttl(self):
+        """Entries are evicted by size and by age"""
+        now = [0.0]
+        cache = BoxCache(maxsize=2, ttl=5.0, clock=lambda: now[0])
+        cache.put(1, b"a", b"1", 0)
+        cache.put(1, b"b", b"2", 0)
+        cache.get(1, b"a")
+        cache.put(1, b"c", b"3", 0)
+        self.assertEqual(cache.get(1, b"b"), (False, None))
+        self.assertEqual(cache.get(1, b"a"), (True, b"1"))
+
+        now[0] = 6.0
+        self.assertEqual(cache.get(1, b"a"), (False, None))
+
+    def test_stale_put_is_ignored(self):
+        """A read that finishes after a newer round was observed is not cached"""
+        cache = BoxCache()
+        cache.advance(20)
+        cache.put(1, b"a", b"old", 19)
+        self.assertEqual(cache.get(1, b"a"), (False, None))
+
+
+class TestFinalizeBatchGroup(unittest.TestCase):
+    """finalize_batch spreads box references over padding calls in one group"""
+
+    def test_group_layout(self):
+        private_key, sender = account.generate_account()
+        client = VotingSystemClient(FakeAlgod(), app_id=1234, sender=sender, signer=AccountTransactionSigner(private_key))
+        client.suggested_params = lambda: transaction.SuggestedParams(1000, 1, 1000, "mock-genesis-hash=", "mocknet-v1")
+        groups = []
+
+        class Result:
+            abi_results = [type("ABIResult", (), {"return_value": [0]})]
+
+        def execute(atc, boxes=None):
+            groups.append([tws.txn for tws in atc.build_group()])
+            return Result
+
+        client.execute = execute
+        client.finalize_batch(list(range(1, 31)))
+        # 24 ids need 16 calls worth of opcode budget; the last 6 need 4
+        self.assertEqual([len(group) for group in groups], [16, 4])
+        first = groups[0]
+        self.assertTrue(all(len(txn.boxes) <= MAX_REFS_PER_TXN for txn in first))
+        refs = {box.name for txn in first for box in txn.boxes}
+        self.assertEqual(len(refs), 49)
+        self.assertIn(proposal_box(24), refs)
+        self.assertIn(ACTIVE_BOX, refs)
+        self.assertEqual(len({txn.get_txid() for txn in first}), 16)
+
+        with self.assertRaises(ValueError):
+            client.finalize_batch(list(range(100)), batch_size=100)
+
+
+class TestAwardBatchGroup(unittest.TestCase):
+    """award_credits_batch spreads proposer accounts and boxes and pools every fee on one call"""
+
+    def client(self, description=""):
+        """A client over AWARD_BATCH_SIZE approved proposals, each from its own proposer"""
+        private_key, sender = account.generate_account()
+        algod = FakeAlgod()
+        algod.application_info = lambda app_id: {"params": {"global-state": [
+            {"key": base64.b64encode(b"credit_token_id").decode(), "value": {"type": 2, "uint": 777}},
+        ]}}
+        proposers = [account.generate_account()[1] for _ in range(AWARD_BATCH_SIZE)]
+        for pid, proposer in enumerate(proposers, start=1):
+            algod.boxes[proposal_box(pid)] = PROPOSAL_TYPE.encode(["P", description, 1000, proposer, 0, 1, 1])
+        client = VotingSystemClient(algod, app_id=1234, sender=sender, signer=AccountTransactionSigner(private_key))
+        client.suggested_params = lambda: transaction.SuggestedParams(1000, 1, 1000, "mock-genesis-hash=", "mocknet-v1")
+        return client, proposers
+
+    def test_group_layout(self):
+        client, proposers = self.client()
+        atc, written = client.compose_award_batch([(pid, 1000) for pid in range(1, AWARD_BATCH_SIZE + 1)])
+        group = [tws.txn for tws in atc.build_group()]
+        self.assertLessEqual(len(group), 16)
+        for txn in group:
+            refs = len(txn.boxes) + len(txn.accounts or []) + len(txn.foreign_assets or [])
+            self.assertLessEqual(refs, MAX_REFS_PER_TXN)
+        self.assertEqual(group[0].foreign_assets, [777])
+        self.assertEqual({a for txn in group for a in txn.accounts or []}, set(proposers))
+        # a proposer's credit holding is only available on a call listing the asset too
+        for txn in group:
+            if txn.accounts:
+                self.assertEqual(txn.foreign_assets, [777])
+        self.assertEqual(len({box.name for txn in group for box in txn.boxes}), 2 * AWARD_BATCH_SIZE)
+        self.assertEqual(written, [awarded_box(pid) for pid in range(1, AWARD_BATCH_SIZE + 1)])
+        # the first call pays for every outer call and every inner transfer
+        self.assertEqual(group[0].fee, (len(group) + AWARD_BATCH_SIZE) * 1000)
+        self.assertTrue(all(txn.fee == 0 for txn in group[1:]))
+
+    def test_long_proposals_split_the_batch(self):
+        """Proposal boxes of several KB take several references each, so the batch is split until each group fits"""
+        client, _ = self.client(description="x" * 3000)
+        awards = [(pid, 1000) for pid in range(1, AWARD_BATCH_SIZE + 1)]
+        with self.assertRaises(GroupOverflow):
+            client.compose_award_batch(awards)
+
+        batches = client.compose_award_batches(awards)
+        self.assertGreater(len(batches), 1)
+        self.assertEqual([award for chunk, _, _ in batches for award in chunk], awards)
+        for chunk, atc, written in batches:
+            self.assertLessEqual(len(atc.build_group()), MAX_GROUP_SIZE)
+            self.assertEqual(written, [awarded_box(pid) for pid, _ in chunk])
+
+
+class TestGroupPlanner(unittest.TestCase):
+    """Calls to one app share their references across as few groups as fit"""
+
+    def setUp(self):
+        self.algod = FakeAlgod()
+        _, proposer = account.generate_account()
+        self.algod.boxes[proposal_box(1)] = PROPOSAL_TYPE.encode(["Solar", "Panels", 5000, proposer, 100, 700, 0])
+        self.sp = transaction.SuggestedParams(1000, 1, 1000, "mock-genesis-hash=", "mocknet-v1", flat_fee=True)
+
+    def client(self):
+        private_key, sender = account.generate_account()
+        client = VotingSystemClient(self.algod, app_id=1234, sender=sender, signer=AccountTransactionSigner(private_key))
+        client.suggested_params = lambda: self.sp
+        return client
+
+    def test_votes_share_proposal_boxes(self):
+        """Twenty voters fill one full group and a second; shared boxes are referenced once"""
+        voters = [self.client() for _ in range(20)]
+        for index, voter in enumerate(voters):
+            self.algod.boxes[member_box(voter.sender)] = MEMBER_TYPE.encode([10, index, 0, 0, 0]) + bytes(72)
+        planner = GroupPlanner(voters[0])
+        for voter in voters:
+            planner.add("vote", [1, 1, 10], client=voter)
+        groups = [[tws.txn for tws in atc.build_group()] for atc in planner.compose()]
+
+        self.assertEqual([len(group) for group in groups], [16, 4])
+        for group in groups:
+            for txn in group:
+                self.assertLessEqual(len(txn.boxes) + len(txn.accounts or []), MAX_REFS_PER_TXN)
+            names = [box.name for txn in group for box in txn.boxes]
+            self.assertEqual(names.count(proposal_box(1)), 1)
+            self.assertIn(voted_box(1), names)
+        first = {box.name for txn in groups[0] for box in txn.boxes}
+        self.assertLessEqual({member_box(voter.sender) for voter in voters[:16]}, first)
+        self.assertEqual({txn.sender for txn in groups[0]}, {voter.sender for voter in voters[:16]})
+
+    def test_vote_refs_follow_bitmap_length(self):
+        """The voted bitmap is referenced for its current size, or the size it grows to"""
+        voter = self.client()
+        self.algod.boxes[member_box(voter.sender)] = MEMBER_TYPE.encode([10, 3, 0, 0, 0]) + bytes(72)
+        self.algod.boxes[voted_box(1)] = bytes(5000)
+        refs = voter.references("vote", [1, 1, 10])
+        self.assertEqual(refs.boxes[voted_box(1)], 5000)
+        # 1KB of box I/O per reference: the 5KB bitmap is repeated to cover every byte
+        self.assertEqual(refs.box_refs().count(voted_box(1)), 1 + math.ceil(sum(refs.boxes.values()) / 1024) - len(refs.boxes))
+        self.algod.boxes[member_box(voter.sender)] = MEMBER_TYPE.encode([10, 40_000, 0, 0, 0]) + bytes(72)
+        voter.cache.invalidate(voter.app_id)
+        self.assertEqual(voter.references("vote", [1, 1, 10]).boxes[voted_box(1)], 40_000 // 8 + 1)
+
+    def test_legacy_members(self):
+        """8-byte member boxes from before indexing have no record until migrated"""
+        client = self.client()
+        _, legacy = account.generate_account()
+        self.algod.boxes[member_box(legacy)] = (300).to_bytes(8, "big")
+        self.algod.boxes[member_box(client.sender)] = MEMBER_TYPE.encode([10, 0, 0, 0, 0]) + bytes(72)
+        self.algod.application_boxes = lambda app_id: {"boxes": [{"name": base64.b64encode(name).decode()} for name in self.algod.boxes]}
+        self.assertEqual(client.legacy_members(), [legacy])
+        self.assertIsNone(client.get_member(legacy))
+        self.assertIsNone(client.member_index(legacy))
+        self.assertEqual(client.member_tokens(legacy), 300)
+        address = encoding.decode_address(legacy)
+        self.assertEqual(list(client.references("migrate_member", [legacy]).boxes), [member_box(legacy), b"midx_" + address, b"deleg_" + address])
+
+    def test_padding_and_fee_pooling(self):
+        """Budget-hungry calls get noop padding paid for by the first call"""
+        self.algod.application_info = lambda app_id: {"params": {"global-state": [
+            {"key": base64.b64encode(b"credit_token_id").decode(), "value": {"type": 2, "uint": 777}},
+        ]}}
+        client = self.client()
+        planner = GroupPlanner(client)
+        planner.add("finalize_batch", [[1]])
+        planner.add("award_credits_batch", [[(pid, 100) for pid in range(1, 9)]])
+        [atc] = planner.compose()
+        group = [tws.txn for tws in atc.build_group()]
+        # 1 + 3 app calls worth of budget, 2 of them padding
+        self.assertEqual(len(group), 4)
+        self.assertEqual(group[0].fee, (1 + 2 + 8) * 1000)
+        self.assertEqual(group[1].fee, 1000)
+        self.assertTrue(all(txn.fee == 0 for txn in group[2:]))
+        self.assertEqual({asset for txn in group for asset in txn.foreign_assets or []}, {777})
+
+    def test_holdings_stay_beside_their_asset(self):
+        """Every call carrying a proposer lists the credit token, whose holding the award credits"""
+        self.algod.application_info = lambda app_id: {"params": {"global-state": [
+            {"key": base64.b64encode(b"credit_token_id").decode(), "value": {"type": 2, "uint": 777}},
+        ]}}
+        proposers = [account.generate_account()[1] for _ in range(12)]
+        for pid, proposer in enumerate(proposers, start=2):
+            self.algod.boxes[proposal_box(pid)] = PROPOSAL_TYPE.encode(["P", "", 1000, proposer, 0, 1, 1])
+        planner = GroupPlanner(self.client())
+        planner.add("award_credits_batch", [[(pid, 100) for pid in range(2, 14)]])
+        [atc] = planner.compose()
+        group = [tws.txn for tws in atc.build_group()]
+        self.assertEqual({a for txn in group for a in txn.accounts or []}, set(proposers))
+        for txn in group:
+            self.assertLessEqual(len(txn.boxes) + len(txn.accounts or []) + len(txn.foreign_assets or []), MAX_REFS_PER_TXN)
+            if txn.accounts:
+                self.assertEqual(txn.foreign_assets, [777])
+
+    def test_discover_reads_unnamed_resources(self):
+        """Simulated calls report what they touched; failures raise"""
+        client = self.client()
+        _, other = account.generate_account()
+        box = lambda name: {"app": 1234, "name": base64.b64encode(name).decode()}
+        response = {"txn-groups": [{
+            "app-budget-consumed": 900,
+            "unnamed-resources-accessed": {"boxes": [box(proposal_box(1))], "extra-box-refs": 1},
+            "txn-results": [{"txn-result": {}, "unnamed-resources-accessed": {
+                "boxes": [box(votes_box(1))], "accounts": [other],
+                "asset-holdings": [{"account": other, "asset": 5}],
+            }}],
+        }]}
+        self.algod.simulate_transactions = lambda request: response
+        refs = discover(client, "finalize", [1])
+        self.assertEqual(list(refs.boxes), [proposal_box(1), votes_box(1)])
+        self.assertEqual((refs.accounts, refs.assets, refs.extra_box_refs, refs.budget_txns), ([other], [5], 1, 2))
+
+        response["txn-groups"][0]["failure-message"] = "logic eval error"
+        with self.assertRaises(ValueError):
+            discover(client, "finalize", [1])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -3,9 +3,15 @@ Smart Contract Unit Tests for TerraLinke Climate DAO
 Tests the core functionality of the climate funding smart contract
 """
 
+import sys
 import unittest
+from pathlib import Path
 from algosdk import account, mnemonic, transaction
-from algosdk.v2client import algod
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from smart_contracts.transport import get_algod_client
 import json
 import base64
 
@@ -18,7 +24,7 @@ class TestClimateDAOContract(unittest.TestCase):
         # Algorand TestNet configuration
         cls.algod_address = "https://testnet-api.algonode.cloud"
         cls.algod_token = ""
-        cls.algod_client = algod.AlgodClient(cls.algod_token, cls.algod_address)
+        cls.algod_client = get_algod_client(cls.algod_address, cls.algod_token)
         
         # Test accounts
         cls.creator_private_key, cls.creator_address = account.generate_account()
@@ -244,7 +250,7 @@ class TestClimateDAOEdgeCases(unittest.TestCase):
         """Set up for edge case testing"""
         self.algod_address = "https://testnet-api.algonode.cloud"
         self.algod_token = ""
-        self.algod_client = algod.AlgodClient(self.algod_token, self.algod_address)
+        self.algod_client = get_algod_client(self.algod_address, self.algod_token)
         self.app_id = 744174033
     
     def test_invalid_proposal_parameters(self):
@@ -0,0 +1,139 @@
+"""
+Unit tests for the columnar proposal and ballot tables
+Query results are checked against the same data kept as a list of dicts
+"""
+
+import random
+import sys
+import tracemalloc
+import unittest
+from dataclasses import replace
+from pathlib import Path
+from types import SimpleNamespace
+from threading import Lock
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algosdk import account
+
+from smart_contracts.climate_dao.client import Proposal, VoteSummary
+from smart_contracts.columnar import BallotTable, ProposalTable, StringTable
+from smart_contracts.events import Event
+
+VOTERS = [account.generate_account()[1] for _ in range(50)]
+
+
+def ballot_dicts(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        {"proposal_id": rng.randint(1, 20), "voter": rng.choice(VOTERS), "choice": rng.randint(0, 2), "power": rng.randint(1, 10**9), "round": 1000 + i // 10}
+        for i in range(count)
+    ]
+
+
+class TestBallotTable(unittest.TestCase):
+    """Filters, sorts and aggregates match the same queries over dicts"""
+
+    def setUp(self):
+        self.dicts = ballot_dicts(5000)
+        self.table = BallotTable()
+        for ballot in self.dicts:
+            self.table.add(**ballot)
+
+    def test_rows_round_trip(self):
+        self.assertEqual(len(self.table), len(self.dicts))
+        self.assertEqual(self.table.row(1234), self.dicts[1234])
+        self.assertEqual(len(self.table.strings), len({b["voter"] for b in self.dicts}))
+
+    def test_where(self):
+        rows = self.table.where("proposal_id", "==", 7)
+        rows = self.table.where("power", ">=", 500_000_000, rows)
+        expected = [i for i, b in enumerate(self.dicts) if b["proposal_id"] == 7 and b["power"] >= 500_000_000]
+        self.assertEqual(list(rows), expected)
+        voters = set(VOTERS[:3])
+        self.assertEqual(list(self.table.where("voter", "in", voters)), [i for i, b in enumerate(self.dicts) if b["voter"] in voters])
+        self.assertEqual(list(self.table.where("voter", "==", "NOT-A-MEMBER")), [])
+        self.assertEqual(len(self.table.where("voter", "!=", "NOT-A-MEMBER")), len(self.dicts))
+        self.assertEqual(list(self.table.where("choice", "in", [1, 2], rows)), [i for i in expected if self.dicts[i]["choice"] in (1, 2)])
+
+    def test_order_and_aggregate(self):
+        rows = self.table.where("proposal_id", "==", 3)
+        top = self.table.order_by("power", rows, descending=True, limit=5)
+        self.assertEqual([self.table.get(row, "power") for row in top], sorted((b["power"] for b in self.dicts if b["proposal_id"] == 3), reverse=True)[:5])
+        self.assertEqual(list(self.table.order_by("power", rows)), sorted(rows, key=lambda i: self.dicts[i]["power"]))
+
+        self.assertEqual(self.table.sum("power"), sum(b["power"] for b in self.dicts))
+        by_voter = {}
+        for b in self.dicts:
+            by_voter[b["voter"]] = by_voter.get(b["voter"], 0) + b["power"]
+        self.assertEqual(self.table.group_sum("voter", "power"), by_voter)
+        self.assertEqual(sum(self.table.count_by("choice", rows).values()), len(rows))
+
+        tallies = self.table.tallies()
+        yes = sum(b["power"] for b in self.dicts if b["proposal_id"] == 3 and b["choice"] == 1)
+        self.assertEqual(tallies[3][0], yes)
+        self.assertEqual(self.table.tallies(rows), {3: tallies[3]})
+
+    def test_add_events(self):
+        table = BallotTable()
+        events = [
+            Event("VoteCast", {"proposal_id": 1, "voter": VOTERS[0], "choice": 1, "power": 5}, 1001, 1005, 0, 0),
+            Event("Delegated", {"member": VOTERS[1], "delegate": VOTERS[0], "power": 9}, 1001, 1005, 1, 0),
+        ]
+        self.assertEqual(table.add_events(events), 1)
+        self.assertEqual(table.row(0), {"proposal_id": 1, "voter": VOTERS[0], "choice": 1, "power": 5, "round": 1005})
+
+    def test_smaller_than_dicts(self):
+        count = 20_000
+        dicts = ballot_dicts(count, seed=1)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            rows = [dict(b, voter=b["voter"].encode().decode()) for b in dicts]  # one string per row, as decoding gives
+            dict_bytes = tracemalloc.get_traced_memory()[0] - before
+            del rows
+        finally:
+            tracemalloc.stop()
+        table = BallotTable()
+        for ballot in dicts:
+            table.add(**ballot)
+        self.assertLess(table.nbytes() * 5, dict_bytes)
+
+
+class TestProposalTable(unittest.TestCase):
+    """Proposals with their tallies, filled from a mirror and updated in place"""
+
+    def setUp(self):
+        self.proposals = {
+            pid: Proposal(f"Project {pid}", "Restore the wetland " * pid, pid * 1000, VOTERS[pid % 3], 100 + pid, 200 + pid, pid % 3)
+            for pid in range(1, 10)
+        }
+        self.summaries = {pid: VoteSummary(pid * 10, pid, 0, pid + 1, pid * 11) for pid in self.proposals}
+        mirror = SimpleNamespace(proposals=self.proposals, summaries=self.summaries, awarded={3: 3000}, lock=Lock())
+        self.table = ProposalTable.from_mirror(mirror, StringTable())
+
+    def test_from_mirror(self):
+        self.assertEqual(self.table.proposal(4), self.proposals[4])
+        self.assertEqual(self.table.tally(4), self.summaries[4])
+        self.assertEqual(self.table.get(self.table.index[3], "awarded"), 3000)
+        self.assertEqual(self.table.sum("funding"), sum(p.funding for p in self.proposals.values()))
+        self.assertEqual(self.table.count_by("proposer"), {VOTERS[0]: 3, VOTERS[1]: 3, VOTERS[2]: 3})
+
+    def test_updates(self):
+        pending = self.table.where("status", "==", 0)
+        ranked = self.table.order_by("yes_votes", pending, descending=True)
+        self.assertEqual([self.table.get(row, "id") for row in ranked], [9, 6, 3])
+
+        self.table.set_tally(3, VoteSummary(1000, 0, 0, 5, 1000))
+        finalized = replace(self.proposals[6], status=1)
+        row = self.table.upsert(6, finalized, self.summaries[6])
+        self.assertEqual(row, self.table.index[6])
+        self.assertEqual(len(self.table), 9)
+        ranked = self.table.order_by("yes_votes", self.table.where("status", "==", 0), descending=True)
+        self.assertEqual([self.table.get(row, "id") for row in ranked], [3, 9])
+        self.assertEqual(self.table.get(self.table.index[6], "description"), self.proposals[6].description)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
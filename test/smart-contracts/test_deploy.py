@@ -0,0 +1,139 @@
+"""
+Unit tests for the build cache and idempotent deployment
+Compiles with puyapy (skipped when unavailable) and deploys to the local mock algod server
+"""
+
+import base64
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algosdk import abi, account, encoding
+
+from smart_contracts import build
+from smart_contracts.climate_dao.client import ClimateDAOClient, VotingSystemClient
+from smart_contracts.deploy import deploy_all
+from smart_contracts.mock_algod import MockAlgod, MockAlgodServer
+from smart_contracts.transport import PooledAlgodClient
+
+
+class ContractLedger(MockAlgod):
+    """Mock ledger that also applies the admin calls deploy relies on"""
+
+    def __init__(self):
+        super().__init__()
+        self.next_asset_id = 5000
+        self.selectors = {}
+        for client in (ClimateDAOClient, VotingSystemClient):
+            for method in client.METHODS.values():
+                self.selectors[method.get_selector()] = method
+
+    def apply(self, stxn, rnd):
+        result = super().apply(stxn, rnd)
+        txn = stxn["txn"]
+        args = txn.get("apaa") or []
+        method = self.selectors.get(args[0]) if args else None
+        if method is None:
+            return result
+        app_id = txn["apid"]
+        if method.name == "create_dao_tokens":
+            self.set_global(app_id, "dao_token_id", self.next_asset_id)
+            self.set_global(app_id, "credit_token_id", self.next_asset_id + 1)
+            self.next_asset_id += 2
+        elif method.name == "set_linked_dao":
+            self.set_global(app_id, "linked_dao", encoding.decode_address(abi.AddressType().decode(args[1])))
+        elif method.name == "set_credit_token":
+            self.set_global(app_id, "credit_token_id", abi.UintType(64).decode(args[1]))
+        elif method.name == "set_total_token_supply":
+            self.set_global(app_id, "total_token_supply", abi.UintType(64).decode(args[1]))
+        return result
+
+
+class TestBuildAndDeploy(unittest.TestCase):
+    """Artifacts are cached by source hash and deploys converge without repeating work"""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            build.build_all()
+        except RuntimeError as e:
+            raise unittest.SkipTest(f"puyapy unavailable: {e}")
+
+    def setUp(self):
+        self.server = MockAlgodServer(ContractLedger(), block_time=0.02).start()
+        self.ledger = self.server.ledger
+        self.client = PooledAlgodClient("", self.server.address)
+        self.private_key, self.address = account.generate_account()
+        self.ledger.add_account(self.address, 100_000_000)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.deployment_file = Path(self.tmp.name) / "deployment_info.json"
+
+    def tearDown(self):
+        self.client.transport.close()
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def sent_count(self):
+        return self.ledger.paths.count("/v2/transactions")
+
+    def test_rebuild_is_cached(self):
+        """An unchanged source tree skips the compiler"""
+        result = build.build_folder("climate_dao")
+        self.assertTrue(result.cached)
+        self.assertEqual(result.key, build.source_key("climate_dao"))
+        self.assertNotEqual(result.key, build.source_key("climate_dao", version="0.0.0"))
+        spec = build.load_app_spec("VotingSystem")
+        self.assertIn("approval", spec["byteCode"])
+
+    def test_client_methods_match_app_specs(self):
+        """The hand-written client signatures agree with the compiled ABI"""
+        for name, client in (("ClimateDAO", ClimateDAOClient), ("VotingSystem", VotingSystemClient)):
+            spec = build.load_app_spec(name)
+            compiled = {abi.Method.undictify(m).get_signature() for m in spec["methods"]}
+            declared = {m.get_signature() for m in client.METHODS.values()}
+            self.assertLessEqual(declared, compiled, name)
+
+    def test_deploy_is_idempotent(self):
+        """First deploy creates, funds and links; a second one sends nothing"""
+        report = deploy_all(self.client, self.private_key, self.deployment_file, network="mocknet")
+        self.assertEqual(sorted(report.created), ["ClimateDAO", "ImpactAnalytics", "VotingSystem"])
+        self.assertTrue(report.tokens_created)
+        self.assertTrue(report.linked)
+
+        voting_id = report.app_ids["VotingSystem"]
+        dao_address = encoding.encode_address(encoding.checksum(b"appID" + report.app_ids["ClimateDAO"].to_bytes(8, "big")))
+        state = VotingSystemClient(self.client, voting_id).global_state()
+        self.assertEqual(state["linked_dao"], encoding.decode_address(dao_address))
+        self.assertEqual(state["credit_token_id"], report.credit_token_id)
+
+        info = json.loads(self.deployment_file.read_text())
+        self.assertEqual(info["app_id"], report.app_ids["ClimateDAO"])
+        self.assertEqual(info["apps"]["VotingSystem"]["app_id"], voting_id)
+
+        sent = self.sent_count()
+        again = deploy_all(self.client, self.private_key, self.deployment_file, network="mocknet")
+        self.assertEqual(again.app_ids, report.app_ids)
+        self.assertEqual(sorted(again.unchanged), ["ClimateDAO", "ImpactAnalytics", "VotingSystem"])
+        self.assertFalse(again.tokens_created or again.linked)
+        self.assertEqual(self.sent_count(), sent)
+
+    def test_changed_program_is_updated_in_place(self):
+        """Differing on-chain bytecode triggers an update that keeps the app id"""
+        report = deploy_all(self.client, self.private_key, self.deployment_file, network="mocknet")
+        app_id = report.app_ids["ImpactAnalytics"]
+        self.ledger.apps[app_id]["params"]["approval-program"] = base64.b64encode(b"\x0a\x81\x01").decode()
+
+        again = deploy_all(self.client, self.private_key, self.deployment_file, network="mocknet")
+        self.assertEqual(again.updated, ["ImpactAnalytics"])
+        self.assertEqual(again.app_ids["ImpactAnalytics"], app_id)
+        approval = base64.b64decode(self.ledger.apps[app_id]["params"]["approval-program"])
+        self.assertEqual(approval, base64.b64decode(build.load_app_spec("ImpactAnalytics")["byteCode"]["approval"]))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
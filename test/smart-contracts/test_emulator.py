@@ -0,0 +1,322 @@
+"""
+Unit tests for the contract-backed mock algod
+Runs contract.py under algopy_testing behind the local mock algod server, no network required
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algosdk import account, encoding, transaction
+from algosdk.atomic_transaction_composer import AccountTransactionSigner, TransactionWithSigner
+from algosdk.error import AlgodHTTPError
+
+from smart_contracts import build, emulator, events
+from smart_contracts.climate_dao.client import (
+    ACTIVE_BOX,
+    LEGACY_DELEGATION_PREFIX,
+    LEGACY_INDEX_PREFIX,
+    MAX_ACTIVE_PROPOSALS,
+    VOTE_DATA_TYPE,
+    ClimateDAOClient,
+    DaoMember,
+    VotingSystemClient,
+    legacy_ballot_box,
+    member_box,
+    proposal_box,
+    votes_box,
+)
+from smart_contracts.climate_dao.contract import ClimateDAO, VotingSystem
+from smart_contracts.deploy import deploy_all
+from smart_contracts.emulator import EmulatedAlgod, payment
+from smart_contracts.mock_algod import MockAlgodServer
+from smart_contracts.reader import ReadError, SimulateReader
+from smart_contracts.transport import PooledAlgodClient
+
+VOTING_PERIOD = 7 * 24 * 3600
+
+
+class EmulatorTest(unittest.TestCase):
+    """Shared setup: an emulated ledger served over HTTP with blocks every 20ms"""
+
+    def setUp(self):
+        self.ledger = EmulatedAlgod()
+        self.server = MockAlgodServer(self.ledger, block_time=0.02).start()
+        self.algod_client = PooledAlgodClient("", self.server.address)
+        self.admin_key, self.admin = account.generate_account()
+
+    def tearDown(self):
+        self.algod_client.transport.close()
+        self.server.stop()
+        self.ledger.close()
+
+    def client(self, client_class, app_id, private_key=None):
+        private_key = private_key or self.admin_key
+        return client_class(self.algod_client, app_id, account.address_from_private_key(private_key), AccountTransactionSigner(private_key))
+
+
+class TestVotingFlow(EmulatorTest):
+    """Proposals, votes and finalization run the contract code through the REST endpoints"""
+
+    def setUp(self):
+        super().setUp()
+        self.app_id = self.ledger.deploy(VotingSystem, self.admin)
+        self.voting = self.client(VotingSystemClient, self.app_id)
+        self.voting.call("set_total_token_supply", [1_000_000_000])
+        self.members = [account.generate_account()[0] for _ in range(3)]
+        for key in self.members:
+            self.voting.register_member(account.address_from_private_key(key), 200_000_000)
+
+    def test_vote_and_finalize(self):
+        proposer = self.client(VotingSystemClient, self.app_id, self.members[0])
+        pid = proposer.submit_proposal("Mangroves", "Restore 40ha", 5000)
+        for key, choice in zip(self.members, (1, 1, 2)):
+            self.client(VotingSystemClient, self.app_id, key).vote(pid, choice, 50_000_000)
+
+        summary = self.voting.get_vote_summary(pid)
+        self.assertEqual((summary.yes_votes, summary.no_votes, summary.total_voters), (100_000_000, 50_000_000, 3))
+        self.assertEqual(self.ledger.get_global(self.app_id, "total_proposals"), 1)
+
+        self.ledger.warp(VOTING_PERIOD + 1)
+        self.assertEqual(self.voting.call("finalize", [pid]), 1)  # 15% turnout clears the 10% quorum
+        self.assertEqual(self.voting.get_proposal(pid).status, 1)
+
+    def test_rejected_group_leaves_no_trace(self):
+        voter = self.client(VotingSystemClient, self.app_id, self.members[1])
+        pid = self.client(VotingSystemClient, self.app_id, self.members[0]).submit_proposal("Solar", "", 100)
+        voter.vote(pid, 1, 10)
+        before = self.ledger.get_box(self.app_id, proposal_box(pid))
+        with self.assertRaises(AlgodHTTPError) as raised:
+            voter.vote(pid, 1, 10)
+        self.assertIn("logic eval error", str(raised.exception))
+        self.assertEqual(self.voting.get_vote_summary(pid).total_voters, 1)
+        self.assertEqual(self.ledger.get_box(self.app_id, proposal_box(pid)), before)
+
+    def test_simulated_reads_do_not_commit(self):
+        pid = self.client(VotingSystemClient, self.app_id, self.members[0]).submit_proposal("Wind", "", 100)
+        reader = SimulateReader(self.algod_client)
+        proposal, missing, voted = reader.read_many([
+            (self.voting, "get_proposal", [pid]),
+            (self.voting, "get_proposal", [pid + 1]),
+            (self.voting, "has_voted", [pid, account.address_from_private_key(self.members[0])]),
+        ], return_exceptions=True)
+        self.assertEqual(proposal[0], "Wind")
+        self.assertIsInstance(missing, ReadError)
+        self.assertFalse(voted)
+
+        # an uncommitted vote is evaluated, logs its event and is rolled back
+        voter = account.address_from_private_key(self.members[2])
+        args = [self.voting.method("vote").get_selector()] + [value.to_bytes(8, "big") for value in (pid, 1, 10)]
+        applied = self.ledger.evaluate([{"type": "appl", "snd": encoding.decode_address(voter), "apid": self.app_id, "apaa": args}], commit=False)
+        name, fields = events.decode_log(applied[0]["dt"]["lg"][0])
+        self.assertEqual((name, fields["voter"]), ("VoteCast", voter))
+        self.assertEqual(self.voting.get_vote_summary(pid).total_voters, 0)
+
+
+class TestMemberMigration(EmulatorTest):
+    """Member boxes written before the record layout are found and upgraded through the client"""
+
+    def test_upgrade_pre_record_state(self):
+        app_id = self.ledger.deploy(VotingSystem, self.admin)
+        voting = self.client(VotingSystemClient, app_id)
+        voting.register_member(self.admin, 200_000_000)
+        member_key, member = account.generate_account()
+        address = encoding.decode_address(member)
+        boxes = self.ledger.app_state(app_id).boxes
+        # an 8-byte balance box with the separate index and delegation boxes it had back then
+        boxes[member_box(member)] = (300_000_000).to_bytes(8, "big")
+        boxes[LEGACY_INDEX_PREFIX + address] = (1).to_bytes(8, "big")
+        boxes[LEGACY_DELEGATION_PREFIX + address] = bytes(72)
+        self.ledger.app_state(app_id).global_state[b"total_members"] = 2
+
+        self.assertEqual(voting.legacy_members(), [member])
+        voting.migrate_member(member)
+        self.assertEqual(voting.legacy_members(), [])
+        record = voting.get_member(member)
+        # the old layout never recorded when the member joined; the migration does not make it up
+        self.assertEqual((record.balance, record.index, record.joined), (300_000_000, 1, 0))
+        self.assertGreater(voting.get_member(self.admin).joined, 0)
+        self.assertNotIn(LEGACY_INDEX_PREFIX + address, self.ledger.box_names(app_id))
+
+        pid = voting.submit_proposal("Wetland", "Restore 12ha", 1000)
+        self.client(VotingSystemClient, app_id, member_key).vote(pid, 1, 10)
+        self.assertEqual(voting.voted_indexes(pid), [1])
+
+    def test_ballot_cast_before_an_upgrade_still_counts(self):
+        """A vrec_ ballot from the pre-bitmap app blocks a second vote on the same proposal"""
+        app_id = self.ledger.deploy(VotingSystem, self.admin)
+        voting = self.client(VotingSystemClient, app_id)
+        voting.register_member(self.admin, 200_000_000)
+        pid = voting.submit_proposal("Wetland", "Restore 12ha", 1000)
+        member_key, member = account.generate_account()
+        # what the old app left behind: a balance-only member box, its ballot and the tally
+        boxes = self.ledger.app_state(app_id).boxes
+        boxes[member_box(member)] = (300_000_000).to_bytes(8, "big")
+        boxes[legacy_ballot_box(pid, member)] = encoding.decode_address(member) + bytes(24)
+        boxes[votes_box(pid)] = VOTE_DATA_TYPE.encode([10, 0, 0, 1, 10])
+
+        sp = self.algod_client.suggested_params()
+        update = transaction.ApplicationUpdateTxn(self.admin, sp, app_id, b"\x0a\x81\x01", b"\x0a\x81\x01")
+        self.algod_client.send_transaction(update.sign(self.admin_key))
+        transaction.wait_for_confirmation(self.algod_client, update.get_txid(), 10)
+        voting.migrate_member(member)
+
+        with self.assertRaisesRegex(AlgodHTTPError, "already voted"):
+            self.client(VotingSystemClient, app_id, member_key).vote(pid, 1, 10)
+        self.assertEqual(voting.get_vote_summary(pid).total_voters, 1)
+
+    def test_open_proposals_are_capped(self):
+        """Once the active queue is full, submit_proposal fails with a clear reason instead of at resize"""
+        app_id = self.ledger.deploy(VotingSystem, self.admin)
+        voting = self.client(VotingSystemClient, app_id)
+        voting.register_member(self.admin, 200_000_000)
+        # open proposals ending long after anything submitted now
+        far = 2**40
+        self.ledger.app_state(app_id).boxes[ACTIVE_BOX] = b"".join(
+            (far + i).to_bytes(8, "big") + (10_000 + i).to_bytes(8, "big") for i in range(MAX_ACTIVE_PROPOSALS - 1)
+        )
+        pid = voting.submit_proposal("Mangroves", "Replant 3km of coast", 1000)
+        self.assertEqual(len(voting.active_proposals()), MAX_ACTIVE_PROPOSALS)
+        self.assertEqual(voting.active_proposals()[0][1], pid)
+        with self.assertRaisesRegex(AlgodHTTPError, "too many open proposals"):
+            voting.submit_proposal("Peatland", "Rewet 40ha", 1000)
+
+    def test_dao_member_box_grows_on_join(self):
+        """A ClimateDAO balance-only box becomes a DaoMemberRecord the next time its owner joins"""
+        dao_id = self.ledger.deploy(ClimateDAO, self.admin)
+        dao = self.client(ClimateDAOClient, dao_id)
+        self.ledger.call(dao_id, self.admin, "create_dao_tokens", [], txns=[payment(self.admin, dao.app_address, 2_000_000)])
+        _, member = account.generate_account()
+        self.ledger.app_state(dao_id).boxes[member_box(member)] = (500).to_bytes(8, "big")
+        self.assertEqual(dao.member_tokens(member), 500)
+        self.assertEqual(self.ledger.call(dao_id, member, "join_dao", [], txns=[payment(member, dao.app_address, 1_000_000)]), 1_000_500)
+        box = self.ledger.get_box(dao_id, member_box(member))
+        self.assertEqual((len(box), DaoMember.decode(box)), (16, DaoMember(1_000_500, 0)))
+
+
+class TestSnapshots(unittest.TestCase):
+    """A large fixture is built once; tests restore or fork it instead of rebuilding it"""
+
+    MEMBERS = 300
+    PROPOSALS = 20
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ledger = EmulatedAlgod()
+        _, cls.admin = account.generate_account()
+        cls.app_id = cls.ledger.deploy(VotingSystem, cls.admin)
+        cls.ledger.call(cls.app_id, cls.admin, "set_total_token_supply", [10_000_000_000])
+        cls.members = [account.generate_account()[1] for _ in range(cls.MEMBERS)]
+        for member in cls.members:
+            cls.ledger.call(cls.app_id, cls.admin, "register_member", [member, 200_000_000])
+        cls.pids = [cls.ledger.call(cls.app_id, cls.members[i], "submit_proposal", [f"P{i}", "", 100]) for i in range(cls.PROPOSALS)]
+        cls.base = cls.ledger.snapshot()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.ledger.close()
+
+    def setUp(self):
+        self.ledger.restore(self.base)
+
+    def summary(self, ledger, pid):
+        return ledger.call(self.app_id, self.admin, "get_vote_summary", [pid])
+
+    def test_restore_discards_changes(self):
+        for member in self.members[:50]:
+            self.ledger.call(self.app_id, member, "vote", [self.pids[0], 1, 10])
+        self.assertEqual(self.summary(self.ledger, self.pids[0])[3], 50)
+        self.ledger.restore(self.base)
+        self.assertEqual(self.summary(self.ledger, self.pids[0])[3], 0)
+        self.assertFalse(self.ledger.call(self.app_id, self.admin, "has_voted", [self.pids[0], self.members[0]]))
+
+    def test_forks_are_independent(self):
+        with self.ledger.fork(self.base) as fork:
+            fork.call(self.app_id, self.members[0], "vote", [self.pids[1], 1, 10])
+            self.ledger.call(self.app_id, self.members[0], "vote", [self.pids[1], 2, 10])
+            self.assertEqual(self.summary(fork, self.pids[1])[:2], [10, 0])
+            self.assertEqual(self.summary(self.ledger, self.pids[1])[:2], [0, 10])
+            # both hand out the same next ids
+            self.assertEqual(fork.call(self.app_id, self.members[2], "submit_proposal", ["Next", "", 1]), self.PROPOSALS + 1)
+            self.assertEqual(self.ledger.call(self.app_id, self.members[3], "submit_proposal", ["Next", "", 1]), self.PROPOSALS + 1)
+
+    def test_untested_algopy_testing_release_fails(self):
+        tested = emulator.TESTING_VERSIONS
+        emulator.TESTING_VERSIONS = ("0.0.",)
+        try:
+            with self.assertRaisesRegex(RuntimeError, "not supported by the emulator"):
+                EmulatedAlgod()
+        finally:
+            emulator.TESTING_VERSIONS = tested
+
+    def test_warp_closes_voting(self):
+        pid = self.pids[2]
+        for member in self.members[:10]:
+            self.ledger.call(self.app_id, member, "vote", [pid, 1, 100_000_000])
+        with self.assertRaises(ValueError):
+            self.ledger.call(self.app_id, self.admin, "finalize", [pid])
+        start = self.ledger.round
+        self.ledger.warp(VOTING_PERIOD + 1)
+        self.assertEqual(self.ledger.round, start + 1)
+        self.assertEqual(self.ledger.call(self.app_id, self.admin, "finalize", [pid]), 1)
+        with self.assertRaises(ValueError):
+            self.ledger.call(self.app_id, self.members[11], "vote", [self.pids[3], 1, 10])
+
+    def test_join_through_call(self):
+        dao_id = self.ledger.deploy(ClimateDAO, self.admin)
+        dao_address = encoding.encode_address(encoding.checksum(b"appID" + dao_id.to_bytes(8, "big")))
+        self.ledger.call(dao_id, self.admin, "create_dao_tokens", [], txns=[payment(self.admin, dao_address, 2_000_000)])
+        minted = self.ledger.call(dao_id, self.members[0], "join_dao", [], txns=[payment(self.members[0], dao_address, 1_000_000)])
+        self.assertEqual(minted, 1_000_000_000)
+        dao_token = self.ledger.get_global(dao_id, "dao_token_id")
+        self.assertEqual(self.ledger.received[(self.members[0], dao_token)], minted)
+        self.ledger.restore(self.base)
+        self.assertNotIn(dao_id, self.ledger.contracts)
+        self.assertNotIn((self.members[0], dao_token), self.ledger.received)
+
+
+class TestDeploy(EmulatorTest):
+    """Compiled artifacts deploy onto the emulator and the apps behave like the source"""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            build.build_all()
+        except RuntimeError as e:
+            raise unittest.SkipTest(f"puyapy unavailable: {e}")
+
+    def test_deploy_and_join(self):
+        self.ledger.add_account(self.admin, 100_000_000)
+        with tempfile.TemporaryDirectory() as tmp:
+            report = deploy_all(self.algod_client, self.admin_key, Path(tmp) / "deployment_info.json")
+        self.assertEqual(sorted(report.created), ["ClimateDAO", "ImpactAnalytics", "VotingSystem"])
+        self.assertTrue(report.tokens_created and report.linked)
+        self.assertNotEqual(report.dao_token_id, report.credit_token_id)
+
+        dao = self.client(ClimateDAOClient, report.app_ids["ClimateDAO"])
+        sp = self.algod_client.suggested_params()
+        pay = TransactionWithSigner(transaction.PaymentTxn(self.admin, sp, dao.app_address, 1_000_000), dao.signer)
+        self.assertEqual(dao.join_dao(pay), 1_000_000_000)
+        self.assertEqual(dao.member_tokens(self.admin), 1_000_000_000)
+
+    def test_linked_dao_can_register_members(self):
+        """The deploy links the DAO by its 32-byte address, which register_member checks the sender against"""
+        self.ledger.add_account(self.admin, 100_000_000)
+        with tempfile.TemporaryDirectory() as tmp:
+            report = deploy_all(self.algod_client, self.admin_key, Path(tmp) / "deployment_info.json")
+        voting_id = report.app_ids["VotingSystem"]
+        dao_address = ClimateDAOClient(self.algod_client, report.app_ids["ClimateDAO"]).app_address
+        _, member = account.generate_account()
+        self.ledger.call(voting_id, dao_address, "register_member", [member, 5])
+        self.assertEqual(VotingSystemClient(self.algod_client, voting_id).get_member(member).balance, 5)
+        _, outsider = account.generate_account()
+        with self.assertRaises(Exception):
+            self.ledger.call(voting_id, outsider, "register_member", [member, 6])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
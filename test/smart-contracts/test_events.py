@@ -0,0 +1,108 @@
+"""
+Unit tests for the ARC-28 event decoder
+Checks the signatures against the compiled app specs and streams events from the local mock algod
+"""
+
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algosdk import account
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from smart_contracts import build
+from smart_contracts.climate_dao.client import VotingSystemClient
+from smart_contracts.emulator import EmulatedAlgod, voting_fixture
+from smart_contracts.events import EVENTS, EventStream, decode_log, encode_event, events_in_block, signature
+from smart_contracts.keeper import Keeper
+from smart_contracts.mock_algod import MockAlgodServer
+from smart_contracts.transport import PooledAlgodClient
+
+VOTING_PERIOD = 7 * 24 * 3600
+
+
+class TestEventCodec(unittest.TestCase):
+    """Event logs round-trip and are found in blocks, inner transactions included"""
+
+    def test_signatures_match_app_specs(self):
+        """Every event the contracts emit is declared here with the same types"""
+        try:
+            build.build_all()
+        except RuntimeError as e:
+            self.skipTest(f"puyapy unavailable: {e}")
+        compiled = set()
+        for contract in build.CONTRACTS["climate_dao"]:
+            for event in build.load_app_spec(contract).get("events", []):
+                compiled.add(f"{event['name']}({','.join(arg['type'] for arg in event['args'])})")
+        self.assertEqual(compiled, {signature(name) for name in EVENTS})
+
+    def test_round_trip(self):
+        _, member = account.generate_account()
+        raw = encode_event("VoteCast", proposal_id=7, voter=member, choice=2, power=40)
+        self.assertEqual(decode_log(raw), ("VoteCast", {"proposal_id": 7, "voter": member, "choice": 2, "power": 40}))
+        self.assertIsNone(decode_log(bytes.fromhex("151f7c75") + (7).to_bytes(8, "big")))
+
+    def test_events_in_block(self):
+        """Outer and inner logs are attributed to the app that logged them"""
+        _, member = account.generate_account()
+        joined = encode_event("MemberJoined", member=member, minted=5, balance=5)
+        registered = encode_event("MemberRegistered", member=member, tokens=5, index=0)
+        block = {"rnd": 12, "txns": [
+            {"txn": {"type": "pay"}},
+            {"txn": {"type": "appl", "apid": 10}, "dt": {
+                "lg": [joined, bytes.fromhex("151f7c75") + (5).to_bytes(8, "big")],
+                "itx": [{"txn": {"type": "appl", "apid": 20}, "dt": {"lg": [registered]}}],
+            }},
+        ]}
+        events = events_in_block(block)
+        self.assertEqual([(e.name, e.app_id, e.round, e.txn_index, e.log_index) for e in events], [
+            ("MemberJoined", 10, 12, 1, 0),
+            ("MemberRegistered", 20, 12, 1, 1),
+        ])
+        self.assertEqual([e.name for e in events_in_block(block, {20})], ["MemberRegistered"])
+        self.assertEqual(events[0]["balance"], 5)
+
+
+class TestEventStream(unittest.TestCase):
+    """The keeper's settlement shows up as events, one block read per round"""
+
+    def setUp(self):
+        self.ledger = EmulatedAlgod()
+        self.private_key, self.sender = account.generate_account()
+        self.app_id, self.proposers = voting_fixture(self.ledger, self.sender, [(2500, 300, 10), (2500, 20, 200)])
+        self.server = MockAlgodServer(self.ledger, block_time=0.05).start()
+        self.algod_client = PooledAlgodClient("", self.server.address)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.algod_client.transport.close()
+        self.server.stop()
+        self.ledger.close()
+        self.tmp.cleanup()
+
+    def test_stream_follows_settlement(self):
+        self.ledger.warp(VOTING_PERIOD + 1)
+        start = self.ledger.round + 1
+        client = VotingSystemClient(self.algod_client, self.app_id, self.sender, AccountTransactionSigner(self.private_key))
+        asyncio.run(Keeper(client, Path(self.tmp.name) / "checkpoint.json").run(rounds=4))
+
+        stream = EventStream(self.algod_client, {self.app_id}, start)
+        events = stream.poll()
+        self.assertEqual([(e.name, e["proposal_id"]) for e in events], [
+            ("ProposalFinalized", 1), ("ProposalFinalized", 2), ("CreditsAwarded", 1),
+        ])
+        self.assertEqual(events[0]["status"], 1)
+        self.assertEqual(events[1]["status"], 2)
+        self.assertEqual(events[2]["receiver"], self.proposers[0])
+        self.assertEqual(stream.blocks_read, stream.next_round - start)
+        self.assertEqual(stream.poll(), [])
+        self.assertEqual(EventStream(self.algod_client, {999}, start).poll(), [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
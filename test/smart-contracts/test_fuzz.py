@@ -0,0 +1,45 @@
+"""
+Unit tests for the model-based contract fuzzer
+Short seeded runs of fuzz_contracts.py against the in-process contracts, no network required
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fuzz_contracts import Fuzzer, FuzzFailure, Model
+
+
+class QuorumlessModel(Model):
+    """A model with a wrong quorum rule, which the fuzzer has to catch"""
+
+    QUORUM_PERCENT = 0
+
+
+class TestFuzzer(unittest.TestCase):
+    """Seeded runs agree with the reference model and divergences are reported"""
+
+    def run_fuzzer(self, ops, **kwargs):
+        fuzzer = Fuzzer(seed=11, check_every=100, **kwargs)
+        try:
+            return fuzzer.run(ops)
+        finally:
+            fuzzer.close()
+
+    def test_contracts_match_model(self):
+        counts = self.run_fuzzer(600)
+        for name in ("join_dao", "register_member", "delegate", "undelegate", "submit_proposal", "vote", "finalize"):
+            self.assertGreater(counts[f"{name} ok"], 0, name)
+            self.assertGreater(counts[f"{name} rejected"], 0, name)
+
+    def test_divergence_is_reported_with_its_seed(self):
+        with self.assertRaises(FuzzFailure) as raised:
+            self.run_fuzzer(2000, model_class=QuorumlessModel)
+        self.assertIn("seed 11: finalize", str(raised.exception))
+        self.assertIn("last operations", str(raised.exception))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,146 @@
+"""
+Unit tests for the settlement keeper
+Runs contract.py on the emulated ledger behind the local mock algod server, no network required
+"""
+
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algosdk import account
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from smart_contracts.climate_dao.client import Proposal, VotingSystemClient, awarded_box, proposal_box
+from smart_contracts.emulator import EmulatedAlgod, voting_fixture
+from smart_contracts.keeper import Checkpoint, Keeper
+from smart_contracts.mock_algod import MockAlgodServer
+from smart_contracts.submitter import TransactionSubmitter
+from smart_contracts.transport import PooledAlgodClient
+
+VOTING_PERIOD = 7 * 24 * 3600
+CREDIT_TOKEN = 9000
+
+
+class TestKeeper(unittest.TestCase):
+    """Expired proposals are finalized, approved ones awarded exactly once"""
+
+    def setUp(self):
+        self.ledger = EmulatedAlgod()
+        self.private_key, self.sender = account.generate_account()
+        tallies = [(2500, 300, 10), (2500, 20, 200), (2500, 5, 0), (2500, 150, 40)]
+        self.app_id, self.proposers = voting_fixture(self.ledger, self.sender, tallies, credit_token_id=CREDIT_TOKEN)
+        self.server = MockAlgodServer(self.ledger, block_time=0.05).start()
+        self.algod_client = PooledAlgodClient("", self.server.address)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.checkpoint = Path(self.tmp.name) / "keeper_checkpoint.json"
+
+    def tearDown(self):
+        self.algod_client.transport.close()
+        self.server.stop()
+        self.ledger.close()
+        self.tmp.cleanup()
+
+    def keeper(self, **kwargs):
+        client = VotingSystemClient(self.algod_client, self.app_id, self.sender, AccountTransactionSigner(self.private_key))
+        return Keeper(client, self.checkpoint, **kwargs)
+
+    def status(self, pid):
+        return Proposal.decode(self.ledger.get_box(self.app_id, proposal_box(pid))).status
+
+    def awarded(self, pid):
+        return int.from_bytes(self.ledger.get_box(self.app_id, awarded_box(pid)) or b"", "big")
+
+    def credits(self):
+        """Credit tokens each proposer received"""
+        return [self.ledger.received.get((proposer, CREDIT_TOKEN), 0) for proposer in self.proposers]
+
+    def wait_for_expiry(self):
+        self.ledger.warp(VOTING_PERIOD + 1)
+
+    def test_finalizes_and_awards(self):
+        """Statuses follow the tally and each approved proposal gets one transfer"""
+        keeper = self.keeper(batch_size=3)
+        self.wait_for_expiry()
+        asyncio.run(keeper.run(rounds=4))
+
+        self.assertEqual([self.status(pid) for pid in range(1, 5)], [1, 2, 3, 1])
+        self.assertEqual(self.credits(), [2500, 0, 0, 2500])
+        self.assertEqual(keeper.stats["finalized"], 4)
+        self.assertEqual(keeper.stats["awarded"], 2)
+
+        saved = Checkpoint.load(self.checkpoint)
+        self.assertEqual(sorted(saved.awarded), [1, 4])
+        self.assertEqual(saved.approved, [])
+        self.assertEqual(saved.pending, [])
+        self.assertGreaterEqual(saved.round, self.ledger.round - 1)
+
+    def test_restart_does_not_award_twice(self):
+        """A group sent before a crash is found on chain instead of being rebuilt"""
+        keeper = self.keeper()
+        self.wait_for_expiry()
+
+        async def crash_after_send():
+            async with TransactionSubmitter(self.algod_client) as submitter:
+                keeper.submitter = submitter
+                await keeper.finalize([1, 2, 3, 4])
+                # compose and record the award group, send it, then "crash" before confirmation
+                [(chunk, signed)] = keeper._compose_awards(list(keeper.checkpoint.approved))
+                keeper._record_pending(chunk, signed)
+                keeper.checkpoint.save(self.checkpoint)
+                await (await submitter.submit(signed))
+
+        asyncio.run(crash_after_send())
+        self.assertEqual(self.credits(), [2500, 0, 0, 2500])
+
+        restarted = self.keeper()
+        self.assertEqual(len(restarted.checkpoint.pending), 1)
+        asyncio.run(restarted.run(rounds=2))
+        self.assertEqual(self.credits(), [2500, 0, 0, 2500])
+        self.assertEqual(sorted(restarted.checkpoint.awarded), [1, 4])
+        self.assertEqual(restarted.checkpoint.pending, [])
+
+    def test_unsent_pending_group_is_resent(self):
+        """A recorded group that never reached the network is sent with the same bytes"""
+        keeper = self.keeper()
+        self.wait_for_expiry()
+
+        async def finalize_only():
+            async with TransactionSubmitter(self.algod_client) as submitter:
+                keeper.submitter = submitter
+                await keeper.finalize([1, 2, 3, 4])
+
+        asyncio.run(finalize_only())
+        [(chunk, signed)] = keeper._compose_awards(list(keeper.checkpoint.approved))
+        txids = [stxn.get_txid() for stxn in signed]
+        keeper._record_pending(chunk, signed)
+        keeper.checkpoint.save(self.checkpoint)
+
+        restarted = self.keeper()
+        asyncio.run(restarted.run(rounds=2))
+        self.assertEqual(self.credits(), [2500, 0, 0, 2500])
+        self.assertEqual(sorted(restarted.checkpoint.awarded), [1, 4])
+        committed = {entry["txid"] for block in self.ledger.blocks.values() for entry in block}
+        self.assertLessEqual(set(txids), committed)
+
+    def test_lost_checkpoint_does_not_award_twice(self):
+        """Without a checkpoint the on-chain awarded_ ledger shows nothing is due"""
+        self.wait_for_expiry()
+        asyncio.run(self.keeper().run(rounds=4))
+        self.assertEqual(self.credits(), [2500, 0, 0, 2500])
+
+        self.checkpoint.unlink()
+        fresh = self.keeper()
+        fresh.checkpoint.approved = [1, 4]
+        asyncio.run(fresh.run(rounds=1))
+        self.assertEqual(self.credits(), [2500, 0, 0, 2500])
+        self.assertEqual([self.awarded(pid) for pid in range(1, 5)], [2500, 0, 0, 2500])
+        self.assertEqual(sorted(fresh.checkpoint.awarded), [1, 4])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,155 @@
+"""
+Unit tests for the live tally streams
+Votes go through the contract on the emulated ledger; watchers follow them through the mirror
+"""
+
+import asyncio
+import json
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algosdk import account
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from smart_contracts.api import ReadAPI
+from smart_contracts.climate_dao.client import VotingSystemClient
+from smart_contracts.climate_dao.contract import VotingSystem
+from smart_contracts.emulator import EmulatedAlgod
+from smart_contracts.live import StreamingAPIServer, TallyHub
+from smart_contracts.mirror import ChainMirror
+from smart_contracts.mock_algod import MockAlgodServer
+from smart_contracts.transport import PooledAlgodClient
+
+
+def parse_events(data: bytes) -> list[dict]:
+    events = []
+    for block in data.decode().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and not line.startswith(":"))
+        if fields.get("event") == "tally":
+            events.append(json.loads(fields["data"]))
+    return events
+
+
+class TestLiveTallies(unittest.TestCase):
+    """Two proposals, three voters"""
+
+    def setUp(self):
+        self.ledger = EmulatedAlgod()
+        self.server = MockAlgodServer(self.ledger, block_time=0.02).start()
+        self.algod_client = PooledAlgodClient("", self.server.address)
+        start_round = self.ledger.round + 1
+        admin_key, admin = account.generate_account()
+        self.app_id = self.ledger.deploy(VotingSystem, admin)
+        admin_client = self.client(admin_key)
+        admin_client.call("set_total_token_supply", [1_000_000_000])
+        self.keys = [account.generate_account()[0] for _ in range(3)]
+        for key in self.keys:
+            admin_client.register_member(account.address_from_private_key(key), 200_000_000)
+        self.pids = [self.client(self.keys[0]).submit_proposal(title, "", 100) for title in ("Kelp", "Peat")]
+
+        self.voting = VotingSystemClient(self.algod_client, self.app_id)
+        self.summary_reads = 0
+        get_vote_summary = self.voting.get_vote_summary
+
+        def counted(pid):
+            self.summary_reads += 1
+            return get_vote_summary(pid)
+
+        self.voting.get_vote_summary = counted
+        self.mirror = ChainMirror(self.voting, start_round=start_round)
+        self.mirror.sync()
+
+    def tearDown(self):
+        self.algod_client.transport.close()
+        self.server.stop()
+        self.ledger.close()
+
+    def client(self, private_key):
+        return VotingSystemClient(self.algod_client, self.app_id, account.address_from_private_key(private_key), AccountTransactionSigner(private_key))
+
+    def test_fan_out_costs_one_read_per_round(self):
+        async def scenario():
+            hub = TallyHub(self.mirror)
+            kelp = [hub.subscribe([self.pids[0]]) for _ in range(2000)]
+            peat = [hub.subscribe([self.pids[1]]) for _ in range(10)]
+            everything = hub.subscribe()
+            self.assertEqual(len(await kelp[0].next()), 1)  # current tally on subscribe
+            self.assertEqual(len(await everything.next()), 2)
+            for watcher in kelp[1:] + peat:
+                await watcher.next()
+
+            self.client(self.keys[1]).vote(self.pids[0], 1, 5)
+            self.client(self.keys[2]).vote(self.pids[0], 2, 3)
+            reads = self.summary_reads
+            hub.publish(self.mirror.sync())
+            self.assertLessEqual(self.summary_reads - reads, 2)  # one per round with a vote, not per watcher
+
+            messages = [await watcher.next() for watcher in kelp]
+            self.assertTrue(all(len(m) == 1 and m[0] is messages[0][0] for m in messages))  # encoded once
+            tally = parse_events(messages[0][0])[0]
+            self.assertEqual((tally["yes_votes"], tally["no_votes"], tally["delta"]["total_voters"]), (5, 3, 2))
+            self.assertEqual(parse_events((await everything.next())[0]), [tally])
+            self.assertEqual(await peat[0].next(timeout=0.01), [])
+            self.assertEqual(hub.stats["deliveries"], 2001)
+
+            for watcher in kelp + peat + [everything]:
+                hub.unsubscribe(watcher)
+            self.assertEqual(hub.watchers, 0)
+
+        asyncio.run(scenario())
+
+    def test_slow_watcher_gets_the_latest_tally(self):
+        async def scenario():
+            hub = TallyHub(self.mirror)
+            watcher = hub.subscribe([self.pids[0]])
+            for key in self.keys[1:]:
+                self.client(key).vote(self.pids[0], 1, 4)
+                hub.publish(self.mirror.sync())
+            tallies = parse_events(b"".join(await watcher.next()))
+            self.assertEqual([(t["yes_votes"], t["delta"]["yes_votes"]) for t in tallies], [(8, 4)])
+
+        asyncio.run(scenario())
+
+    def test_first_delta_counts_from_the_hub_start(self):
+        async def scenario():
+            self.client(self.keys[1]).vote(self.pids[0], 1, 6)
+            self.mirror.sync()
+            hub = TallyHub(self.mirror)
+            watcher = hub.subscribe([self.pids[0]])
+            await watcher.next()
+            self.client(self.keys[2]).vote(self.pids[0], 1, 2)
+            hub.publish(self.mirror.sync())
+            tally = parse_events((await watcher.next())[0])[0]
+            self.assertEqual((tally["yes_votes"], tally["delta"]["yes_votes"], tally["delta"]["total_voters"]), (8, 2, 1))
+
+        asyncio.run(scenario())
+
+    def test_sse_endpoint(self):
+        async def read_until(reader, count):
+            data = b""
+            while len(parse_events(data)) < count:
+                data += await asyncio.wait_for(reader.read(4096), 5)
+            return data
+
+        async def scenario(address):
+            host, port = address.removeprefix("http://").split(":")
+            reader, writer = await asyncio.open_connection(host, int(port))
+            writer.write(f"GET /api/proposals/{self.pids[0]}/stream HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+            await writer.drain()
+            data = await read_until(reader, 1)
+            self.assertIn(b"Content-Type: text/event-stream", data)
+            await asyncio.to_thread(self.client(self.keys[1]).vote, self.pids[0], 0, 9)
+            tally = parse_events(data + await read_until(reader, 1))[-1]
+            self.assertEqual((tally["abstain_votes"], tally["delta"]["abstain_votes"]), (9, 9))
+            writer.close()
+
+        with StreamingAPIServer(ReadAPI(self.mirror), TallyHub(self.mirror), sync_interval=0.02, heartbeat=0.05) as server:
+            asyncio.run(scenario(server.address))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,96 @@
+"""
+Unit tests for the suggested-params cache
+Runs against the local mock algod server, no network required
+"""
+
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from smart_contracts.mock_algod import MockAlgodServer
+from smart_contracts import params_cache
+from smart_contracts.params_cache import SuggestedParamsCache
+from smart_contracts.transport import PooledAlgodClient
+
+
+class TestSuggestedParamsCache(unittest.TestCase):
+    """Params are fetched once per round and handed out with valid windows"""
+
+    def setUp(self):
+        self.server = MockAlgodServer(block_time=0.05).start()
+        self.ledger = self.server.ledger
+        self.client = PooledAlgodClient("", self.server.address)
+
+    def tearDown(self):
+        self.client.transport.close()
+        self.server.stop()
+
+    def params_requests(self):
+        return self.ledger.paths.count("/v2/transactions/params")
+
+    def test_no_network_per_transaction(self):
+        """Thousands of gets cost a single params request"""
+        cache = SuggestedParamsCache(self.client)
+        for _ in range(1000):
+            sp = cache.get()
+        self.assertEqual(self.params_requests(), 1)
+        self.assertEqual(sp.last - sp.first, 1000)
+        self.assertEqual(sp.gen, "mocknet-v1")
+
+    def test_copies_are_private(self):
+        """Callers can tweak fees without affecting other callers"""
+        cache = SuggestedParamsCache(self.client, validity=10)
+        sp = cache.get()
+        sp.fee = 5000
+        sp.flat_fee = True
+        again = cache.get(validity=5)
+        self.assertFalse(again.flat_fee)
+        self.assertEqual(again.last - again.first, 5)
+        with self.assertRaises(ValueError):
+            cache.get(validity=1001)
+
+    def test_background_refresh_follows_rounds(self):
+        """The watcher thread refreshes as rounds advance"""
+        with SuggestedParamsCache(self.client) as cache:
+            start = cache.get().first
+            time.sleep(0.4)
+            latest = cache.get()
+        self.assertGreater(latest.first, start)
+        self.assertEqual(latest.last, latest.first + 1000)
+        self.assertLessEqual(latest.first, self.ledger.round)
+        # at most one refresh per produced round
+        self.assertLessEqual(cache.refreshes, self.ledger.round - start + 1)
+
+    def test_ttl_refresh_without_thread(self):
+        """With a TTL and no thread, stale params are refetched lazily"""
+        cache = SuggestedParamsCache(self.client, ttl=0.05)
+        cache.get()
+        cache.get()
+        self.assertEqual(self.params_requests(), 1)
+        time.sleep(0.1)
+        cache.get()
+        self.assertEqual(self.params_requests(), 2)
+
+    def test_default_refresh_follows_rounds_without_thread(self):
+        """With neither a TTL nor a thread, the window and fees still follow the chain about once a block"""
+        cache = SuggestedParamsCache(self.client, validity=100)
+        with mock.patch.object(params_cache, "DEFAULT_TTL", 0.1):
+            seen = []
+            for _ in range(4):
+                sp = cache.get()
+                seen.append(sp.first)
+                self.assertEqual(sp.last, sp.first + 100)
+                self.assertLessEqual(self.ledger.round - sp.first, 3)
+                time.sleep(0.15)
+        self.assertEqual(seen, sorted(seen))
+        self.assertGreater(seen[-1], seen[0])
+        self.assertEqual(self.params_requests(), 4)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
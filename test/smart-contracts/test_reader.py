@@ -0,0 +1,75 @@
+"""
+Unit tests for batched readonly calls
+Simulates against contract.py on the emulated ledger behind the local mock algod server, no network required
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algosdk import account
+
+from smart_contracts.climate_dao.client import VotingSystemClient
+from smart_contracts.emulator import EmulatedAlgod, voting_fixture
+from smart_contracts.mock_algod import MockAlgodServer
+from smart_contracts.reader import ReadError, SimulateReader
+from smart_contracts.transport import PooledAlgodClient
+
+
+class TestSimulateReader(unittest.TestCase):
+    """Readonly calls share simulate requests and get their own results back"""
+
+    def setUp(self):
+        self.ledger = EmulatedAlgod()
+        _, admin = account.generate_account()
+        app_id, self.proposers = voting_fixture(self.ledger, admin, [(100 * pid, pid, 1) for pid in range(1, 21)])
+        self.server = MockAlgodServer(self.ledger).start()
+        self.algod_client = PooledAlgodClient("", self.server.address)
+        self.voting = VotingSystemClient(self.algod_client, app_id)
+        self.reader = SimulateReader(self.algod_client)
+
+    def tearDown(self):
+        self.algod_client.transport.close()
+        self.server.stop()
+        self.ledger.close()
+
+    def test_read_many_batches_by_group(self):
+        """20 proposals and 20 tallies take 3 simulate requests"""
+        calls = [(self.voting, "get_proposal", [pid]) for pid in range(1, 21)]
+        calls += [(self.voting, "get_vote_summary", [pid]) for pid in range(1, 21)]
+        results = self.reader.read_many(calls)
+        self.assertEqual(self.ledger.simulations, 3)
+        self.assertEqual([p[2] for p in results[:20]], [100 * pid for pid in range(1, 21)])
+        self.assertEqual(results[3][3], self.proposers[3])
+        self.assertEqual([v[0] for v in results[20:]], list(range(1, 21)))
+
+    def test_failed_call_fails_alone(self):
+        """An unknown proposal fails; the rest of its batch still resolves, duplicates share a slot"""
+        calls = [(self.voting, "get_proposal", [1]), (self.voting, "get_proposal", [99]),
+                 (self.voting, "get_awarded", [2]), (self.voting, "get_proposal", [1])]
+        results = self.reader.read_many(calls, return_exceptions=True)
+        self.assertIsInstance(results[1], ReadError)
+        self.assertEqual(results[0], results[3])
+        self.assertEqual(results[2], 0)
+        self.assertEqual(self.reader.stats["coalesced"], 1)
+        self.assertEqual(self.ledger.simulations, 2)
+        with self.assertRaises(ReadError):
+            self.reader.read_one(self.voting, "get_proposal", [99])
+
+    def test_concurrent_reads_coalesce(self):
+        """40 concurrent reads go out as full batches"""
+        async def read_all():
+            return await asyncio.gather(*(self.reader.read(self.voting, "get_vote_summary", [pid % 20 + 1]) for pid in range(40)))
+
+        results = asyncio.run(read_all())
+        self.assertEqual([v[0] for v in results], [pid % 20 + 1 for pid in range(40)])
+        self.assertEqual(self.ledger.simulations, 3)
+        self.assertEqual(self.reader.stats["reads"], 40)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,61 @@
+"""
+Unit tests for the multi-process signing pool
+Signatures are compared with algosdk's own (ed25519 signatures are deterministic)
+"""
+
+import base64
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algosdk import account, encoding, mnemonic, transaction
+from algosdk.atomic_transaction_composer import AtomicTransactionComposer, TransactionWithSigner
+
+from smart_contracts.signing import SigningPool
+
+SP = transaction.SuggestedParams(1000, 100, 1100, base64.b64encode(bytes(32)).decode(), "mocknet-v1", flat_fee=True)
+
+
+class TestSigningPool(unittest.TestCase):
+    """Batches are split over workers and come back signed, in order"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.accounts = [account.generate_account() for _ in range(3)]
+        cls.pool = SigningPool.from_mnemonics([mnemonic.from_private_key(key) for key, _ in cls.accounts], processes=2, chunk_size=16)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def test_matches_inline_signing(self):
+        txns = []
+        for i in range(100):
+            key, sender = self.accounts[i % 3]
+            txns.append((key, transaction.PaymentTxn(sender, SP, self.accounts[0][1], i, note=i.to_bytes(2, "big"))))
+        signed = self.pool.sign([txn for _, txn in txns])
+        expected = [base64.b64decode(encoding.msgpack_encode(txn.sign(key))) for key, txn in txns]
+        self.assertEqual(signed, expected)
+
+    def test_signer_in_composer(self):
+        """A group signed through the pool is what the accounts' own signers produce"""
+        (key_a, a), (key_b, b) = self.accounts[:2]
+        signer = self.pool.signer()
+        atc = AtomicTransactionComposer()
+        atc.add_transaction(TransactionWithSigner(transaction.PaymentTxn(a, SP, b, 1), signer))
+        atc.add_transaction(TransactionWithSigner(transaction.PaymentTxn(b, SP, a, 2), signer))
+        group = atc.gather_signatures()
+        txns = [stxn.transaction for stxn in group]
+        self.assertEqual([stxn.signature for stxn in group], [txns[0].sign(key_a).signature, txns[1].sign(key_b).signature])
+
+    def test_unknown_sender(self):
+        _, stranger = account.generate_account()
+        with self.assertRaises(ValueError):
+            self.pool.sign([transaction.PaymentTxn(stranger, SP, stranger, 0)])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,161 @@
+"""
+Unit tests for the pipelined transaction submitter
+Runs against the local mock algod server, no network required
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algosdk import account, error, transaction
+
+from smart_contracts.mock_algod import MockAlgodServer
+from smart_contracts.submitter import TransactionExpiredError, TransactionSubmitter, submit_and_confirm
+from smart_contracts.transport import PooledAlgodClient
+
+
+class TestTransactionSubmitter(unittest.TestCase):
+    """Submission with bounded concurrency, confirmed by watching rounds"""
+
+    def setUp(self):
+        self.server = MockAlgodServer(block_time=0.02).start()
+        self.ledger = self.server.ledger
+        self.client = PooledAlgodClient("", self.server.address)
+        self.private_key, self.sender = account.generate_account()
+        _, self.receiver = account.generate_account()
+
+    def tearDown(self):
+        self.client.transport.close()
+        self.server.stop()
+
+    def payment(self, amount, sp=None):
+        sp = sp or self.client.suggested_params()
+        return transaction.PaymentTxn(self.sender, sp, self.receiver, amount).sign(self.private_key)
+
+    def test_confirms_stream_without_per_txid_polling(self):
+        """Every txn confirms and no pending_transaction_info polling happens"""
+        sp = self.client.suggested_params()
+        signed = [self.payment(i, sp) for i in range(1, 51)]
+        confirmed = []
+
+        async def run():
+            async with TransactionSubmitter(self.client, max_in_flight=8) as submitter:
+                results = await submitter.submit_all(signed, callback=lambda txid, result, exc: confirmed.append(txid))
+                return results, submitter.stats
+
+        results, stats = asyncio.run(run())
+        self.assertEqual([r["txid"] for r in results], [s.get_txid() for s in signed])
+        self.assertTrue(all(r["confirmed-round"] > 0 for r in results))
+        self.assertEqual(len(confirmed), 50)
+        self.assertEqual(stats["confirmed"], 50)
+        self.assertFalse(any(path.startswith("/v2/transactions/pending") for path in self.ledger.paths))
+        # one txid listing per watched round, never one per transaction
+        txid_reads = sum(1 for path in self.ledger.paths if path.endswith("/txids"))
+        self.assertEqual(txid_reads, stats["rounds_watched"])
+        self.assertLess(txid_reads, 50)
+
+    def test_in_flight_is_bounded(self):
+        """No more than max_in_flight groups await confirmation at once"""
+        sp = self.client.suggested_params()
+        signed = [self.payment(i, sp) for i in range(1, 21)]
+        peak = [0]
+
+        async def run():
+            async with TransactionSubmitter(self.client, max_in_flight=3) as submitter:
+                futures = []
+                for stxn in signed:
+                    futures.append(await submitter.submit(stxn))
+                    peak[0] = max(peak[0], len(submitter._pending))
+                await asyncio.gather(*futures)
+
+        asyncio.run(run())
+        self.assertLessEqual(peak[0], 3)
+
+    def test_group_apply_data(self):
+        """Groups confirm together and created app ids come back without extra lookups"""
+        sp = self.client.suggested_params()
+        create = transaction.ApplicationCreateTxn(
+            self.sender, sp, transaction.OnComplete.NoOpOC, b"\x0a\x81\x01", b"\x0a\x81\x01",
+            transaction.StateSchema(0, 0), transaction.StateSchema(0, 0),
+        )
+        pay = transaction.PaymentTxn(self.sender, sp, self.receiver, 1)
+        group = transaction.assign_group_id([create, pay])
+        signed = [txn.sign(self.private_key) for txn in group]
+
+        results = submit_and_confirm(self.client, [signed])
+        self.assertGreaterEqual(results[0]["application-index"], 1001)
+
+    def test_expired_transactions_fail(self):
+        """Transactions that never land fail once their last valid round passes"""
+        self.ledger.max_block_txns = 0
+        sp = self.client.suggested_params()
+        sp.last = sp.first + 3
+
+        async def run():
+            async with TransactionSubmitter(self.client) as submitter:
+                future = await submitter.submit(self.payment(1, sp))
+                with self.assertRaises(TransactionExpiredError):
+                    await future
+
+        asyncio.run(run())
+
+    def test_rejected_submission_fails_future(self):
+        """Errors from algod resolve the future with the error and free the slot"""
+        stxn = self.payment(1)
+
+        async def run():
+            async with TransactionSubmitter(self.client, max_in_flight=1) as submitter:
+                self.ledger.fail_next, self.ledger.fail_status = 1, 400
+                future = await submitter.submit(stxn)
+                with self.assertRaises(error.AlgodHTTPError):
+                    await future
+                await asyncio.wait_for(submitter.submit(self.payment(2)), 5)  # the slot was released
+
+        asyncio.run(run())
+
+    def test_connection_errors_fail_the_whole_group(self):
+        """Any send failure settles every txid of the group, not only algod rejections"""
+        sp = self.client.suggested_params()
+        group = [txn.sign(self.private_key) for txn in transaction.assign_group_id([
+            transaction.PaymentTxn(self.sender, sp, self.receiver, 1),
+            transaction.PaymentTxn(self.sender, sp, self.receiver, 2),
+        ])]
+
+        def unreachable(*args, **kwargs):
+            raise ConnectionResetError("connection reset by peer")
+
+        settled = {}
+
+        async def run():
+            async with TransactionSubmitter(self.client, max_in_flight=1) as submitter:
+                self.client.send_transactions = unreachable
+                future = await submitter.submit(group, callback=lambda txid, result, exc: settled.update({txid: exc}))
+                with self.assertRaises(ConnectionResetError):
+                    await future
+                self.assertEqual(submitter._pending, {})
+                self.assertEqual(submitter.stats["failed"], 2)
+
+        asyncio.run(run())
+        self.assertEqual(set(settled), {stxn.get_txid() for stxn in group})
+        self.assertTrue(all(isinstance(exc, ConnectionResetError) for exc in settled.values()))
+
+    def test_duplicate_submission_reuses_the_future(self):
+        """Submitting a pending transaction again neither resends it nor takes a second slot"""
+        stxn = self.payment(1)
+
+        async def run():
+            async with TransactionSubmitter(self.client, max_in_flight=1) as submitter:
+                first = await submitter.submit(stxn)
+                second = await asyncio.wait_for(submitter.submit(stxn), 5)
+                self.assertIs(first, second)
+                await first
+
+        asyncio.run(run())
+        self.assertEqual(self.ledger.paths.count("/v2/transactions"), 1)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
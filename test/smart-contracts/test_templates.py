@@ -0,0 +1,93 @@
+"""
+Unit tests for pre-encoded transaction templates
+Checks the bytes against algosdk's own encoding and submits through the local mock algod
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+import base64
+
+from algosdk import account, encoding, transaction
+from algosdk.atomic_transaction_composer import AccountTransactionSigner, TransactionWithSigner
+
+from smart_contracts.climate_dao.client import ClimateDAOClient, VotingSystemClient, member_box
+from smart_contracts.climate_dao.templates import MethodTemplate, group_id, payment_template, signing_key, vote_boxes
+from smart_contracts.mock_algod import GENESIS_HASH, GENESIS_ID, MockAlgodServer
+from smart_contracts.submitter import TransactionSubmitter
+from smart_contracts.transport import PooledAlgodClient
+
+
+def signed_bytes(stxn) -> bytes:
+    return base64.b64decode(encoding.msgpack_encode(stxn))
+
+
+class TestTemplates(unittest.TestCase):
+    """Template bytes are exactly what algosdk builds and signs"""
+
+    def setUp(self):
+        self.private_key, self.sender = account.generate_account()
+        self.signer = AccountTransactionSigner(self.private_key)
+        self.sp = transaction.SuggestedParams(1000, 100, 1100, GENESIS_HASH, GENESIS_ID, flat_fee=True)
+
+    def test_vote_matches_composer(self):
+        voting = VotingSystemClient(None, app_id=1001, sender=self.sender, signer=self.signer)
+        template = MethodTemplate(voting, "vote", self.sp, boxes=vote_boxes)
+        key = signing_key(self.private_key)
+        for pid, choice, power in [(1, 1, 10), (300, 0, 2 ** 40)]:
+            atc = voting.compose("vote", [pid, choice, power], sp=self.sp, boxes=vote_boxes(self.sender, [pid]))
+            [expected] = atc.gather_signatures()
+            encoded = template.call(key, self.sender, [pid, choice, power], 100, 1100)
+            self.assertEqual(encoded.signed_bytes, signed_bytes(expected))
+            self.assertEqual(encoded.get_txid(), expected.get_txid())
+            # algosdk can re-encode it too
+            self.assertEqual(signed_bytes(encoded), encoded.signed_bytes)
+
+    def test_join_group_matches_composer(self):
+        """Payment plus join_dao call, grouped, with the fee pooled on the payment"""
+        dao = ClimateDAOClient(None, app_id=2002, sender=self.sender, signer=self.signer)
+        pay_sp = transaction.SuggestedParams(3000, 100, 1100, GENESIS_HASH, GENESIS_ID, flat_fee=True)
+        call_sp = transaction.SuggestedParams(0, 100, 1100, GENESIS_HASH, GENESIS_ID, flat_fee=True)
+        pay = transaction.PaymentTxn(self.sender, pay_sp, dao.app_address, 100_000)
+        atc = dao.compose("join_dao", [TransactionWithSigner(pay, self.signer)], sp=call_sp, boxes=[member_box(self.sender)], foreign_assets=[77])
+        expected = atc.gather_signatures()
+
+        pay_template = payment_template(dao.app_address, 100_000, pay_sp)
+        join_template = MethodTemplate(dao, "join_dao", call_sp, boxes=lambda sender, args: [member_box(sender)], foreign_assets=[77])
+        bodies = [pay_template.encode(self.sender, 100, 1100), join_template.encode(self.sender, [], 100, 1100)]
+        gid = group_id(bodies)
+        key = signing_key(self.private_key)
+        group = [
+            pay_template.sign(key, pay_template.encode(self.sender, 100, 1100, group=gid), 100, 1100),
+            join_template.sign(key, join_template.encode(self.sender, [], 100, 1100, group=gid), 100, 1100),
+        ]
+        self.assertEqual([stxn.signed_bytes for stxn in group], [signed_bytes(stxn) for stxn in expected])
+
+    def test_submit_pre_encoded(self):
+        """The submitter sends encoded transactions as they are and confirms them"""
+        with MockAlgodServer(block_time=0.05) as server:
+            algod_client = PooledAlgodClient("", server.address)
+            voting = VotingSystemClient(algod_client, app_id=1001, sender=self.sender, signer=self.signer)
+            sp = algod_client.suggested_params()
+            sp.flat_fee, sp.fee = True, 1000
+            template = MethodTemplate(voting, "vote", sp, boxes=vote_boxes)
+            key = signing_key(self.private_key)
+            txns = [template.call(key, self.sender, [pid, 1, 5], sp.first, sp.last) for pid in range(1, 6)]
+
+            async def submit():
+                async with TransactionSubmitter(algod_client) as submitter:
+                    return await submitter.submit_all(txns)
+
+            results = asyncio.run(submit())
+            algod_client.transport.close()
+        self.assertTrue(all(result["confirmed-round"] for result in results))
+        self.assertEqual({result["txid"] for result in results}, {stxn.txid for stxn in txns})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
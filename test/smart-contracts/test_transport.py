@@ -0,0 +1,101 @@
+"""
+Unit tests for the pooled algod transport
+Runs against the local mock algod server, no network required
+"""
+
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algosdk import account, error
+
+from smart_contracts.mock_algod import MockAlgodServer
+from smart_contracts.transport import HTTPTransport, PooledAlgodClient, RequestNotSent, RetryPolicy, get_algod_client
+
+
+class TestPooledTransport(unittest.TestCase):
+    """Keep-alive, retries, coalescing and bounded concurrency"""
+
+    def setUp(self):
+        self.server = MockAlgodServer().start()
+        self.ledger = self.server.ledger
+        self.client = PooledAlgodClient("", self.server.address, retry=RetryPolicy(backoff=0.001))
+
+    def tearDown(self):
+        self.client.transport.close()
+        self.server.stop()
+
+    def test_connections_are_reused(self):
+        """Sequential calls share one keep-alive connection"""
+        _, address = account.generate_account()
+        self.ledger.add_account(address, 5_000_000)
+        for _ in range(20):
+            self.client.status()
+            self.client.suggested_params()
+        self.assertEqual(self.client.account_info(address)["amount"], 5_000_000)
+        self.assertEqual(self.ledger.connections, 1)
+        self.assertEqual(self.client.transport.stats["connections_opened"], 1)
+
+    def test_retries_transient_errors(self):
+        """503s are retried with backoff until the request succeeds"""
+        self.ledger.fail_next = 2
+        self.assertEqual(self.client.status()["last-round"], self.ledger.round)
+        self.assertEqual(self.client.transport.stats["retries"], 2)
+
+    def test_gives_up_after_max_attempts(self):
+        """Persistent failures surface as AlgodHTTPError"""
+        self.ledger.fail_next = 100
+        with self.assertRaises(error.AlgodHTTPError) as ctx:
+            self.client.status()
+        self.assertEqual(ctx.exception.code, 503)
+        self.assertEqual(self.ledger.requests, self.client.transport.retry.attempts)
+
+    def test_posts_are_not_resent(self):
+        """A POST the server may have seen is never sent twice; one that never left is retried"""
+        self.ledger.fail_next = 1
+        response = self.client.transport.request("POST", "/v2/transactions", {}, b"signed bytes")
+        self.assertEqual((response.status, self.ledger.requests), (503, 1))
+        self.assertEqual(self.client.transport.stats["retries"], 0)
+
+        closed = HTTPTransport("http://127.0.0.1:1", retry=RetryPolicy(attempts=3, backoff=0.001))
+        with self.assertRaises(RequestNotSent):
+            closed.request("POST", "/v2/transactions", {}, b"signed bytes")
+        self.assertEqual(closed.stats["retries"], 2)
+
+    def test_not_found_is_not_retried(self):
+        """4xx responses map to AlgodHTTPError immediately"""
+        with self.assertRaises(error.AlgodHTTPError) as ctx:
+            self.client.application_info(42)
+        self.assertEqual(ctx.exception.code, 404)
+        self.assertEqual(self.ledger.requests, 1)
+
+    def test_identical_reads_are_coalesced(self):
+        """Concurrent identical GETs produce a single upstream request"""
+        self.ledger.latency = 0.2
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            results = list(pool.map(lambda _: self.client.status()["last-round"], range(10)))
+        self.assertEqual(set(results), {self.ledger.round})
+        self.assertLess(self.ledger.requests, 10)
+        self.assertEqual(self.client.transport.stats["coalesced"] + self.ledger.requests, 10)
+
+    def test_concurrency_is_bounded(self):
+        """No more than max_connections sockets are opened under load"""
+        client = PooledAlgodClient("", self.server.address, max_connections=2)
+        self.ledger.latency = 0.05
+        self.ledger.add_app(7)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda i: client.application_info(7) if i % 2 else client.status(), range(16)))
+        self.assertLessEqual(client.transport.stats["connections_opened"], 2)
+        client.transport.close()
+
+    def test_shared_client(self):
+        """get_algod_client hands out one client per address/token"""
+        self.assertIs(get_algod_client(self.server.address, ""), get_algod_client(self.server.address, ""))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,462 @@
+"""
+Unit tests for the VotingSystem contract logic
+Runs the contract in-process with algopy_testing, no network required
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[2] / "contracts" / "climate-dao" / "projects" / "climate-dao"
+sys.path.insert(0, str(PROJECT_DIR))
+
+from algopy import UInt64, arc4
+from algopy_testing import algopy_testing_context
+
+from smart_contracts.climate_dao.client import bitmap_indexes, decode_active
+from smart_contracts.events import decode_log
+from smart_contracts.climate_dao.contract import CreditAward, DelegationRecord, VotingSystem
+
+
+class VotingContractTest(unittest.TestCase):
+    """Shared setup: a VotingSystem with the creator as admin"""
+
+    def setUp(self):
+        self.ctx_manager = algopy_testing_context()
+        self.ctx = self.ctx_manager.__enter__()
+        self.admin = self.ctx.default_sender
+        self.contract = VotingSystem()
+
+    def tearDown(self):
+        self.ctx_manager.__exit__(None, None, None)
+
+    def register(self, tokens=500_000_000):
+        account = self.ctx.any.account()
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": self.admin}):
+            self.contract.register_member(arc4.Address(account), arc4.UInt64(tokens))
+        return account
+
+    def propose(self, proposer, title="Mangroves"):
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": proposer}):
+            return self.contract.submit_proposal(arc4.String(title), arc4.String("Restore 40ha"), arc4.UInt64(1000))
+
+    def vote(self, voter, pid, choice=1, power=10):
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": voter}):
+            self.contract.vote(arc4.UInt64(pid), arc4.UInt64(choice), arc4.UInt64(power))
+
+    def delegate(self, member, to):
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": member}):
+            self.contract.delegate(arc4.Address(to))
+
+    def undelegate(self, member):
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": member}):
+            self.contract.undelegate()
+
+    def set_time(self, timestamp):
+        self.ctx.ledger.patch_global_fields(latest_timestamp=timestamp)
+
+    def summary(self, pid):
+        return self.contract.get_vote_summary(arc4.UInt64(pid))
+
+
+class TestVotedBitmap(VotingContractTest):
+    """Member indexes and per-proposal voted bitmaps"""
+
+    def test_members_get_dense_indexes(self):
+        """Registration assigns 0, 1, 2, ... and re-registering keeps the index"""
+        members = [self.register() for _ in range(3)]
+        for i, member in enumerate(members):
+            self.assertEqual(self.contract.get_member(arc4.Address(member)).index.native, i)
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": self.admin}):
+            self.contract.register_member(arc4.Address(members[1]), arc4.UInt64(1))
+        record = self.contract.get_member(arc4.Address(members[1]))
+        self.assertEqual((record.index.native, record.balance.native), (1, 1))
+        self.assertEqual(self.contract.total_members, 3)
+
+    def test_member_record_counts_activity(self):
+        """Proposals and ballots are counted in place in the member's record"""
+        self.set_time(1_000_000)
+        member = self.register()
+        first = self.propose(member)
+        self.propose(member, "Solar")
+        self.vote(member, first)
+        record = self.contract.get_member(arc4.Address(member))
+        self.assertEqual((record.joined.native, record.proposals.native, record.votes.native), (1_000_000, 2, 1))
+        self.assertEqual(len(self.contract.members[member]), 112)  # MemberRecord + DelegationRecord
+        self.assertEqual(self.contract.get_delegation(arc4.Address(member)).last_vote.native, 1_000_000)
+
+    def test_vote_sets_member_bit(self):
+        """A vote sets exactly the voter's bit and tallies the power"""
+        members = [self.register() for _ in range(3)]
+        pid = self.propose(members[0])
+        self.vote(members[2], pid, power=25)
+
+        bitmap = self.contract.voted[pid]
+        self.assertEqual(bitmap_indexes(bitmap.value), [2])
+        self.assertTrue(self.contract.has_voted(arc4.UInt64(pid), arc4.Address(members[2])))
+        self.assertFalse(self.contract.has_voted(arc4.UInt64(pid), arc4.Address(members[1])))
+        summary = self.contract.get_vote_summary(arc4.UInt64(pid))
+        self.assertEqual(summary.yes_votes.native, 25)
+        self.assertEqual(summary.total_voters.native, 1)
+
+    def test_double_vote_rejected(self):
+        """The second ballot from the same member fails the bit test"""
+        member = self.register()
+        pid = self.propose(member)
+        self.vote(member, pid)
+        with self.assertRaisesRegex(AssertionError, "already voted"):
+            self.vote(member, pid, choice=2)
+        self.assertEqual(self.contract.get_vote_summary(arc4.UInt64(pid)).no_votes.native, 0)
+
+    def test_bitmap_grows_for_late_members(self):
+        """Members registered after the proposal still vote; the bitmap grows a byte per 8 members"""
+        first = self.register()
+        pid = self.propose(first)
+        late = [self.register() for _ in range(12)]
+        self.vote(first, pid)
+        self.assertEqual(len(self.contract.voted[pid].value), 1)
+        self.vote(late[-1], pid)
+        bitmap = self.contract.voted[pid].value
+        self.assertEqual(len(bitmap), 2)
+        self.assertEqual(bitmap_indexes(bitmap), [0, 12])
+
+    def test_bitmaps_are_per_proposal(self):
+        """Voting on one proposal does not mark the member on another"""
+        member = self.register()
+        first = self.propose(member)
+        second = self.propose(member, "Solar")
+        self.vote(member, first)
+        self.vote(member, second)
+        self.assertEqual(bitmap_indexes(self.contract.voted[first].value), [0])
+        self.assertEqual(bitmap_indexes(self.contract.voted[second].value), [0])
+
+
+class TestMemberMigration(VotingContractTest):
+    """Members registered before indexing get an index and the full record"""
+
+    def legacy_member(self, balance=300_000_000):
+        # the 8-byte balance box older versions wrote, without an index
+        account = self.ctx.any.account()
+        self.contract.members[account] = arc4.UInt64(balance).bytes
+        return account
+
+    def migrate(self, member):
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": member}):
+            self.contract.migrate_member(arc4.Address(member))
+
+    def test_migrate_assigns_next_index(self):
+        """The balance is kept, the index follows the members registered since, and they can vote"""
+        legacy = self.legacy_member()
+        member = self.register()
+        pid = self.propose(member)
+        self.migrate(legacy)
+        record = self.contract.get_member(arc4.Address(legacy))
+        self.assertEqual((record.balance.native, record.index.native, record.votes.native), (300_000_000, 1, 0))
+        self.assertEqual(len(self.contract.members[legacy]), 112)
+        self.assertEqual(self.contract.total_members, 2)
+
+        self.vote(legacy, pid)
+        self.assertEqual(bitmap_indexes(self.contract.voted[pid].value), [1])
+        # a second migration changes nothing
+        self.migrate(legacy)
+        self.assertEqual(self.contract.get_member(arc4.Address(legacy)).index.native, 1)
+        self.assertEqual(self.contract.total_members, 2)
+
+    def test_migrate_merges_index_and_delegation_boxes(self):
+        """Members indexed before the record was merged keep their index and delegation"""
+        delegate = self.register()
+        legacy = self.legacy_member()
+        self.contract.legacy_index[legacy] = UInt64(1)
+        self.contract.legacy_delegations[legacy] = DelegationRecord(
+            arc4.Address(delegate), arc4.UInt64(300_000_000), arc4.UInt64(0), arc4.UInt64(0), arc4.UInt64(50), arc4.UInt64(0)
+        ).bytes
+        self.contract.total_members = UInt64(2)
+        self.migrate(legacy)
+
+        self.assertEqual(self.contract.get_member(arc4.Address(legacy)).index.native, 1)
+        delegation = self.contract.get_delegation(arc4.Address(legacy))
+        self.assertEqual((delegation.delegate.native, delegation.lent_power.native, delegation.last_change.native), (delegate, 300_000_000, 50))
+        self.assertNotIn(legacy, self.contract.legacy_index)
+        self.assertNotIn(legacy, self.contract.legacy_delegations)
+        self.assertEqual(self.contract.total_members, 2)
+        newcomer = self.register()
+        self.assertEqual(self.contract.get_member(arc4.Address(newcomer)).index.native, 2)
+
+    def test_register_migrates(self):
+        """Re-registering a legacy member migrates them before setting the balance"""
+        legacy = self.legacy_member()
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": self.admin}):
+            self.contract.register_member(arc4.Address(legacy), arc4.UInt64(7))
+        record = self.contract.get_member(arc4.Address(legacy))
+        self.assertEqual((record.balance.native, record.index.native), (7, 0))
+
+
+class TestDelegation(VotingContractTest):
+    """Delegated power is aggregated into the delegate's vote and never counted twice"""
+
+    def setUp(self):
+        super().setUp()
+        self.set_time(1_000_000)
+        self.delegate_member = self.register(50)
+        self.alice = self.register(100)
+        self.bob = self.register(200)
+        self.proposer = self.register()
+
+    def test_delegate_votes_with_aggregated_power(self):
+        """One call casts the delegate's and both delegators' power"""
+        self.delegate(self.alice, self.delegate_member)
+        self.delegate(self.bob, self.delegate_member)
+        record = self.contract.get_delegation(arc4.Address(self.delegate_member))
+        self.assertEqual(record.delegated_power.native, 300)
+        self.assertEqual(record.delegators.native, 2)
+
+        self.set_time(1_000_010)
+        pid = self.propose(self.proposer)
+        with self.assertRaisesRegex(AssertionError, "insufficient balance"):
+            self.vote(self.delegate_member, pid, power=351)
+        self.vote(self.delegate_member, pid, power=350)
+        summary = self.summary(pid)
+        self.assertEqual(summary.yes_votes.native, 350)
+        self.assertEqual(summary.total_voters.native, 3)
+
+    def test_delegator_cannot_vote_directly(self):
+        """Power handed to a delegate cannot also be cast by its owner"""
+        self.delegate(self.alice, self.delegate_member)
+        self.set_time(1_000_010)
+        pid = self.propose(self.proposer)
+        with self.assertRaisesRegex(AssertionError, "voting power delegated"):
+            self.vote(self.alice, pid, power=100)
+
+    def test_voter_cannot_delegate_while_proposal_open(self):
+        """A direct vote locks delegation until the voting period has passed"""
+        pid = self.propose(self.proposer)
+        self.vote(self.alice, pid, power=100)
+        with self.assertRaisesRegex(AssertionError, "voted on an open proposal"):
+            self.delegate(self.alice, self.delegate_member)
+        self.set_time(1_000_000 + 604800 + 1)
+        self.delegate(self.alice, self.delegate_member)
+        self.assertEqual(self.contract.get_delegation(arc4.Address(self.delegate_member)).delegated_power.native, 100)
+
+    def test_undelegate_only_applies_to_new_proposals(self):
+        """After undelegating, older proposals stay with the delegate's tally"""
+        self.delegate(self.alice, self.delegate_member)
+        self.set_time(1_000_010)
+        old_pid = self.propose(self.proposer)
+        self.vote(self.delegate_member, old_pid, power=150)
+
+        self.set_time(1_000_020)
+        self.undelegate(self.alice)
+        self.assertEqual(self.contract.get_delegation(arc4.Address(self.delegate_member)).delegated_power.native, 0)
+        with self.assertRaisesRegex(AssertionError, "delegation changed during this proposal"):
+            self.vote(self.alice, old_pid, power=100)
+        # re-delegating right away would let a second delegate cast the same power on old_pid
+        with self.assertRaisesRegex(AssertionError, "delegation changed recently"):
+            self.delegate(self.alice, self.bob)
+
+        self.set_time(1_000_030)
+        new_pid = self.propose(self.proposer, "Solar")
+        self.vote(self.alice, new_pid, power=100)
+        self.assertEqual(self.summary(old_pid).yes_votes.native, 150)
+        self.assertEqual(self.summary(new_pid).yes_votes.native, 100)
+
+    def test_balance_change_moves_lent_power(self):
+        """Re-registering a delegator with a new balance moves the difference to or from its delegate"""
+        self.delegate(self.alice, self.delegate_member)
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": self.admin}):
+            self.contract.register_member(arc4.Address(self.alice), arc4.UInt64(40))
+        self.assertEqual(self.contract.get_delegation(arc4.Address(self.alice)).lent_power.native, 40)
+        self.assertEqual(self.contract.get_delegation(arc4.Address(self.delegate_member)).delegated_power.native, 40)
+
+        self.set_time(1_000_010)
+        pid = self.propose(self.proposer)
+        with self.assertRaisesRegex(AssertionError, "insufficient balance"):
+            self.vote(self.delegate_member, pid, power=91)
+        self.vote(self.delegate_member, pid, power=90)
+        # undelegating takes back exactly what is lent now, not the balance at delegation time
+        self.set_time(1_000_020)
+        self.undelegate(self.alice)
+        self.assertEqual(self.contract.get_delegation(arc4.Address(self.delegate_member)).delegated_power.native, 0)
+
+    def test_no_delegation_chains(self):
+        """Delegates cannot delegate, and delegators cannot receive delegation"""
+        self.delegate(self.alice, self.delegate_member)
+        with self.assertRaisesRegex(AssertionError, "delegates cannot delegate"):
+            self.delegate(self.delegate_member, self.bob)
+        with self.assertRaisesRegex(AssertionError, "delegate is delegating"):
+            self.delegate(self.bob, self.alice)
+        with self.assertRaisesRegex(AssertionError, "already delegating"):
+            self.delegate(self.alice, self.bob)
+
+
+class TestFinalizeBatch(VotingContractTest):
+    """Batch finalization skips ineligible ids instead of failing"""
+
+    def finalize_batch(self, ids):
+        ids = arc4.DynamicArray[arc4.UInt64](*[arc4.UInt64(i) for i in ids])
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": self.admin}):
+            return [status.native for status in self.contract.finalize_batch(ids)]
+
+    def test_mixed_batch(self):
+        """Expired ids are finalized; open, final and unknown ids report their status"""
+        self.set_time(1_000_000)
+        proposer = self.register()
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": self.admin}):
+            self.contract.set_total_token_supply(arc4.UInt64(1000))
+        approved = self.propose(proposer)
+        no_quorum = self.propose(proposer, "Wind")
+        self.vote(proposer, approved, choice=1, power=200)
+
+        self.set_time(1_000_000 + 604800 + 1)
+        still_open = self.propose(proposer, "Solar")
+
+        self.assertEqual(self.finalize_batch([approved, still_open, no_quorum, 99]), [1, 0, 3, 0])
+        self.assertEqual(self.contract.get_proposal(arc4.UInt64(approved)).status.native, 1)
+        self.assertEqual(self.contract.get_proposal(arc4.UInt64(still_open)).status.native, 0)
+        # a second pass leaves finalized proposals untouched
+        self.assertEqual(self.finalize_batch([approved, no_quorum]), [1, 3])
+
+    def test_finalize_still_strict(self):
+        """The single-id method keeps failing loudly"""
+        proposer = self.register()
+        pid = self.propose(proposer)
+        with self.assertRaisesRegex(AssertionError, "voting still open"):
+            with self.ctx.txn.create_group(active_txn_overrides={"sender": self.admin}):
+                self.contract.finalize(arc4.UInt64(pid))
+
+
+class TestActiveQueue(VotingContractTest):
+    """Open proposals are listed by end time and leave the queue when finalized"""
+
+    def expiring(self, before_ts, limit=100):
+        entries = self.contract.get_expiring(arc4.UInt64(before_ts), arc4.UInt64(limit))
+        return [(entry.end_time.native, entry.proposal_id.native) for entry in entries]
+
+    def finalize(self, pid):
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": self.admin}):
+            return self.contract.finalize(arc4.UInt64(pid)).native
+
+    def test_queue_is_sorted_by_end_time(self):
+        """Entries come back soonest first, filtered by `before_ts` and capped by `limit`"""
+        proposer = self.register()
+        self.set_time(1000)
+        first = self.propose(proposer)
+        self.set_time(2000)
+        second = self.propose(proposer, "Wind")
+        # a shorter voting period makes the newest proposal end first
+        self.contract.voting_period = arc4.UInt64(100)
+        third = self.propose(proposer, "Solar")
+
+        everything = self.expiring(2**64 - 1)
+        self.assertEqual(everything, [(2100, third), (605800, first), (606800, second)])
+        self.assertEqual(decode_active(self.contract.active.value.value), everything)
+        self.assertEqual(self.expiring(605800), [(2100, third)])
+        self.assertEqual(self.expiring(2**64 - 1, limit=2), everything[:2])
+        self.assertEqual(self.expiring(0), [])
+
+    def test_finalize_removes_entries(self):
+        """finalize and finalize_batch take proposals out of the queue; the box goes when empty"""
+        proposer = self.register()
+        self.set_time(1000)
+        pids = [self.propose(proposer, f"P{i}") for i in range(4)]
+        self.set_time(1000 + 604800 + 1)
+        self.finalize(pids[2])
+        self.assertEqual([pid for _, pid in self.expiring(2**64 - 1)], [pids[0], pids[1], pids[3]])
+
+        ids = arc4.DynamicArray[arc4.UInt64](*[arc4.UInt64(pid) for pid in pids])
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": self.admin}):
+            self.contract.finalize_batch(ids)
+        self.assertEqual(self.expiring(2**64 - 1), [])
+        self.assertFalse(self.contract.active)
+
+
+class TestCreditAwards(VotingContractTest):
+    """Awards are totalled per proposal and capped at its funding"""
+
+    def setUp(self):
+        super().setUp()
+        self.set_time(1_000_000)
+        self.proposer = self.register()
+        credit = self.ctx.any.asset()
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": self.admin}):
+            self.contract.set_total_token_supply(arc4.UInt64(1000))
+            self.contract.set_credit_token(arc4.UInt64(credit.id))
+        self.approved = self.propose(self.proposer)
+        self.rejected = self.propose(self.proposer, "Wind")
+        self.vote(self.proposer, self.approved, choice=1, power=200)
+        self.set_time(1_000_000 + 604800 + 1)
+        ids = arc4.DynamicArray[arc4.UInt64](arc4.UInt64(self.approved), arc4.UInt64(self.rejected))
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": self.admin}):
+            self.contract.finalize_batch(ids)
+
+    def award_batch(self, awards):
+        awards = arc4.DynamicArray[CreditAward](*[CreditAward(arc4.UInt64(pid), arc4.UInt64(amount)) for pid, amount in awards])
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": self.admin}):
+            totals = [total.native for total in self.contract.award_credits_batch(awards)]
+        group = self.ctx.txn.last_group
+        transfers = [group.get_itxn_group(i).asset_transfer(0) for i in range(len(group.itxn_groups))]
+        return totals, [(txn.asset_receiver, txn.asset_amount) for txn in transfers]
+
+    def awarded(self, pid):
+        return self.contract.get_awarded(arc4.UInt64(pid)).native
+
+    def test_batch_pays_eligible_awards(self):
+        """Approved awards within funding pay; rejected, unknown and over-cap ones are skipped"""
+        totals, transfers = self.award_batch([(self.approved, 600), (self.rejected, 100), (77, 5), (self.approved, 500), (self.approved, 400)])
+        self.assertEqual(totals, [600, 0, 0, 600, 1000])
+        self.assertEqual(transfers, [(self.proposer, 600), (self.proposer, 400)])
+        self.assertEqual(self.awarded(self.approved), 1000)
+        self.assertEqual(self.awarded(self.rejected), 0)
+
+        # a repeated payout is a no-op
+        self.assertEqual(self.award_batch([(self.approved, 1000)]), ([1000], []))
+
+    def test_single_award_is_capped(self):
+        """award_credits shares the ledger and fails past the funding"""
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": self.admin}):
+            self.contract.award_credits(arc4.UInt64(self.approved), arc4.UInt64(700))
+        self.assertEqual(self.awarded(self.approved), 700)
+        with self.assertRaisesRegex(AssertionError, "award exceeds funding"):
+            with self.ctx.txn.create_group(active_txn_overrides={"sender": self.admin}):
+                self.contract.award_credits(arc4.UInt64(self.approved), arc4.UInt64(301))
+
+
+class TestEvents(VotingContractTest):
+    """Each state-changing call logs its ARC-28 event"""
+
+    def logged(self):
+        txn = self.ctx.txn.last_active
+        return [decode_log(txn.logs(i)) for i in range(txn.num_logs) if decode_log(txn.logs(i))]
+
+    def test_lifecycle_events(self):
+        self.set_time(1_000_000)
+        credit = self.ctx.any.asset()
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": self.admin}):
+            self.contract.set_credit_token(arc4.UInt64(credit.id))
+        self.assertEqual(self.logged(), [("SettingChanged", {"name": "credit_token_id", "value": credit.id.value.to_bytes(8, "big")})])
+
+        proposer = self.register()
+        self.assertEqual(self.logged(), [("MemberRegistered", {"member": str(proposer), "tokens": 500_000_000, "index": 0})])
+        backer = self.register()
+        self.delegate(backer, proposer)
+        self.assertEqual(self.logged(), [("Delegated", {"member": str(backer), "delegate": str(proposer), "power": 500_000_000})])
+
+        self.set_time(1_000_000 + 604800 + 1)
+        pid = self.propose(proposer)
+        self.assertEqual(self.logged(), [("ProposalSubmitted", {"proposal_id": pid, "proposer": str(proposer), "funding": 1000, "end_time": 1_000_000 + 2 * 604800 + 1})])
+        self.vote(proposer, pid, choice=1, power=700)
+        self.assertEqual(self.logged(), [("VoteCast", {"proposal_id": pid, "voter": str(proposer), "choice": 1, "power": 700})])
+
+        self.set_time(1_000_000 + 3 * 604800)
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": self.admin}):
+            self.contract.finalize(arc4.UInt64(pid))
+        self.assertEqual(self.logged(), [("ProposalFinalized", {"proposal_id": pid, "status": 1, "yes_votes": 700, "no_votes": 0, "total_voting_power": 700})])
+        with self.ctx.txn.create_group(active_txn_overrides={"sender": self.admin}):
+            self.contract.award_credits(arc4.UInt64(pid), arc4.UInt64(250))
+        self.assertEqual(self.logged(), [("CreditsAwarded", {"proposal_id": pid, "receiver": str(proposer), "amount": 250, "total": 250})])
+
+        self.undelegate(backer)
+        self.assertEqual(self.logged(), [("Undelegated", {"member": str(backer), "delegate": str(proposer), "power": 500_000_000})])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)